@@ -0,0 +1,314 @@
+"""Admission control — host headroom checks and the FIFO slot wait queue.
+
+Before a slot is allocated, the host must have enough free memory (from
+/proc/meminfo and the cgroup limit) and the project must be under its
+``max_slots`` quota. Requests that cannot be admitted are refused, or
+with ``kinfra impl --wait`` parked in ~/.devops-ai/queue.json and admitted
+first-in, first-out as capacity frees up. A waiter held back only by its
+own project's quota does not hold up other projects.
+"""
+
+from __future__ import annotations
+
+import fcntl
+import json
+import logging
+import os
+import time
+import uuid
+from collections.abc import Callable, Iterator
+from contextlib import contextmanager
+from dataclasses import asdict, dataclass
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import TYPE_CHECKING
+
+from devops_ai.config import InfraConfig, parse_mem_limit
+from devops_ai.resources import read_meminfo, slot_demand
+
+if TYPE_CHECKING:
+    from devops_ai.registry import Registry
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_QUEUE_PATH = Path.home() / ".devops-ai" / "queue.json"
+CGROUP_ROOT = Path("/sys/fs/cgroup")
+
+
+class AdmissionDenied(RuntimeError):
+    """The host or project cannot take another slot right now.
+
+    Unlike slot exhaustion this is transient: retrying once other slots
+    are released may succeed.
+    """
+
+
+# ---------------------------------------------------------------------------
+# Host headroom
+# ---------------------------------------------------------------------------
+
+
+def read_mem_available(meminfo: Path | None = None) -> int | None:
+    """Return MemAvailable from /proc/meminfo in bytes, or None."""
+    return read_meminfo("MemAvailable", meminfo)
+
+
+def cgroup_memory_headroom(cgroup_root: Path | None = None) -> int | None:
+    """Return memory.max - memory.current for the cgroup v2 root, or None.
+
+    Returns None when there is no cgroup limit (``max``) or the files are
+    unreadable (cgroup v1, macOS).
+    """
+    root = cgroup_root or CGROUP_ROOT
+    try:
+        limit = (root / "memory.max").read_text().strip()
+        current = int((root / "memory.current").read_text().strip())
+    except (OSError, ValueError):
+        return None
+    if limit == "max":
+        return None
+    try:
+        return max(int(limit) - current, 0)
+    except ValueError:
+        return None
+
+
+def memory_headroom(
+    meminfo: Path | None = None, cgroup_root: Path | None = None
+) -> int | None:
+    """Free memory for new sandboxes: the tighter of host and cgroup."""
+    candidates = [
+        v
+        for v in (
+            read_mem_available(meminfo),
+            cgroup_memory_headroom(cgroup_root),
+        )
+        if v is not None
+    ]
+    return min(candidates) if candidates else None
+
+
+def check_quota(registry: Registry, config: InfraConfig) -> str | None:
+    """Return why the project's ``max_slots`` quota is full, or None."""
+    if config.max_slots is None:
+        return None
+    in_use = sum(
+        1 for s in registry.slots.values() if s.project == config.project_name
+    )
+    if in_use >= config.max_slots:
+        return (
+            f"Project quota reached: {in_use} of {config.max_slots} "
+            f"slots in use for {config.project_name}"
+        )
+    return None
+
+
+def check_admission(
+    registry: Registry,
+    config: InfraConfig,
+    headroom: int | None = None,
+) -> str | None:
+    """Decide whether a new slot for this project may start now.
+
+    Checks the project's ``max_slots`` quota, then that free memory covers
+    the slot's reservation (or ``min_free_mem``, whichever is larger).
+    Returns a human-readable reason if denied, or None if admitted.
+    """
+    quota = check_quota(registry, config)
+    if quota:
+        return quota
+
+    needed = slot_demand(config).mem_bytes
+    if config.resources.min_free_mem:
+        needed = max(needed, parse_mem_limit(config.resources.min_free_mem))
+    if not needed:
+        return None
+
+    if headroom is None:
+        headroom = memory_headroom()
+    if headroom is not None and headroom < needed:
+        return (
+            f"Insufficient memory headroom: {headroom // 1024**2}MiB free, "
+            f"slot needs {needed // 1024**2}MiB"
+        )
+    return None
+
+
+# ---------------------------------------------------------------------------
+# Wait queue
+# ---------------------------------------------------------------------------
+
+
+@dataclass
+class QueueEntry:
+    """A ``kinfra impl --wait`` request waiting for admission."""
+
+    ticket: str
+    project: str
+    request: str  # e.g. "my-feature/M1"
+    pid: int
+    enqueued_at: str
+    # Held back only by its own project's quota; other projects may pass
+    quota_blocked: bool = False
+
+
+def _ahead_of(entries: list[QueueEntry], project: str) -> list[QueueEntry]:
+    """Entries a request for ``project`` has to wait behind."""
+    return [e for e in entries if e.project == project or not e.quota_blocked]
+
+
+def _pid_alive(pid: int) -> bool:
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+@contextmanager
+def _locked_queue(path: Path) -> Iterator[list[QueueEntry]]:
+    """Yield the queue under an exclusive lock, persisting changes on exit.
+
+    Entries whose waiting process has died are pruned on every access so
+    a crashed waiter never blocks the head of the queue.
+    """
+    path.parent.mkdir(parents=True, exist_ok=True)
+    lock_path = path.with_suffix(".lock")
+    with open(lock_path, "a") as lock:
+        fcntl.flock(lock.fileno(), fcntl.LOCK_EX)
+        try:
+            entries = _read_queue(path)
+            entries = [e for e in entries if _pid_alive(e.pid)]
+            yield entries
+            tmp = path.with_suffix(".tmp")
+            tmp.write_text(
+                json.dumps([asdict(e) for e in entries], indent=2) + "\n"
+            )
+            os.replace(tmp, path)
+        finally:
+            fcntl.flock(lock.fileno(), fcntl.LOCK_UN)
+
+
+def _read_queue(path: Path) -> list[QueueEntry]:
+    try:
+        data = json.loads(path.read_text())
+    except (OSError, json.JSONDecodeError):
+        return []
+    entries: list[QueueEntry] = []
+    for item in data if isinstance(data, list) else []:
+        try:
+            entries.append(QueueEntry(**item))
+        except TypeError:
+            logger.warning("Dropping malformed queue entry: %s", item)
+    return entries
+
+
+def load_queue(path: Path | None = None) -> list[QueueEntry]:
+    """Return live queue entries in FIFO order.
+
+    Read-only: the file is replaced atomically by writers, so no lock is
+    needed, and dead waiters are skipped rather than pruned.
+    """
+    entries = _read_queue(path or DEFAULT_QUEUE_PATH)
+    return [e for e in entries if _pid_alive(e.pid)]
+
+
+def check_queue(project: str, path: Path | None = None) -> str | None:
+    """Return why a request that is not queued must not start, or None.
+
+    Requests waiting in the queue are admitted first, so nobody may jump
+    ahead of them while any are waiting. Waiters of other projects held
+    back only by their own quota do not count.
+    """
+    waiting = len(_ahead_of(load_queue(path), project))
+    if waiting:
+        return f"{waiting} request(s) already queued for a slot"
+    return None
+
+
+def enqueue(
+    project: str, request: str, path: Path | None = None
+) -> QueueEntry:
+    """Append a request for the current process to the queue."""
+    entry = QueueEntry(
+        ticket=uuid.uuid4().hex[:12],
+        project=project,
+        request=request,
+        pid=os.getpid(),
+        enqueued_at=datetime.now(timezone.utc).isoformat(timespec="seconds"),
+    )
+    with _locked_queue(path or DEFAULT_QUEUE_PATH) as entries:
+        entries.append(entry)
+    return entry
+
+
+def dequeue(ticket: str, path: Path | None = None) -> None:
+    """Remove a ticket from the queue (no-op if already gone)."""
+    with _locked_queue(path or DEFAULT_QUEUE_PATH) as entries:
+        entries[:] = [e for e in entries if e.ticket != ticket]
+
+
+def queue_position(ticket: str, path: Path | None = None) -> int | None:
+    """Return the 0-based position of a ticket, or None if not queued."""
+    for i, entry in enumerate(load_queue(path)):
+        if entry.ticket == ticket:
+            return i
+    return None
+
+
+def _set_quota_blocked(
+    ticket: str, blocked: bool, path: Path | None = None
+) -> None:
+    with _locked_queue(path or DEFAULT_QUEUE_PATH) as entries:
+        for e in entries:
+            if e.ticket == ticket:
+                e.quota_blocked = blocked
+
+
+def wait_for_admission(
+    entry: QueueEntry,
+    admit: Callable[[], str | None],
+    path: Path | None = None,
+    poll_interval: float = 5.0,
+    timeout: float | None = None,
+    quota: Callable[[], str | None] | None = None,
+) -> bool:
+    """Block until ``entry`` is at the head of the queue and admitted.
+
+    ``admit`` re-evaluates admission (typically reloading the registry)
+    and returns a denial reason or None. Only the head of the queue is
+    admitted, which keeps processing strictly FIFO. ``quota`` checks the
+    project's own slot quota: while it denies, the entry is marked so
+    waiters of other projects are not held up behind it. The caller must
+    ``dequeue`` the ticket once its slot is claimed. Returns False on
+    timeout (the ticket is removed).
+    """
+    deadline = None if timeout is None else time.monotonic() + timeout
+    while True:
+        entries = load_queue(path)
+        if not any(e.ticket == entry.ticket for e in entries):
+            # Removed externally — rejoin at the back with the same ticket.
+            with _locked_queue(path or DEFAULT_QUEUE_PATH) as queued:
+                queued.append(entry)
+                entries = list(queued)
+        ahead = _ahead_of(entries, entry.project)
+        position = next(
+            i for i, e in enumerate(ahead) if e.ticket == entry.ticket
+        )
+        if position == 0:
+            blocked = quota() if quota is not None else None
+            if (blocked is not None) != entry.quota_blocked:
+                entry.quota_blocked = blocked is not None
+                _set_quota_blocked(entry.ticket, entry.quota_blocked, path)
+            reason = blocked or admit()
+            if reason is None:
+                return True
+            logger.info("Queue head waiting: %s", reason)
+        else:
+            logger.info("Queued at position %s", position)
+        if deadline is not None and time.monotonic() >= deadline:
+            dequeue(entry.ticket, path)
+            return False
+        time.sleep(poll_interval)
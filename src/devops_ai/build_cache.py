@@ -0,0 +1,217 @@
+"""Build cache — content-addressed image tags for compose ``build:`` services.
+
+Each service's build context is hashed (honouring ``.dockerignore``)
+together with its Dockerfile, build args and target, and the override
+pins ``image:`` to a tag derived from that hash. Compose only builds a
+service whose image is missing, so slots whose build matches main or
+another slot byte for byte reuse the existing image.
+"""
+
+from __future__ import annotations
+
+import fnmatch
+import hashlib
+import logging
+import os
+from collections.abc import Sequence
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any
+
+from ruamel.yaml.error import YAMLError
+
+from devops_ai.compose_graph import resolve_compose_graph
+from devops_ai.config import InfraConfig
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class BuildContext:
+    """A compose service's build context, Dockerfile, args and target."""
+
+    context: Path
+    dockerfile: str = "Dockerfile"
+    args: dict[str, str | None] = field(default_factory=dict)
+    target: str | None = None
+
+
+def _build_args(args: Any) -> dict[str, str | None]:
+    """Normalise ``build.args`` (mapping or ``KEY=VALUE`` list)."""
+    if isinstance(args, dict):
+        return {
+            str(k): None if v is None else str(v) for k, v in args.items()
+        }
+    result: dict[str, str | None] = {}
+    for item in args if isinstance(args, list) else []:
+        key, sep, value = str(item).partition("=")
+        result[key] = value if sep else None
+    return result
+
+
+def load_build_contexts(
+    compose_path: Path, overrides: Sequence[Path] = ()
+) -> dict[str, BuildContext]:
+    """Return build contexts for services that declare ``build:``.
+
+    Reads the whole compose graph (``overrides`` layered on top, includes
+    and extends followed), so builds declared outside the primary file
+    are found too. Relative contexts are resolved against the compose
+    file's directory. Services that already set ``image:`` keep their own
+    tag, and remote contexts (git URLs) are skipped — they cannot be
+    hashed locally.
+    """
+    try:
+        graph = resolve_compose_graph(compose_path, overrides)
+    except (OSError, ValueError, YAMLError):
+        return {}
+
+    base = compose_path.parent
+    contexts: dict[str, BuildContext] = {}
+    for name, svc in graph.services.items():
+        if not isinstance(svc, dict) or svc.get("image"):
+            continue
+        build = svc.get("build")
+        if build is None:
+            continue
+        if isinstance(build, str):
+            build = {"context": build}
+        elif not isinstance(build, dict):
+            continue
+        context = str(build.get("context", "."))
+        if "://" in context or context.startswith("git@"):
+            continue
+        target = build.get("target")
+        contexts[name] = BuildContext(
+            context=(base / context).resolve(),
+            dockerfile=str(build.get("dockerfile", "Dockerfile")),
+            args=_build_args(build.get("args")),
+            target=None if target is None else str(target),
+        )
+    return contexts
+
+
+def _load_dockerignore(context: Path) -> list[tuple[bool, str]]:
+    """Parse .dockerignore into (negated, pattern) pairs."""
+    try:
+        text = (context / ".dockerignore").read_text()
+    except OSError:
+        return []
+    patterns: list[tuple[bool, str]] = []
+    for raw in text.splitlines():
+        line = raw.strip()
+        if not line or line.startswith("#"):
+            continue
+        negated = line.startswith("!")
+        pattern = line.removeprefix("!").strip().strip("/")
+        pattern = os.path.normpath(pattern) if pattern else pattern
+        if pattern and pattern != ".":
+            patterns.append((negated, pattern))
+    return patterns
+
+
+def _matches(rel_path: str, pattern: str) -> bool:
+    """Match a path, or any of its parent dirs, against a pattern."""
+    if fnmatch.fnmatchcase(rel_path, pattern):
+        return True
+    if pattern.startswith("**/") and fnmatch.fnmatchcase(
+        rel_path, pattern[3:]
+    ):
+        return True
+    parts = rel_path.split("/")
+    return any(
+        fnmatch.fnmatchcase("/".join(parts[:i]), pattern)
+        for i in range(1, len(parts))
+    )
+
+
+def _is_ignored(rel_path: str, patterns: list[tuple[bool, str]]) -> bool:
+    """Apply .dockerignore semantics: the last matching pattern wins."""
+    ignored = False
+    for negated, pattern in patterns:
+        if _matches(rel_path, pattern):
+            ignored = not negated
+    return ignored
+
+
+def hash_build_context(build: BuildContext) -> str:
+    """Hash the files Docker would send for this build, and its options.
+
+    Covers relative paths, the executable bit and file contents in a
+    stable order. The Dockerfile's contents are always included, also
+    when it lives outside the context, as are the build args (sorted)
+    and target.
+    """
+    patterns = _load_dockerignore(build.context)
+    has_negations = any(neg for neg, _ in patterns)
+    dockerfile = os.path.normpath(build.dockerfile)
+
+    files: list[str] = []
+    for dirpath, dirnames, filenames in os.walk(build.context):
+        rel_dir = os.path.relpath(dirpath, build.context)
+        rel_dir = "" if rel_dir == "." else rel_dir
+        # Prune ignored dirs unless a later "!" pattern could re-include
+        if not has_negations:
+            dirnames[:] = [
+                d
+                for d in dirnames
+                if not _is_ignored(os.path.join(rel_dir, d), patterns)
+            ]
+        dirnames.sort()
+        for fname in filenames:
+            rel = os.path.join(rel_dir, fname)
+            if rel == dockerfile or not _is_ignored(rel, patterns):
+                files.append(rel)
+
+    digest = hashlib.sha256()
+    for rel in sorted(files):
+        path = build.context / rel
+        try:
+            mode = path.stat().st_mode
+            content = path.read_bytes()
+        except OSError:
+            continue
+        digest.update(rel.encode() + b"\0")
+        digest.update(b"x" if mode & 0o111 else b"-")
+        digest.update(hashlib.sha256(content).digest())
+    digest.update(f"dockerfile={dockerfile}\0".encode())
+    try:
+        content = (build.context / build.dockerfile).read_bytes()
+    except OSError:
+        content = b""
+    digest.update(hashlib.sha256(content).digest())
+    for key, value in sorted(build.args.items()):
+        digest.update(f"arg={key}={value!r}\0".encode())
+    digest.update(f"target={build.target}".encode())
+    return digest.hexdigest()
+
+
+def image_tag(project: str, service: str, context_hash: str) -> str:
+    """Content-addressed local image tag for a service build."""
+    return f"kinfra-{project}-{service}".lower() + f":{context_hash[:16]}"
+
+
+def compute_image_pins(
+    config: InfraConfig, worktree_path: Path
+) -> dict[str, str]:
+    """Map each ``build:`` service in the worktree's compose to its tag.
+
+    Returns an empty dict when build caching is disabled.
+    """
+    if not config.build_cache:
+        return {}
+    contexts = load_build_contexts(
+        worktree_path / config.compose_file,
+        [worktree_path / f for f in config.compose_overrides],
+    )
+    pins: dict[str, str] = {}
+    for service, build in contexts.items():
+        if not build.context.is_dir():
+            logger.warning(
+                "Build context for %s not found: %s", service, build.context
+            )
+            continue
+        pins[service] = image_tag(
+            config.project_name, service, hash_build_context(build)
+        )
+    return pins
@@ -4,24 +4,40 @@ from __future__ import annotations
 
 import logging
 import re
+from collections.abc import Callable, Sequence
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
+from typing import TypeVar
 
 from devops_ai import agent_deck
-from devops_ai.config import find_project_root, load_config
+from devops_ai.context import ProjectContext
 from devops_ai.registry import (
+    SlotInfo,
     get_slot_for_worktree,
     load_registry,
+    registry_lock,
     release_slot,
+    release_slots,
 )
 from devops_ai.sandbox import remove_slot_dir, stop_sandbox
+from devops_ai.teardown import Step, format_durations, run_steps
 from devops_ai.worktree import (
+    DirtyState,
+    WorktreeInfo,
     check_dirty,
     list_worktrees,
+    merged_branches,
     remove_worktree,
 )
 
 logger = logging.getLogger(__name__)
 
+# Concurrent compose teardowns / git removals in bulk mode
+DEFAULT_DONE_JOBS = 4
+
+_T = TypeVar("_T")
+_R = TypeVar("_R")
+
 # Matches the last hyphen before a milestone token (e.g., -M1, -M2, -Phase2)
 _MILESTONE_SEP_RE = re.compile(r"-(?=[A-Z]\w*$)")
 
@@ -45,31 +61,61 @@ def _session_title_from_worktree(wt: object) -> str:
     return getattr(wt, "feature", "")
 
 
-def done_command(
-    name: str,
-    repo_root: Path | None = None,
-    force: bool = False,
-) -> tuple[int, str]:
-    """Remove a worktree by name. Returns (exit_code, message).
+def _teardown_sandbox(slot: SlotInfo) -> None:
+    """Stop a slot's containers and delete its slot directory."""
+    slot_dir = Path(slot.slot_dir)
+    if slot_dir.exists():
+        stop_sandbox(slot, check=True)
+        remove_slot_dir(slot_dir)
+    else:
+        logger.warning(
+            "Slot dir %s missing, skipping Docker stop",
+            slot_dir,
+        )
 
-    If the worktree has an associated sandbox slot, stops containers,
-    removes the slot directory, and releases the registry entry before
-    removing the worktree.
+
+def _release_slot(slot_id: int) -> None:
+    """Release a slot against a fresh registry under the lock.
+
+    The registry read before a teardown may be stale by now; saving it
+    back would drop slots claimed meanwhile.
     """
-    if repo_root is None:
-        repo_root = find_project_root() or Path.cwd()
+    with registry_lock():
+        release_slot(load_registry(), slot_id)
 
-    config = (
-        load_config(repo_root)
-        if (repo_root / ".devops-ai").is_dir()
-        else None
-    )
-    prefix = config.prefix if config else repo_root.name
 
-    # Find matching worktrees
-    all_wts = list_worktrees(repo_root, prefix)
-    managed = [w for w in all_wts if w.wt_type in ("spec", "impl")]
+def _release_slots(slot_ids: list[int]) -> None:
+    """Like ``_release_slot`` for several slots, in one write."""
+    with registry_lock():
+        release_slots(load_registry(), slot_ids)
+
 
+def _sandbox_steps(
+    slot: SlotInfo, release: Callable[[], object]
+) -> list[Step]:
+    """Teardown steps for a slot: compose down → slot dir → release."""
+    slot_dir = Path(slot.slot_dir)
+    if not slot_dir.exists():
+        logger.warning(
+            "Slot dir %s missing, skipping Docker stop",
+            slot_dir,
+        )
+        return [Step("release slot", release)]
+    return [
+        Step("compose down", lambda: stop_sandbox(slot, check=True)),
+        Step(
+            "slot dir",
+            lambda: remove_slot_dir(slot_dir),
+            after=("compose down",),
+        ),
+        Step("release slot", release, after=("slot dir",)),
+    ]
+
+
+def _match_worktree(
+    managed: list[WorktreeInfo], name: str
+) -> tuple[WorktreeInfo | None, str]:
+    """Resolve a name to one worktree. Returns (worktree, error message)."""
     # Try exact feature match first, then partial, then directory name
     exact = [w for w in managed if w.feature == name]
     if len(exact) == 1:
@@ -82,60 +128,258 @@ def done_command(
         matches = [w for w in managed if w.path.name == name]
 
     if not matches:
-        return 1, f"No worktree found matching '{name}'"
+        return None, f"No worktree found matching '{name}'"
 
     if len(matches) > 1:
         names = ", ".join(w.feature for w in matches)
-        return 1, f"Ambiguous match for '{name}': {names}"
+        return None, f"Ambiguous match for '{name}': {names}"
+
+    return matches[0], ""
+
+
+def _dirty_detail(state: DirtyState) -> str:
+    parts = []
+    if state.has_uncommitted:
+        parts.append("uncommitted changes")
+    if state.has_unpushed:
+        count = f" ({state.ahead})" if state.ahead else ""
+        parts.append(f"unpushed commits{count}")
+    return " and ".join(parts)
+
+
+def done_command(
+    name: str,
+    repo_root: Path | None = None,
+    force: bool = False,
+) -> tuple[int, str]:
+    """Remove a worktree by name. Returns (exit_code, message).
+
+    If the worktree has an associated sandbox slot, stops containers,
+    removes the slot directory, and releases the registry entry while
+    the worktree is removed in parallel. The message ends with per-step
+    durations.
+    """
+    ctx = ProjectContext.resolve(repo_root)
+    repo_root, prefix = ctx.repo_root, ctx.prefix
 
-    wt = matches[0]
+    # Find matching worktrees
+    all_wts = list_worktrees(repo_root, prefix)
+    managed = [w for w in all_wts if w.wt_type in ("spec", "impl")]
+
+    wt, error = _match_worktree(managed, name)
+    if wt is None:
+        return 1, error
 
     # Dirty check (unless forced)
     if not force:
         state = check_dirty(wt.path)
         if state.is_dirty:
-            parts = []
-            if state.has_uncommitted:
-                parts.append("uncommitted changes")
-            if state.has_unpushed:
-                parts.append("unpushed commits")
-            detail = " and ".join(parts)
             return 1, (
-                f"Worktree '{wt.feature}' has {detail}. "
+                f"Worktree '{wt.feature}' has {_dirty_detail(state)}. "
                 "Use --force to remove anyway."
             )
 
-    # Agent-deck cleanup (best-effort, before sandbox stop)
-    # Session title derives from branch: impl/feat-M1 → feat/M1,
-    # spec/feat → spec/feat.  Fall back to wt.feature if no branch.
+    # Teardown graph: agent-deck cleanup overlaps the rest. The worktree
+    # is removed only after compose down, because the containers
+    # bind-mount it; slot dir removal and release overlap with that. The
+    # slot is released only once its containers are down and its
+    # directory is gone.
+    steps: list[Step] = []
     if agent_deck.is_available():
+        # Session title derives from branch: impl/feat-M1 → feat/M1,
+        # spec/feat → spec/feat.  Fall back to wt.feature if no branch.
         session_title = _session_title_from_worktree(wt)
-        agent_deck.remove_session(session_title)
+        steps.append(
+            Step(
+                "agent-deck",
+                lambda: agent_deck.remove_session(session_title),
+            )
+        )
 
-    # Check registry for sandbox slot
     registry = load_registry()
     slot = get_slot_for_worktree(registry, wt.path)
+    if slot is not None:
+        slot_id = slot.slot_id
+        steps.extend(
+            _sandbox_steps(slot, lambda: _release_slot(slot_id))
+        )
+
+    wt_path = wt.path
+    stops = [s.name for s in steps if s.name == "compose down"]
+    steps.append(
+        Step(
+            "worktree",
+            lambda: remove_worktree(repo_root, wt_path, force=force),
+            after=tuple(stops),
+        )
+    )
+    results = run_steps(steps)
+    timings = f"  Teardown: {format_durations(results)}"
+
+    removal = results["worktree"]
+    if removal.error is not None:
+        return 1, f"Error removing worktree: {removal.error}\n{timings}"
 
+    parts = []
+    if removal.ok:
+        parts.append(f"Removed worktree: {wt.feature} ({wt.path})")
+    code = 0
     if slot is not None:
-        # Sandbox cleanup: stop → remove slot dir → release
-        slot_dir = Path(slot.slot_dir)
-        if slot_dir.exists():
-            stop_sandbox(slot)
-            remove_slot_dir(slot_dir)
+        if results["release slot"].ok:
+            parts.append(f"  Released slot {slot.slot_id}")
         else:
-            logger.warning(
-                "Slot dir %s missing, skipping Docker stop",
-                slot_dir,
+            failed = next(
+                r
+                for r in results.values()
+                if r.error is not None and r.name != "agent-deck"
             )
-        release_slot(registry, slot.slot_id)
+            kept = f"slot {slot.slot_id}"
+            if not removal.ok:
+                kept += f" and worktree {wt.path}"
+            indent = "  " if parts else ""
+            parts.append(
+                f"{indent}Sandbox teardown failed ({failed.name}: "
+                f"{failed.error}); {kept} kept"
+            )
+            code = 1
+    parts.append(timings)
+    return code, "\n".join(parts)
 
-    # Remove worktree
-    try:
-        remove_worktree(repo_root, wt.path, force=force)
-    except Exception as e:
-        return 1, f"Error removing worktree: {e}"
 
-    parts = [f"Removed worktree: {wt.feature} ({wt.path})"]
-    if slot is not None:
-        parts.append(f"  Released slot {slot.slot_id}")
-    return 0, "\n".join(parts)
+def _parallel(
+    fn: Callable[[_T], _R], items: Sequence[_T], jobs: int
+) -> list[_R | Exception]:
+    """Map ``fn`` over ``items`` concurrently, capturing exceptions."""
+
+    def call(item: _T) -> _R | Exception:
+        try:
+            return fn(item)
+        except Exception as e:
+            return e
+
+    if len(items) <= 1 or jobs <= 1:
+        return [call(item) for item in items]
+    with ThreadPoolExecutor(max_workers=min(jobs, len(items))) as pool:
+        return list(pool.map(call, items))
+
+
+def done_many_command(
+    names: Sequence[str] = (),
+    repo_root: Path | None = None,
+    force: bool = False,
+    merged: bool = False,
+    all_worktrees: bool = False,
+    jobs: int = DEFAULT_DONE_JOBS,
+) -> tuple[int, str]:
+    """Remove several worktrees at once. Returns (exit_code, message).
+
+    Targets are the named worktrees, every managed worktree
+    (``all_worktrees``) or those whose branch is merged into the main
+    checkout's branch (``merged``). Dirty worktrees are skipped unless
+    ``force``. Sandboxes are torn down concurrently, the slots whose
+    teardown succeeded are released in one registry write, then the
+    worktrees are removed concurrently. A worktree whose sandbox could
+    not be torn down is kept along with its slot. Exit code is 1 if
+    anything was skipped or failed.
+    """
+    ctx = ProjectContext.resolve(repo_root)
+    repo_root, prefix = ctx.repo_root, ctx.prefix
+
+    all_wts = list_worktrees(repo_root, prefix)
+    managed = [w for w in all_wts if w.wt_type in ("spec", "impl")]
+
+    problems: list[str] = []
+    targets: list[WorktreeInfo] = []
+    if all_worktrees:
+        targets = managed
+    elif merged:
+        base = all_wts[0].branch if all_wts else ""
+        if not base:
+            return 1, "Main checkout is detached; cannot determine merges."
+        merged_set = merged_branches(repo_root, base)
+        targets = [w for w in managed if w.branch in merged_set]
+    for name in names:
+        wt, error = _match_worktree(managed, name)
+        if wt is None:
+            problems.append(error)
+        elif wt not in targets:
+            targets.append(wt)
+
+    if not force and targets:
+        states = _parallel(lambda w: check_dirty(w.path), targets, jobs)
+        clean: list[WorktreeInfo] = []
+        for wt, state in zip(targets, states):
+            if isinstance(state, Exception):
+                problems.append(f"Skipped '{wt.feature}': {state}")
+            elif state.is_dirty:
+                problems.append(
+                    f"Skipped '{wt.feature}': has {_dirty_detail(state)} "
+                    "(use --force to remove anyway)"
+                )
+            else:
+                clean.append(wt)
+        targets = clean
+
+    if not targets:
+        problems.insert(0, "No worktrees to remove.")
+        return (1 if len(problems) > 1 else 0), "\n".join(problems)
+
+    if agent_deck.is_available():
+        # Best-effort, like the agent-deck step of a single done
+        _parallel(
+            lambda w: agent_deck.remove_session(
+                _session_title_from_worktree(w)
+            ),
+            targets,
+            jobs,
+        )
+
+    # Sandboxes first (containers hold bind mounts into the worktrees)
+    registry = load_registry()
+    slots = {
+        wt.path: slot
+        for wt in targets
+        if (slot := get_slot_for_worktree(registry, wt.path)) is not None
+    }
+    outcomes = _parallel(_teardown_sandbox, list(slots.values()), jobs)
+    failed = {
+        path: outcome
+        for path, outcome in zip(slots, outcomes)
+        if isinstance(outcome, Exception)
+    }
+    released = {p: s for p, s in slots.items() if p not in failed}
+    if released:
+        ids = [s.slot_id for s in released.values()]
+        try:
+            _release_slots(ids)
+        except OSError as e:
+            # Containers are gone; the entries go stale with the worktrees
+            problems.append(
+                f"Could not release slots "
+                f"{', '.join(map(str, ids))}: {e}"
+            )
+            released = {}
+    for wt in [w for w in targets if w.path in failed]:
+        # Its containers may still be up and bind-mounting the worktree
+        problems.append(
+            f"Sandbox teardown failed for '{wt.feature}' "
+            f"({failed[wt.path]}); slot {slots[wt.path].slot_id} and "
+            "worktree kept"
+        )
+        targets.remove(wt)
+
+    results = _parallel(
+        lambda w: remove_worktree(repo_root, w.path, force=force),
+        targets,
+        jobs,
+    )
+    lines: list[str] = []
+    for wt, result in zip(targets, results):
+        if isinstance(result, Exception):
+            problems.append(f"Error removing '{wt.feature}': {result}")
+            continue
+        lines.append(f"Removed worktree: {wt.feature} ({wt.path})")
+        if wt.path in released:
+            lines.append(f"  Released slot {released[wt.path].slot_id}")
+    lines.extend(problems)
+    return (1 if problems else 0), "\n".join(lines)
@@ -0,0 +1,426 @@
+"""kinfra gc — report disk usage and reclaim what released slots left.
+
+Sizes come from scandir walks (``disk.tree_size``) run in parallel with
+each other and with the Docker queries. Reclaimable items are:
+
+- registry entries whose worktree or slot dir no longer exists
+- slot dirs under ~/.devops-ai/slots that no live registry entry uses
+- containers labelled ``devops-ai.managed=true`` whose slot dir lies in
+  this user's slots base but belongs to no live registry entry, plus
+  the volumes of their compose projects
+- compose backups (``*.bak``) that ``kinfra init`` left behind
+
+Docker objects of other users' or unrelated compose projects are never
+touched, whatever they are named. ``reclaim`` re-reads the registry
+under its lock before deleting anything, so a slot claimed meanwhile
+survives. Unless ``yes`` is given nothing is changed; the report shows
+what would go.
+"""
+
+from __future__ import annotations
+
+import os
+import subprocess
+from collections.abc import Iterable
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass, field
+from pathlib import Path
+
+from devops_ai.config import InfraConfig
+from devops_ai.context import ProjectContext
+from devops_ai.disk import format_size, tree_size
+from devops_ai.labels import MANAGED, SLOT_DIR
+from devops_ai.registry import (
+    Registry,
+    SlotInfo,
+    load_registry,
+    paths_exist,
+    registry_lock,
+    release_slots,
+)
+from devops_ai.sandbox import DEFAULT_SLOTS_BASE, remove_slot_dir
+from devops_ai.worktree import list_worktrees
+from devops_ai.worktree_pool import pool_dir
+
+DEFAULT_JOBS = 8
+DOCKER_TIMEOUT = 30.0
+
+_COMPOSE_PROJECT = "com.docker.compose.project"
+
+
+@dataclass
+class Usage:
+    """Disk usage of one worktree or slot dir (None if unknown)."""
+
+    label: str
+    path: Path
+    size: int | None = None
+
+
+@dataclass
+class Orphan:
+    """Something ``kinfra gc`` can reclaim."""
+
+    kind: str  # "slot dir", "container", "volume" or "backup"
+    name: str  # filesystem path or Docker object name
+    size: int | None = None
+    project: str = ""  # compose project of a container or volume
+
+
+@dataclass
+class GcReport:
+    worktrees: list[Usage] = field(default_factory=list)
+    slots: list[Usage] = field(default_factory=list)
+    stale: list[SlotInfo] = field(default_factory=list)
+    orphans: list[Orphan] = field(default_factory=list)
+    notes: list[str] = field(default_factory=list)
+
+    @property
+    def reclaimable(self) -> int:
+        return sum(o.size or 0 for o in self.orphans)
+
+
+def _managed_containers(timeout: float) -> list[tuple[str, str, str]]:
+    """(name, compose project, slot dir) of kinfra-labelled containers."""
+    fields = [
+        "{{.Names}}",
+        f'{{{{.Label "{_COMPOSE_PROJECT}"}}}}',
+        f'{{{{.Label "{SLOT_DIR}"}}}}',
+    ]
+    result = subprocess.run(
+        [
+            "docker", "ps", "-a",
+            "--filter", f"label={MANAGED}=true",
+            "--format", "\t".join(fields),
+        ],
+        capture_output=True,
+        text=True,
+        timeout=timeout,
+        check=True,
+    )
+    containers = []
+    for line in result.stdout.splitlines():
+        values = line.split("\t")
+        if len(values) == 3 and all(values):
+            containers.append((values[0], values[1], values[2]))
+    return containers
+
+
+def _compose_volumes(timeout: float) -> list[tuple[str, str]]:
+    """(name, compose project) of compose-created volumes."""
+    result = subprocess.run(
+        [
+            "docker", "volume", "ls",
+            "--filter", f"label={_COMPOSE_PROJECT}",
+            "--format", f'{{{{.Name}}}}\t{{{{.Label "{_COMPOSE_PROJECT}"}}}}',
+        ],
+        capture_output=True,
+        text=True,
+        timeout=timeout,
+        check=True,
+    )
+    volumes = []
+    for line in result.stdout.splitlines():
+        name, _, project = line.partition("\t")
+        if name and project:
+            volumes.append((name, project))
+    return volumes
+
+
+def _file_size(path: Path) -> int | None:
+    try:
+        return path.stat().st_blocks * 512
+    except OSError:
+        return None
+
+
+def compose_backups(
+    roots: Iterable[Path], config: InfraConfig | None
+) -> list[Path]:
+    """Compose ``.bak`` files next to the configured compose files."""
+    names = ["docker-compose.yml"]
+    if config is not None:
+        names = [config.compose_file, *config.compose_overrides]
+    found: list[Path] = []
+    for root in roots:
+        for name in names:
+            compose = root / name
+            for backup in (
+                compose.with_suffix(".yml.bak"),
+                compose.with_name(f"{compose.name}.bak"),
+            ):
+                if backup.is_file() and backup not in found:
+                    found.append(backup)
+    return found
+
+
+def collect_report(
+    registry: Registry,
+    worktrees: list[Usage],
+    backups: list[Path],
+    slots_base: Path = DEFAULT_SLOTS_BASE,
+    jobs: int = DEFAULT_JOBS,
+    docker_timeout: float = DOCKER_TIMEOUT,
+) -> GcReport:
+    """Measure usage and find orphans. Changes nothing."""
+    report = GcReport(worktrees=worktrees)
+    exists = paths_exist(
+        [
+            p
+            for s in registry.slots.values()
+            for p in (s.worktree_path, s.slot_dir)
+        ],
+        max_workers=jobs,
+    )
+    live = {
+        sid: s
+        for sid, s in registry.slots.items()
+        if exists[s.worktree_path] and exists[s.slot_dir]
+    }
+    report.stale = [
+        s for sid, s in registry.slots.items() if sid not in live
+    ]
+    report.slots = [
+        Usage(f"slot {s.slot_id} ({s.project})", Path(s.slot_dir))
+        for _, s in sorted(live.items())
+    ]
+    in_use = {Path(s.slot_dir) for s in live.values()}
+    try:
+        slot_dirs = sorted(p for p in slots_base.iterdir() if p.is_dir())
+    except FileNotFoundError:
+        slot_dirs = []
+    orphan_dirs = [
+        Orphan("slot dir", str(p)) for p in slot_dirs if p not in in_use
+    ]
+
+    with ThreadPoolExecutor(max_workers=max(1, jobs)) as pool:
+        containers = pool.submit(_managed_containers, docker_timeout)
+        volumes = pool.submit(_compose_volumes, docker_timeout)
+        sizes: list[tuple[Usage | Orphan, Future[int | None]]] = [
+            (item, pool.submit(tree_size, item.path))
+            for item in [*report.worktrees, *report.slots]
+        ]
+        sizes += [
+            (orphan, pool.submit(tree_size, Path(orphan.name)))
+            for orphan in orphan_dirs
+        ]
+        for target, size in sizes:
+            target.size = size.result()
+
+        report.orphans.extend(orphan_dirs)
+        try:
+            orphan_containers = [
+                Orphan("container", name, project=project)
+                for name, project, slot_dir in containers.result()
+                # Only slots this user's registry handed out
+                if Path(slot_dir).parent == slots_base
+                and Path(slot_dir) not in in_use
+            ]
+        except (OSError, subprocess.SubprocessError) as e:
+            report.notes.append(f"Could not list Docker containers: {e}")
+            orphan_containers = []
+        report.orphans.extend(orphan_containers)
+        orphan_projects = {o.project for o in orphan_containers}
+        try:
+            report.orphans.extend(
+                Orphan("volume", name, project=project)
+                for name, project in volumes.result()
+                if project in orphan_projects
+            )
+        except (OSError, subprocess.SubprocessError) as e:
+            report.notes.append(f"Could not list Docker volumes: {e}")
+
+    report.orphans.extend(
+        Orphan("backup", str(p), _file_size(p)) for p in backups
+    )
+    return report
+
+
+def _still_orphaned(report: GcReport, registry: Registry) -> GcReport:
+    """Drop items a registry entry has claimed since the report was made."""
+    slot_dirs = {Path(s.slot_dir) for s in registry.slots.values()}
+    projects = {s.compose_project for s in registry.slots.values()}
+    stale = [
+        s
+        for s in report.stale
+        if (current := registry.slots.get(s.slot_id)) is not None
+        and current.worktree_path == s.worktree_path
+    ]
+    # A stale entry's own resources go with it
+    slot_dirs -= {Path(s.slot_dir) for s in stale}
+    projects -= {s.compose_project for s in stale}
+    orphans = [
+        o
+        for o in report.orphans
+        if not (o.kind == "slot dir" and Path(o.name) in slot_dirs)
+        and o.project not in projects
+    ]
+    return GcReport(stale=stale, orphans=orphans)
+
+
+def reclaim(
+    report: GcReport,
+    registry_path: Path | None = None,
+    jobs: int = DEFAULT_JOBS,
+    docker_timeout: float = DOCKER_TIMEOUT,
+) -> list[str]:
+    """Delete everything the report lists as reclaimable.
+
+    Runs under the registry lock and re-checks every item against the
+    current registry first. Returns error messages for items that
+    could not be removed.
+    """
+    with registry_lock(registry_path):
+        registry = load_registry(registry_path)
+        return _reclaim(
+            _still_orphaned(report, registry),
+            registry,
+            registry_path,
+            jobs,
+            docker_timeout,
+        )
+
+
+def _reclaim(
+    report: GcReport,
+    registry: Registry,
+    registry_path: Path | None,
+    jobs: int,
+    docker_timeout: float,
+) -> list[str]:
+    errors: list[str] = []
+    if report.stale:
+        release_slots(
+            registry, [s.slot_id for s in report.stale], registry_path
+        )
+
+    by_kind: dict[str, list[str]] = {}
+    for orphan in report.orphans:
+        by_kind.setdefault(orphan.kind, []).append(orphan.name)
+
+    # Containers first: a volume in use by one cannot be removed
+    for kind, cmd in (
+        ("container", ["docker", "rm", "-f"]),
+        ("volume", ["docker", "volume", "rm"]),
+    ):
+        names = by_kind.get(kind)
+        if not names:
+            continue
+        try:
+            result = subprocess.run(
+                [*cmd, *names],
+                capture_output=True,
+                text=True,
+                timeout=docker_timeout,
+            )
+        except (OSError, subprocess.SubprocessError) as e:
+            errors.append(f"Could not remove {kind}s: {e}")
+            continue
+        if result.returncode != 0:
+            errors.append(result.stderr.strip())
+
+    with ThreadPoolExecutor(max_workers=max(1, jobs)) as pool:
+        slot_dirs = [Path(name) for name in by_kind.get("slot dir", [])]
+        list(pool.map(remove_slot_dir, slot_dirs))
+    for name in by_kind.get("backup", []):
+        try:
+            os.unlink(name)
+        except OSError as e:
+            errors.append(f"Could not remove {name}: {e}")
+    return errors
+
+
+def _size(size: int | None) -> str:
+    return format_size(size) if size is not None else "?"
+
+
+def format_report(report: GcReport, dry_run: bool) -> str:
+    lines: list[str] = []
+    for title, rows in (
+        ("Worktrees", report.worktrees),
+        ("Slots", report.slots),
+    ):
+        if rows:
+            lines.append(f"{title}:")
+            for row in rows:
+                lines.append(
+                    f"  {_size(row.size):>8}  {row.label}  {row.path}"
+                )
+    total = sum(r.size or 0 for r in [*report.worktrees, *report.slots])
+    lines.append(f"In use: {format_size(total)}")
+    lines.append("")
+
+    if report.stale:
+        lines.append("Stale registry entries:")
+        for slot in report.stale:
+            lines.append(
+                f"  slot {slot.slot_id} ({slot.project}) "
+                f"→ {slot.worktree_path}"
+            )
+    if report.orphans:
+        lines.append("Orphans:")
+        for orphan in report.orphans:
+            # Docker does not cheaply report per-object disk usage
+            docker = orphan.kind in ("container", "volume")
+            size = "" if docker else _size(orphan.size)
+            lines.append(f"  {size:>8}  {orphan.kind}: {orphan.name}")
+    lines.extend(report.notes)
+
+    if not report.stale and not report.orphans:
+        lines.append("Nothing to reclaim.")
+        return "\n".join(lines)
+    counts: dict[str, int] = {}
+    for orphan in report.orphans:
+        counts[orphan.kind] = counts.get(orphan.kind, 0) + 1
+    parts = [f"{n} × {kind}" for kind, n in counts.items()]
+    if report.stale:
+        parts.insert(0, f"{len(report.stale)} × registry entry")
+    summary = ", ".join(parts)
+    verb = "Would reclaim" if dry_run else "Reclaimed"
+    lines.append(
+        f"{verb} {format_size(report.reclaimable)} on disk: {summary}"
+        + (" (dry run; rerun with --yes to reclaim)" if dry_run else "")
+    )
+    return "\n".join(lines)
+
+
+def _project_usage(ctx: ProjectContext) -> tuple[list[Usage], list[Path]]:
+    """The current project's worktrees and compose backups."""
+    main_root = ctx.main_repo_root or ctx.repo_root
+    wts = list_worktrees(main_root, ctx.prefix)
+    managed = [w for w in wts if w.wt_type in ("spec", "impl")]
+    usage = [Usage(w.feature, w.path) for w in managed]
+    pool = pool_dir(main_root, ctx.prefix)
+    if pool.is_dir():
+        usage.append(Usage("(worktree pool)", pool))
+    roots = [main_root, *(w.path for w in managed)]
+    return usage, compose_backups(roots, ctx.config)
+
+
+def gc_command(
+    yes: bool = False,
+    repo_root: Path | None = None,
+    jobs: int = DEFAULT_JOBS,
+) -> tuple[int, str]:
+    """Report disk usage and, with ``yes``, reclaim orphans.
+
+    Returns (exit_code, msg). Outside a git checkout only slots and
+    Docker objects are examined.
+    """
+    ctx = ProjectContext.resolve(repo_root)
+    notes: list[str] = []
+    try:
+        worktrees, backups = _project_usage(ctx)
+    except (OSError, subprocess.CalledProcessError):
+        worktrees, backups = [], []
+        notes.append("Not in a git checkout; worktrees not examined.")
+
+    registry = load_registry()
+    report = collect_report(registry, worktrees, backups, jobs=jobs)
+    report.notes[:0] = notes
+    errors = reclaim(report, jobs=jobs) if yes else []
+
+    msg = format_report(report, dry_run=not yes)
+    if errors:
+        msg += "\nErrors:\n" + "\n".join(f"  {e}" for e in errors)
+    return (1 if errors else 0), msg
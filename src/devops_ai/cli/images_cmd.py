@@ -0,0 +1,47 @@
+"""kinfra images — Prefetch compose images and record their digests."""
+
+from __future__ import annotations
+
+from pathlib import Path
+
+from devops_ai.context import ProjectContext
+from devops_ai.images import (
+    DEFAULT_MAX_WORKERS,
+    ImageRuntime,
+    collect_images,
+    prefetch_images,
+    record_digests,
+)
+
+
+def images_prefetch_command(
+    project_root: Path | None = None,
+    runtime: ImageRuntime | None = None,
+    max_workers: int = DEFAULT_MAX_WORKERS,
+    cache_dir: Path | None = None,
+) -> tuple[int, str]:
+    """Pull every image in the project's compose file concurrently.
+
+    Returns (exit_code, message). Exit code is 1 if any pull failed.
+    """
+    ctx = ProjectContext.resolve(project_root)
+    project_root, config = ctx.repo_root, ctx.config
+    project = ctx.project_name
+    compose_file = config.compose_file if config else "docker-compose.yml"
+
+    images = collect_images(project_root / compose_file)
+    if not images:
+        return 0, f"No images to prefetch in {compose_file}."
+
+    result = prefetch_images(images, runtime, max_workers=max_workers)
+    if result.digests:
+        record_digests(project, result.digests, cache_dir)
+
+    lines = [f"Prefetched {len(result.digests)}/{len(images)} images:"]
+    for image in images:
+        if image in result.errors:
+            lines.append(f"  ✗ {image}: {result.errors[image]}")
+        else:
+            digest = result.digests.get(image) or "(no digest)"
+            lines.append(f"  ✓ {image} {digest}")
+    return (1 if result.errors else 0), "\n".join(lines)
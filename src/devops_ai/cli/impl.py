@@ -3,11 +3,25 @@
 from __future__ import annotations
 
 import logging
+import subprocess
 from datetime import datetime, timezone
 from pathlib import Path
 
+from ruamel.yaml.error import YAMLError
+
 from devops_ai import agent_deck
-from devops_ai.config import InfraConfig, find_project_root, load_config
+from devops_ai.admission import (
+    AdmissionDenied,
+    QueueEntry,
+    check_queue,
+    check_quota,
+    dequeue,
+    enqueue,
+    wait_for_admission,
+)
+from devops_ai.build_cache import compute_image_pins
+from devops_ai.config import InfraConfig, validate_sparse_path
+from devops_ai.context import ProjectContext
 from devops_ai.observability import ObservabilityManager
 from devops_ai.provision import (
     FileProvisionError,
@@ -19,12 +33,15 @@ from devops_ai.provision import (
 from devops_ai.registry import (
     SlotInfo,
     allocate_slot,
+    check_capacity,
     claim_slot,
     clean_stale_entries,
     load_registry,
+    registry_lock,
     release_slot,
     save_registry,
 )
+from devops_ai.resources import slot_demand
 from devops_ai.sandbox import (
     copy_compose_to_slot,
     create_slot_dir,
@@ -33,12 +50,16 @@ from devops_ai.sandbox import (
     remove_slot_dir,
     run_health_gate,
     start_sandbox,
+    teardown_stale_slot,
 )
 from devops_ai.worktree import (
     create_impl_worktree,
+    finish_checkout,
     impl_worktree_path,
+    start_checkout,
     validate_feature_name,
 )
+from devops_ai.yaml_loader import load_yaml
 
 logger = logging.getLogger(__name__)
 
@@ -74,17 +95,66 @@ def _find_milestone_file(
     return None
 
 
+def _milestone_paths(ms_file: Path) -> list[str]:
+    """Directories a milestone declares in its front matter ``paths:``.
+
+    Raises OSError, YAMLError or ValueError for unreadable or invalid
+    front matter. A file without front matter declares nothing.
+    """
+    text = ms_file.read_text()
+    if not text.startswith("---\n"):
+        return []
+    end = text.find("\n---", 4)
+    if end == -1:
+        return []
+    meta = load_yaml(text[4:end]) or {}
+    paths = meta.get("paths", []) if isinstance(meta, dict) else []
+    if not isinstance(paths, list) or not all(
+        isinstance(p, str) for p in paths
+    ):
+        raise ValueError("'paths' must be a list of directories")
+    where = f"{ms_file.name} paths"
+    return [validate_sparse_path(p, where) for p in paths]
+
+
+def _sparse_paths(
+    config: InfraConfig | None, feature: str, ms_file: Path
+) -> list[str]:
+    """Cone directories for a sparse impl worktree ([] = full checkout).
+
+    Combines [worktree].sparse with the milestone's declared paths. The
+    feature's design docs and the compose file's directory are always
+    included, since the agent and the sandbox read them.
+    """
+    paths = list(config.worktree.sparse) if config else []
+    paths += _milestone_paths(ms_file)
+    if not paths:
+        return []
+    paths.append(f"docs/designs/{feature}")
+    if config and config.has_sandbox:
+        compose_dir = Path(config.compose_file).parent.as_posix()
+        if compose_dir != ".":
+            paths.append(compose_dir)
+    return sorted(set(paths))
+
+
 def impl_command(
     arg: str,
     repo_root: Path | None = None,
     session: bool = True,
+    wait: bool = False,
+    wait_timeout: float | None = None,
 ) -> tuple[int, str]:
     """Create an impl worktree with optional sandbox.
 
+    With ``wait``, a slot request the host cannot admit yet is queued
+    and processed FIFO instead of being refused, for at most
+    ``wait_timeout`` seconds if given.
+
     Returns (exit_code, message).
     """
-    if repo_root is None:
-        repo_root = find_project_root() or Path.cwd()
+    ctx = ProjectContext.resolve(repo_root)
+    repo_root = ctx.repo_root
 
     # Parse argument
     try:
@@ -97,13 +167,7 @@ def impl_command(
     except ValueError as e:
         return 1, f"Invalid feature name: {e}"
 
-    # Load config (optional)
-    config = (
-        load_config(repo_root)
-        if (repo_root / ".devops-ai").is_dir()
-        else None
-    )
-    prefix = config.prefix if config else repo_root.name
+    config, prefix = ctx.config, ctx.prefix
 
     # Find milestone file
     ms_file = _find_milestone_file(repo_root, feature, milestone)
@@ -119,13 +183,27 @@ def impl_command(
     if wt_path.exists():
         return 1, f"Worktree already exists at {wt_path}"
 
+    try:
+        sparse = _sparse_paths(config, feature, ms_file)
+    except (OSError, ValueError, YAMLError) as e:
+        return 1, f"Invalid front matter in {ms_file.name}: {e}"
+    deferred = bool(config and config.worktree.deferred_checkout)
+
     # Create worktree
     try:
         wt_path = create_impl_worktree(
-            repo_root, prefix, feature, milestone
+            repo_root,
+            prefix,
+            feature,
+            milestone,
+            sparse=sparse,
+            checkout=not deferred,
+            pool_size=config.worktree.pool_size if config else 0,
         )
     except Exception as e:
         return 1, f"Error creating worktree: {e}"
+    if sparse:
+        logger.info("Sparse checkout: %s", ", ".join(sparse))
 
     # If no sandbox config, we're done (but session may still apply)
     if not config or not config.has_sandbox:
@@ -134,6 +212,14 @@ def impl_command(
             f"  Branch: impl/{feature}-{milestone}\n"
             f"  No sandbox configured."
         )
+        if deferred and not session:
+            proc = start_checkout(wt_path, detach=True)
+            msg += f"\n  Checkout continuing in background (pid {proc.pid})"
+        elif deferred:
+            try:
+                finish_checkout(start_checkout(wt_path))
+            except subprocess.CalledProcessError as e:
+                return 1, f"{msg}\nCheckout failed: {e.stderr.strip()}"
         if session:
             session_msg = _setup_session(
                 feature, milestone, wt_path
@@ -142,27 +228,57 @@ def impl_command(
                 msg += f"\n{session_msg}"
         return 0, msg
 
-    # Observability: network is required (sandbox override declares it
-    # external), full stack is non-fatal.
-    obs_mgr = ObservabilityManager()
+    # Populate the worktree while Docker work that doesn't need it runs
+    checkout = start_checkout(wt_path) if deferred else None
     try:
-        obs_mgr.ensure_network()
-    except Exception as exc:
-        return 1, (
-            f"Cannot create observability network: {exc}\n"
-            f"  Worktree created at {wt_path}"
+        # Observability: network is required (sandbox override declares
+        # it external), full stack is non-fatal.
+        obs_mgr = ObservabilityManager()
+        try:
+            obs_mgr.ensure_network()
+        except Exception as exc:
+            return 1, (
+                f"Cannot create observability network: {exc}\n"
+                f"  Worktree created at {wt_path}"
+            )
+        try:
+            obs_mgr.ensure_running()
+        except Exception:
+            logger.warning(
+                "Could not start observability stack — continuing without it"
+            )
+
+        # --- Sandbox setup ---
+        return _setup_sandbox(
+            config,
+            repo_root,
+            wt_path,
+            feature,
+            milestone,
+            session,
+            wait,
+            checkout=checkout,
+            wait_timeout=wait_timeout,
         )
+    finally:
+        if checkout is not None:
+            _reap_checkout(checkout)
+
+
+def _reap_checkout(checkout: subprocess.Popen[str]) -> None:
+    """Wait for a checkout an early return left running; log failures."""
+    if checkout.returncode is not None:
+        return
     try:
-        obs_mgr.ensure_running()
-    except Exception:
-        logger.warning(
-            "Could not start observability stack — continuing without it"
-        )
+        finish_checkout(checkout)
+    except subprocess.CalledProcessError as e:
+        logger.warning("Checkout failed: %s", e.stderr.strip())
 
-    # --- Sandbox setup ---
-    return _setup_sandbox(
-        config, repo_root, wt_path, feature, milestone, session
-    )
+
+def _release(slot_id: int) -> None:
+    """Release a slot against a fresh registry under the lock."""
+    with registry_lock():
+        release_slot(load_registry(), slot_id)
 
 
 def _format_provision_failure(
@@ -211,40 +327,116 @@ def _setup_sandbox(
     feature: str,
     milestone: str,
     session: bool = False,
+    wait: bool = False,
+    checkout: subprocess.Popen[str] | None = None,
+    wait_timeout: float | None = None,
 ) -> tuple[int, str]:
-    """Set up sandbox for an impl worktree."""
+    """Set up sandbox for an impl worktree.
+
+    ``checkout`` is a still-running worktree population; it is awaited
+    once the slot is claimed, before anything reads the worktree. On
+    earlier returns the caller reaps it.
+    """
     registry = load_registry()
-    clean_stale_entries(registry)
+    clean_stale_entries(registry, teardown=teardown_stale_slot)
 
-    # Allocate slot
+    # Allocate slot (queueing for admission if requested)
+    ticket: QueueEntry | None = None
     try:
+        queued = check_queue(config.project_name)
+        if queued:
+            raise AdmissionDenied(queued)
         slot_id, ports = allocate_slot(registry, config)
+    except AdmissionDenied as e:
+        if not wait:
+            return 1, (
+                f"Slot allocation refused: {e}\n"
+                f"  Worktree created at {wt_path}\n"
+                f"  Retry with --wait to queue until capacity frees up."
+            )
+        ticket = enqueue(config.project_name, f"{feature}/{milestone}")
+        logger.warning("Host saturated (%s) — queued for a slot", e)
+        if not wait_for_admission(
+            ticket,
+            lambda: check_capacity(load_registry(), config),
+            timeout=wait_timeout,
+            quota=lambda: check_quota(load_registry(), config),
+        ):
+            return 1, (
+                f"Timed out waiting for a slot after {wait_timeout:g}s\n"
+                f"  Worktree created at {wt_path}"
+            )
+        registry = load_registry()
+        try:
+            slot_id, ports = allocate_slot(registry, config)
+        except RuntimeError as e2:
+            dequeue(ticket.ticket)
+            return 1, f"Slot allocation failed: {e2}"
     except RuntimeError as e:
         return 1, f"Slot allocation failed: {e}"
 
-    # Create slot dir
-    slot_dir = create_slot_dir(config.project_name, slot_id)
-
-    # Claim slot
-    now = datetime.now(timezone.utc).isoformat(timespec="seconds")
-    compose_path = repo_root / config.compose_file
-    compose_copy = copy_compose_to_slot(compose_path, slot_dir)
-
-    slot_info = SlotInfo(
-        slot_id=slot_id,
-        project=config.project_name,
-        worktree_path=str(wt_path),
-        slot_dir=str(slot_dir),
-        compose_file_copy=str(compose_copy),
-        ports=ports,
-        claimed_at=now,
-        status="provisioning",
-    )
-    claim_slot(registry, slot_info)
+    # Create and claim the slot dir under the registry lock so a
+    # concurrent `kinfra gc` never sees it unclaimed, re-reading the
+    # registry so claims made since allocation are neither lost nor
+    # duplicated
+    with registry_lock():
+        registry = load_registry()
+        if slot_id in registry.slots:
+            try:
+                slot_id, ports = allocate_slot(registry, config)
+            except RuntimeError as e:
+                if ticket is not None:
+                    dequeue(ticket.ticket)
+                return 1, f"Slot allocation failed: {e}"
+        slot_dir = create_slot_dir(config.project_name, slot_id)
+
+        # Claim slot
+        now = datetime.now(timezone.utc).isoformat(timespec="seconds")
+        compose_path = repo_root / config.compose_file
+        compose_copy = copy_compose_to_slot(
+            compose_path,
+            slot_dir,
+            overrides=[repo_root / f for f in config.compose_overrides],
+        )
+        demand = slot_demand(config)
+
+        slot_info = SlotInfo(
+            slot_id=slot_id,
+            project=config.project_name,
+            worktree_path=str(wt_path),
+            slot_dir=str(slot_dir),
+            compose_file_copy=str(compose_copy),
+            ports=ports,
+            claimed_at=now,
+            status="provisioning",
+            cpus=demand.cpus,
+            mem_bytes=demand.mem_bytes,
+        )
+        claim_slot(registry, slot_info)
+    if ticket is not None:
+        dequeue(ticket.ticket)
+
+    if checkout is not None:
+        try:
+            finish_checkout(checkout)
+        except subprocess.CalledProcessError as e:
+            _release(slot_id)
+            remove_slot_dir(slot_dir)
+            return 1, (
+                f"Checkout failed: {e.stderr.strip()}\n"
+                f"  Worktree created at {wt_path}"
+            )
 
     # Generate files
     generate_env_file(config, slot_info, slot_dir)
-    generate_override(config, slot_info, wt_path, repo_root, slot_dir)
+    generate_override(
+        config,
+        slot_info,
+        wt_path,
+        repo_root,
+        slot_dir,
+        image_pins=compute_image_pins(config, wt_path),
+    )
 
     # Provision files and resolve secrets
     file_errors: list[FileProvisionError] = []
@@ -274,7 +466,7 @@ def _setup_sandbox(
         start_sandbox(config, slot_info, wt_path)
     except RuntimeError as e:
         # Cleanup: release slot, remove slot dir, keep worktree
-        release_slot(registry, slot_id)
+        _release(slot_id)
         remove_slot_dir(slot_dir)
         return 1, (
             f"Sandbox failed to start: {e}\n"
@@ -283,7 +475,11 @@ def _setup_sandbox(
 
     # Mark slot as running now that containers are up
     slot_info.status = "running"
-    save_registry(registry)
+    with registry_lock():
+        registry = load_registry()
+        if slot_id in registry.slots:
+            registry.slots[slot_id].status = "running"
+            save_registry(registry)
 
     # Health gate
     healthy = run_health_gate(config, slot_info)
@@ -3,6 +3,7 @@
 from __future__ import annotations
 
 import json
+import os
 import re
 import subprocess
 import tomllib
@@ -11,10 +12,15 @@ from pathlib import Path
 from typing import Any
 
 import typer
-from ruamel.yaml import YAML
 
-from devops_ai.compose import rewrite_compose
+from devops_ai.compose import (
+    rewrite_compose,
+    rewrite_compose_text,
+)
+from devops_ai.compose_graph import default_override
+from devops_ai.compose_model import ComposeModel, load_compose_model
 from devops_ai.config import find_project_root, load_config
+from devops_ai.images import start_background_prefetch
 
 # Image patterns that identify observability services
 OBSERVABILITY_PATTERNS = [
@@ -23,6 +29,14 @@ OBSERVABILITY_PATTERNS = [
     re.compile(r"^grafana/grafana"),
 ]
 
+# Default compose file names, in the order Compose itself prefers them
+CANONICAL_COMPOSE_FILES = (
+    "compose.yaml",
+    "compose.yml",
+    "docker-compose.yaml",
+    "docker-compose.yml",
+)
+
 
 @dataclass
 class EnvVarCandidate:
@@ -65,6 +79,10 @@ class InitPlan:
     file_mount_candidates: list[FileMountCandidate] = field(
         default_factory=list
     )
+    compose_overrides: list[str] = field(default_factory=list)
+    # Every file in the resolved compose graph (includes, extends bases)
+    compose_graph: list[Path] = field(default_factory=list)
+    profiles: dict[str, list[str]] = field(default_factory=dict)
 
 
 def detect_project(
@@ -78,14 +96,20 @@ def detect_project(
     (e.g., port vars from existing infra.toml when compose is parameterized).
     """
     # Find compose files
-    compose_files = find_compose_files(project_root)
-    compose_file = compose_files[0].name if compose_files else "docker-compose.yml"
+    compose_file, compose_overrides = select_compose_files(project_root)
     compose_path = project_root / compose_file
 
+    # Resolve the compose graph once; every detector reads the same model
+    model = load_compose_model(
+        compose_path,
+        cache_dir=project_root / ".devops-ai" / "cache",
+        overrides=[project_root / f for f in compose_overrides],
+    )
+
     # Parse services
     services: dict[str, dict[str, Any]] = {}
-    if compose_path.exists():
-        services = detect_services_from_compose(compose_path.read_text())
+    if model is not None:
+        services = _services_from_model(model)
 
     # Identify obs vs app services
     obs_services = identify_observability_services(services)
@@ -114,17 +138,16 @@ def detect_project(
     # Detect env vars and gitignored mounts
     env_var_candidates: list[EnvVarCandidate] = []
     file_mount_candidates: list[FileMountCandidate] = []
-    if compose_path.exists():
-        compose_text = compose_path.read_text()
+    if model is not None:
         known_vars = (
             set(ports.keys())
             | {"COMPOSE_PROJECT_NAME"}
             | {"OTEL_EXPORTER_OTLP_ENDPOINT", "OTEL_RESOURCE_ATTRIBUTES"}
             | (extra_known_vars or set())
         )
-        env_var_candidates = detect_env_vars(compose_text, known_vars)
-        file_mount_candidates = detect_gitignored_mounts(
-            compose_text, project_root
+        env_var_candidates = _env_vars_from_model(model, known_vars)
+        file_mount_candidates = _gitignored_mounts_from_model(
+            model, project_root
         )
 
     # Generate toml content
@@ -132,6 +155,7 @@ def detect_project(
         project_name=project_name,
         prefix=prefix,
         compose_file=compose_file,
+        compose_overrides=compose_overrides,
         ports=ports,
         health_endpoint=health_endpoint,
         health_port_var=health_port_var,
@@ -152,6 +176,9 @@ def detect_project(
         toml_content=toml_content,
         env_var_candidates=env_var_candidates,
         file_mount_candidates=file_mount_candidates,
+        compose_overrides=compose_overrides,
+        compose_graph=[Path(f) for f in model.files] if model else [],
+        profiles=dict(model.profiles) if model else {},
     )
 
 
@@ -162,43 +189,14 @@ def detect_services_from_compose(
 
     Returns dict of service_name -> {image, ports: [{host, container}]}.
     """
-    yml = YAML()
-    data = yml.load(yaml_content)
-    if not data or "services" not in data:
-        return {}
-
-    result: dict[str, dict[str, Any]] = {}
-    for name, svc in data["services"].items():
-        ports = []
-        for port_spec in svc.get("ports", []):
-            parsed = _parse_port_spec(str(port_spec))
-            if parsed:
-                ports.append(parsed)
-
-        result[name] = {
-            "image": svc.get("image"),
-            "ports": ports,
-        }
-    return result
-
-
-def _parse_port_spec(spec: str) -> dict[str, int] | None:
-    """Parse a Docker port spec like '8080:8080' into host/container."""
-    # Handle "HOST:CONTAINER" format
-    spec = spec.strip('"').strip("'")
-    # Skip already-parameterized ports like ${VAR:-8080}:8080
-    if "${" in spec:
-        return None
-    parts = spec.split(":")
-    if len(parts) == 2:
-        try:
-            return {
-                "host": int(parts[0]),
-                "container": int(parts[1]),
-            }
-        except ValueError:
-            return None
-    return None
+    return _services_from_model(ComposeModel.from_text(yaml_content))
+
+
+def _services_from_model(model: ComposeModel) -> dict[str, dict[str, Any]]:
+    return {
+        name: {"image": svc["image"], "ports": list(svc["ports"])}
+        for name, svc in model.services.items()
+    }
 
 
 def identify_observability_services(
@@ -224,51 +222,22 @@ def detect_env_vars(
     Returns candidates for [sandbox.secrets] or [sandbox.env].
     Uses raw text regex to catch references in all contexts.
     """
-    # Find all ${VAR} and ${VAR:-default} references
-    pattern = re.compile(r"\$\{([A-Z_][A-Z0-9_]*)(?::-(.*?))?\}")
-    all_refs: dict[str, str | None] = {}
-    for match in pattern.finditer(compose_content):
-        name = match.group(1)
-        default = match.group(2)
-        if name not in known_vars:
-            # Keep first-seen default (don't overwrite with None)
-            if name not in all_refs:
-                all_refs[name] = default
-
-    if not all_refs:
-        return []
-
-    # Determine which services reference each var via YAML parsing
-    yml = YAML()
-    data = yml.load(compose_content)
-    services_map: dict[str, list[str]] = {name: [] for name in all_refs}
-
-    if data and "services" in data:
-        for svc_name, svc in data["services"].items():
-            env_block = svc.get("environment")
-            if not env_block:
-                continue
-            # environment can be a list or dict
-            env_text = ""
-            if isinstance(env_block, list):
-                env_text = "\n".join(str(e) for e in env_block)
-            elif isinstance(env_block, dict):
-                env_text = "\n".join(
-                    f"{k}={v}" for k, v in env_block.items()
-                )
-            for var_name in all_refs:
-                if f"${{{var_name}}}" in env_text or (
-                    f"${{{var_name}:-" in env_text
-                ):
-                    services_map[var_name].append(svc_name)
+    return _env_vars_from_model(
+        ComposeModel.from_text(compose_content), known_vars
+    )
+
 
+def _env_vars_from_model(
+    model: ComposeModel, known_vars: set[str]
+) -> list[EnvVarCandidate]:
     return [
         EnvVarCandidate(
             name=name,
-            services=services_map.get(name, []),
+            services=list(model.env_services.get(name, [])),
             default=default,
         )
-        for name, default in sorted(all_refs.items())
+        for name, default in sorted(model.env_refs.items())
+        if name not in known_vars
     ]
 
 
@@ -281,85 +250,130 @@ def detect_gitignored_mounts(
     Uses `git check-ignore` for correct gitignore interpretation.
     Skips named volumes (no path separator in host part).
     """
-    yml = YAML()
-    data = yml.load(compose_content)
-    if not data or "services" not in data:
-        return []
-
-    # Collect top-level named volumes
-    named_volumes = set(data.get("volumes", {}).keys()) if data.get(
-        "volumes"
-    ) else set()
+    return _gitignored_mounts_from_model(
+        ComposeModel.from_text(compose_content), project_root
+    )
 
-    candidates: list[FileMountCandidate] = []
 
-    for svc_name, svc in data["services"].items():
-        for vol in svc.get("volumes", []):
-            vol_str = str(vol)
-            parts = vol_str.split(":")
-            if len(parts) < 2:
-                continue
+def _gitignored_mounts_from_model(
+    model: ComposeModel, project_root: Path
+) -> list[FileMountCandidate]:
+    named_volumes = set(model.named_volumes)
+    bind_mounts: list[tuple[str, str, str]] = []
+
+    for vol in model.volumes:
+        host_part = vol.host
+
+        # Skip named volumes
+        if host_part in named_volumes:
+            continue
+        # Bind mounts start with ./ or / or contain /
+        if not (
+            host_part.startswith("./")
+            or host_part.startswith("/")
+            or "/" in host_part
+            or host_part.startswith(".")
+        ):
+            continue
 
-            host_part = parts[0]
-            container_part = parts[1]
+        # Normalize: strip leading ./
+        rel_path = host_part.removeprefix("./")
+        bind_mounts.append((vol.service, rel_path, vol.container))
 
-            # Skip named volumes
-            if host_part in named_volumes:
-                continue
-            # Bind mounts start with ./ or / or contain /
-            if not (
-                host_part.startswith("./")
-                or host_part.startswith("/")
-                or "/" in host_part
-                or host_part.startswith(".")
-            ):
-                continue
+    # One git call for every path, one directory scan per parent dir
+    ignored = _git_ignored_paths(
+        list(dict.fromkeys(rel for _, rel, _ in bind_mounts)), project_root
+    )
+    listings: dict[Path, set[str]] = {}
 
-            # Normalize: strip leading ./
-            rel_path = host_part.removeprefix("./")
-
-            # Check if gitignored
-            try:
-                result = subprocess.run(
-                    ["git", "check-ignore", "-q", rel_path],
-                    capture_output=True,
-                    text=True,
-                    timeout=5,
-                    cwd=project_root,
-                )
-            except (FileNotFoundError, subprocess.TimeoutExpired):
-                continue
+    candidates: list[FileMountCandidate] = []
+    for svc_name, rel_path, container_part in bind_mounts:
+        if rel_path not in ignored:
+            continue
+
+        # Check source existence and .example variant
+        source_path = project_root / rel_path
+        siblings = _dir_files(source_path.parent, listings)
+        source_exists = source_path.name in siblings
+
+        example_path = None
+        example_exists = False
+        for suffix in [".example", ".sample", ".template"]:
+            if f"{source_path.name}{suffix}" in siblings:
+                example_exists = True
+                example_path = f"{rel_path}{suffix}"
+                break
 
-            if result.returncode != 0:
-                continue  # Not ignored
-
-            # Check source existence and .example variant
-            source_path = project_root / rel_path
-            source_exists = source_path.is_file()
-
-            example_path = None
-            example_exists = False
-            for suffix in [".example", ".sample", ".template"]:
-                candidate_example = project_root / f"{rel_path}{suffix}"
-                if candidate_example.is_file():
-                    example_exists = True
-                    example_path = f"{rel_path}{suffix}"
-                    break
-
-            candidates.append(
-                FileMountCandidate(
-                    host_path=rel_path,
-                    container_path=container_part,
-                    service=svc_name,
-                    source_exists=source_exists,
-                    example_exists=example_exists,
-                    example_path=example_path,
-                )
+        candidates.append(
+            FileMountCandidate(
+                host_path=rel_path,
+                container_path=container_part,
+                service=svc_name,
+                source_exists=source_exists,
+                example_exists=example_exists,
+                example_path=example_path,
             )
+        )
 
     return candidates
 
 
+def _git_ignored_paths(paths: list[str], project_root: Path) -> set[str]:
+    """Return the subset of ``paths`` that git ignores.
+
+    A single ``git check-ignore --stdin`` call covers every path. Paths
+    matched only by a negated (``!``) pattern are not ignored. Paths
+    outside ``project_root`` (``/var/run/docker.sock``, ``../shared``)
+    are never ignored; they are left out of the batch because git
+    rejects the whole call on any of them.
+    """
+    root = project_root.resolve()
+    paths = [p for p in paths if (root / p).resolve().is_relative_to(root)]
+    if not paths:
+        return set()
+    try:
+        result = subprocess.run(
+            [
+                "git",
+                "check-ignore",
+                "--stdin",
+                "-z",
+                "--verbose",
+                "--non-matching",
+            ],
+            input="".join(f"{p}\0" for p in paths),
+            capture_output=True,
+            text=True,
+            timeout=10,
+            cwd=project_root,
+        )
+    except (FileNotFoundError, subprocess.TimeoutExpired):
+        return set()
+    # 0: some paths ignored, 1: none ignored, 128: not a git repo
+    if result.returncode not in (0, 1):
+        return set()
+
+    # Records are source, line number, pattern, path — NUL separated
+    fields = result.stdout.split("\0")
+    ignored: set[str] = set()
+    for i in range(0, len(fields) - 3, 4):
+        pattern, path = fields[i + 2], fields[i + 3]
+        if pattern and not pattern.startswith("!"):
+            ignored.add(path)
+    return ignored
+
+
+def _dir_files(directory: Path, listings: dict[Path, set[str]]) -> set[str]:
+    """Names of regular files in ``directory``, scanned once per dir."""
+    if directory not in listings:
+        try:
+            with os.scandir(directory) as entries:
+                listings[directory] = {e.name for e in entries if e.is_file()}
+        except OSError:
+            listings[directory] = set()
+    return listings[directory]
+
+
 def detect_project_name(project_root: Path) -> str:
     """Detect project name from multiple sources."""
     # 1. .devops-ai/project.md
@@ -393,13 +407,76 @@ def detect_project_name(project_root: Path) -> str:
 
 def find_compose_files(project_root: Path) -> list[Path]:
     """Find compose files in the project root."""
-    patterns = ["docker-compose*.yml", "compose*.yml"]
+    patterns = [
+        "docker-compose*.yml",
+        "docker-compose*.yaml",
+        "compose*.yml",
+        "compose*.yaml",
+    ]
     files: list[Path] = []
     for pattern in patterns:
         files.extend(project_root.glob(pattern))
     return sorted(set(files))
 
 
+def select_compose_files(project_root: Path) -> tuple[str, list[str]]:
+    """Pick the primary compose file and the overrides layered on it.
+
+    Prefers the default names Compose looks for, then any other
+    non-override file. The sibling override Compose merges automatically
+    (e.g. docker-compose.override.yml) is layered on top, since kinfra
+    runs Compose with explicit ``-f`` flags that disable auto-merging.
+    """
+    candidates = [
+        f for f in find_compose_files(project_root)
+        if ".override." not in f.name
+    ]
+    if not candidates:
+        return "docker-compose.yml", []
+
+    def rank(path: Path) -> tuple[int, str]:
+        if path.name in CANONICAL_COMPOSE_FILES:
+            return CANONICAL_COMPOSE_FILES.index(path.name), path.name
+        return len(CANONICAL_COMPOSE_FILES), path.name
+
+    primary = min(candidates, key=rank)
+    override = default_override(primary)
+    return primary.name, [override.name] if override else []
+
+
+def rewrite_compose_graph(
+    project_root: Path,
+    compose_files: list[Path],
+    port_map: dict[str, int],
+    obs_services: list[str],
+) -> list[str]:
+    """Rewrite every compose file in the project that needs changes.
+
+    Only the first file gets the kinfra header; other files in the
+    graph (overrides, includes) are only touched when a port or
+    observability service in them changes. Files outside the project
+    are never modified. Returns the rewritten paths, relative to the
+    project root.
+    """
+    root = project_root.resolve()
+    rewritten: list[str] = []
+    for i, path in enumerate(compose_files):
+        path = path.resolve()
+        if not path.is_file() or not path.is_relative_to(root):
+            continue
+        root_file = i == 0
+        if not root_file:
+            text = path.read_text()
+            new_text = rewrite_compose_text(
+                text, port_map, obs_services, header=False
+            )
+            if new_text == text:
+                continue
+        rewrite_compose(path, port_map, obs_services, header=root_file)
+        rewritten.append(str(path.relative_to(root)))
+    return rewritten
+
+
 def generate_infra_toml(
     project_name: str,
     prefix: str,
@@ -417,15 +494,23 @@ def generate_infra_toml(
     env: dict[str, str] | None = None,
     secrets: dict[str, str] | None = None,
     files: dict[str, str] | None = None,
+    compose_overrides: list[str] | None = None,
 ) -> str:
     """Generate infra.toml content as a string."""
+    if compose_overrides:
+        items = ", ".join(
+            f'"{f}"' for f in [compose_file, *compose_overrides]
+        )
+        compose_line = f"compose_file = [{items}]"
+    else:
+        compose_line = f'compose_file = "{compose_file}"'
     lines = [
         "[project]",
         f'name = "{project_name}"',
         f'prefix = "{prefix}"',
         "",
         "[sandbox]",
-        f'compose_file = "{compose_file}"',
+        compose_line,
     ]
 
     if health_endpoint:
@@ -552,21 +637,32 @@ def _git_toplevel() -> Path | None:
     return None
 
 
+def _start_prefetch(project_root: Path, project_name: str) -> None:
+    """Kick off a background image prefetch for the onboarded project."""
+    if start_background_prefetch(project_root, project_name):
+        typer.echo("Prefetching images in the background.")
+
+
 def _format_dry_run_output(plan: InitPlan) -> str:
     """Format the dry-run output for display."""
     lines = [
         f"Project: {plan.project_name}",
         f"Prefix: {plan.prefix}",
         f"Compose: {plan.compose_file}",
-        "",
-        "Services detected:",
     ]
+    if plan.compose_overrides:
+        lines.append(f"Layered: {', '.join(plan.compose_overrides)}")
+    if len(plan.compose_graph) > 1:
+        lines.append(f"Compose graph: {len(plan.compose_graph)} files")
+    lines += ["", "Services detected:"]
 
     for name, svc in plan.services.items():
         ports_str = ", ".join(str(p["host"]) for p in svc["ports"])
         label = ""
         if name in plan.obs_services:
             label = " (observability — will be commented out)"
+        elif name in plan.profiles:
+            label = f" (profiles: {', '.join(plan.profiles[name])})"
         lines.append(f"  {name}: ports [{ports_str}]{label}")
 
     if not plan.services:
@@ -695,6 +791,38 @@ def _format_check_output(plan: InitPlan) -> str:
     return "\n".join(lines)
 
 
+def detect_gaps(project_root: Path) -> InitPlan:
+    """Detect provisioning gaps for an already-onboarded project.
+
+    Runs detection with the config's port vars treated as known and drops
+    env vars and files the config already declares.
+    """
+    # Load existing config to know what's already declared
+    existing_config = load_config(project_root)
+    extra_known: set[str] = set()
+    if existing_config:
+        extra_known = {p.env_var for p in existing_config.ports}
+    plan = detect_project(project_root, extra_known_vars=extra_known)
+    # Filter out already-declared items
+    if existing_config:
+        declared_vars = (
+            set(existing_config.secrets.keys())
+            | set(existing_config.env.keys())
+        )
+        plan.env_var_candidates = [
+            c
+            for c in plan.env_var_candidates
+            if c.name not in declared_vars
+        ]
+        declared_files = set(existing_config.files.keys())
+        plan.file_mount_candidates = [
+            fc
+            for fc in plan.file_mount_candidates
+            if fc.host_path not in declared_files
+        ]
+    return plan
+
+
 def init_command(
     project_root: Path | None = None,
     dry_run: bool = False,
@@ -720,31 +848,7 @@ def init_command(
 
     # --check mode: report gaps and exit
     if check:
-        # Load existing config to know what's already declared
-        existing_config = load_config(project_root)
-        extra_known: set[str] = set()
-        if existing_config:
-            extra_known = {p.env_var for p in existing_config.ports}
-        plan = detect_project(
-            project_root, extra_known_vars=extra_known
-        )
-        # Filter out already-declared items
-        if existing_config:
-            declared_vars = (
-                set(existing_config.secrets.keys())
-                | set(existing_config.env.keys())
-            )
-            plan.env_var_candidates = [
-                c
-                for c in plan.env_var_candidates
-                if c.name not in declared_vars
-            ]
-            declared_files = set(existing_config.files.keys())
-            plan.file_mount_candidates = [
-                fc
-                for fc in plan.file_mount_candidates
-                if fc.host_path not in declared_files
-            ]
+        plan = detect_gaps(project_root)
         typer.echo(_format_check_output(plan))
         return 0
 
@@ -764,7 +868,8 @@ def init_command(
                 return 0
 
     # Check Docker
-    if not check_docker_running():
+    docker_running = check_docker_running()
+    if not docker_running:
         typer.echo(
             "Warning: Docker not running. "
             "Init can proceed, but sandbox features need Docker."
@@ -833,6 +938,7 @@ def init_command(
         project_name=plan.project_name,
         prefix=plan.prefix,
         compose_file=plan.compose_file,
+        compose_overrides=plan.compose_overrides,
         ports=plan.ports,
         health_endpoint=plan.health_endpoint,
         health_port_var=plan.health_port_var,
@@ -862,12 +968,15 @@ def init_command(
         if plan.compose_path.exists() and (
             plan.ports or plan.obs_services
         ):
-            rewrite_compose(
-                plan.compose_path, plan.ports, plan.obs_services
-            )
-            typer.echo(
-                f"Compose file updated: {plan.compose_file}"
-            )
+            for name in rewrite_compose_graph(
+                project_root,
+                plan.compose_graph or [plan.compose_path],
+                plan.ports,
+                plan.obs_services,
+            ):
+                typer.echo(f"Compose file updated: {name}")
+        if docker_running:
+            _start_prefetch(project_root, plan.project_name)
         return 0
 
     # Interactive mode — prompt for overrides
@@ -921,11 +1030,16 @@ def init_command(
 
     # Rebuild port map and toml with possibly-overridden values
     compose_path = project_root / compose_file
+    override = default_override(compose_path)
+    compose_overrides = [override.name] if override else []
+    model = load_compose_model(
+        compose_path,
+        cache_dir=project_root / ".devops-ai" / "cache",
+        overrides=[override] if override else [],
+    )
     services: dict[str, dict[str, Any]] = {}
-    if compose_path.exists():
-        services = detect_services_from_compose(
-            compose_path.read_text()
-        )
+    if model is not None:
+        services = _services_from_model(model)
     obs_services = identify_observability_services(services)
     app_services = {
         k: v for k, v in services.items() if k not in obs_services
@@ -947,6 +1061,7 @@ def init_command(
         project_name=project_name,
         prefix=prefix,
         compose_file=compose_file,
+        compose_overrides=compose_overrides,
         ports=ports,
         health_endpoint=prompted_health,
         health_port_var=health_port_var,
@@ -967,6 +1082,9 @@ def init_command(
             health_endpoint=prompted_health,
             health_port_var=health_port_var,
             toml_content=toml_content,
+            compose_overrides=compose_overrides,
+            compose_graph=[Path(f) for f in model.files] if model else [],
+            profiles=dict(model.profiles) if model else {},
         )
         typer.echo(_format_dry_run_output(overridden_plan))
         return 0
@@ -979,7 +1097,13 @@ def init_command(
 
     # Rewrite compose file with parameterized ports and commented obs services
     if compose_path.exists() and (ports or obs_services):
-        rewrite_compose(compose_path, ports, obs_services)
-        typer.echo(f"Compose file updated: {compose_file}")
+        graph = [Path(f) for f in model.files] if model else []
+        for name in rewrite_compose_graph(
+            project_root, graph or [compose_path], ports, obs_services
+        ):
+            typer.echo(f"Compose file updated: {name}")
+
+    if docker_running:
+        _start_prefetch(project_root, project_name)
 
     return 0
@@ -0,0 +1,184 @@
+"""kinfra init --recursive — inspect every sub-project of a monorepo.
+
+Sub-projects are discovered by walking the tree for compose files or
+existing ``.devops-ai/infra.toml`` configs. Detection runs in a process
+pool (YAML parsing and regex scans are CPU-bound), then the per-project
+reports are combined with a cross-project check for overlapping port
+bands. Recursive mode is report-only: it never writes config or rewrites
+compose files.
+"""
+
+from __future__ import annotations
+
+import os
+from collections import defaultdict
+from collections.abc import Iterator
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from pathlib import Path
+
+from ruamel.yaml.error import YAMLError
+
+from devops_ai.cli.init_cmd import (
+    InitPlan,
+    _format_check_output,
+    _format_dry_run_output,
+    detect_gaps,
+    detect_project,
+    find_compose_files,
+)
+from devops_ai.config import load_config
+from devops_ai.ports import find_port_band_clashes
+
+# Directories never descended into during discovery
+_PRUNED_DIRS = {"node_modules", "__pycache__", "venv", "vendor"}
+
+
+@dataclass
+class ProjectReport:
+    """Detection result for one sub-project."""
+
+    root: Path
+    onboarded: bool
+    plan: InitPlan | None = None
+    # env_var -> base port (declared in infra.toml, else detected)
+    ports: dict[str, int] = field(default_factory=dict)
+    error: str | None = None
+
+    @property
+    def name(self) -> str:
+        return self.plan.project_name if self.plan else self.root.name
+
+
+def _is_project(directory: Path) -> bool:
+    return (directory / ".devops-ai" / "infra.toml").is_file() or bool(
+        find_compose_files(directory)
+    )
+
+
+def discover_projects(root: Path) -> list[Path]:
+    """Find sub-projects under ``root`` (including ``root`` itself).
+
+    Hidden directories and dependency/vendor trees are pruned.
+    """
+    projects: list[Path] = []
+    for dirpath, dirnames, _ in os.walk(root):
+        dirnames[:] = sorted(
+            d
+            for d in dirnames
+            if not d.startswith(".") and d not in _PRUNED_DIRS
+        )
+        directory = Path(dirpath)
+        if _is_project(directory):
+            projects.append(directory)
+    return projects
+
+
+def inspect_project(root: Path) -> ProjectReport:
+    """Run detection for one sub-project. Safe to call in a worker process.
+
+    Onboarded projects get a gap check against their config; others get
+    the plan ``kinfra init`` would apply. Errors are captured, not raised.
+    """
+    onboarded = (root / ".devops-ai" / "infra.toml").is_file()
+    try:
+        config = load_config(root) if onboarded else None
+        if config is not None:
+            plan = detect_gaps(root)
+            ports = {sp.env_var: sp.base_port for sp in config.ports}
+            plan.project_name = config.project_name
+        else:
+            plan = detect_project(root)
+            ports = dict(plan.ports)
+    except (OSError, ValueError, YAMLError) as e:
+        return ProjectReport(root=root, onboarded=onboarded, error=str(e))
+    return ProjectReport(
+        root=root, onboarded=onboarded, plan=plan, ports=ports
+    )
+
+
+def _inspect_all(
+    roots: list[Path], jobs: int | None
+) -> Iterator[ProjectReport]:
+    workers = min(jobs or os.cpu_count() or 1, len(roots))
+    if workers <= 1:
+        yield from map(inspect_project, roots)
+        return
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        yield from pool.map(inspect_project, roots)
+
+
+def _relative(path: Path, root: Path) -> str:
+    return path.relative_to(root).as_posix()
+
+
+def _format_report(
+    reports: list[ProjectReport], root: Path
+) -> tuple[str, bool]:
+    """Combine per-project reports. Returns (text, has_problems)."""
+    lines: list[str] = []
+    for report in reports:
+        rel = _relative(report.root, root)
+        lines.append(f"=== {rel} ===")
+        if report.error is not None:
+            lines.append(f"Error: {report.error}")
+        elif report.plan is not None:
+            body = (
+                _format_check_output(report.plan)
+                if report.onboarded
+                else _format_dry_run_output(report.plan)
+            )
+            lines.append(body)
+        lines.append("")
+
+    errors = [r for r in reports if r.error is not None]
+    by_name: dict[str, list[str]] = defaultdict(list)
+    for report in reports:
+        if report.plan is not None:
+            by_name[report.name].append(_relative(report.root, root))
+    duplicates = {n: dirs for n, dirs in by_name.items() if len(dirs) > 1}
+    clashes = find_port_band_clashes(
+        {
+            _relative(r.root, root): r.ports
+            for r in reports
+            if r.ports
+        }
+    )
+
+    onboarded = sum(1 for r in reports if r.onboarded)
+    lines.append(
+        f"Summary: {len(reports)} projects "
+        f"({onboarded} onboarded, {len(reports) - onboarded} new)"
+    )
+    if errors:
+        lines.append(f"⚠ {len(errors)} projects failed detection:")
+        for r in errors:
+            lines.append(f"  {_relative(r.root, root)}")
+    if duplicates:
+        lines.append("⚠ Duplicate project names:")
+        for name, dirs in sorted(duplicates.items()):
+            lines.append(f"  {name}: {', '.join(dirs)}")
+    if clashes:
+        lines.append("⚠ Port band clashes:")
+        for clash in clashes:
+            lines.append(f"  {clash}")
+    has_problems = bool(errors or duplicates or clashes)
+    if not has_problems:
+        lines.append("No cross-project conflicts.")
+    return "\n".join(lines), has_problems
+
+
+def init_recursive_command(
+    root: Path, jobs: int | None = None
+) -> tuple[int, str]:
+    """Inspect every sub-project under ``root`` and combine the reports.
+
+    Returns (exit_code, message). Exit code is 1 if any project failed
+    detection, two projects share a name, or port bands overlap.
+    """
+    roots = discover_projects(root)
+    if not roots:
+        return 1, f"No compose projects found under {root}."
+    reports = list(_inspect_all(roots, jobs))
+    text, has_problems = _format_report(reports, root)
+    return (1 if has_problems else 0), text
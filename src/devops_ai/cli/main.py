@@ -1,15 +1,14 @@
-"""kinfra CLI — Developer infrastructure for worktree and sandbox management."""
+"""kinfra CLI — Developer infrastructure for worktree and sandbox management.
 
-import typer
+Command modules are imported inside each command so that a call like
+``kinfra status`` only loads what it needs: init pulls in the YAML stack,
+worktrees pulls in rich, impl pulls in the whole sandbox pipeline.
+tests/unit/test_import_time.py guards the per-command import budget.
+"""
+
+from pathlib import Path
 
-from devops_ai.cli.done import done_command
-from devops_ai.cli.impl import impl_command
-from devops_ai.cli.init_cmd import init_command
-from devops_ai.cli.observability import _down_command, _status_command, _up_command
-from devops_ai.cli.sandbox_cmd import sandbox_start_command
-from devops_ai.cli.spec import spec_command
-from devops_ai.cli.status import status_command
-from devops_ai.cli.worktrees import worktrees_command
+import typer
 
 app = typer.Typer(
     name="kinfra",
@@ -29,6 +28,18 @@ sandbox_app = typer.Typer(
 )
 app.add_typer(sandbox_app, name="sandbox")
 
+images_app = typer.Typer(
+    help="Prefetch compose images and track their digests.",
+    no_args_is_help=True,
+)
+app.add_typer(images_app, name="images")
+
+registry_app = typer.Typer(
+    help="Inspect and repair the slot registry.",
+    no_args_is_help=True,
+)
+app.add_typer(registry_app, name="registry")
+
 
 @app.command()
 def init(
@@ -46,8 +57,31 @@ def init(
     check: bool = typer.Option(
         False, "--check", help="Report provisioning gaps"
     ),
+    recursive: bool = typer.Option(
+        False,
+        "--recursive",
+        "-r",
+        help="Inspect every sub-project below the current directory",
+    ),
+    jobs: int | None = typer.Option(
+        None, "--jobs", "-j", help="Parallel detection workers"
+    ),
 ) -> None:
     """Initialize kinfra for the current project."""
+    if recursive:
+        from devops_ai.cli.init_recursive import init_recursive_command
+
+        if auto and not dry_run:
+            typer.echo(
+                "--recursive only reports; run 'kinfra init --auto' "
+                "inside each project to write config."
+            )
+            raise typer.Exit(1)
+        code, msg = init_recursive_command(Path.cwd(), jobs=jobs)
+        typer.echo(msg)
+        raise typer.Exit(code)
+    from devops_ai.cli.init_cmd import init_command
+
     code = init_command(
         dry_run=dry_run,
         auto=auto,
@@ -60,19 +94,55 @@ def init(
 @app.command()
 def spec(feature: str = typer.Argument(help="Feature name")) -> None:
     """Create a spec (design) worktree for a feature."""
+    from devops_ai.cli.spec import spec_command
+
     code = spec_command(feature)
     raise typer.Exit(code)
 
 
 @app.command()
 def done(
-    name: str = typer.Argument(help="Worktree name or partial match"),
+    names: list[str] | None = typer.Argument(
+        None, help="Worktree names or partial matches"
+    ),
     force: bool = typer.Option(
         False, "--force", help="Remove even if dirty"
     ),
+    merged: bool = typer.Option(
+        False,
+        "--merged",
+        help="Also remove worktrees whose branch is merged into main",
+    ),
+    all_worktrees: bool = typer.Option(
+        False, "--all", help="Remove every spec/impl worktree"
+    ),
+    jobs: int = typer.Option(
+        4, "--jobs", "-j", help="Parallel teardowns in bulk mode"
+    ),
 ) -> None:
-    """Remove a worktree (with dirty check)."""
-    code, msg = done_command(name, force=force)
+    """Remove worktrees (with dirty check)."""
+    names = names or []
+    if all_worktrees and (names or merged):
+        typer.echo("--all cannot be combined with names or --merged.")
+        raise typer.Exit(1)
+    if not (names or merged or all_worktrees):
+        typer.echo("Give a worktree name, --merged or --all.")
+        raise typer.Exit(1)
+
+    if len(names) == 1 and not (merged or all_worktrees):
+        from devops_ai.cli.done import done_command
+
+        code, msg = done_command(names[0], force=force)
+    else:
+        from devops_ai.cli.done import done_many_command
+
+        code, msg = done_many_command(
+            names,
+            force=force,
+            merged=merged,
+            all_worktrees=all_worktrees,
+            jobs=jobs,
+        )
     typer.echo(msg)
     raise typer.Exit(code)
 
@@ -80,10 +150,51 @@ def done(
 @app.command()
 def worktrees() -> None:
     """List all active worktrees."""
+    from devops_ai.cli.worktrees import worktrees_command
+
     code = worktrees_command()
     raise typer.Exit(code)
 
 
+@app.command()
+def gc(
+    yes: bool = typer.Option(
+        False, "--yes", "-y", help="Delete what is reported as reclaimable"
+    ),
+    dry_run: bool = typer.Option(
+        False, "--dry-run", hidden=True, help="Only report (the default)"
+    ),
+    jobs: int = typer.Option(
+        8, "--jobs", "-j", help="Parallel disk-usage walks"
+    ),
+) -> None:
+    """Report disk usage; with --yes, reclaim leftovers of released slots."""
+    from devops_ai.cli.gc_cmd import gc_command
+
+    code, msg = gc_command(yes=yes and not dry_run, jobs=jobs)
+    typer.echo(msg)
+    raise typer.Exit(code)
+
+
+@app.command()
+def reconcile(
+    watch: bool = typer.Option(
+        False, "--watch", help="Keep following Docker events and worktrees"
+    ),
+    interval: float = typer.Option(
+        2.0, "--interval", help="Seconds between filesystem polls"
+    ),
+) -> None:
+    """Sync registry slot status with containers and worktrees."""
+    from devops_ai.cli.reconcile_cmd import reconcile_command
+
+    code, msg = reconcile_command(
+        watch=watch, interval=interval, echo=typer.echo
+    )
+    typer.echo(msg)
+    raise typer.Exit(code)
+
+
 @app.command(name="impl")
 def impl_cmd(
     feature_milestone: str = typer.Argument(
@@ -94,9 +205,26 @@ def impl_cmd(
         "--session/--no-session",
         help="Create an agent-deck session with Claude",
     ),
+    wait: bool = typer.Option(
+        False,
+        "--wait",
+        help="Queue until the host has capacity instead of failing",
+    ),
+    wait_timeout: float | None = typer.Option(
+        None,
+        "--wait-timeout",
+        help="With --wait, give up after this many seconds",
+    ),
 ) -> None:
     """Create an implementation worktree with sandbox."""
-    code, msg = impl_command(feature_milestone, session=session)
+    from devops_ai.cli.impl import impl_command
+
+    code, msg = impl_command(
+        feature_milestone,
+        session=session,
+        wait=wait,
+        wait_timeout=wait_timeout,
+    )
     typer.echo(msg)
     raise typer.Exit(code)
 
@@ -104,7 +232,29 @@ def impl_cmd(
 @app.command()
 def status() -> None:
     """Show sandbox details for current directory."""
-    code, msg = status_command()
+    from devops_ai.daemon import call_daemon
+
+    reply = call_daemon("status", {"cwd": str(Path.cwd())})
+    if reply is None:
+        from devops_ai.cli.status import status_command
+
+        reply = status_command()
+    code, msg = reply
+    typer.echo(msg)
+    raise typer.Exit(code)
+
+
+@app.command()
+def queue() -> None:
+    """Show sandbox requests waiting for host capacity."""
+    from devops_ai.daemon import call_daemon
+
+    reply = call_daemon("queue")
+    if reply is None:
+        from devops_ai.cli.queue_cmd import queue_command
+
+        reply = queue_command()
+    code, msg = reply
     typer.echo(msg)
     raise typer.Exit(code)
 
@@ -112,6 +262,8 @@ def status() -> None:
 @observability_app.command(name="up")
 def obs_up() -> None:
     """Start the shared observability stack."""
+    from devops_ai.cli.observability import _up_command
+
     code, msg = _up_command()
     typer.echo(msg)
     raise typer.Exit(code)
@@ -120,6 +272,8 @@ def obs_up() -> None:
 @observability_app.command(name="down")
 def obs_down() -> None:
     """Stop the shared observability stack."""
+    from devops_ai.cli.observability import _down_command
+
     code, msg = _down_command()
     typer.echo(msg)
     raise typer.Exit(code)
@@ -128,6 +282,8 @@ def obs_down() -> None:
 @observability_app.command(name="status")
 def obs_status() -> None:
     """Show observability stack status."""
+    from devops_ai.cli.observability import _status_command
+
     code, msg = _status_command()
     typer.echo(msg)
     raise typer.Exit(code)
@@ -136,14 +292,45 @@ def obs_status() -> None:
 @sandbox_app.command(name="start")
 def sandbox_start() -> None:
     """Start sandbox for an existing worktree (re-runs provisioning)."""
+    from devops_ai.cli.sandbox_cmd import sandbox_start_command
+
     code, msg = sandbox_start_command()
     typer.echo(msg)
     raise typer.Exit(code)
 
 
+@images_app.command(name="prefetch")
+def images_prefetch(
+    jobs: int = typer.Option(
+        4, "--jobs", "-j", help="Maximum concurrent pulls"
+    ),
+) -> None:
+    """Pull compose images concurrently and record their digests."""
+    from devops_ai.cli.images_cmd import images_prefetch_command
+
+    code, msg = images_prefetch_command(max_workers=jobs)
+    typer.echo(msg)
+    raise typer.Exit(code)
+
+
+@registry_app.command(name="rebuild")
+def registry_rebuild(
+    dry_run: bool = typer.Option(
+        False, "--dry-run", help="Show what would be added without saving"
+    ),
+) -> None:
+    """Recover registry entries from sandbox container labels."""
+    from devops_ai.cli.registry_cmd import rebuild_command
+
+    code, msg = rebuild_command(dry_run=dry_run)
+    typer.echo(msg)
+    raise typer.Exit(code)
+
+
 def main() -> None:
     app()
 
 
 if __name__ == "__main__":
     main()
+
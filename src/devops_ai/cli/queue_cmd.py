@@ -0,0 +1,25 @@
+"""kinfra queue — Show requests waiting for sandbox admission."""
+
+from __future__ import annotations
+
+from pathlib import Path
+
+from devops_ai.admission import load_queue
+
+
+def queue_command(queue_path: Path | None = None) -> tuple[int, str]:
+    """List queued ``kinfra impl --wait`` requests in FIFO order.
+
+    Returns (exit_code, message).
+    """
+    entries = load_queue(queue_path)
+    if not entries:
+        return 0, "No queued requests."
+
+    lines = ["Queued sandbox requests:"]
+    for position, entry in enumerate(entries, start=1):
+        lines.append(
+            f"  {position}. {entry.project} {entry.request} "
+            f"(pid {entry.pid}, since {entry.enqueued_at})"
+        )
+    return 0, "\n".join(lines)
@@ -0,0 +1,47 @@
+"""kinfra reconcile — sync registry slot status with Docker and disk."""
+
+from __future__ import annotations
+
+import subprocess
+import threading
+from collections.abc import Callable
+
+from devops_ai.reconcile import (
+    DEFAULT_INTERVAL,
+    Reconciler,
+    StatusChange,
+    reconcile_once,
+)
+
+
+def reconcile_command(
+    watch: bool = False,
+    interval: float = DEFAULT_INTERVAL,
+    echo: Callable[[str], None] = print,
+) -> tuple[int, str]:
+    """Update slot status once, or keep it updated until interrupted.
+
+    In watch mode each change is passed to ``echo`` as it happens.
+    Returns (exit_code, msg).
+    """
+    if not watch:
+        try:
+            changes = reconcile_once()
+        except (OSError, subprocess.SubprocessError) as e:
+            return 1, f"Could not list Docker containers: {e}"
+        if not changes:
+            return 0, "All slot statuses up to date."
+        return 0, "\n".join(str(c) for c in changes)
+
+    def report(changes: list[StatusChange]) -> None:
+        for change in changes:
+            echo(str(change))
+
+    echo("Watching Docker events and worktrees (Ctrl-C to stop)…")
+    try:
+        Reconciler().watch(threading.Event(), interval, report)
+    except (OSError, subprocess.SubprocessError) as e:
+        return 1, f"Could not follow Docker events: {e}"
+    except KeyboardInterrupt:
+        pass
+    return 0, "Stopped."
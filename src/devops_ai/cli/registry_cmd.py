@@ -0,0 +1,39 @@
+"""kinfra registry rebuild — recover slot entries from container labels."""
+
+from __future__ import annotations
+
+import subprocess
+
+from devops_ai.labels import list_slot_containers, rebuild_registry
+from devops_ai.registry import load_registry, registry_lock, save_registry
+
+
+def rebuild_command(dry_run: bool = False) -> tuple[int, str]:
+    """Re-create registry entries for labelled sandboxes.
+
+    Entries already in the registry are kept. Returns (exit_code, msg).
+    """
+    try:
+        containers = list_slot_containers()
+    except (OSError, subprocess.SubprocessError) as e:
+        return 1, f"Could not list Docker containers: {e}"
+
+    # Hold the lock across load and save so a concurrent claim is kept
+    with registry_lock():
+        registry = load_registry()
+        added, conflicts = rebuild_registry(registry, containers)
+        if added and not dry_run:
+            save_registry(registry)
+
+    lines = []
+    verb = "Would add" if dry_run else "Added"
+    for slot in added:
+        lines.append(
+            f"{verb} slot {slot.slot_id} ({slot.project}, {slot.status}) "
+            f"→ {slot.worktree_path}"
+        )
+    if not added:
+        lines.append("Registry already covers every labelled sandbox.")
+    for conflict in conflicts:
+        lines.append(f"Skipped {conflict}")
+    return 0, "\n".join(lines)
@@ -3,10 +3,11 @@
 from __future__ import annotations
 
 import logging
-import subprocess
 from pathlib import Path
 
-from devops_ai.config import find_project_root, load_config
+from devops_ai.build_cache import compute_image_pins
+from devops_ai.config import find_project_root
+from devops_ai.context import ProjectContext
 from devops_ai.provision import (
     FileProvisionError,
     SecretResolutionError,
@@ -20,32 +21,17 @@ from devops_ai.registry import (
     load_registry,
     save_registry,
 )
-from devops_ai.sandbox import run_health_gate, start_sandbox
+from devops_ai.sandbox import (
+    generate_override,
+    run_health_gate,
+    start_sandbox,
+)
 
 logger = logging.getLogger(__name__)
 
 REGISTRY_PATH = DEFAULT_REGISTRY_PATH
 
 
-def _find_main_repo_root(worktree_path: Path) -> Path | None:
-    """Find the main repo root from a worktree via git."""
-    try:
-        result = subprocess.run(
-            ["git", "rev-parse", "--path-format=absolute", "--git-common-dir"],
-            capture_output=True,
-            text=True,
-            timeout=5,
-            cwd=worktree_path,
-        )
-        if result.returncode == 0 and result.stdout.strip():
-            # --git-common-dir returns the .git dir of the main worktree
-            git_dir = Path(result.stdout.strip())
-            return git_dir.parent
-    except (FileNotFoundError, subprocess.TimeoutExpired):
-        pass
-    return None
-
-
 def sandbox_start_command(
     worktree_path: Path | None = None,
 ) -> tuple[int, str]:
@@ -79,12 +65,13 @@ def sandbox_start_command(
     if config_root is None:
         return 1, "No .devops-ai/ directory found in worktree."
 
-    config = load_config(config_root)
+    ctx = ProjectContext.resolve(config_root)
+    config = ctx.config
     if config is None:
         return 1, "No infra.toml found in .devops-ai/."
 
     # Find main repo root for file provisioning
-    main_repo = _find_main_repo_root(wt_path)
+    main_repo = ctx.main_repo_root
     if main_repo is None:
         return 1, "Cannot determine main repository root."
 
@@ -119,6 +106,16 @@ def sandbox_start_command(
     if resolved_secrets:
         generate_secrets_file(resolved_secrets, slot_dir)
 
+    # Refresh the override so changed build contexts get a new image tag
+    generate_override(
+        config,
+        slot_info,
+        wt_path,
+        main_repo,
+        slot_dir,
+        image_pins=compute_image_pins(config, wt_path),
+    )
+
     # Start sandbox
     try:
         start_sandbox(config, slot_info, wt_path)
@@ -2,11 +2,13 @@
 
 from __future__ import annotations
 
+import shutil
 from pathlib import Path
 
 import typer
 
-from devops_ai.config import find_project_root, load_config
+from devops_ai.context import ProjectContext
+from devops_ai.images import start_background_prefetch
 from devops_ai.worktree import create_spec_worktree, validate_feature_name
 
 
@@ -16,12 +18,10 @@ def spec_command(feature: str, repo_root: Path | None = None) -> int:
     Accepts optional repo_root for testing; defaults to find_project_root()
     or cwd.
     """
-    if repo_root is None:
-        repo_root = find_project_root() or Path.cwd()
-
-    # Determine prefix: from config or fallback to directory name
-    config = load_config(repo_root) if (repo_root / ".devops-ai").is_dir() else None
-    prefix = config.prefix if config else repo_root.name
+    ctx = ProjectContext.resolve(repo_root)
+    repo_root, config = ctx.repo_root, ctx.config
+    # Prefix comes from config, falling back to the directory name
+    prefix = ctx.prefix
 
     try:
         validate_feature_name(feature)
@@ -30,7 +30,12 @@ def spec_command(feature: str, repo_root: Path | None = None) -> int:
         return 1
 
     try:
-        wt_path = create_spec_worktree(repo_root, prefix, feature)
+        wt_path = create_spec_worktree(
+            repo_root,
+            prefix,
+            feature,
+            pool_size=config.worktree.pool_size if config else 0,
+        )
     except Exception as e:
         typer.echo(f"Error creating worktree: {e}", err=True)
         return 1
@@ -38,4 +43,8 @@ def spec_command(feature: str, repo_root: Path | None = None) -> int:
     typer.echo(f"Created spec worktree: {wt_path}")
     typer.echo(f"  Branch: spec/{feature}")
     typer.echo(f"  Design dir: {wt_path / 'docs' / 'designs' / feature}")
+
+    # Warm the image cache while the design is being written
+    if config and config.has_sandbox and shutil.which("docker"):
+        start_background_prefetch(repo_root, config.project_name)
     return 0
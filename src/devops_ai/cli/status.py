@@ -5,13 +5,16 @@ from __future__ import annotations
 from pathlib import Path
 
 from devops_ai.config import find_project_root
-from devops_ai.registry import get_slot_for_worktree, load_registry
+from devops_ai.registry import Registry, get_slot_for_worktree, load_registry
 
 
-def status_command(cwd: Path | None = None) -> tuple[int, str]:
+def status_command(
+    cwd: Path | None = None, registry: Registry | None = None
+) -> tuple[int, str]:
     """Show sandbox status for the current directory.
 
-    Returns (exit_code, message).
+    ``registry`` lets kinfrad pass its in-memory copy; by default it is
+    read from disk. Returns (exit_code, message).
     """
     cwd = cwd or Path.cwd()
 
@@ -21,7 +24,8 @@ def status_command(cwd: Path | None = None) -> tuple[int, str]:
         return 0, "Not inside a devops-ai project."
 
     # Check registry for worktree root (not cwd, which may be a subdir)
-    registry = load_registry()
+    if registry is None:
+        registry = load_registry()
     slot = get_slot_for_worktree(registry, project_root)
 
     if slot is None:
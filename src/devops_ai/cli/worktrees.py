@@ -1,48 +1,227 @@
-"""kinfra worktrees — List all active worktrees."""
+"""kinfra worktrees — List all active worktrees with their sandbox state.
+
+Per-worktree probes (git status, disk usage, health endpoint) and one
+``docker ps`` for all sandboxes run concurrently in a bounded thread
+pool. Anything still running at the deadline is shown as ``?`` so the
+table always renders promptly.
+"""
 
 from __future__ import annotations
 
+import json
+import subprocess
+import time
+from concurrent.futures import Future, ThreadPoolExecutor, wait
+from dataclasses import dataclass
 from pathlib import Path
+from typing import Any
 
 import typer
 from rich.console import Console
 from rich.table import Table
 
-from devops_ai.config import find_project_root, load_config
-from devops_ai.worktree import list_worktrees
+from devops_ai.config import InfraConfig
+from devops_ai.context import ProjectContext
+from devops_ai.disk import format_size, tree_size
+from devops_ai.registry import SlotInfo, get_slot_for_worktree, load_registry
+from devops_ai.worktree import (
+    DirtyState,
+    WorktreeInfo,
+    check_dirty,
+    list_worktrees,
+)
 
+DEFAULT_TIMEOUT = 2.0
+DEFAULT_MAX_WORKERS = 8
 
-def worktrees_command(repo_root: Path | None = None) -> int:
-    """List all active worktrees. Returns exit code."""
-    if repo_root is None:
-        repo_root = find_project_root() or Path.cwd()
+_PENDING = "?"
+
+
+@dataclass
+class WorktreeRow:
+    """One table row: a worktree plus whatever the probes found in time."""
 
-    config = (
-        load_config(repo_root)
-        if (repo_root / ".devops-ai").is_dir()
-        else None
+    info: WorktreeInfo
+    slot: SlotInfo | None = None
+    dirty: DirtyState | None = None
+    disk: int | None = None
+    health: str = _PENDING
+    containers: str = _PENDING
+
+
+def _docker_states(timeout: float) -> dict[str, list[str]]:
+    """Map compose project name -> container states, from one docker ps."""
+    result = subprocess.run(
+        [
+            "docker", "ps", "-a",
+            "--filter", "label=com.docker.compose.project",
+            "--format", "{{json .}}",
+        ],
+        capture_output=True,
+        text=True,
+        timeout=timeout,
     )
-    prefix = config.prefix if config else repo_root.name
-    project_name = config.project_name if config else repo_root.name
+    states: dict[str, list[str]] = {}
+    for line in result.stdout.splitlines():
+        try:
+            container = json.loads(line)
+        except ValueError:
+            continue
+        labels = dict(
+            item.split("=", 1)
+            for item in container.get("Labels", "").split(",")
+            if "=" in item
+        )
+        project = labels.get("com.docker.compose.project")
+        if project:
+            states.setdefault(project, []).append(
+                str(container.get("State", "unknown"))
+            )
+    return states
+
+
+def _summarize_containers(states: list[str]) -> str:
+    if not states:
+        return "none"
+    running = states.count("running")
+    return f"{running}/{len(states)} up"
+
+
+def _probe_health(
+    config: InfraConfig, slot: SlotInfo, timeout: float
+) -> str:
+    """One GET against the health endpoint (no polling, unlike the gate)."""
+    import urllib.request
+
+    if not config.health_endpoint or not config.health_port_var:
+        return "-"
+    port = slot.ports.get(config.health_port_var)
+    if port is None:
+        return "-"
+    endpoint = config.health_endpoint
+    if not endpoint.startswith("/"):
+        endpoint = f"/{endpoint}"
+    try:
+        url = f"http://localhost:{port}{endpoint}"
+        with urllib.request.urlopen(url, timeout=timeout) as resp:
+            if resp.status == 200:
+                return "healthy"
+            return f"HTTP {resp.status}"
+    except Exception:
+        return "unhealthy"
+
 
-    all_wts = list_worktrees(repo_root, prefix)
+def collect_rows(
+    worktrees: list[WorktreeInfo],
+    config: InfraConfig | None,
+    timeout: float = DEFAULT_TIMEOUT,
+    max_workers: int = DEFAULT_MAX_WORKERS,
+) -> list[WorktreeRow]:
+    """Gather row details concurrently, giving up after ``timeout`` seconds."""
+    registry = load_registry()
+    rows = [
+        WorktreeRow(
+            info=wt, slot=get_slot_for_worktree(registry, wt.path)
+        )
+        for wt in worktrees
+    ]
+    deadline = time.monotonic() + timeout
+    pool = ThreadPoolExecutor(max_workers=max(1, max_workers))
+    # Each probe future fills in one attribute of one row
+    targets: dict[Future[Any], tuple[WorktreeRow, str]] = {}
+
+    docker: Future[dict[str, list[str]]] | None = None
+    if any(row.slot for row in rows):
+        docker = pool.submit(_docker_states, timeout)
+    for row in rows:
+        targets[pool.submit(check_dirty, row.info.path, timeout)] = (
+            row,
+            "dirty",
+        )
+        targets[pool.submit(tree_size, row.info.path, deadline)] = (
+            row,
+            "disk",
+        )
+        if row.slot is None:
+            row.health = row.containers = "-"
+        elif config is None:
+            row.health = "-"
+        else:
+            future = pool.submit(_probe_health, config, row.slot, timeout)
+            targets[future] = (row, "health")
+
+    pending = [*targets, *([docker] if docker else [])]
+    wait(pending, timeout=max(0.0, deadline - time.monotonic()))
+    pool.shutdown(wait=False, cancel_futures=True)
+
+    for future, (row, attr) in targets.items():
+        if future.done() and not future.cancelled():
+            if future.exception() is None:
+                setattr(row, attr, future.result())
+    if docker is not None and docker.done() and not docker.exception():
+        states = docker.result()
+        for row in rows:
+            if row.slot is not None:
+                row.containers = _summarize_containers(
+                    states.get(row.slot.compose_project.lower(), [])
+                )
+    return rows
+
+
+def _dirty_cell(dirty: DirtyState | None) -> str:
+    if dirty is None:
+        return _PENDING
+    parts = ["dirty" if dirty.has_uncommitted else "clean"]
+    if dirty.ahead:
+        parts.append(f"↑{dirty.ahead}")
+    if dirty.behind:
+        parts.append(f"↓{dirty.behind}")
+    return " ".join(parts)
+
+
+def worktrees_command(
+    repo_root: Path | None = None, timeout: float = DEFAULT_TIMEOUT
+) -> int:
+    """List all active worktrees. Returns exit code."""
+    ctx = ProjectContext.resolve(repo_root)
+    prefix = ctx.prefix
+    project_name = ctx.project_name
+
+    all_wts = list_worktrees(ctx.repo_root, prefix)
     managed = [w for w in all_wts if w.wt_type in ("spec", "impl")]
 
     if not managed:
         typer.echo("No active worktrees.")
         return 0
 
+    rows = collect_rows(managed, ctx.config, timeout=timeout)
+
     table = Table(title=f"Worktrees — {project_name}")
     table.add_column("Name", style="cyan")
     table.add_column("Type", style="green")
     table.add_column("Branch", style="yellow")
+    table.add_column("Git")
+    table.add_column("Slot", justify="right")
+    table.add_column("Ports")
+    table.add_column("Containers")
+    table.add_column("Health")
+    table.add_column("Disk", justify="right")
     table.add_column("Path")
 
-    for wt in managed:
+    for row in rows:
+        wt, slot = row.info, row.slot
         table.add_row(
             wt.feature,
             wt.wt_type,
             wt.branch,
+            _dirty_cell(row.dirty),
+            str(slot.slot_id) if slot else "-",
+            ", ".join(str(p) for _, p in sorted(slot.ports.items()))
+            if slot
+            else "-",
+            row.containers,
+            row.health,
+            format_size(row.disk) if row.disk is not None else _PENDING,
             str(wt.path),
         )
 
@@ -1,13 +1,18 @@
-"""Compose file parameterization — port vars, observability commenting, headers."""
+"""Compose file parameterization — port vars, observability commenting, headers.
+
+``rewrite_compose`` applies every transformation in a single pass over
+the file's lines. The individual step functions (``remove_depends_on``,
+``parameterize_ports``, ``comment_out_services``, ``add_header_comment``)
+share the same per-line machinery and remain usable on their own.
+"""
 
 from __future__ import annotations
 
 import re
 import shutil
+from collections.abc import Iterable, Iterator
 from pathlib import Path
 
-from ruamel.yaml import YAML
-
 HEADER_COMMENT = """\
 # =============================================================================
 # kinfra-managed Docker Compose file
@@ -30,100 +35,215 @@ OBS_COMMENT = """\
 """
 
 
-def parameterize_ports(
-    yaml_content: str, port_map: dict[str, int]
-) -> str:
-    """Replace hardcoded host ports with ${VAR:-default} syntax.
+_SERVICE_LINE_RE = re.compile(r"^  (\S+):")
+_DEPENDS_ON_RE = re.compile(r"^\s+depends_on:\s*$")
+_SERVICES_KEY_RE = re.compile(
+    r"^(?:services|\"services\"|'services')\s*:", re.MULTILINE
+)
+_HOST_PORT_RE = re.compile(r"(\d+):")
 
-    port_map maps env var names to base port numbers.
-    Only replaces ports that match values in port_map.
-    Skips ports that already contain ${.
+
+class _PortRewriter:
+    """Replace hardcoded host ports on a line with ``${VAR:-port}``.
+
+    Patterns are compiled once per port. For each line only the ports
+    that can possibly match (a suffix of some ``<digits>:`` token on the
+    line) are applied, in ``port_map`` order — the same result as running
+    every port's substitution over the whole text in turn.
     """
-    result = yaml_content
-    for var_name, port in port_map.items():
-        # Match "HOST:CONTAINER" patterns where HOST matches the port value
-        # from port_map. Preserves the original container port.
-        # Skips already-parameterized entries.
-        pattern = re.compile(
-            rf'(?<!\${{)"?{port}:(\d+)"?'
-        )
-        replacement = rf'"${{{var_name}:-{port}}}:\1"'
-        result = pattern.sub(replacement, result)
-    return result
 
+    def __init__(self, port_map: dict[str, int]) -> None:
+        self._subs: list[tuple[str, re.Pattern[str], str]] = []
+        for var_name, port in port_map.items():
+            # Match "HOST:CONTAINER" patterns where HOST matches the port
+            # value from port_map. Preserves the original container port.
+            # Skips already-parameterized entries.
+            pattern = re.compile(rf'(?<!\${{)"?{port}:(\d+)"?')
+            replacement = rf'"${{{var_name}:-{port}}}:\1"'
+            self._subs.append((str(port), pattern, replacement))
+        self._ports = {port for port, _, _ in self._subs}
+
+    def __call__(self, line: str) -> str:
+        if not self._subs or ":" not in line:
+            return line
+        numbers = _HOST_PORT_RE.findall(line)
+        if not numbers:
+            return line
+        candidates = {
+            port
+            for port in self._ports
+            if any(n.endswith(port) for n in numbers)
+        }
+        if not candidates:
+            return line
+        for port, pattern, replacement in self._subs:
+            if port in candidates:
+                line = pattern.sub(replacement, line)
+        return line
+
+
+def _indent(line: str) -> int:
+    return len(line) - len(line.lstrip())
+
+
+def _filter_depends_on(
+    lines: list[str], service_names: list[str]
+) -> Iterator[str]:
+    """Yield lines with depends_on entries for the given services removed.
 
-def comment_out_services(
-    yaml_content: str, service_names: list[str]
-) -> str:
-    """Comment out entire service blocks for the given service names."""
+    Handles both short form (``- service``) and long form
+    (``service: {condition: ...}``) depends_on syntax. Drops the entire
+    depends_on block if all entries are removed.
+    """
     if not service_names:
-        return yaml_content
+        yield from lines
+        return
 
-    # Parse to find service boundaries
-    yml = YAML()
-    data = yml.load(yaml_content)
-    if not data or "services" not in data:
-        return yaml_content
+    i = 0
+    while i < len(lines):
+        line = lines[i]
+
+        # Detect "depends_on:" line
+        if not _DEPENDS_ON_RE.match(line.rstrip()):
+            yield line
+            i += 1
+            continue
 
-    lines = yaml_content.splitlines(keepends=True)
-    result_lines: list[str] = []
+        depends_indent = _indent(line)
+        dep_lines: list[str] = []
+        j = i + 1
+        # Collect all lines under depends_on
+        while j < len(lines):
+            dep_line = lines[j]
+            if dep_line.rstrip() == "":
+                break
+            if _indent(dep_line) <= depends_indent:
+                break
+            dep_lines.append(dep_line)
+            j += 1
+
+        # Group lines into entries. Each entry is either:
+        # - Short form: single line like "- jaeger"
+        # - Long form: key line "jaeger:" + child lines
+        entry_indent = depends_indent + 2  # expected child indent
+        entries: list[tuple[str, list[str]]] = []
+        k = 0
+        while k < len(dep_lines):
+            dl = dep_lines[k]
+            dl_stripped = dl.strip()
+
+            if _indent(dl) == entry_indent:
+                # Short form: "- service_name"
+                if dl_stripped.startswith("- "):
+                    name = dl_stripped.lstrip("- ").strip()
+                    entries.append((name, [dl]))
+                    k += 1
+                # Long form: "service_name:" with children
+                elif dl_stripped.endswith(":"):
+                    name = dl_stripped[:-1]
+                    group = [dl]
+                    k += 1
+                    while k < len(dep_lines):
+                        child = dep_lines[k]
+                        if _indent(child) <= entry_indent:
+                            break
+                        group.append(child)
+                        k += 1
+                    entries.append((name, group))
+                else:
+                    # Unknown format — keep it
+                    entries.append((dl_stripped, [dl]))
+                    k += 1
+            else:
+                # Unexpected indent — keep the line
+                entries.append((dl_stripped, [dl]))
+                k += 1
+
+        # Filter out obs service references
+        kept_lines: list[str] = []
+        for name, group in entries:
+            if name not in service_names:
+                kept_lines.extend(group)
+
+        if kept_lines:
+            yield line
+            yield from kept_lines
+        # else: drop entire depends_on block
+        i = j
+
+
+def _comment_blocks(
+    lines: Iterable[str], service_names: list[str]
+) -> Iterator[str]:
+    """Yield lines with the given service blocks commented out."""
     in_obs_service = False
-    obs_indent = 0
+    obs_indent = 2
     added_obs_header = False
 
-    i = 0
-    while i < len(lines):
-        line = lines[i]
+    for line in lines:
         stripped = line.rstrip()
 
         # Detect start of a service block (2 spaces + name + colon)
-        svc_match = re.match(r"^  (\S+):", stripped)
+        svc_match = _SERVICE_LINE_RE.match(stripped)
         if svc_match:
-            svc_name = svc_match.group(1)
-            if svc_name in service_names:
+            if svc_match.group(1) in service_names:
                 if not added_obs_header:
-                    result_lines.append("\n")
-                    result_lines.append(OBS_COMMENT)
+                    yield "\n"
+                    yield OBS_COMMENT
                     added_obs_header = True
                 in_obs_service = True
-                obs_indent = 2
                 # Comment this line
-                result_lines.append(f"  # {stripped.lstrip()}\n")
-                i += 1
+                yield f"  # {stripped.lstrip()}\n"
                 continue
-            else:
-                in_obs_service = False
-
-        if in_obs_service:
-            # Check if this line is still inside the service block
-            if stripped == "":
-                # Blank line — could end the block
-                in_obs_service = False
-                result_lines.append(line)
-            elif line[0] == " " and len(line) - len(
-                line.lstrip()
-            ) > obs_indent:
-                # Indented deeper — still in service
-                result_lines.append(
-                    f"  # {stripped.lstrip()}\n"
-                )
-            elif (
-                line[0] == " "
-                and len(line) - len(line.lstrip()) == obs_indent
-                and not re.match(r"^  \S+:", stripped)
-            ):
-                # Same indent, continuation
-                result_lines.append(
-                    f"  # {stripped.lstrip()}\n"
-                )
-            else:
-                in_obs_service = False
-                result_lines.append(line)
+            in_obs_service = False
+
+        if not in_obs_service:
+            yield line
+        elif stripped == "":
+            # Blank line ends the block
+            in_obs_service = False
+            yield line
+        elif line[0] == " " and _indent(line) > obs_indent:
+            # Indented deeper — still in service
+            yield f"  # {stripped.lstrip()}\n"
+        elif (
+            line[0] == " "
+            and _indent(line) == obs_indent
+            and not _SERVICE_LINE_RE.match(stripped)
+        ):
+            # Same indent, continuation
+            yield f"  # {stripped.lstrip()}\n"
         else:
-            result_lines.append(line)
-        i += 1
+            in_obs_service = False
+            yield line
 
-    return "".join(result_lines)
+
+def parameterize_ports(
+    yaml_content: str, port_map: dict[str, int]
+) -> str:
+    """Replace hardcoded host ports with ${VAR:-default} syntax.
+
+    port_map maps env var names to base port numbers.
+    Only replaces ports that match values in port_map.
+    Skips ports that already contain ${.
+    """
+    rewrite = _PortRewriter(port_map)
+    return "".join(
+        rewrite(line) for line in yaml_content.splitlines(keepends=True)
+    )
+
+
+def comment_out_services(
+    yaml_content: str, service_names: list[str]
+) -> str:
+    """Comment out entire service blocks for the given service names."""
+    if not service_names or not _SERVICES_KEY_RE.search(yaml_content):
+        return yaml_content
+    return "".join(
+        _comment_blocks(
+            yaml_content.splitlines(keepends=True), service_names
+        )
+    )
 
 
 def remove_depends_on(
@@ -136,93 +256,11 @@ def remove_depends_on(
     (``service: {condition: ...}``) depends_on syntax.
     Removes the entire depends_on block if all entries are removed.
     """
-    if not service_names:
-        return yaml_content
-
-    lines = yaml_content.splitlines(keepends=True)
-    result: list[str] = []
-    i = 0
-    while i < len(lines):
-        line = lines[i]
-        stripped = line.rstrip()
-
-        # Detect "depends_on:" line
-        if re.match(r"^\s+depends_on:\s*$", stripped):
-            depends_indent = len(line) - len(line.lstrip())
-            dep_lines: list[str] = []
-            j = i + 1
-            # Collect all lines under depends_on
-            while j < len(lines):
-                dep_line = lines[j]
-                dep_stripped = dep_line.rstrip()
-                if dep_stripped == "":
-                    break
-                dep_line_indent = len(dep_line) - len(
-                    dep_line.lstrip()
-                )
-                if dep_line_indent <= depends_indent:
-                    break
-                dep_lines.append(dep_line)
-                j += 1
-
-            # Group lines into entries. Each entry is either:
-            # - Short form: single line like "- jaeger"
-            # - Long form: key line "jaeger:" + child lines
-            entry_indent = depends_indent + 2  # expected child indent
-            entries: list[tuple[str, list[str]]] = []
-            k = 0
-            while k < len(dep_lines):
-                dl = dep_lines[k]
-                dl_indent = len(dl) - len(dl.lstrip())
-                dl_stripped = dl.strip()
-
-                if dl_indent == entry_indent:
-                    # Short form: "- service_name"
-                    if dl_stripped.startswith("- "):
-                        name = dl_stripped.lstrip("- ").strip()
-                        entries.append((name, [dl]))
-                        k += 1
-                    # Long form: "service_name:" with children
-                    elif dl_stripped.endswith(":"):
-                        name = dl_stripped[:-1]
-                        group = [dl]
-                        k += 1
-                        while k < len(dep_lines):
-                            child = dep_lines[k]
-                            child_indent = len(child) - len(
-                                child.lstrip()
-                            )
-                            if child_indent <= entry_indent:
-                                break
-                            group.append(child)
-                            k += 1
-                        entries.append((name, group))
-                    else:
-                        # Unknown format — keep it
-                        entries.append((dl_stripped, [dl]))
-                        k += 1
-                else:
-                    # Unexpected indent — keep the line
-                    entries.append((dl_stripped, [dl]))
-                    k += 1
-
-            # Filter out obs service references
-            kept_lines: list[str] = []
-            for name, group in entries:
-                if name not in service_names:
-                    kept_lines.extend(group)
-
-            if kept_lines:
-                result.append(line)
-                result.extend(kept_lines)
-            # else: drop entire depends_on block
-            i = j
-            continue
-
-        result.append(line)
-        i += 1
-
-    return "".join(result)
+    return "".join(
+        _filter_depends_on(
+            yaml_content.splitlines(keepends=True), service_names
+        )
+    )
 
 
 def add_header_comment(yaml_content: str) -> str:
@@ -233,14 +271,39 @@ def add_header_comment(yaml_content: str) -> str:
     return HEADER_COMMENT + yaml_content
 
 
+def rewrite_compose_text(
+    yaml_content: str,
+    port_map: dict[str, int],
+    obs_services: list[str],
+    header: bool = True,
+) -> str:
+    """Apply all compose transformations in one pass over the lines.
+
+    Equivalent to ``remove_depends_on`` → ``parameterize_ports`` →
+    ``comment_out_services`` → ``add_header_comment`` (the last only
+    with ``header``).
+    """
+    lines: Iterable[str] = _filter_depends_on(
+        yaml_content.splitlines(keepends=True), obs_services
+    )
+    rewrite = _PortRewriter(port_map)
+    lines = (rewrite(line) for line in lines)
+    if obs_services and _SERVICES_KEY_RE.search(yaml_content):
+        lines = _comment_blocks(lines, obs_services)
+    text = "".join(lines)
+    return add_header_comment(text) if header else text
+
+
 def rewrite_compose(
     compose_path: Path,
     port_map: dict[str, int],
     obs_services: list[str],
+    header: bool = True,
 ) -> None:
     """Rewrite a compose file with parameterized ports and commented obs services.
 
-    Creates a .bak backup before modifying.
+    Creates a .bak backup before modifying. ``header`` adds the kinfra
+    header comment.
     """
     original = compose_path.read_text()
 
@@ -249,11 +312,6 @@ def rewrite_compose(
     if not backup_path.exists():
         shutil.copy2(compose_path, backup_path)
 
-    # Apply transformations in order
-    result = original
-    result = remove_depends_on(result, obs_services)
-    result = parameterize_ports(result, port_map)
-    result = comment_out_services(result, obs_services)
-    result = add_header_comment(result)
-
-    compose_path.write_text(result)
+    compose_path.write_text(
+        rewrite_compose_text(original, port_map, obs_services, header)
+    )
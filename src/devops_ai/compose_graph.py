@@ -0,0 +1,263 @@
+"""Compose graph resolution — layered files, ``include:``, ``extends:``, profiles.
+
+``resolve_compose_graph`` follows every file Compose itself would read
+for a project: the primary file, layered override files, files pulled in
+with ``include:`` and base files referenced by ``extends:``. It returns
+the merged document together with the full file list, so detection sees
+every service and slot snapshots capture every fragment.
+"""
+
+from __future__ import annotations
+
+import logging
+import os
+from collections.abc import Iterable, Sequence
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any
+
+from devops_ai.yaml_loader import load_yaml_file
+
+logger = logging.getLogger(__name__)
+
+# Sibling files ``docker compose`` merges automatically when run without -f
+_OVERRIDE_SUFFIXES = (".override.yaml", ".override.yml")
+
+# Service keys whose list values replace rather than extend on merge
+_REPLACED_LISTS = {"command", "entrypoint", "test", "profiles"}
+
+
+@dataclass
+class ComposeGraph:
+    """A fully resolved compose project."""
+
+    primary: Path
+    files: list[Path] = field(default_factory=list)
+    data: dict[str, Any] = field(default_factory=dict)
+
+    @property
+    def services(self) -> dict[str, dict[str, Any]]:
+        services = self.data.get("services")
+        return services if isinstance(services, dict) else {}
+
+    def profiles(self) -> dict[str, list[str]]:
+        """Map each profile-gated service to its profiles."""
+        return {
+            name: [str(p) for p in svc.get("profiles") or []]
+            for name, svc in self.services.items()
+            if svc.get("profiles")
+        }
+
+    def active_services(self, profiles: Iterable[str] = ()) -> list[str]:
+        """Services that start with the given profiles enabled."""
+        enabled = set(profiles)
+        return [
+            name
+            for name, svc in self.services.items()
+            if not svc.get("profiles") or enabled & set(svc["profiles"])
+        ]
+
+
+def default_override(primary: Path) -> Path | None:
+    """Return the sibling override Compose auto-loads for ``primary``.
+
+    ``docker-compose.yml`` pairs with ``docker-compose.override.yml``
+    (or ``.yaml``). kinfra always passes ``-f``, which disables that
+    auto-loading, so the override must be layered explicitly.
+    """
+    stem = primary.name.rsplit(".", 1)[0]
+    if stem.endswith(".override"):
+        return None
+    for suffix in _OVERRIDE_SUFFIXES:
+        candidate = primary.with_name(stem + suffix)
+        if candidate.is_file():
+            return candidate
+    return None
+
+
+def merge_compose(base: Any, override: Any, key: str | None = None) -> Any:
+    """Merge two compose values following Compose's merge rules.
+
+    Mappings merge recursively, most lists are concatenated without
+    duplicates, and scalars (plus command/entrypoint-style lists) are
+    replaced by the override.
+    """
+    if isinstance(base, dict) and isinstance(override, dict):
+        merged = dict(base)
+        for k, v in override.items():
+            merged[k] = merge_compose(base[k], v, k) if k in base else v
+        return merged
+    if (
+        isinstance(base, list)
+        and isinstance(override, list)
+        and key not in _REPLACED_LISTS
+    ):
+        merged_list = list(base)
+        for item in override:
+            if item not in merged_list:
+                merged_list.append(item)
+        return merged_list
+    return override
+
+
+class _Resolver:
+    def __init__(self, project_dir: Path) -> None:
+        self.project_dir = project_dir
+        self.files: list[Path] = []
+        self._docs: dict[Path, dict[str, Any]] = {}
+
+    def _record(self, path: Path) -> None:
+        if path not in self.files:
+            self.files.append(path)
+
+    def _raw(self, path: Path) -> dict[str, Any]:
+        """Load a file once, without resolving include or extends."""
+        if path not in self._docs:
+            data = load_yaml_file(path)
+            doc = data if isinstance(data, dict) else {}
+            if path.parent != self.project_dir:
+                _rebase_volumes(doc, path.parent, self.project_dir)
+                _rebase_builds(doc, path.parent, self.project_dir)
+            self._docs[path] = doc
+            self._record(path)
+        return self._docs[path]
+
+    def load(self, path: Path, stack: tuple[Path, ...] = ()) -> dict[str, Any]:
+        """Load a file with its includes merged and extends resolved."""
+        if path in stack:
+            chain = " -> ".join(p.name for p in (*stack, path))
+            raise ValueError(f"Circular compose include: {chain}")
+        doc = dict(self._raw(path))
+        services = {
+            name: self._extend(path, name, ())
+            for name in (doc.get("services") or {})
+        }
+        if services:
+            doc["services"] = services
+
+        for inc_path in _include_paths(doc.pop("include", None), path):
+            if not inc_path.is_file():
+                logger.warning("Included compose file not found: %s", inc_path)
+                continue
+            included = self.load(inc_path, (*stack, path))
+            # The including file wins on conflicting definitions
+            for section, value in included.items():
+                if isinstance(value, dict):
+                    current = doc.get(section) or {}
+                    doc[section] = {**value, **current}
+                else:
+                    doc.setdefault(section, value)
+        return doc
+
+    def _extend(
+        self, path: Path, name: str, stack: tuple[tuple[Path, str], ...]
+    ) -> dict[str, Any]:
+        """Return a service with its ``extends:`` chain applied."""
+        if (path, name) in stack:
+            raise ValueError(f"Circular extends for service {name!r}")
+        services = self._raw(path).get("services") or {}
+        svc = services.get(name)
+        if not isinstance(svc, dict):
+            return {}
+        extends = svc.get("extends")
+        if extends is None:
+            return dict(svc)
+        if isinstance(extends, str):
+            base_path, base_name = path, extends
+        else:
+            base_name = str(extends.get("service", ""))
+            file = extends.get("file")
+            base_path = (path.parent / file).resolve() if file else path
+        own = {k: v for k, v in svc.items() if k != "extends"}
+        if not base_path.is_file():
+            logger.warning("Extended compose file not found: %s", base_path)
+            return own
+        base = self._extend(base_path, base_name, (*stack, (path, name)))
+        merged: dict[str, Any] = merge_compose(base, own)
+        return merged
+
+
+def _rebase_volumes(
+    doc: dict[str, Any], file_dir: Path, project_dir: Path
+) -> None:
+    """Make relative bind mounts relative to the project directory.
+
+    Compose resolves relative paths in included and extended files
+    against that file's directory; detection works from the project root.
+    """
+    for svc in (doc.get("services") or {}).values():
+        if not isinstance(svc, dict) or not svc.get("volumes"):
+            continue
+        rebased = []
+        for vol in svc["volumes"]:
+            if isinstance(vol, str) and vol.startswith("."):
+                host, sep, rest = vol.partition(":")
+                rel = os.path.relpath(file_dir / host, project_dir)
+                if not rel.startswith(".."):
+                    rel = f"./{rel}"
+                vol = f"{rel}{sep}{rest}"
+            rebased.append(vol)
+        svc["volumes"] = rebased
+
+
+def _rebase_builds(
+    doc: dict[str, Any], file_dir: Path, project_dir: Path
+) -> None:
+    """Make relative build contexts relative to the project directory.
+
+    Like ``_rebase_volumes``; a Dockerfile path is relative to its
+    context, so it moves with it.
+    """
+    for svc in (doc.get("services") or {}).values():
+        if not isinstance(svc, dict):
+            continue
+        build = svc.get("build")
+        if isinstance(build, str):
+            build = {"context": build}
+        elif isinstance(build, dict):
+            build = dict(build)
+        else:
+            continue
+        context = str(build.get("context", "."))
+        if "://" in context or context.startswith("git@"):
+            continue
+        if not os.path.isabs(context):
+            build["context"] = os.path.relpath(file_dir / context, project_dir)
+            svc["build"] = build
+
+
+def _include_paths(include: Any, path: Path) -> list[Path]:
+    """Local file paths referenced by an ``include:`` section."""
+    paths: list[str] = []
+    for entry in include or []:
+        if isinstance(entry, str):
+            paths.append(entry)
+        elif isinstance(entry, dict):
+            value = entry.get("path")
+            if isinstance(value, str):
+                paths.append(value)
+            elif isinstance(value, list):
+                paths.extend(str(v) for v in value)
+    return [
+        (path.parent / p).resolve()
+        for p in paths
+        if "://" not in p and not p.startswith("git@")
+    ]
+
+
+def resolve_compose_graph(
+    primary: Path, overrides: Sequence[Path] = ()
+) -> ComposeGraph:
+    """Resolve a compose project into one merged document.
+
+    ``overrides`` are layered after ``primary`` like extra ``-f`` flags.
+    Missing included or extended files are skipped with a warning.
+    Raises FileNotFoundError if ``primary`` is missing, ValueError on
+    include/extends cycles and YAMLError on malformed files.
+    """
+    primary = primary.resolve()
+    resolver = _Resolver(primary.parent)
+    merged: dict[str, Any] = {}
+    for path in (primary, *overrides):
+        merged = merge_compose(merged, resolver.load(path.resolve()))
+    return ComposeGraph(primary=primary, files=resolver.files, data=merged)
@@ -0,0 +1,280 @@
+"""Parsed compose model — one resolution per compose project, cached by hash.
+
+``kinfra init`` detectors (services, env vars, gitignored mounts) all read
+the same compose project. ``ComposeModel`` resolves it once (see
+``compose_graph``) and prebuilds the indexes they need. Models are cached
+as JSON in ``.devops-ai/cache/``, one file per set of resolved input
+paths, and validated against the sha256 of every file in the graph, so
+repeated ``init --check`` runs skip YAML parsing entirely.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import logging
+import os
+import re
+from collections.abc import Sequence
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from typing import Any
+
+from devops_ai.compose_graph import ComposeGraph, resolve_compose_graph
+from devops_ai.yaml_loader import load_yaml
+
+logger = logging.getLogger(__name__)
+
+CACHE_VERSION = 2
+# Shared cache for compose projects outside a kinfra project dir, such as
+# worktree checkouts
+DEFAULT_CACHE_DIR = Path.home() / ".devops-ai" / "cache"
+
+# ${VAR} and ${VAR:-default} references anywhere in the text
+ENV_REF_RE = re.compile(r"\$\{([A-Z_][A-Z0-9_]*)(?::-(.*?))?\}")
+# ${VAR} or ${VAR:-...} inside an environment entry
+_ENV_USE_RE = re.compile(r"\$\{([A-Z_][A-Z0-9_]*)(?:\}|:-)")
+
+
+@dataclass
+class VolumeRef:
+    """A short-syntax ``volumes:`` entry of a service."""
+
+    service: str
+    host: str
+    container: str
+
+
+@dataclass
+class ComposeModel:
+    """Indexes over a compose file, built from a single parse.
+
+    services: name -> {image, ports: [{host, container}]}
+    env_refs: var -> first-seen default, for every ${VAR} in the text
+    env_services: var -> services whose ``environment`` references it
+    volumes: short-syntax volume entries, in file order
+    named_volumes: top-level ``volumes:`` keys
+    profiles: profile-gated service -> its profiles
+    files: every file in the compose graph, primary first
+    """
+
+    digest: str
+    services: dict[str, dict[str, Any]] = field(default_factory=dict)
+    env_refs: dict[str, str | None] = field(default_factory=dict)
+    env_services: dict[str, list[str]] = field(default_factory=dict)
+    volumes: list[VolumeRef] = field(default_factory=list)
+    named_volumes: list[str] = field(default_factory=list)
+    profiles: dict[str, list[str]] = field(default_factory=dict)
+    files: list[str] = field(default_factory=list)
+
+    @classmethod
+    def from_text(cls, text: str) -> ComposeModel:
+        """Parse a single compose document and build all indexes.
+
+        ``include:`` and ``extends: {file: ...}`` are not followed — use
+        ``from_graph`` for that. Raises ruamel.yaml.YAMLError on
+        malformed YAML.
+        """
+        model = cls(digest=content_digest(text))
+        model._index(load_yaml(text), [text])
+        return model
+
+    @classmethod
+    def from_graph(cls, graph: ComposeGraph) -> ComposeModel:
+        """Build indexes over a resolved compose graph."""
+        model = cls(
+            digest=graph_digest(graph.files) or "",
+            files=[str(f) for f in graph.files],
+            profiles=graph.profiles(),
+        )
+        model._index(graph.data, [f.read_text() for f in graph.files])
+        return model
+
+    def _index(self, data: Any, texts: list[str]) -> None:
+        for text in texts:
+            for match in ENV_REF_RE.finditer(text):
+                # Keep first-seen default (don't overwrite with None)
+                self.env_refs.setdefault(match.group(1), match.group(2))
+
+        if not data or "services" not in data:
+            return
+
+        volumes = data.get("volumes")
+        if volumes:
+            self.named_volumes = [str(k) for k in volumes]
+
+        for name, svc in (data["services"] or {}).items():
+            svc = svc if isinstance(svc, dict) else {}
+            ports = []
+            for port_spec in svc.get("ports") or []:
+                parsed = _parse_port_spec(str(port_spec))
+                if parsed:
+                    ports.append(parsed)
+            image = svc.get("image")
+            self.services[name] = {
+                "image": None if image is None else str(image),
+                "ports": ports,
+            }
+
+            for var in sorted(_env_uses(svc.get("environment"))):
+                self.env_services.setdefault(var, []).append(name)
+
+            for vol in svc.get("volumes") or []:
+                if isinstance(vol, dict):
+                    continue
+                parts = str(vol).split(":")
+                if len(parts) >= 2:
+                    self.volumes.append(
+                        VolumeRef(name, parts[0], parts[1])
+                    )
+
+    def to_dict(self) -> dict[str, Any]:
+        return asdict(self)
+
+    @classmethod
+    def from_dict(cls, data: dict[str, Any]) -> ComposeModel:
+        return cls(
+            digest=data["digest"],
+            services=data["services"],
+            env_refs=data["env_refs"],
+            env_services=data["env_services"],
+            volumes=[VolumeRef(**v) for v in data["volumes"]],
+            named_volumes=data["named_volumes"],
+            profiles=data["profiles"],
+            files=data["files"],
+        )
+
+
+def content_digest(text: str) -> str:
+    return hashlib.sha256(text.encode()).hexdigest()
+
+
+def graph_digest(files: Sequence[Path]) -> str | None:
+    """Hash the paths and contents of a compose graph's files.
+
+    Returns None if any file can no longer be read.
+    """
+    digest = hashlib.sha256()
+    for path in files:
+        try:
+            content = path.read_bytes()
+        except OSError:
+            return None
+        digest.update(str(path).encode() + b"\0")
+        digest.update(hashlib.sha256(content).digest())
+    return digest.hexdigest()
+
+
+def _parse_port_spec(spec: str) -> dict[str, int] | None:
+    """Parse a Docker port spec like '8080:8080' into host/container."""
+    # Handle "HOST:CONTAINER" format
+    spec = spec.strip('"').strip("'")
+    # Skip already-parameterized ports like ${VAR:-8080}:8080
+    if "${" in spec:
+        return None
+    parts = spec.split(":")
+    if len(parts) == 2:
+        try:
+            return {
+                "host": int(parts[0]),
+                "container": int(parts[1]),
+            }
+        except ValueError:
+            return None
+    return None
+
+
+def _env_uses(env_block: Any) -> set[str]:
+    """Vars referenced in a service's environment (list or dict form)."""
+    if not env_block:
+        return set()
+    if isinstance(env_block, list):
+        env_text = "\n".join(str(e) for e in env_block)
+    elif isinstance(env_block, dict):
+        env_text = "\n".join(f"{k}={v}" for k, v in env_block.items())
+    else:
+        return set()
+    return set(_ENV_USE_RE.findall(env_text))
+
+
+def cache_file(inputs: Sequence[str]) -> str:
+    """Cache file name for a compose project given its resolved inputs."""
+    key = hashlib.sha256("\0".join(inputs).encode()).hexdigest()
+    return f"compose-model-{key[:16]}.json"
+
+
+def _read_cache(cache_path: Path, inputs: list[str]) -> ComposeModel | None:
+    """Return the cached model if its inputs and files are unchanged."""
+    try:
+        data = json.loads(cache_path.read_text())
+    except (OSError, json.JSONDecodeError):
+        return None
+    if (
+        not isinstance(data, dict)
+        or data.get("version") != CACHE_VERSION
+        or data.get("inputs") != inputs
+    ):
+        return None
+    try:
+        model = ComposeModel.from_dict(data["model"])
+    except (KeyError, TypeError):
+        return None
+    if graph_digest([Path(f) for f in model.files]) != model.digest:
+        return None
+    return model
+
+
+def _write_cache(
+    cache_dir: Path, inputs: list[str], model: ComposeModel
+) -> None:
+    """Persist the model; failures are logged, never raised."""
+    try:
+        cache_dir.mkdir(exist_ok=True)
+        gitignore = cache_dir / ".gitignore"
+        if not gitignore.exists():
+            gitignore.write_text("*\n")
+        cache_path = cache_dir / cache_file(inputs)
+        tmp = cache_path.with_suffix(".tmp")
+        tmp.write_text(
+            json.dumps(
+                {
+                    "version": CACHE_VERSION,
+                    "inputs": inputs,
+                    "model": model.to_dict(),
+                }
+            )
+        )
+        os.replace(tmp, cache_path)
+    except (OSError, TypeError, ValueError) as e:
+        logger.debug("Could not write compose model cache: %s", e)
+
+
+def load_compose_model(
+    compose_path: Path,
+    cache_dir: Path | None = None,
+    overrides: Sequence[Path] = (),
+) -> ComposeModel | None:
+    """Return the model for a compose project, or None if it does not exist.
+
+    The project is ``compose_path`` plus ``overrides`` layered on top,
+    with includes and extends followed. With ``cache_dir``, a cached model
+    is reused while none of the graph's files have changed, and a fresh
+    resolution is written back. The cache is only written when the
+    directory's parent (``.devops-ai/``) exists. Raises ValueError on
+    include cycles and YAMLError on malformed files.
+    """
+    if not compose_path.is_file():
+        return None
+    inputs = [str(p.resolve()) for p in (compose_path, *overrides)]
+
+    if cache_dir is not None:
+        cached = _read_cache(cache_dir / cache_file(inputs), inputs)
+        if cached is not None:
+            return cached
+
+    model = ComposeModel.from_graph(
+        resolve_compose_graph(compose_path, overrides)
+    )
+    if cache_dir is not None and cache_dir.parent.is_dir():
+        _write_cache(cache_dir, inputs, model)
+    return model
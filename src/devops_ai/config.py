@@ -2,6 +2,8 @@
 
 from __future__ import annotations
 
+import re
+import time
 import tomllib
 from dataclasses import dataclass, field
 from pathlib import Path
@@ -24,6 +26,46 @@ class ServicePort:
     base_port: int
 
 
+@dataclass
+class ServiceResources:
+    """Container limits for one service from [sandbox.resources.<service>]."""
+
+    cpus: float | None = None
+    mem_limit: str | None = None
+    pids_limit: int | None = None
+
+
+@dataclass
+class SlotResources:
+    """Parsed [sandbox.resources] — per-service limits plus per-slot totals.
+
+    Per-service limits are rendered into the compose override. The slot
+    totals are what a slot reserves against the host budget; when unset
+    they default to the sum of the per-service limits.
+    """
+
+    slot_cpus: float | None = None
+    slot_mem_limit: str | None = None
+    min_free_mem: str | None = None  # admission floor for free host memory
+    services: dict[str, ServiceResources] = field(default_factory=dict)
+
+
+@dataclass
+class WorktreeSettings:
+    """Parsed [worktree] — how impl worktrees are checked out.
+
+    ``sparse`` lists cone-mode directories; when it (or the milestone's
+    declared paths) is non-empty only those directories and top-level
+    files are checked out. ``deferred_checkout`` creates the worktree
+    with ``--no-checkout`` and populates it in the background.
+    ``pool_size`` keeps that many checked-out worktrees ready to claim.
+    """
+
+    sparse: list[str] = field(default_factory=list)
+    deferred_checkout: bool = False
+    pool_size: int = 0
+
+
 @dataclass
 class InfraConfig:
     """Typed representation of .devops-ai/infra.toml."""
@@ -32,6 +74,10 @@ class InfraConfig:
     prefix: str
     has_sandbox: bool = False
     compose_file: str = "docker-compose.yml"
+    # Files layered after compose_file, like extra ``-f`` flags
+    compose_overrides: list[str] = field(default_factory=list)
+    max_slots: int | None = None
+    build_cache: bool = True
     ports: list[ServicePort] = field(default_factory=list)
     health_endpoint: str | None = None
     health_port_var: str | None = None
@@ -45,6 +91,8 @@ class InfraConfig:
     env: dict[str, str] = field(default_factory=dict)
     secrets: dict[str, str] = field(default_factory=dict)
     files: dict[str, str] = field(default_factory=dict)
+    resources: SlotResources = field(default_factory=SlotResources)
+    worktree: WorktreeSettings = field(default_factory=WorktreeSettings)
 
 
 def parse_mount(spec: str) -> MountEntry:
@@ -61,16 +109,167 @@ def parse_mount(spec: str) -> MountEntry:
     raise ValueError(f"Invalid mount syntax: {spec!r} (expected host:container[:ro])")
 
 
+_MEM_RE = re.compile(r"^(\d+(?:\.\d+)?)\s*([bkmg]?)b?$", re.IGNORECASE)
+
+_MEM_UNITS = {"": 1, "b": 1, "k": 1024, "m": 1024**2, "g": 1024**3}
+
+
+def parse_mem_limit(spec: str) -> int:
+    """Parse a Docker memory size (``512m``, ``2g``, ``1024``) into bytes."""
+    match = _MEM_RE.match(spec.strip())
+    if not match:
+        raise ValueError(
+            f"Invalid memory size: {spec!r} (expected e.g. 512m, 2g)"
+        )
+    value, unit = match.groups()
+    return int(float(value) * _MEM_UNITS[unit.lower()])
+
+
+def _parse_resources(data: dict[str, object]) -> SlotResources:
+    """Parse the [sandbox.resources] table.
+
+    Scalar keys ``slot_cpus`` / ``slot_mem_limit`` set the per-slot totals;
+    every sub-table is a service name with ``cpus``, ``mem_limit`` and
+    ``pids_limit`` keys.
+    """
+    if not isinstance(data, dict):
+        raise ValueError(
+            f"[sandbox.resources] must be a table, got {type(data).__name__}"
+        )
+
+    slot_cpus = data.get("slot_cpus")
+    if slot_cpus is not None and not isinstance(slot_cpus, (int, float)):
+        raise ValueError("[sandbox.resources].slot_cpus must be a number")
+    slot_mem_limit = data.get("slot_mem_limit")
+    if slot_mem_limit is not None:
+        slot_mem_limit = str(slot_mem_limit)
+        parse_mem_limit(slot_mem_limit)
+
+    min_free_mem = data.get("min_free_mem")
+    if min_free_mem is not None:
+        min_free_mem = str(min_free_mem)
+        parse_mem_limit(min_free_mem)
+
+    services: dict[str, ServiceResources] = {}
+    for key, val in data.items():
+        if key in ("slot_cpus", "slot_mem_limit", "min_free_mem"):
+            continue
+        if not isinstance(val, dict):
+            raise ValueError(
+                f"Unknown key in [sandbox.resources]: {key!r} "
+                f"(expected slot_cpus, slot_mem_limit, min_free_mem "
+                f"or a service table)"
+            )
+        cpus = val.get("cpus")
+        if cpus is not None and not isinstance(cpus, (int, float)):
+            raise ValueError(
+                f"[sandbox.resources.{key}].cpus must be a number"
+            )
+        pids_limit = val.get("pids_limit")
+        if pids_limit is not None and not isinstance(pids_limit, int):
+            raise ValueError(
+                f"[sandbox.resources.{key}].pids_limit must be an integer"
+            )
+        mem_limit = val.get("mem_limit")
+        if mem_limit is not None:
+            mem_limit = str(mem_limit)
+            parse_mem_limit(mem_limit)
+        services[key] = ServiceResources(
+            cpus=float(cpus) if cpus is not None else None,
+            mem_limit=mem_limit,
+            pids_limit=pids_limit,
+        )
+
+    return SlotResources(
+        slot_cpus=float(slot_cpus) if slot_cpus is not None else None,
+        slot_mem_limit=slot_mem_limit,
+        min_free_mem=min_free_mem,
+        services=services,
+    )
+
+
+# Parsed configs keyed by infra.toml path, validated by (mtime, size, inode)
+_config_cache: dict[Path, tuple[tuple[int, int, int], InfraConfig]] = {}
+
+# Files modified this recently are never cached: mtime granularity is
+# coarse enough that a same-size rewrite within it would go unnoticed
+_RACY_WINDOW_NS = 2_000_000_000
+
+
+def validate_sparse_path(path: str, where: str) -> str:
+    """Check one cone-mode directory; returns it without slashes at ends."""
+    cleaned = path.strip("/")
+    if (
+        not cleaned
+        or any(c in cleaned for c in "*?[]!\\")
+        or ".." in cleaned.split("/")
+    ):
+        raise ValueError(
+            f"{where}: {path!r} must be a plain directory path "
+            "(no wildcards or '..')"
+        )
+    return cleaned
+
+
+def _parse_worktree(data: dict[str, object]) -> WorktreeSettings:
+    """Parse the [worktree] section."""
+    sparse = data.get("sparse", [])
+    if not isinstance(sparse, list) or not all(
+        isinstance(p, str) for p in sparse
+    ):
+        raise ValueError("[worktree].sparse must be a list of paths")
+    deferred = data.get("deferred_checkout", False)
+    if not isinstance(deferred, bool):
+        raise ValueError("[worktree].deferred_checkout must be true or false")
+    pool_size = data.get("pool_size", 0)
+    if (
+        not isinstance(pool_size, int)
+        or isinstance(pool_size, bool)
+        or pool_size < 0
+    ):
+        raise ValueError("[worktree].pool_size must be a non-negative integer")
+    return WorktreeSettings(
+        sparse=[validate_sparse_path(p, "[worktree].sparse") for p in sparse],
+        deferred_checkout=deferred,
+        pool_size=pool_size,
+    )
+
+
+def clear_config_cache() -> None:
+    """Drop every cached config (for tests and long-running processes)."""
+    _config_cache.clear()
+
+
 def load_config(project_root: Path) -> InfraConfig | None:
     """Load and parse .devops-ai/infra.toml from the given project root.
 
+    Parsed configs are cached in-process and re-read only when the file's
+    mtime, size or inode changes. The returned object is shared between
+    callers, so treat it as read-only.
+
     Returns None if infra.toml does not exist.
     Raises ValueError if required fields are missing.
     """
     config_path = project_root / ".devops-ai" / "infra.toml"
-    if not config_path.exists():
+    try:
+        st = config_path.stat()
+    except FileNotFoundError:
+        _config_cache.pop(config_path, None)
         return None
 
+    key = (st.st_mtime_ns, st.st_size, st.st_ino)
+    cached = _config_cache.get(config_path)
+    if cached is not None and cached[0] == key:
+        return cached[1]
+
+    config = _parse_config(config_path)
+    if time.time_ns() - st.st_mtime_ns > _RACY_WINDOW_NS:
+        _config_cache[config_path] = (key, config)
+    return config
+
+
+def _parse_config(config_path: Path) -> InfraConfig:
+    """Parse an infra.toml file. Raises ValueError on invalid fields."""
     with open(config_path, "rb") as f:
         data = tomllib.load(f)
 
@@ -80,12 +279,36 @@ def load_config(project_root: Path) -> InfraConfig | None:
         raise ValueError("Missing required field: [project].name in infra.toml")
 
     prefix = project.get("prefix", name)
+    worktree = _parse_worktree(data.get("worktree", {}))
 
     sandbox = data.get("sandbox")
     if sandbox is None:
-        return InfraConfig(project_name=name, prefix=prefix, has_sandbox=False)
+        return InfraConfig(
+            project_name=name,
+            prefix=prefix,
+            has_sandbox=False,
+            worktree=worktree,
+        )
 
     compose_file = sandbox.get("compose_file", "docker-compose.yml")
+    compose_overrides: list[str] = []
+    if isinstance(compose_file, list):
+        if not compose_file or not all(
+            isinstance(f, str) for f in compose_file
+        ):
+            raise ValueError(
+                "[sandbox].compose_file must be a path or a non-empty "
+                "list of paths"
+            )
+        compose_file, *compose_overrides = compose_file
+    max_slots = sandbox.get("max_slots")
+    if max_slots is not None and (
+        not isinstance(max_slots, int) or max_slots < 1
+    ):
+        raise ValueError("[sandbox].max_slots must be a positive integer")
+    build_cache = sandbox.get("build_cache", True)
+    if not isinstance(build_cache, bool):
+        raise ValueError("[sandbox].build_cache must be true or false")
 
     # Ports
     ports_data = sandbox.get("ports", {})
@@ -128,11 +351,17 @@ def load_config(project_root: Path) -> InfraConfig | None:
                 f"got {type(section_val).__name__}"
             )
 
+    # Resource limits
+    resources = _parse_resources(sandbox.get("resources", {}))
+
     return InfraConfig(
         project_name=name,
         prefix=prefix,
         has_sandbox=True,
         compose_file=compose_file,
+        compose_overrides=compose_overrides,
+        max_slots=max_slots,
+        build_cache=build_cache,
         ports=ports,
         health_endpoint=health_endpoint,
         health_port_var=health_port_var,
@@ -146,6 +375,8 @@ def load_config(project_root: Path) -> InfraConfig | None:
         env=env,
         secrets=secrets,
         files=files,
+        resources=resources,
+        worktree=worktree,
     )
 
 
@@ -0,0 +1,68 @@
+"""Per-invocation project context.
+
+Commands resolve the project root, its config and (when needed) the
+main repository root once through ``ProjectContext`` and pass the
+result on, instead of each step re-walking the tree and re-reading
+infra.toml.
+"""
+
+from __future__ import annotations
+
+import subprocess
+from dataclasses import dataclass, field
+from functools import cached_property
+from pathlib import Path
+
+from devops_ai.config import InfraConfig, find_project_root, load_config
+
+
+def find_main_repo_root(path: Path) -> Path | None:
+    """Find the main repository root for ``path`` (which may be a worktree)."""
+    try:
+        result = subprocess.run(
+            ["git", "rev-parse", "--path-format=absolute", "--git-common-dir"],
+            capture_output=True,
+            text=True,
+            timeout=5,
+            cwd=path,
+        )
+        if result.returncode == 0 and result.stdout.strip():
+            # --git-common-dir returns the .git dir of the main worktree
+            git_dir = Path(result.stdout.strip())
+            return git_dir.parent
+    except (FileNotFoundError, subprocess.TimeoutExpired):
+        pass
+    return None
+
+
+@dataclass
+class ProjectContext:
+    """Project root, config and main repo root for one invocation."""
+
+    repo_root: Path
+    config: InfraConfig | None = field(default=None)
+
+    @classmethod
+    def resolve(cls, repo_root: Path | None = None) -> ProjectContext:
+        """Build the context for ``repo_root`` (default: found from cwd).
+
+        Raises ValueError if infra.toml exists but is invalid.
+        """
+        if repo_root is None:
+            repo_root = find_project_root() or Path.cwd()
+        return cls(repo_root=repo_root, config=load_config(repo_root))
+
+    @property
+    def prefix(self) -> str:
+        return self.config.prefix if self.config else self.repo_root.name
+
+    @property
+    def project_name(self) -> str:
+        if self.config:
+            return self.config.project_name
+        return self.repo_root.name
+
+    @cached_property
+    def main_repo_root(self) -> Path | None:
+        """Root of the main checkout (differs from repo_root in worktrees)."""
+        return find_main_repo_root(self.repo_root)
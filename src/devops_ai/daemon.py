@@ -0,0 +1,74 @@
+"""kinfrad client — ask a running daemon to answer a kinfra query.
+
+kinfrad (``devops_ai.daemon_server``) keeps the registry in memory and
+answers requests over a Unix socket at ~/.devops-ai/kinfra.sock. The
+protocol is one JSON line per connection:
+
+    -> {"version": 1, "method": "status", "params": {"cwd": "/path"}}
+    <- {"code": 0, "msg": "..."}            (or {"error": "..."})
+
+The CLI calls ``call_daemon`` first and falls back to running the command
+in-process when it returns None. That happens when no daemon is
+listening, the daemon speaks another protocol version, or
+KINFRA_NO_DAEMON is set.
+
+This module is imported by the CLI on every ``kinfra status``, so it
+must stay cheap to import; everything server-side lives in
+``daemon_server``.
+"""
+
+from __future__ import annotations
+
+import json
+import logging
+import os
+import socket
+from pathlib import Path
+from typing import Any
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_SOCKET_PATH = Path.home() / ".devops-ai" / "kinfra.sock"
+
+# Bumped whenever request/response shapes change; clients fall back to
+# in-process execution rather than talk to a daemon from another release
+PROTOCOL_VERSION = 1
+
+# Seconds the client waits for a reply before falling back
+CLIENT_TIMEOUT = 5.0
+
+
+def call_daemon(
+    method: str,
+    params: dict[str, Any] | None = None,
+    socket_path: Path | None = None,
+    timeout: float = CLIENT_TIMEOUT,
+) -> tuple[int, str] | None:
+    """Ask a running kinfrad to execute ``method``.
+
+    Returns (exit_code, message), or None if the caller should run the
+    command in-process instead.
+    """
+    if os.environ.get("KINFRA_NO_DAEMON"):
+        return None
+    path = socket_path or DEFAULT_SOCKET_PATH
+    request = {
+        "version": PROTOCOL_VERSION,
+        "method": method,
+        "params": params or {},
+    }
+    try:
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+            sock.settimeout(timeout)
+            sock.connect(str(path))
+            sock.sendall(json.dumps(request).encode() + b"\n")
+            with sock.makefile("rb") as reader:
+                reply = json.loads(reader.readline())
+    except (OSError, ValueError):
+        # No daemon, stale socket, timeout or garbled reply
+        return None
+    if not isinstance(reply, dict) or "error" in reply:
+        if isinstance(reply, dict):
+            logger.debug("kinfrad refused %s: %s", method, reply["error"])
+        return None
+    return int(reply["code"]), str(reply["msg"])
@@ -0,0 +1,226 @@
+"""kinfrad — optional resident daemon serving read-only kinfra queries.
+
+The daemon keeps the registry in memory, reloading it only when
+registry.json changes on disk, and answers ``devops_ai.daemon`` clients
+over its Unix socket. Only read-only commands are served: anything that
+claims slots or touches Docker keeps running in the CLI process, under
+the registry's file lock.
+
+With ``--reconcile`` the daemon also runs the slot status reconciler
+(see ``devops_ai.reconcile``) in a background thread.
+
+Server-side command modules are imported inside the handlers.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import logging
+import os
+import signal
+import socket
+import socketserver
+import threading
+from collections.abc import Callable
+from pathlib import Path
+from types import FrameType
+from typing import TYPE_CHECKING, Any
+
+from devops_ai.daemon import DEFAULT_SOCKET_PATH, PROTOCOL_VERSION
+
+if TYPE_CHECKING:
+    from devops_ai.registry import Registry
+
+logger = logging.getLogger(__name__)
+
+_MAX_REQUEST_BYTES = 64 * 1024
+
+
+class KinfraDaemon:
+    """Request dispatcher holding the in-memory state between calls."""
+
+    def __init__(self, registry_path: Path | None = None) -> None:
+        from devops_ai.registry import DEFAULT_REGISTRY_PATH
+
+        self.registry_path = registry_path or DEFAULT_REGISTRY_PATH
+        self._registry: Registry | None = None
+        self._registry_key: tuple[int, int, int] | None = None
+        self._lock = threading.Lock()
+        self.methods: dict[str, Callable[[dict[str, Any]], tuple[int, str]]]
+        self.methods = {
+            "ping": self._ping,
+            "status": self._status,
+            "queue": self._queue,
+        }
+
+    def registry(self) -> Registry:
+        """Return the registry, re-reading it only if the file changed."""
+        from devops_ai.registry import load_registry
+
+        try:
+            st = self.registry_path.stat()
+            key: tuple[int, int, int] | None = (
+                st.st_mtime_ns,
+                st.st_size,
+                st.st_ino,
+            )
+        except FileNotFoundError:
+            key = None
+        with self._lock:
+            if self._registry is None or key != self._registry_key:
+                self._registry = load_registry(self.registry_path)
+                self._registry_key = key
+            return self._registry
+
+    def dispatch(self, request: Any) -> dict[str, Any]:
+        """Execute one decoded request and build the reply."""
+        if not isinstance(request, dict):
+            return {"error": "request must be a JSON object"}
+        if request.get("version") != PROTOCOL_VERSION:
+            return {
+                "error": f"protocol version {request.get('version')!r} "
+                f"not supported (daemon speaks {PROTOCOL_VERSION})"
+            }
+        handler = self.methods.get(str(request.get("method")))
+        if handler is None:
+            return {"error": f"unknown method {request.get('method')!r}"}
+        params = request.get("params") or {}
+        try:
+            code, msg = handler(params)
+        except Exception as e:  # keep serving after a failed request
+            logger.exception("kinfrad: %s failed", request["method"])
+            return {"error": f"{type(e).__name__}: {e}"}
+        return {"code": code, "msg": msg}
+
+    def _ping(self, params: dict[str, Any]) -> tuple[int, str]:
+        return 0, f"kinfrad pid {os.getpid()}"
+
+    def _status(self, params: dict[str, Any]) -> tuple[int, str]:
+        from devops_ai.cli.status import status_command
+
+        cwd = Path(params["cwd"]) if "cwd" in params else None
+        return status_command(cwd, registry=self.registry())
+
+    def _queue(self, params: dict[str, Any]) -> tuple[int, str]:
+        from devops_ai.cli.queue_cmd import queue_command
+
+        return queue_command()
+
+
+class _RequestHandler(socketserver.StreamRequestHandler):
+    server: _DaemonServer
+
+    def handle(self) -> None:
+        line = self.rfile.readline(_MAX_REQUEST_BYTES)
+        try:
+            request = json.loads(line)
+        except ValueError:
+            reply: dict[str, Any] = {"error": "malformed request"}
+        else:
+            reply = self.server.dispatcher.dispatch(request)
+        self.wfile.write(json.dumps(reply).encode() + b"\n")
+
+
+class _DaemonServer(socketserver.ThreadingUnixStreamServer):
+    daemon_threads = True
+
+    def __init__(self, socket_path: Path, dispatcher: KinfraDaemon) -> None:
+        self.dispatcher = dispatcher
+        super().__init__(str(socket_path), _RequestHandler)
+
+
+def _claim_socket(socket_path: Path) -> None:
+    """Remove a stale socket file, refusing if a daemon still answers."""
+    if not socket_path.exists():
+        return
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+        try:
+            sock.connect(str(socket_path))
+        except OSError:
+            socket_path.unlink()
+            return
+    raise RuntimeError(f"kinfrad is already listening on {socket_path}")
+
+
+def create_server(
+    socket_path: Path | None = None, daemon: KinfraDaemon | None = None
+) -> _DaemonServer:
+    """Bind the daemon socket (owner-only) and return the server.
+
+    Raises RuntimeError if another daemon is already listening.
+    """
+    socket_path = socket_path or DEFAULT_SOCKET_PATH
+    socket_path.parent.mkdir(parents=True, exist_ok=True)
+    _claim_socket(socket_path)
+    old_umask = os.umask(0o177)
+    try:
+        server = _DaemonServer(socket_path, daemon or KinfraDaemon())
+    finally:
+        os.umask(old_umask)
+    return server
+
+
+def _raise_exit(signum: int, frame: FrameType | None) -> None:
+    raise SystemExit(0)
+
+
+def _run_reconciler(stop: threading.Event) -> None:
+    """Keep slot status in sync until ``stop`` is set (daemon thread)."""
+    from devops_ai.reconcile import Reconciler
+
+    def report(changes: list[Any]) -> None:
+        for change in changes:
+            logger.info("%s", change)
+
+    try:
+        Reconciler().watch(stop, report=report)
+    except Exception:
+        logger.exception("reconciler stopped")
+
+
+def main() -> None:
+    """Entry point for ``kinfrad``: serve until interrupted."""
+    parser = argparse.ArgumentParser(
+        prog="kinfrad", description="Resident kinfra query daemon."
+    )
+    parser.add_argument(
+        "--socket",
+        type=Path,
+        default=DEFAULT_SOCKET_PATH,
+        help=f"Unix socket path (default: {DEFAULT_SOCKET_PATH})",
+    )
+    parser.add_argument(
+        "--reconcile",
+        action="store_true",
+        help="Also keep slot status in sync with Docker and worktrees",
+    )
+    args = parser.parse_args()
+    logging.basicConfig(
+        level=logging.INFO, format="%(asctime)s kinfrad %(message)s"
+    )
+
+    try:
+        server = create_server(args.socket)
+    except RuntimeError as e:
+        parser.exit(1, f"{e}\n")
+    signal.signal(signal.SIGTERM, _raise_exit)
+    stop = threading.Event()
+    if args.reconcile:
+        threading.Thread(
+            target=_run_reconciler, args=(stop,), daemon=True
+        ).start()
+    logger.info("listening on %s", args.socket)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        stop.set()
+        server.server_close()
+        args.socket.unlink(missing_ok=True)
+        logger.info("stopped")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,55 @@
+"""Disk usage accounting for worktrees and slot directories."""
+
+from __future__ import annotations
+
+import os
+import time
+from pathlib import Path
+
+
+def tree_size(root: Path, deadline: float | None = None) -> int | None:
+    """Return bytes allocated on disk under ``root`` (like ``du -s``).
+
+    Walks with os.scandir without following symlinks, and counts
+    hard-linked files once. Returns None if ``deadline``
+    (a time.monotonic() value) passes before the walk finishes.
+    Unreadable entries are skipped.
+    """
+    total = 0
+    seen: set[tuple[int, int]] = set()
+    stack = [os.fspath(root)]
+    while stack:
+        if deadline is not None and time.monotonic() > deadline:
+            return None
+        try:
+            entries = os.scandir(stack.pop())
+        except OSError:
+            continue
+        with entries:
+            for entry in entries:
+                try:
+                    if entry.is_dir(follow_symlinks=False):
+                        stack.append(entry.path)
+                        continue
+                    st = entry.stat(follow_symlinks=False)
+                except OSError:
+                    continue
+                if st.st_nlink > 1:
+                    key = (st.st_dev, st.st_ino)
+                    if key in seen:
+                        continue
+                    seen.add(key)
+                total += st.st_blocks * 512
+    return total
+
+
+def format_size(size: int) -> str:
+    """Format a byte count for display (e.g. ``1.5G``)."""
+    if size < 1024:
+        return f"{size}B"
+    value = size / 1024
+    for unit in ("K", "M", "G"):
+        if value < 1024:
+            return f"{value:.1f}{unit}"
+        value /= 1024
+    return f"{value:.1f}T"
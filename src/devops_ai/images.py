@@ -0,0 +1,211 @@
+"""Image prefetch — pull compose images ahead of ``kinfra impl``.
+
+Pulls run concurrently with a bounded worker count, and the resolved
+digest of every image is recorded per project in
+~/.devops-ai/images/<project>.json. ``kinfra init`` and ``kinfra spec``
+start a detached background prefetch so pulls are off the critical path
+of ``start_sandbox``.
+"""
+
+from __future__ import annotations
+
+import json
+import logging
+import os
+import subprocess
+import sys
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Protocol
+
+from ruamel.yaml.error import YAMLError
+
+from devops_ai.yaml_loader import load_yaml_file
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CACHE_DIR = Path.home() / ".devops-ai" / "images"
+
+DEFAULT_MAX_WORKERS = 4
+
+
+class ImageRuntime(Protocol):
+    """Container runtime operations needed for prefetching."""
+
+    def pull(self, image: str) -> None:
+        """Pull an image. Raises RuntimeError on failure."""
+
+    def digest(self, image: str) -> str | None:
+        """Return the repo digest of a local image, or None."""
+
+
+class DockerRuntime:
+    """ImageRuntime backed by the docker CLI."""
+
+    def pull(self, image: str) -> None:
+        try:
+            result = subprocess.run(
+                ["docker", "pull", "--quiet", image],
+                capture_output=True,
+                text=True,
+            )
+        except FileNotFoundError:
+            raise RuntimeError(
+                "Docker is not installed or not on PATH"
+            ) from None
+        if result.returncode != 0:
+            raise RuntimeError(result.stderr.strip() or "docker pull failed")
+
+    def digest(self, image: str) -> str | None:
+        try:
+            result = subprocess.run(
+                [
+                    "docker",
+                    "image",
+                    "inspect",
+                    "--format",
+                    "{{json .RepoDigests}}",
+                    image,
+                ],
+                capture_output=True,
+                text=True,
+            )
+        except FileNotFoundError:
+            return None
+        if result.returncode != 0:
+            return None
+        try:
+            digests = json.loads(result.stdout.strip() or "[]")
+        except json.JSONDecodeError:
+            return None
+        return digests[0] if digests else None
+
+
+@dataclass
+class PrefetchResult:
+    """Outcome of a prefetch run."""
+
+    digests: dict[str, str | None] = field(default_factory=dict)
+    errors: dict[str, str] = field(default_factory=dict)
+
+
+def collect_images(compose_path: Path) -> list[str]:
+    """Return pullable images referenced by a compose file.
+
+    Skips services that build locally and images with unresolved
+    ``${VAR}`` interpolation (their name is only known at ``up`` time).
+    """
+    try:
+        data = load_yaml_file(compose_path)
+    except (OSError, YAMLError):
+        return []
+    if not isinstance(data, dict) or not isinstance(
+        data.get("services"), dict
+    ):
+        return []
+    images: set[str] = set()
+    for svc in data["services"].values():
+        if not isinstance(svc, dict) or svc.get("build") is not None:
+            continue
+        image = svc.get("image")
+        if isinstance(image, str) and image and "${" not in image:
+            images.add(image)
+    return sorted(images)
+
+
+def prefetch_images(
+    images: list[str],
+    runtime: ImageRuntime | None = None,
+    max_workers: int = DEFAULT_MAX_WORKERS,
+) -> PrefetchResult:
+    """Pull images concurrently (at most ``max_workers`` at a time)."""
+    runtime = runtime or DockerRuntime()
+    result = PrefetchResult()
+
+    def _pull(image: str) -> tuple[str, str | None, str | None]:
+        try:
+            runtime.pull(image)
+        except RuntimeError as e:
+            return image, None, str(e)
+        return image, runtime.digest(image), None
+
+    if not images:
+        return result
+    with ThreadPoolExecutor(max_workers=max(1, max_workers)) as pool:
+        for image, digest, error in pool.map(_pull, images):
+            if error is not None:
+                logger.warning("Prefetch failed for %s: %s", image, error)
+                result.errors[image] = error
+            else:
+                result.digests[image] = digest
+    return result
+
+
+def _cache_path(project: str, cache_dir: Path | None) -> Path:
+    return (cache_dir or DEFAULT_CACHE_DIR) / f"{project}.json"
+
+
+def load_digest_cache(
+    project: str, cache_dir: Path | None = None
+) -> dict[str, dict[str, str | None]]:
+    """Return {image: {"digest", "pulled_at"}} recorded for a project."""
+    try:
+        data = json.loads(_cache_path(project, cache_dir).read_text())
+    except (OSError, json.JSONDecodeError):
+        return {}
+    images = data.get("images", {}) if isinstance(data, dict) else {}
+    return images if isinstance(images, dict) else {}
+
+
+def record_digests(
+    project: str,
+    digests: dict[str, str | None],
+    cache_dir: Path | None = None,
+) -> Path:
+    """Merge freshly resolved digests into the project's cache file."""
+    path = _cache_path(project, cache_dir)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    now = datetime.now(timezone.utc).isoformat(timespec="seconds")
+    images = load_digest_cache(project, cache_dir)
+    for image, digest in digests.items():
+        images[image] = {"digest": digest, "pulled_at": now}
+    tmp = path.with_suffix(".tmp")
+    tmp.write_text(
+        json.dumps({"images": dict(sorted(images.items()))}, indent=2) + "\n"
+    )
+    os.replace(tmp, path)
+    return path
+
+
+def start_background_prefetch(
+    project_root: Path, project: str, cache_dir: Path | None = None
+) -> bool:
+    """Launch ``kinfra images prefetch`` detached from this process.
+
+    Output goes to ~/.devops-ai/images/<project>.log. Returns False if
+    the process could not be spawned (never raises).
+    """
+    log_dir = cache_dir or DEFAULT_CACHE_DIR
+    try:
+        log_dir.mkdir(parents=True, exist_ok=True)
+        with open(log_dir / f"{project}.log", "ab") as log:
+            subprocess.Popen(
+                [
+                    sys.executable,
+                    "-m",
+                    "devops_ai.cli.main",
+                    "images",
+                    "prefetch",
+                ],
+                cwd=project_root,
+                stdin=subprocess.DEVNULL,
+                stdout=log,
+                stderr=log,
+                start_new_session=True,
+            )
+    except OSError as e:
+        logger.warning("Could not start background image prefetch: %s", e)
+        return False
+    return True
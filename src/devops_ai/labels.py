@@ -0,0 +1,160 @@
+"""Docker labels that make sandbox containers self-describing.
+
+``generate_override`` puts ``devops-ai.*`` labels on every service of a
+sandbox. They carry everything needed to rebuild the slot's registry
+entry, so one ``docker ps`` answers "what is every slot doing" and a
+lost or corrupt registry.json can be reconstructed from Docker.
+"""
+
+from __future__ import annotations
+
+import subprocess
+from dataclasses import dataclass, field
+
+from devops_ai.registry import Registry, SlotInfo
+
+MANAGED = "devops-ai.managed"
+PROJECT = "devops-ai.project"
+SLOT = "devops-ai.slot"
+WORKTREE = "devops-ai.worktree"
+SLOT_DIR = "devops-ai.slot-dir"
+COMPOSE_FILE = "devops-ai.compose-file"
+PORTS = "devops-ai.ports"
+CLAIMED_AT = "devops-ai.claimed-at"
+CPUS = "devops-ai.cpus"
+MEM_BYTES = "devops-ai.mem-bytes"
+
+_ALL_LABELS = (
+    MANAGED, PROJECT, SLOT, WORKTREE, SLOT_DIR,
+    COMPOSE_FILE, PORTS, CLAIMED_AT, CPUS, MEM_BYTES,
+)
+
+DOCKER_TIMEOUT = 30.0
+
+
+def slot_labels(slot: SlotInfo) -> dict[str, str]:
+    """Labels for every container of ``slot``'s sandbox."""
+    return {
+        MANAGED: "true",
+        PROJECT: slot.project,
+        SLOT: str(slot.slot_id),
+        WORKTREE: slot.worktree_path,
+        SLOT_DIR: slot.slot_dir,
+        COMPOSE_FILE: slot.compose_file_copy,
+        # ";" because docker joins label lists with ","
+        PORTS: ";".join(f"{k}={v}" for k, v in sorted(slot.ports.items())),
+        CLAIMED_AT: slot.claimed_at,
+        CPUS: str(slot.cpus),
+        MEM_BYTES: str(slot.mem_bytes),
+    }
+
+
+def slot_from_labels(labels: dict[str, str]) -> SlotInfo | None:
+    """Rebuild a registry entry from container labels (None if invalid)."""
+    try:
+        ports = {}
+        for item in filter(None, labels.get(PORTS, "").split(";")):
+            env_var, _, port = item.partition("=")
+            ports[env_var] = int(port)
+        return SlotInfo(
+            slot_id=int(labels[SLOT]),
+            project=labels[PROJECT],
+            worktree_path=labels[WORKTREE],
+            slot_dir=labels[SLOT_DIR],
+            compose_file_copy=labels.get(COMPOSE_FILE, ""),
+            ports=ports,
+            claimed_at=labels.get(CLAIMED_AT, ""),
+            status="stopped",
+            cpus=float(labels.get(CPUS) or 0.0),
+            mem_bytes=int(labels.get(MEM_BYTES) or 0),
+        )
+    except (KeyError, ValueError):
+        return None
+
+
+@dataclass
+class LabelledContainer:
+    """One container of a kinfra sandbox, as ``docker ps`` lists it."""
+
+    name: str
+    state: str
+    labels: dict[str, str] = field(default_factory=dict)
+
+
+def list_slot_containers(
+    timeout: float = DOCKER_TIMEOUT,
+) -> list[LabelledContainer]:
+    """Every kinfra-labelled container, from a single ``docker ps``.
+
+    Raises OSError or subprocess.SubprocessError if Docker is
+    unavailable.
+    """
+    # Ask for each label on its own: docker's {{.Labels}} joins them with
+    # commas, which paths may contain
+    fields = ["{{.Names}}", "{{.State}}"] + [
+        f'{{{{.Label "{label}"}}}}' for label in _ALL_LABELS
+    ]
+    result = subprocess.run(
+        [
+            "docker", "ps", "-a",
+            "--filter", f"label={MANAGED}=true",
+            "--format", "\t".join(fields),
+        ],
+        capture_output=True,
+        text=True,
+        timeout=timeout,
+        check=True,
+    )
+    containers = []
+    for line in result.stdout.splitlines():
+        values = line.split("\t")
+        if len(values) != len(fields):
+            continue
+        name, state, *label_values = values
+        labels = {
+            k: v for k, v in zip(_ALL_LABELS, label_values) if v
+        }
+        containers.append(LabelledContainer(name, state, labels))
+    return containers
+
+
+def rebuild_registry(
+    registry: Registry, containers: list[LabelledContainer]
+) -> tuple[list[SlotInfo], list[str]]:
+    """Add slots found on labelled containers to ``registry``.
+
+    Existing entries are kept. A slot is "running" if any of its
+    containers runs. Returns (added slots, conflict messages).
+    """
+    found: dict[int, SlotInfo] = {}
+    conflicts: list[str] = []
+    for container in containers:
+        slot = slot_from_labels(container.labels)
+        if slot is None:
+            conflicts.append(f"{container.name}: incomplete labels")
+            continue
+        seen = found.setdefault(slot.slot_id, slot)
+        if (seen.project, seen.worktree_path) != (
+            slot.project,
+            slot.worktree_path,
+        ):
+            conflicts.append(
+                f"{container.name}: slot {slot.slot_id} already "
+                f"claimed by {seen.project} ({seen.worktree_path})"
+            )
+            continue
+        if container.state == "running":
+            seen.status = "running"
+
+    added: list[SlotInfo] = []
+    for slot_id, slot in sorted(found.items()):
+        existing = registry.slots.get(slot_id)
+        if existing is None:
+            registry.slots[slot_id] = slot
+            added.append(slot)
+        elif existing.worktree_path != slot.worktree_path:
+            conflicts.append(
+                f"slot {slot_id}: registry has {existing.worktree_path}, "
+                f"containers belong to {slot.worktree_path}"
+            )
+    return added, conflicts
@@ -7,6 +7,9 @@ from dataclasses import dataclass
 
 from devops_ai.config import InfraConfig
 
+# Slot ids run 1..100, so each base port owns the next 100 ports
+PORT_BAND_WIDTH = 100
+
 
 @dataclass
 class PortConflict:
@@ -17,6 +20,27 @@ class PortConflict:
     message: str
 
 
+@dataclass
+class PortBandClash:
+    """Two projects whose slot port bands overlap."""
+
+    project: str
+    env_var: str
+    base_port: int
+    other_project: str
+    other_env_var: str
+    other_base_port: int
+
+    def __str__(self) -> str:
+        distance = abs(self.other_base_port - self.base_port)
+        return (
+            f"{self.project}:{self.env_var} (base {self.base_port}) and "
+            f"{self.other_project}:{self.other_env_var} "
+            f"(base {self.other_base_port}) are {distance} apart — "
+            f"slot ports overlap"
+        )
+
+
 def compute_ports(config: InfraConfig, slot_id: int) -> dict[str, int]:
     """Compute actual ports for a slot: base_port + slot_id for each declared port."""
     return {sp.env_var: sp.base_port + slot_id for sp in config.ports}
@@ -72,3 +96,35 @@ def check_base_port_safety(
                         f"{other_project}:{other_var} (base {other_base})"
                     )
     return warnings
+
+
+def find_port_band_clashes(
+    projects: dict[str, dict[str, int]],
+) -> list[PortBandClash]:
+    """Find base ports of different projects whose slot bands overlap.
+
+    projects maps project name -> {env_var: base_port}. Bases are sorted
+    once and only neighbours within PORT_BAND_WIDTH are compared.
+    """
+    bases = sorted(
+        (base, project, var)
+        for project, ports in projects.items()
+        for var, base in ports.items()
+    )
+    clashes: list[PortBandClash] = []
+    for i, (base, project, var) in enumerate(bases):
+        for other_base, other_project, other_var in bases[i + 1 :]:
+            if other_base - base >= PORT_BAND_WIDTH:
+                break
+            if other_project != project:
+                clashes.append(
+                    PortBandClash(
+                        project=project,
+                        env_var=var,
+                        base_port=base,
+                        other_project=other_project,
+                        other_env_var=other_var,
+                        other_base_port=other_base,
+                    )
+                )
+    return clashes
@@ -0,0 +1,376 @@
+"""Reconciler — keep registry slot status in step with Docker and disk.
+
+``SlotInfo.status`` is otherwise only written by kinfra itself, so it
+goes stale when containers crash or a worktree is deleted by hand. The
+reconciler starts from one labelled ``docker ps`` (see ``labels``) and
+then follows ``docker events`` for kinfra containers, re-evaluating only
+the slot an event belongs to. Worktrees and slot dirs are watched
+through the mtimes of their parent directories: an idle poll costs one
+stat per parent, and a slot's paths are only checked again when one of
+its parents changed.
+
+Statuses written are "running" (a container of the slot runs),
+"stopped" (none does) and "missing" (worktree or slot dir is gone).
+Slots still "provisioning" are left to ``kinfra impl`` unless their
+paths are gone or they were claimed more than ``PROVISIONING_TIMEOUT``
+ago, which means the ``kinfra impl`` that claimed them died.
+"""
+
+from __future__ import annotations
+
+import json
+import logging
+import queue
+import subprocess
+import threading
+from collections.abc import Callable, Iterable
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from typing import IO, Any
+
+from devops_ai.labels import (
+    MANAGED,
+    SLOT,
+    WORKTREE,
+    LabelledContainer,
+    list_slot_containers,
+)
+from devops_ai.registry import (
+    DEFAULT_REGISTRY_PATH,
+    Registry,
+    SlotInfo,
+    load_registry,
+    registry_lock,
+    save_registry,
+)
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_INTERVAL = 2.0
+
+# Seconds after which a slot still "provisioning" is treated as abandoned
+PROVISIONING_TIMEOUT = 30 * 60.0
+
+RUNNING = "running"
+STOPPED = "stopped"
+MISSING = "missing"
+PROVISIONING = "provisioning"
+
+# docker events actions that change whether a container runs; "kill"
+# and "oom" are always followed by "die"
+_RUNNING_ACTIONS = frozenset({"start", "restart", "unpause"})
+_STOPPED_ACTIONS = frozenset({"die", "stop", "pause"})
+
+# (slot id, worktree path): a released slot id can be reused by another
+# worktree before the old containers are gone
+_ContainerKey = tuple[int, str]
+
+
+@dataclass
+class StatusChange:
+    """A slot status the reconciler wrote to the registry."""
+
+    slot_id: int
+    project: str
+    old: str
+    new: str
+
+    def __str__(self) -> str:
+        return (
+            f"slot {self.slot_id} ({self.project}): {self.old} → {self.new}"
+        )
+
+
+def _container_key(labels: dict[str, str]) -> _ContainerKey | None:
+    try:
+        return int(labels[SLOT]), labels[WORKTREE]
+    except (KeyError, ValueError):
+        return None
+
+
+def _stat_key(path: Path) -> tuple[int, int, int] | None:
+    try:
+        st = path.stat()
+    except OSError:
+        return None
+    return st.st_mtime_ns, st.st_size, st.st_ino
+
+
+def _slot_parents(slot: SlotInfo) -> set[Path]:
+    return {Path(slot.worktree_path).parent, Path(slot.slot_dir).parent}
+
+
+def _claimed_before(slot: SlotInfo, cutoff: datetime) -> bool:
+    """Whether ``slot`` was claimed before ``cutoff`` (True if unknown)."""
+    try:
+        claimed = datetime.fromisoformat(slot.claimed_at)
+    except ValueError:
+        return True
+    if claimed.tzinfo is None:
+        claimed = claimed.replace(tzinfo=timezone.utc)
+    return claimed < cutoff
+
+
+class Reconciler:
+    """Incrementally derived slot status, written back to the registry.
+
+    Feed it with ``sync`` (a full container listing), ``apply_event``
+    (one decoded ``docker events`` record) and ``poll`` (registry file
+    and parent directory mtimes). ``flush`` evaluates the slots those
+    calls marked dirty and persists any status that changed.
+    """
+
+    def __init__(
+        self,
+        registry_path: Path | None = None,
+        provisioning_timeout: float = PROVISIONING_TIMEOUT,
+    ) -> None:
+        self.registry_path = registry_path or DEFAULT_REGISTRY_PATH
+        self.provisioning_timeout = provisioning_timeout
+        self._slots: dict[int, SlotInfo] = {}
+        self._containers: dict[_ContainerKey, dict[str, bool]] = {}
+        self._parents: dict[Path, tuple[int, int, int] | None] = {}
+        self._registry_key: tuple[int, int, int] | None = None
+        self._dirty: set[int] = set()
+
+    def sync(self, containers: Iterable[LabelledContainer]) -> None:
+        """Replace container state with a full listing and reload."""
+        self._containers = {}
+        for container in containers:
+            key = _container_key(container.labels)
+            if key is not None:
+                states = self._containers.setdefault(key, {})
+                states[container.name] = container.state == RUNNING
+        self._use(load_registry(self.registry_path), dirty_all=True)
+
+    def apply_event(self, event: dict[str, Any]) -> None:
+        """Update container state from one ``docker events`` record."""
+        actor = event.get("Actor") or {}
+        attrs = actor.get("Attributes") or {}
+        action = str(event.get("Action") or event.get("status") or "")
+        name = attrs.get("name")
+        key = _container_key(attrs)
+        if key is None or not name:
+            return
+        states = self._containers.setdefault(key, {})
+        if action == "destroy":
+            states.pop(name, None)
+        elif action in _RUNNING_ACTIONS:
+            states[name] = True
+        elif action in _STOPPED_ACTIONS:
+            states[name] = False
+        else:
+            return
+        self._dirty.add(key[0])
+
+    def poll(self) -> None:
+        """Mark slots dirty whose registry entry or parent dirs changed.
+
+        Slots stuck "provisioning" past the timeout are marked too.
+        """
+        if _stat_key(self.registry_path) != self._registry_key:
+            self._use(load_registry(self.registry_path), dirty_all=True)
+        self._dirty.update(
+            sid
+            for sid, slot in self._slots.items()
+            if slot.status == PROVISIONING and self._abandoned(slot)
+        )
+        for parent, seen in list(self._parents.items()):
+            now = _stat_key(parent)
+            if now == seen:
+                continue
+            self._parents[parent] = now
+            self._dirty.update(
+                sid
+                for sid, slot in self._slots.items()
+                if parent in _slot_parents(slot)
+            )
+
+    def status_of(self, slot: SlotInfo) -> str:
+        """The status ``slot`` should have given what has been observed."""
+        if not (
+            Path(slot.worktree_path).exists() and Path(slot.slot_dir).exists()
+        ):
+            return MISSING
+        if slot.status == PROVISIONING and not self._abandoned(slot):
+            return slot.status
+        states = self._containers.get((slot.slot_id, slot.worktree_path))
+        return RUNNING if states and any(states.values()) else STOPPED
+
+    def flush(self) -> list[StatusChange]:
+        """Persist status changes of dirty slots. Returns what changed."""
+        changes: list[StatusChange] = []
+        for sid in sorted(self._dirty):
+            slot = self._slots.get(sid)
+            if slot is None:
+                continue
+            status = self.status_of(slot)
+            if status != slot.status:
+                changes.append(
+                    StatusChange(sid, slot.project, slot.status, status)
+                )
+        self._dirty.clear()
+        if not changes:
+            return []
+
+        # Re-read under the lock so entries claimed or released
+        # meanwhile are kept
+        written: list[StatusChange] = []
+        retry: set[int] = set()
+        with registry_lock(self.registry_path):
+            registry = load_registry(self.registry_path)
+            for change in changes:
+                current = registry.slots.get(change.slot_id)
+                seen = self._slots[change.slot_id]
+                if (
+                    current is None
+                    or current.worktree_path != seen.worktree_path
+                ):
+                    continue
+                if current.status != seen.status:
+                    # Written meanwhile (e.g. impl finished provisioning)
+                    retry.add(change.slot_id)
+                    continue
+                current.status = change.new
+                written.append(change)
+            if written:
+                save_registry(registry, self.registry_path)
+        self._use(registry, dirty_all=False)
+        self._dirty.update(retry)
+        return written
+
+    def _abandoned(self, slot: SlotInfo) -> bool:
+        """Whether a "provisioning" slot has outlived the timeout."""
+        cutoff = datetime.now(timezone.utc) - timedelta(
+            seconds=self.provisioning_timeout
+        )
+        return _claimed_before(slot, cutoff)
+
+    def _use(self, registry: Registry, dirty_all: bool) -> None:
+        """Adopt ``registry`` as the known slots and watch their parents."""
+        before = {sid: s.worktree_path for sid, s in self._slots.items()}
+        self._slots = dict(registry.slots)
+        for sid, slot in self._slots.items():
+            if dirty_all or before.get(sid) != slot.worktree_path:
+                self._dirty.add(sid)
+        parents = set().union(*map(_slot_parents, self._slots.values()))
+        self._parents = {
+            p: self._parents[p] if p in self._parents else _stat_key(p)
+            for p in parents
+        }
+        self._registry_key = _stat_key(self.registry_path)
+
+    def watch(
+        self,
+        stop: threading.Event,
+        interval: float = DEFAULT_INTERVAL,
+        report: Callable[[list[StatusChange]], None] | None = None,
+    ) -> None:
+        """Follow Docker events and poll paths until ``stop`` is set.
+
+        If the event stream ends (Docker restarted), the container state
+        is rebuilt from a fresh listing and the stream reopened. Raises
+        OSError or subprocess.SubprocessError if Docker is unavailable
+        when watching starts.
+        """
+        first = True
+        while not stop.is_set():
+            try:
+                self._follow(stop, interval, report)
+            except (OSError, subprocess.SubprocessError) as e:
+                if first:
+                    raise
+                logger.warning("Docker unavailable, retrying: %s", e)
+            first = False
+            stop.wait(interval)
+
+    def _follow(
+        self,
+        stop: threading.Event,
+        interval: float,
+        report: Callable[[list[StatusChange]], None] | None,
+    ) -> None:
+        # Subscribe before listing so no event between the two is lost;
+        # replaying one the listing already reflects is harmless
+        proc = _docker_events()
+        events: queue.Queue[dict[str, Any] | None] = queue.Queue()
+        assert proc.stdout is not None
+        reader = threading.Thread(
+            target=_pump, args=(proc.stdout, events), daemon=True
+        )
+        reader.start()
+        try:
+            self.sync(list_slot_containers())
+            ended = False
+            while not (stop.is_set() or ended):
+                ended = self._drain(events, interval)
+                self.poll()
+                changes = self.flush()
+                if changes and report is not None:
+                    report(changes)
+        finally:
+            proc.terminate()
+            proc.wait()
+
+    def _drain(
+        self, events: queue.Queue[dict[str, Any] | None], timeout: float
+    ) -> bool:
+        """Apply queued events, waiting up to ``timeout`` for the first.
+
+        Returns True when the event stream has ended.
+        """
+        try:
+            event = events.get(timeout=timeout)
+        except queue.Empty:
+            return False
+        while True:
+            if event is None:
+                return True
+            self.apply_event(event)
+            try:
+                event = events.get_nowait()
+            except queue.Empty:
+                return False
+
+
+def _docker_events() -> subprocess.Popen[str]:
+    return subprocess.Popen(
+        [
+            "docker", "events",
+            "--filter", "type=container",
+            "--filter", f"label={MANAGED}=true",
+            "--format", "{{json .}}",
+        ],
+        stdin=subprocess.DEVNULL,
+        stdout=subprocess.PIPE,
+        stderr=subprocess.DEVNULL,
+        text=True,
+    )
+
+
+def _pump(
+    stream: IO[str], events: queue.Queue[dict[str, Any] | None]
+) -> None:
+    """Decode JSON event lines onto ``events``; None marks the end."""
+    try:
+        for line in stream:
+            try:
+                event = json.loads(line)
+            except ValueError:
+                continue
+            if isinstance(event, dict):
+                events.put(event)
+    finally:
+        events.put(None)
+
+
+def reconcile_once(registry_path: Path | None = None) -> list[StatusChange]:
+    """One full pass: a single ``docker ps`` plus a stat of each slot.
+
+    Raises OSError or subprocess.SubprocessError if Docker is
+    unavailable.
+    """
+    reconciler = Reconciler(registry_path)
+    reconciler.sync(list_slot_containers())
+    return reconciler.flush()
@@ -11,11 +11,18 @@ import json
 import logging
 import os
 import tempfile
+import time
+from collections.abc import Callable, Iterable, Iterator
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
 from dataclasses import asdict, dataclass, field
 from pathlib import Path
+from typing import Any
 
+from devops_ai.admission import AdmissionDenied, check_admission
 from devops_ai.config import InfraConfig
 from devops_ai.ports import check_ports_available, compute_ports
+from devops_ai.resources import check_host_budget, slot_demand
 
 logger = logging.getLogger(__name__)
 
@@ -33,7 +40,14 @@ class SlotInfo:
     compose_file_copy: str
     ports: dict[str, int]
     claimed_at: str
-    status: str  # "running" | "stopped"
+    status: str  # "provisioning" | "running" | "stopped" | "missing"
+    cpus: float = 0.0  # reserved against the host budget
+    mem_bytes: int = 0
+
+    @property
+    def compose_project(self) -> str:
+        """Compose project name (COMPOSE_PROJECT_NAME in .env.sandbox)."""
+        return f"{self.project}-slot-{self.slot_id}"
 
 
 @dataclass
@@ -52,13 +66,36 @@ def load_registry(path: Path | None = None) -> Registry:
 
     try:
         text = path.read_text()
-        if not text.strip():
-            return Registry()
-        data = json.loads(text)
-    except (json.JSONDecodeError, OSError):
-        logger.warning("Registry file corrupt, starting fresh: %s", path)
+    except OSError:
+        logger.warning("Registry file unreadable, starting fresh: %s", path)
+        return Registry()
+    if not text.strip():
+        return Registry()
+    try:
+        return _parse_registry(json.loads(text))
+    except (ValueError, KeyError, TypeError, AttributeError):
+        backup = _backup_corrupt(path)
+        logger.warning(
+            "Registry file corrupt, starting fresh: %s (saved as %s; "
+            "run 'kinfra registry rebuild' to recover slots from Docker)",
+            path,
+            backup,
+        )
         return Registry()
 
+
+def _backup_corrupt(path: Path) -> Path | None:
+    """Move a corrupt registry aside so it is not silently overwritten."""
+    stamp = time.strftime("%Y%m%dT%H%M%S")
+    backup = path.with_name(f"{path.name}.corrupt-{stamp}")
+    try:
+        os.replace(path, backup)
+    except OSError:
+        return None
+    return backup
+
+
+def _parse_registry(data: dict[str, Any]) -> Registry:
     version = data.get("version", 1)
     slots: dict[int, SlotInfo] = {}
     for key, val in data.get("slots", {}).items():
@@ -72,6 +109,8 @@ def load_registry(path: Path | None = None) -> Registry:
             ports=val.get("ports", {}),
             claimed_at=val.get("claimed_at", ""),
             status=val.get("status", "running"),
+            cpus=val.get("cpus", 0.0),
+            mem_bytes=val.get("mem_bytes", 0),
         )
     return Registry(version=version, slots=slots)
 
@@ -114,13 +153,49 @@ def save_registry(registry: Registry, path: Path | None = None) -> None:
         raise
 
 
+@contextmanager
+def registry_lock(path: Path | None = None) -> Iterator[None]:
+    """Hold an exclusive lock for a read-check-write of the registry.
+
+    Writes are atomic on their own; this serializes sequences such as
+    "create a slot dir, then claim it" against "find unused slot dirs,
+    then delete them".
+    """
+    path = path or DEFAULT_REGISTRY_PATH
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with open(path.with_name(f"{path.name}.lock"), "a") as lock:
+        fcntl.flock(lock.fileno(), fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(lock.fileno(), fcntl.LOCK_UN)
+
+
+def check_capacity(registry: Registry, config: InfraConfig) -> str | None:
+    """Return why a new slot for this project cannot start now, or None.
+
+    Combines the host resource budget with admission control (free
+    memory and the per-project slot quota).
+    """
+    return check_host_budget(
+        slot_demand(config), registry.slots.values()
+    ) or check_admission(registry, config)
+
+
 def allocate_slot(
     registry: Registry, config: InfraConfig
 ) -> tuple[int, dict[str, int]]:
     """Find next free slot with TCP bind test.
 
     Returns (slot_id, ports_dict). Raises RuntimeError if all exhausted.
+    Raises AdmissionDenied (a RuntimeError) if the project's
+    [sandbox.resources] reservation does not fit in the host budget,
+    free memory is too low, or the project's max_slots quota is reached.
     """
+    denied = check_capacity(registry, config)
+    if denied:
+        raise AdmissionDenied(denied)
+
     for slot_id in range(1, 101):
         if slot_id in registry.slots:
             continue
@@ -154,6 +229,15 @@ def release_slot(
     save_registry(registry, path)
 
 
+def release_slots(
+    registry: Registry, slot_ids: Iterable[int], path: Path | None = None
+) -> None:
+    """Remove several slots from the registry with a single write."""
+    for slot_id in slot_ids:
+        registry.slots.pop(slot_id, None)
+    save_registry(registry, path)
+
+
 def get_slot_for_worktree(
     registry: Registry, worktree_path: Path
 ) -> SlotInfo | None:
@@ -165,15 +249,54 @@ def get_slot_for_worktree(
     return None
 
 
-def clean_stale_entries(registry: Registry) -> list[int]:
+EXISTS_WORKERS = 8
+
+
+def _exists(path: str) -> bool:
+    return os.path.exists(path)
+
+
+def paths_exist(
+    paths: Iterable[str], max_workers: int = EXISTS_WORKERS
+) -> dict[str, bool]:
+    """Whether each path exists, stat-ing them concurrently.
+
+    Stats on network-mounted homes are slow, so they run in a thread
+    pool rather than one after another.
+    """
+    todo = list(dict.fromkeys(paths))
+    if len(todo) == 1:
+        return {todo[0]: _exists(todo[0])}
+    if not todo:
+        return {}
+    with ThreadPoolExecutor(
+        max_workers=max(1, min(max_workers, len(todo)))
+    ) as pool:
+        return dict(zip(todo, pool.map(_exists, todo)))
+
+
+def clean_stale_entries(
+    registry: Registry,
+    teardown: Callable[[SlotInfo], None] | None = None,
+    max_workers: int = EXISTS_WORKERS,
+) -> list[int]:
     """Remove entries where worktree or slot dir no longer exists.
 
+    Existence checks for all slots run concurrently (see
+    ``paths_exist``). If given, ``teardown`` is called for each stale
+    slot, concurrently, to stop its containers and delete what is left
+    of its slot dir; failures are logged and do not keep the entry.
     Returns list of removed slot IDs.
     """
-    stale: list[int] = []
-    for slot_id, info in list(registry.slots.items()):
-        wt_exists = Path(info.worktree_path).exists()
-        sd_exists = Path(info.slot_dir).exists()
+    slots = list(registry.slots.items())
+    exists = paths_exist(
+        [p for _, s in slots for p in (s.worktree_path, s.slot_dir)],
+        max_workers=max_workers,
+    )
+    stale: list[SlotInfo] = []
+    for slot_id, info in slots:
+        wt_exists = exists[info.worktree_path]
+        sd_exists = exists[info.slot_dir]
         if not wt_exists or not sd_exists:
             reason = []
             if not wt_exists:
@@ -186,7 +309,21 @@ def clean_stale_entries(registry: Registry) -> list[int]:
                 info.project,
                 ", ".join(reason),
             )
-            stale.append(slot_id)
-    for slot_id in stale:
-        del registry.slots[slot_id]
-    return stale
+            stale.append(info)
+    for info in stale:
+        del registry.slots[info.slot_id]
+
+    if teardown is not None and stale:
+        with ThreadPoolExecutor(
+            max_workers=max(1, min(max_workers, len(stale)))
+        ) as pool:
+            futures = {pool.submit(teardown, s): s for s in stale}
+        for future, info in futures.items():
+            error = future.exception()
+            if error is not None:
+                logger.warning(
+                    "Could not tear down stale slot %d: %s",
+                    info.slot_id,
+                    error,
+                )
+    return [info.slot_id for info in stale]
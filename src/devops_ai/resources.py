@@ -0,0 +1,134 @@
+"""Host resource budget — per-slot reservations checked at allocation time."""
+
+from __future__ import annotations
+
+import os
+from collections.abc import Iterable
+from dataclasses import dataclass
+from pathlib import Path
+from typing import TYPE_CHECKING
+
+from devops_ai.config import InfraConfig, parse_mem_limit
+
+if TYPE_CHECKING:
+    from devops_ai.registry import SlotInfo
+
+MEMINFO_PATH = Path("/proc/meminfo")
+
+
+@dataclass
+class SlotDemand:
+    """CPU and memory a slot reserves against the host budget."""
+
+    cpus: float = 0.0
+    mem_bytes: int = 0
+
+    @property
+    def is_empty(self) -> bool:
+        return self.cpus == 0 and self.mem_bytes == 0
+
+
+@dataclass
+class HostCapacity:
+    """Total CPUs and memory available to sandboxes on this host."""
+
+    cpus: float
+    mem_bytes: int
+
+
+def slot_demand(config: InfraConfig) -> SlotDemand:
+    """Compute what one slot of this project reserves.
+
+    Uses ``slot_cpus`` / ``slot_mem_limit`` when declared, otherwise the
+    sum of the per-service limits. Services without limits count as 0.
+    """
+    res = config.resources
+    if res.slot_cpus is not None:
+        cpus = res.slot_cpus
+    else:
+        cpus = sum(s.cpus or 0.0 for s in res.services.values())
+    if res.slot_mem_limit is not None:
+        mem = parse_mem_limit(res.slot_mem_limit)
+    else:
+        mem = sum(
+            parse_mem_limit(s.mem_limit)
+            for s in res.services.values()
+            if s.mem_limit
+        )
+    return SlotDemand(cpus=cpus, mem_bytes=mem)
+
+
+def read_meminfo(field: str, meminfo: Path | None = None) -> int | None:
+    """Return a /proc/meminfo field (e.g. "MemAvailable") in bytes, or None."""
+    try:
+        for line in (meminfo or MEMINFO_PATH).read_text().splitlines():
+            if line.startswith(f"{field}:"):
+                return int(line.split()[1]) * 1024
+    except (OSError, ValueError, IndexError):
+        pass
+    return None
+
+
+def _read_mem_total(meminfo: Path) -> int:
+    """Read MemTotal from /proc/meminfo, falling back to sysconf."""
+    total = read_meminfo("MemTotal", meminfo)
+    if total is not None:
+        return total
+    try:
+        return os.sysconf("SC_PAGE_SIZE") * os.sysconf("SC_PHYS_PAGES")
+    except (ValueError, OSError, AttributeError):
+        return 0
+
+
+def host_capacity(meminfo: Path | None = None) -> HostCapacity:
+    """Detect host CPU count and total memory."""
+    return HostCapacity(
+        cpus=float(os.cpu_count() or 1),
+        mem_bytes=_read_mem_total(meminfo or MEMINFO_PATH),
+    )
+
+
+def check_host_budget(
+    demand: SlotDemand,
+    claimed: Iterable[SlotInfo],
+    capacity: HostCapacity | None = None,
+) -> str | None:
+    """Check that a new slot fits next to the slots already claimed.
+
+    Only slots that recorded a reservation count towards the budget.
+    Returns a human-readable reason if the budget would be exceeded,
+    or None if the slot fits. Slots without declared limits always fit.
+    """
+    if demand.is_empty:
+        return None
+    capacity = capacity or host_capacity()
+
+    used_cpus = 0.0
+    used_mem = 0
+    for slot in claimed:
+        used_cpus += slot.cpus
+        used_mem += slot.mem_bytes
+
+    if demand.cpus and used_cpus + demand.cpus > capacity.cpus:
+        return (
+            f"CPU budget exceeded: {used_cpus:g} of {capacity.cpus:g} CPUs "
+            f"reserved, slot needs {demand.cpus:g}"
+        )
+    if (
+        demand.mem_bytes
+        and capacity.mem_bytes
+        and used_mem + demand.mem_bytes > capacity.mem_bytes
+    ):
+        return (
+            f"Memory budget exceeded: {_fmt_bytes(used_mem)} of "
+            f"{_fmt_bytes(capacity.mem_bytes)} reserved, slot needs "
+            f"{_fmt_bytes(demand.mem_bytes)}"
+        )
+    return None
+
+
+def _fmt_bytes(n: int) -> str:
+    """Format a byte count as MiB/GiB for messages."""
+    if n >= 1024**3:
+        return f"{n / 1024**3:.1f}GiB"
+    return f"{n / 1024**2:.0f}MiB"
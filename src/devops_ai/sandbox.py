@@ -2,16 +2,22 @@
 
 from __future__ import annotations
 
+import hashlib
+import json
 import logging
+import os
 import shutil
 import subprocess
 import time
 import urllib.request
 from collections.abc import Sequence
-from datetime import datetime, timezone
 from pathlib import Path
 
-from devops_ai.config import InfraConfig
+from ruamel.yaml.error import YAMLError
+
+from devops_ai.compose_model import DEFAULT_CACHE_DIR, load_compose_model
+from devops_ai.config import InfraConfig, ServiceResources
+from devops_ai.labels import slot_labels
 from devops_ai.registry import SlotInfo
 
 OTEL_ENDPOINT = "http://devops-ai-jaeger:4317"
@@ -20,6 +26,12 @@ logger = logging.getLogger(__name__)
 
 DEFAULT_SLOTS_BASE = Path.home() / ".devops-ai" / "slots"
 
+SLOT_HASH_FILE = ".kinfra-hash"
+
+# Snapshot of the compose graph inside a slot dir, and its -f file list
+COMPOSE_SNAPSHOT_DIR = "compose"
+COMPOSE_MANIFEST = ".kinfra-files"
+
 
 def create_slot_dir(
     project: str, slot_id: int, *, base: Path | None = None
@@ -36,13 +48,83 @@ def remove_slot_dir(slot_dir: Path) -> None:
     shutil.rmtree(slot_dir, ignore_errors=True)
 
 
+def compose_graph_files(
+    compose_path: Path, overrides: Sequence[Path] = ()
+) -> list[Path]:
+    """Return every file in a compose project's graph, primary first.
+
+    Includes layered overrides and files reached through ``include:`` and
+    ``extends:``. If the graph cannot be resolved, returns just the given
+    files.
+    """
+    inputs = [p.resolve() for p in (compose_path, *overrides)]
+    try:
+        model = load_compose_model(
+            compose_path,
+            cache_dir=DEFAULT_CACHE_DIR,
+            overrides=overrides,
+        )
+    except (OSError, ValueError, YAMLError) as e:
+        logger.warning("Could not resolve compose graph: %s", e)
+        model = None
+    files = [Path(f) for f in model.files] if model else []
+    return files + [p for p in inputs if p not in files]
+
+
 def copy_compose_to_slot(
-    compose_path: Path, slot_dir: Path
+    compose_path: Path,
+    slot_dir: Path,
+    overrides: Sequence[Path] = (),
 ) -> Path:
-    """Copy worktree's compose file to slot dir for teardown safety."""
-    dest = slot_dir / compose_path.name
-    shutil.copy2(compose_path, dest)
-    return dest
+    """Snapshot the compose graph into the slot dir for teardown safety.
+
+    Every file of the graph is copied under ``compose/`` keeping its
+    relative layout, so includes and extends still resolve from the
+    copy. The ``-f`` file list is recorded for ``stop_sandbox``.
+    Returns the copy of the primary compose file.
+    """
+    files = compose_graph_files(compose_path, overrides)
+    anchor = Path(os.path.commonpath([str(f.parent) for f in files]))
+    snapshot = slot_dir / COMPOSE_SNAPSHOT_DIR
+    shutil.rmtree(snapshot, ignore_errors=True)
+    for path in files:
+        dest = snapshot / path.relative_to(anchor)
+        dest.parent.mkdir(parents=True, exist_ok=True)
+        shutil.copy2(path, dest)
+
+    layered = [p.resolve() for p in (compose_path, *overrides)]
+    (snapshot / COMPOSE_MANIFEST).write_text(
+        "".join(f"{p.relative_to(anchor)}\n" for p in layered)
+    )
+    return snapshot / layered[0].relative_to(anchor)
+
+
+def _snapshot_compose_files(slot: SlotInfo) -> list[str | Path]:
+    """The ``-f`` files to tear a slot down with, primary first."""
+    snapshot = Path(slot.slot_dir) / COMPOSE_SNAPSHOT_DIR
+    try:
+        lines = (snapshot / COMPOSE_MANIFEST).read_text().splitlines()
+    except OSError:
+        lines = []
+    if not lines:
+        # Slots claimed before graph snapshots: single compose copy
+        return [slot.compose_file_copy]
+    return [snapshot / line for line in lines if line]
+
+
+def _write_if_changed(path: Path, content: str) -> bool:
+    """Write content only if it differs from what is on disk.
+
+    Leaves the file (and its mtime) untouched when nothing changed.
+    Returns True if the file was written.
+    """
+    try:
+        if path.read_text() == content:
+            return False
+    except OSError:
+        pass
+    path.write_text(content)
+    return True
 
 
 def generate_env_file(
@@ -60,7 +142,7 @@ def generate_env_file(
         lines.append(f"{key}={value}")
 
     env_path = slot_dir / ".env.sandbox"
-    env_path.write_text("\n".join(lines) + "\n")
+    _write_if_changed(env_path, "\n".join(lines) + "\n")
     return env_path
 
 
@@ -75,28 +157,70 @@ def _build_volume_line(
     return line
 
 
+def _build_resource_lines(res: ServiceResources) -> list[str]:
+    """Build cpus/mem_limit/pids_limit lines for one service."""
+    lines: list[str] = []
+    if res.cpus is not None:
+        lines.append(f"    cpus: {res.cpus:g}")
+    if res.mem_limit is not None:
+        lines.append(f"    mem_limit: {res.mem_limit}")
+    if res.pids_limit is not None:
+        lines.append(f"    pids_limit: {res.pids_limit}")
+    return lines
+
+
+def _compose_services(
+    config: InfraConfig, worktree_path: Path
+) -> list[str] | None:
+    """Service names of the worktree's compose graph, None if unreadable.
+
+    Resolves the same files ``start_sandbox`` runs, so the override
+    never names a service the worktree has removed or renamed.
+    """
+    compose_path = worktree_path / config.compose_file
+    try:
+        model = load_compose_model(
+            compose_path,
+            cache_dir=DEFAULT_CACHE_DIR,
+            overrides=[worktree_path / f for f in config.compose_overrides],
+        )
+    except (OSError, ValueError, YAMLError) as e:
+        logger.debug("Could not list compose services: %s", e)
+        return None
+    return list(model.services) if model else None
+
+
 def generate_override(
     config: InfraConfig,
     slot: SlotInfo,
     worktree_path: Path,
     main_repo_path: Path,
     slot_dir: Path,
+    image_pins: dict[str, str] | None = None,
 ) -> Path:
     """Generate docker-compose.override.yml with volume mounts.
 
+    Output is deterministic for a given config and slot, and the file is
+    only rewritten when its content changes.
+
     Always includes the devops-ai-observability network and OTEL
     environment variables. Callers must ensure the network exists
     (e.g. via ``ObservabilityManager.ensure_network()``) before
-    starting the sandbox.
+    starting the sandbox. Services listed in [sandbox.resources] get
+    cpus/mem_limit/pids_limit so one runaway sandbox cannot starve
+    the other slots. ``image_pins`` maps ``build:`` services to
+    content-addressed tags (see ``build_cache``) so unchanged build
+    contexts reuse an existing image instead of rebuilding per slot.
+    Every service of the worktree's compose graph gets the
+    ``devops-ai.*`` slot labels; when that graph can be read, services
+    it does not define are left out of the override.
     """
-    now = datetime.now(timezone.utc).isoformat(timespec="seconds")
     namespace = f"{config.project_name}-slot-{slot.slot_id}"
 
     lines: list[str] = [
         "# Generated by kinfra impl — do not edit manually",
         f"# Worktree: {worktree_path}",
         f"# Slot: {namespace}",
-        f"# Generated at: {now}",
         "",
         "networks:",
         "  devops-ai-observability:",
@@ -108,12 +232,38 @@ def generate_override(
     all_targets: set[str] = set()
     all_targets.update(config.code_mount_targets)
     all_targets.update(config.shared_mount_targets)
+    limited = config.resources.services
+    pins = image_pins or {}
+    known = _compose_services(config, worktree_path)
+    label_lines = [
+        f"      {key}: {json.dumps(value)}"
+        for key, value in slot_labels(slot).items()
+    ]
 
-    if all_targets:
+    services = all_targets | set(limited) | set(pins) | set(known or ())
+    if known is not None:
+        # A stanza for a service the worktree lacks would fail `up`
+        services &= set(known)
+    if services:
         lines.append("services:")
-        for target in sorted(all_targets):
+        for target in sorted(services):
             lines.append(f"  {target}:")
 
+            # Content-addressed image for build services
+            if target in pins:
+                lines.append(f"    image: {pins[target]}")
+
+            # Resource limits
+            if target in limited:
+                lines.extend(_build_resource_lines(limited[target]))
+
+            # Self-describing containers (see devops_ai.labels)
+            lines.append("    labels:")
+            lines.extend(label_lines)
+
+            if target not in all_targets:
+                continue
+
             # Observability network + OTEL env (always included)
             lines += [
                 "    networks:",
@@ -143,7 +293,7 @@ def generate_override(
                 lines.extend(volumes)
 
     override_path = slot_dir / "docker-compose.override.yml"
-    override_path.write_text("\n".join(lines) + "\n")
+    _write_if_changed(override_path, "\n".join(lines) + "\n")
     return override_path
 
 
@@ -152,6 +302,40 @@ def generate_override(
 # ---------------------------------------------------------------------------
 
 
+def compute_slot_hash(
+    compose_files: Path | Sequence[Path], slot_dir: Path
+) -> str:
+    """Hash everything that determines the sandbox's container config.
+
+    Covers the compose files (the whole graph, when given), the
+    generated override and the env files. Missing files hash as absent,
+    so a partially set up slot never matches a previously recorded hash.
+    """
+    if isinstance(compose_files, Path):
+        compose_files = [compose_files]
+    digest = hashlib.sha256()
+    inputs = [
+        *compose_files,
+        slot_dir / "docker-compose.override.yml",
+        *_env_files_for_slot(slot_dir),
+    ]
+    for path in inputs:
+        digest.update(path.name.encode() + b"\0")
+        try:
+            digest.update(path.read_bytes())
+        except OSError:
+            digest.update(b"<missing>")
+        digest.update(b"\0")
+    return digest.hexdigest()
+
+
+def _read_slot_hash(slot_dir: Path) -> str | None:
+    try:
+        return (slot_dir / SLOT_HASH_FILE).read_text().strip() or None
+    except OSError:
+        return None
+
+
 def _env_files_for_slot(slot_dir: Path) -> list[Path]:
     """Return env files for a slot: .env.sandbox + .env.secrets if it exists."""
     files = [slot_dir / ".env.sandbox"]
@@ -166,16 +350,17 @@ def _compose_cmd(
     override_file: str | Path,
     env_files: Sequence[str | Path],
     action: list[str],
+    extra_files: Sequence[str | Path] = (),
 ) -> list[str]:
-    """Build a docker compose command with absolute paths."""
-    cmd = [
-        "docker",
-        "compose",
-        "-f",
-        str(compose_file),
-        "-f",
-        str(override_file),
-    ]
+    """Build a docker compose command with absolute paths.
+
+    ``extra_files`` are layered between the compose file and the
+    generated override.
+    """
+    cmd = ["docker", "compose", "-f", str(compose_file)]
+    for extra in extra_files:
+        cmd.extend(["-f", str(extra)])
+    cmd.extend(["-f", str(override_file)])
     for ef in env_files:
         cmd.extend(["--env-file", str(ef)])
     cmd.extend(action)
@@ -189,14 +374,29 @@ def start_sandbox(
 ) -> None:
     """Start sandbox containers using worktree's compose file.
 
+    If the compose file, override and env files hash the same as on the
+    last successful start, containers are left as they are
+    (``up -d --no-recreate``) instead of being recreated.
+
     On failure, runs compose down to clean partial containers, then raises.
     """
     slot_dir = Path(slot.slot_dir)
     compose_file = worktree_path / config.compose_file
+    overrides = [worktree_path / f for f in config.compose_overrides]
     override_file = slot_dir / "docker-compose.override.yml"
     env_files = _env_files_for_slot(slot_dir)
 
-    cmd = _compose_cmd(compose_file, override_file, env_files, ["up", "-d"])
+    slot_hash = compute_slot_hash(
+        compose_graph_files(compose_file, overrides), slot_dir
+    )
+    action = ["up", "-d"]
+    if slot_hash == _read_slot_hash(slot_dir):
+        logger.info("Sandbox config unchanged, skipping recreation")
+        action.append("--no-recreate")
+
+    cmd = _compose_cmd(
+        compose_file, override_file, env_files, action, overrides
+    )
     logger.info("Starting sandbox: %s", " ".join(cmd))
 
     try:
@@ -210,28 +410,65 @@ def start_sandbox(
         logger.error("Sandbox start failed: %s", result.stderr)
         # Cleanup partial containers
         down_cmd = _compose_cmd(
-            compose_file, override_file, env_files, ["down"]
+            compose_file, override_file, env_files, ["down"], overrides
         )
         subprocess.run(down_cmd, capture_output=True, text=True)
+        (slot_dir / SLOT_HASH_FILE).unlink(missing_ok=True)
         raise RuntimeError(
             f"Sandbox failed to start: {result.stderr.strip()}"
         )
 
+    if slot_dir.is_dir():
+        (slot_dir / SLOT_HASH_FILE).write_text(slot_hash + "\n")
+
 
-def stop_sandbox(slot: SlotInfo) -> None:
+def stop_sandbox(slot: SlotInfo, check: bool = False) -> None:
     """Stop sandbox containers using slot dir's compose copy.
 
     Uses the compose copy (not worktree) because the worktree might
-    already be removed. Errors are ignored (best-effort cleanup).
+    already be removed. Errors are ignored (best-effort cleanup) unless
+    ``check``, in which case RuntimeError is raised when Docker is
+    missing or ``docker compose down`` fails.
     """
     slot_dir = Path(slot.slot_dir)
-    compose_file = slot.compose_file_copy
+    compose_file, *overrides = _snapshot_compose_files(slot)
     override_file = slot_dir / "docker-compose.override.yml"
     env_files = _env_files_for_slot(slot_dir)
 
-    cmd = _compose_cmd(compose_file, override_file, env_files, ["down"])
+    cmd = _compose_cmd(
+        compose_file, override_file, env_files, ["down"], overrides
+    )
     logger.info("Stopping sandbox: %s", " ".join(cmd))
 
+    try:
+        result = subprocess.run(cmd, capture_output=True, text=True)
+    except FileNotFoundError:
+        if check:
+            raise RuntimeError("Docker not found, cannot stop sandbox")
+        logger.warning("Docker not found, cannot stop sandbox")
+        return
+    if check and result.returncode != 0:
+        raise RuntimeError(
+            f"docker compose down failed: {result.stderr.strip()}"
+        )
+
+
+def teardown_stale_slot(slot: SlotInfo) -> None:
+    """Stop a stale slot's containers and delete what is left of its dir.
+
+    Works after the slot dir is gone: containers are then found through
+    their compose project name instead of the compose copy.
+    """
+    slot_dir = Path(slot.slot_dir)
+    if slot_dir.exists():
+        stop_sandbox(slot)
+        remove_slot_dir(slot_dir)
+        return
+    cmd = [
+        "docker", "compose", "-p", slot.compose_project,
+        "down", "--remove-orphans",
+    ]
+    logger.info("Stopping orphaned sandbox: %s", " ".join(cmd))
     try:
         subprocess.run(cmd, capture_output=True, text=True)
     except FileNotFoundError:
@@ -0,0 +1,119 @@
+"""Run cleanup steps as a small dependency graph.
+
+Each step names the steps it must wait for. Independent steps run
+concurrently in a thread pool (they are subprocess- or I/O-bound). A
+step whose dependency failed or was skipped is skipped too, so for
+example a slot is never released when its containers could not be
+stopped.
+"""
+
+from __future__ import annotations
+
+import time
+from collections.abc import Callable, Sequence
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor
+from concurrent.futures import wait as wait_futures
+from dataclasses import dataclass
+
+DEFAULT_MAX_WORKERS = 4
+
+
+@dataclass
+class Step:
+    """One unit of teardown work."""
+
+    name: str
+    fn: Callable[[], object]
+    after: tuple[str, ...] = ()
+
+
+@dataclass
+class StepResult:
+    """Outcome of one step. ``duration`` is None if it never ran."""
+
+    name: str
+    duration: float | None = None
+    error: Exception | None = None
+
+    @property
+    def ok(self) -> bool:
+        return self.duration is not None and self.error is None
+
+
+def _check_graph(steps: Sequence[Step]) -> None:
+    """Raise ValueError on duplicate names, unknown deps or cycles."""
+    names = [s.name for s in steps]
+    if len(set(names)) != len(names):
+        raise ValueError(f"Duplicate step names: {names}")
+    deps = {s.name: set(s.after) for s in steps}
+    for name, after in deps.items():
+        unknown = after - deps.keys()
+        if unknown:
+            raise ValueError(
+                f"Step '{name}' depends on unknown {sorted(unknown)}"
+            )
+    done: set[str] = set()
+    while len(done) < len(deps):
+        ready = {n for n, a in deps.items() if n not in done and a <= done}
+        if not ready:
+            raise ValueError(
+                f"Dependency cycle among {sorted(deps.keys() - done)}"
+            )
+        done |= ready
+
+
+def _timed(step: Step) -> StepResult:
+    start = time.perf_counter()
+    try:
+        step.fn()
+    except Exception as e:
+        return StepResult(step.name, time.perf_counter() - start, e)
+    return StepResult(step.name, time.perf_counter() - start)
+
+
+def run_steps(
+    steps: Sequence[Step], max_workers: int = DEFAULT_MAX_WORKERS
+) -> dict[str, StepResult]:
+    """Run ``steps`` respecting their ``after`` dependencies.
+
+    Returns results keyed by step name, in declaration order. Step
+    exceptions are captured in the results, never raised. Raises
+    ValueError if the graph is malformed.
+    """
+    _check_graph(steps)
+    results: dict[str, StepResult] = {}
+    pending = list(steps)
+    running: dict[Future[StepResult], Step] = {}
+
+    with ThreadPoolExecutor(max_workers=max(1, max_workers)) as pool:
+        while pending or running:
+            for step in list(pending):
+                deps = [results.get(name) for name in step.after]
+                if any(r is not None and not r.ok for r in deps):
+                    results[step.name] = StepResult(step.name)
+                    pending.remove(step)
+                elif all(r is not None for r in deps):
+                    running[pool.submit(_timed, step)] = step
+                    pending.remove(step)
+            if not running:
+                # Everything left was just skipped; re-scan for its dependents
+                continue
+            finished, _ = wait_futures(running, return_when=FIRST_COMPLETED)
+            for future in finished:
+                step = running.pop(future)
+                results[step.name] = future.result()
+
+    return {s.name: results[s.name] for s in steps}
+
+
+def format_durations(results: dict[str, StepResult]) -> str:
+    """One-line summary like ``compose down 2.31s, worktree 0.12s``."""
+    parts = []
+    for name, result in results.items():
+        if result.duration is None:
+            parts.append(f"{name} skipped")
+        elif result.error is not None:
+            parts.append(f"{name} failed after {result.duration:.2f}s")
+        else:
+            parts.append(f"{name} {result.duration:.2f}s")
+    return ", ".join(parts)
@@ -2,8 +2,10 @@
 
 from __future__ import annotations
 
+import os
 import re
 import subprocess
+from collections.abc import Sequence
 from dataclasses import dataclass
 from pathlib import Path
 
@@ -16,6 +18,9 @@ class DirtyState:
 
     has_uncommitted: bool = False
     has_unpushed: bool = False
+    upstream: str | None = None
+    ahead: int = 0  # commits on HEAD not on upstream
+    behind: int = 0  # commits on upstream not on HEAD
 
     @property
     def is_dirty(self) -> bool:
@@ -66,7 +71,10 @@ def impl_branch_name(feature: str, milestone: str) -> str:
 
 
 def _run_git(
-    args: list[str], cwd: Path, check: bool = True
+    args: list[str],
+    cwd: Path,
+    check: bool = True,
+    timeout: float | None = None,
 ) -> subprocess.CompletedProcess[str]:
     """Run a git command and return the result."""
     return subprocess.run(
@@ -75,21 +83,49 @@ def _run_git(
         capture_output=True,
         text=True,
         check=check,
+        timeout=timeout,
+    )
+
+
+def _add_worktree(
+    repo_root: Path,
+    prefix: str,
+    wt_path: Path,
+    branch: str,
+    pool_size: int = 0,
+    checkout: bool = True,
+) -> None:
+    """``git worktree add -b``, claiming a pooled worktree if one is ready.
+
+    A claimed worktree is always checked out, whatever ``checkout`` says.
+    """
+    if pool_size > 0:
+        from devops_ai.worktree_pool import claim_worktree, spawn_refill
+
+        claimed = claim_worktree(repo_root, prefix, wt_path, branch)
+        spawn_refill(repo_root, prefix, pool_size)
+        if claimed:
+            return
+    no_checkout = [] if checkout else ["--no-checkout"]
+    _run_git(
+        ["worktree", "add", *no_checkout, "-b", branch, str(wt_path)],
+        cwd=repo_root,
     )
 
 
 def create_spec_worktree(
-    repo_root: Path, prefix: str, feature: str
+    repo_root: Path, prefix: str, feature: str, pool_size: int = 0
 ) -> Path:
-    """Create a spec worktree and its design directory."""
+    """Create a spec worktree and its design directory.
+
+    With ``pool_size``, a pre-created worktree is claimed when available
+    and the pool is refilled in the background.
+    """
     validate_feature_name(feature)
     wt_path = spec_worktree_path(repo_root, prefix, feature)
     branch = spec_branch_name(feature)
 
-    _run_git(
-        ["worktree", "add", "-b", branch, str(wt_path)],
-        cwd=repo_root,
-    )
+    _add_worktree(repo_root, prefix, wt_path, branch, pool_size)
 
     # Create design directory in the worktree
     design_dir = wt_path / "docs" / "designs" / feature
@@ -99,23 +135,74 @@ def create_spec_worktree(
 
 
 def create_impl_worktree(
-    repo_root: Path, prefix: str, feature: str, milestone: str
+    repo_root: Path,
+    prefix: str,
+    feature: str,
+    milestone: str,
+    sparse: Sequence[str] = (),
+    checkout: bool = True,
+    pool_size: int = 0,
 ) -> Path:
-    """Create an impl worktree."""
+    """Create an impl worktree.
+
+    With ``sparse`` directories, the worktree gets a cone-mode sparse
+    checkout of just those directories (plus top-level files). With
+    ``checkout=False`` it is left unpopulated for ``start_checkout``.
+    Without ``sparse``, a pooled worktree is claimed when ``pool_size``
+    is set.
+    """
     validate_feature_name(feature)
     wt_path = impl_worktree_path(
         repo_root, prefix, feature, milestone
     )
     branch = impl_branch_name(feature, milestone)
 
+    if not sparse:
+        _add_worktree(
+            repo_root, prefix, wt_path, branch, pool_size, checkout
+        )
+        return wt_path
+
+    _add_worktree(repo_root, prefix, wt_path, branch, checkout=False)
+    # Stored per worktree (git enables extensions.worktreeConfig)
     _run_git(
-        ["worktree", "add", "-b", branch, str(wt_path)],
-        cwd=repo_root,
+        ["sparse-checkout", "set", "--cone", "--", *sparse],
+        cwd=wt_path,
     )
-
+    if checkout:
+        _run_git(["read-tree", "-mu", "HEAD"], cwd=wt_path)
     return wt_path
 
 
+def start_checkout(
+    wt_path: Path, detach: bool = False
+) -> subprocess.Popen[str]:
+    """Populate a worktree created with ``checkout=False``.
+
+    Runs ``git read-tree -mu HEAD`` (which honours sparse patterns) and
+    returns without waiting. Pass the handle to ``finish_checkout``; a
+    ``detach``-ed checkout outlives the calling process and its errors
+    are discarded.
+    """
+    return subprocess.Popen(
+        ["git", "read-tree", "-mu", "HEAD"],
+        cwd=wt_path,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL if detach else subprocess.PIPE,
+        text=True,
+        start_new_session=detach,
+    )
+
+
+def finish_checkout(proc: subprocess.Popen[str]) -> None:
+    """Wait for ``start_checkout``. Raises CalledProcessError on failure."""
+    _, stderr = proc.communicate()
+    if proc.returncode:
+        raise subprocess.CalledProcessError(
+            proc.returncode, proc.args, stderr=stderr
+        )
+
+
 def remove_worktree(
     repo_root: Path, wt_path: Path, force: bool = False
 ) -> None:
@@ -126,44 +213,79 @@ def remove_worktree(
     _run_git(args, cwd=repo_root)
 
 
-def check_dirty(path: Path) -> DirtyState:
-    """Check a worktree for uncommitted changes and unpushed commits."""
-    # Uncommitted changes
+def merged_branches(repo_root: Path, base: str) -> set[str]:
+    """Local branches whose tips are reachable from ``base``."""
     result = _run_git(
-        ["status", "--porcelain"], cwd=path, check=False
+        ["branch", "--merged", base, "--format=%(refname:short)"],
+        cwd=repo_root,
     )
-    has_uncommitted = bool(result.stdout.strip())
+    return {line.strip() for line in result.stdout.splitlines() if line}
+
+
+def check_dirty(path: Path, timeout: float | None = None) -> DirtyState:
+    """Check a worktree for uncommitted changes and unpushed commits.
 
-    # Unpushed commits (only if upstream exists)
-    has_unpushed = False
-    upstream = _run_git(
-        ["rev-parse", "--abbrev-ref", "--symbolic-full-name", "@{u}"],
+    One ``git status --porcelain=v2 --branch`` call reports both: header
+    lines carry the upstream and ahead/behind counts, every other line is
+    a changed or untracked path. Raises subprocess.TimeoutExpired if
+    ``timeout`` elapses.
+    """
+    result = _run_git(
+        ["status", "--porcelain=v2", "--branch"],
         cwd=path,
         check=False,
+        timeout=timeout,
     )
-    if upstream.returncode == 0:
-        unpushed = _run_git(
-            ["log", "@{u}..HEAD", "--oneline"],
-            cwd=path,
-            check=False,
-        )
-        has_unpushed = bool(unpushed.stdout.strip())
-
-    return DirtyState(
-        has_uncommitted=has_uncommitted,
-        has_unpushed=has_unpushed,
-    )
+    return parse_status_v2(result.stdout)
+
+
+def parse_status_v2(output: str) -> DirtyState:
+    """Parse ``git status --porcelain=v2 --branch`` output."""
+    state = DirtyState()
+    for line in output.splitlines():
+        if line.startswith("# branch.upstream "):
+            state.upstream = line.split(" ", 2)[2]
+        elif line.startswith("# branch.ab "):
+            # "# branch.ab +<ahead> -<behind>"; absent if upstream is gone
+            _, _, ahead, behind = line.split(" ")
+            state.ahead = int(ahead.lstrip("+"))
+            state.behind = int(behind.lstrip("-"))
+        elif line and not line.startswith("#"):
+            state.has_uncommitted = True
+    state.has_unpushed = state.ahead > 0
+    return state
 
 
 def list_worktrees(
-    repo_root: Path, prefix: str
+    repo_root: Path, prefix: str, fast: bool = True
 ) -> list[WorktreeInfo]:
-    """List all worktrees, identifying spec/impl by prefix matching."""
+    """List all worktrees, identifying spec/impl by prefix matching.
+
+    With ``fast`` (the default) worktree metadata is read straight from
+    the git directory; whenever that layout is not the plain one git
+    itself would report on, this falls back to ``git worktree list``.
+    """
+    entries = _read_worktree_metadata(repo_root) if fast else None
+    if entries is None:
+        entries = _git_worktree_list(repo_root)
+    worktrees: list[WorktreeInfo] = []
+    for path, branch in entries:
+        wt_type, feature = _classify_worktree(path, prefix)
+        worktrees.append(
+            WorktreeInfo(
+                path=path, branch=branch, wt_type=wt_type, feature=feature
+            )
+        )
+    return worktrees
+
+
+def _git_worktree_list(repo_root: Path) -> list[tuple[Path, str]]:
+    """(path, branch) pairs from ``git worktree list --porcelain``."""
     result = _run_git(
         ["worktree", "list", "--porcelain"], cwd=repo_root
     )
 
-    worktrees: list[WorktreeInfo] = []
+    entries: list[tuple[Path, str]] = []
     current_path: Path | None = None
     current_branch = ""
 
@@ -176,33 +298,82 @@ def list_worktrees(
             current_branch = ref.removeprefix("refs/heads/")
         elif line == "":
             if current_path is not None:
-                wt_type, feature = _classify_worktree(
-                    current_path, prefix
-                )
-                worktrees.append(
-                    WorktreeInfo(
-                        path=current_path,
-                        branch=current_branch,
-                        wt_type=wt_type,
-                        feature=feature,
-                    )
-                )
+                entries.append((current_path, current_branch))
                 current_path = None
                 current_branch = ""
 
     # Handle last entry (porcelain output may not end with blank line)
     if current_path is not None:
-        wt_type, feature = _classify_worktree(current_path, prefix)
-        worktrees.append(
-            WorktreeInfo(
-                path=current_path,
-                branch=current_branch,
-                wt_type=wt_type,
-                feature=feature,
-            )
-        )
-
-    return worktrees
+        entries.append((current_path, current_branch))
+
+    return entries
+
+
+# Environment variables that redirect git away from the on-disk layout
+_GIT_LAYOUT_ENV = ("GIT_DIR", "GIT_COMMON_DIR", "GIT_WORK_TREE")
+
+
+def _head_branch(head_file: Path) -> str | None:
+    """Branch checked out per a HEAD file; "" if detached, None if odd."""
+    head = head_file.read_text().strip()
+    if head.startswith("ref: "):
+        return head[5:].removeprefix("refs/heads/")
+    if re.fullmatch(r"[0-9a-f]{40}|[0-9a-f]{64}", head):
+        return ""
+    return None
+
+
+def _common_git_dir(repo_root: Path) -> Path | None:
+    """Locate the shared .git directory for the repo containing repo_root."""
+    for directory in (repo_root, *repo_root.parents):
+        dot_git = directory / ".git"
+        if dot_git.is_dir():
+            return dot_git
+        if dot_git.is_file():
+            # Linked worktree: "gitdir: <main>/.git/worktrees/<id>"
+            text = dot_git.read_text().strip()
+            if not text.startswith("gitdir: "):
+                return None
+            gitdir = directory / text[len("gitdir: "):]
+            common = (gitdir / "commondir").read_text().strip()
+            return (gitdir / common).resolve()
+    return None
+
+
+def _read_worktree_metadata(
+    repo_root: Path,
+) -> list[tuple[Path, str]] | None:
+    """(path, branch) pairs read from .git/worktrees without spawning git.
+
+    Mirrors ``git worktree list``: the main worktree first, then linked
+    worktrees sorted by path. Returns None when the layout is anything
+    but the plain one (bare repo, GIT_DIR overrides, unreadable or
+    unexpected metadata) so the caller can ask git instead.
+    """
+    if any(var in os.environ for var in _GIT_LAYOUT_ENV):
+        return None
+    try:
+        common = _common_git_dir(repo_root.resolve())
+        if common is None or common.name != ".git":
+            return None
+        main_branch = _head_branch(common / "HEAD")
+        if main_branch is None:
+            return None
+        linked: list[tuple[Path, str]] = []
+        meta_root = common / "worktrees"
+        if meta_root.is_dir():
+            for meta in meta_root.iterdir():
+                gitdir = Path((meta / "gitdir").read_text().strip())
+                if not gitdir.is_absolute():
+                    gitdir = (meta / gitdir).resolve()
+                branch = _head_branch(meta / "HEAD")
+                if branch is None or gitdir.name != ".git":
+                    return None
+                linked.append((gitdir.parent, branch))
+    except OSError:
+        return None
+    linked.sort(key=lambda entry: str(entry[0]))
+    return [(common.parent, main_branch), *linked]
 
 
 def _classify_worktree(
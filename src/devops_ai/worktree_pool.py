@@ -0,0 +1,200 @@
+"""Worktree pool — checked-out worktrees created ahead of time.
+
+With ``[worktree].pool_size`` set, kinfra keeps that many detached
+worktrees at the main checkout's HEAD in a hidden directory next to the
+repo (``.<prefix>-worktree-pool/``). Creating a spec or impl worktree
+claims one by renaming its directory, repairing git's link to it and
+creating the branch there, which only touches files that changed since
+the entry was last refreshed. A background ``python -m
+devops_ai.worktree_pool`` then tops the pool up and fast-forwards idle
+entries.
+
+Only ready entries ever sit directly in the pool directory, so a claim
+is a single atomic rename and needs no lock. Refills work on entries
+moved into a staging name and take a lock only against each other.
+Entries are ``git worktree lock``-ed so ``git worktree prune`` leaves
+them alone while they are being moved.
+"""
+
+from __future__ import annotations
+
+import argparse
+import fcntl
+import logging
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+from devops_ai.worktree import _run_git
+
+logger = logging.getLogger(__name__)
+
+_LOCK_REASON = "kinfra worktree pool"
+_STAGING_PREFIX = ".staging-"
+
+
+def pool_dir(repo_root: Path, prefix: str) -> Path:
+    """Directory holding a project's pooled worktrees."""
+    return repo_root.parent / f".{prefix}-worktree-pool"
+
+
+def pool_entries(directory: Path) -> list[Path]:
+    """Ready (claimable) entries, oldest name first."""
+    try:
+        entries = [
+            p
+            for p in directory.iterdir()
+            if not p.name.startswith(".") and (p / ".git").is_file()
+        ]
+    except FileNotFoundError:
+        return []
+    return sorted(entries, key=lambda p: p.name)
+
+
+def _head_commit(repo_root: Path) -> str:
+    return _run_git(["rev-parse", "HEAD"], cwd=repo_root).stdout.strip()
+
+
+def _move(repo_root: Path, src: Path, dest: Path) -> None:
+    """Rename a worktree directory and point git's metadata at it."""
+    os.rename(src, dest)
+    _run_git(["worktree", "repair", str(dest)], cwd=repo_root)
+
+
+def _discard(repo_root: Path, path: Path) -> None:
+    """Best-effort removal of a (locked) worktree."""
+    result = _run_git(
+        ["worktree", "remove", "--force", "--force", str(path)],
+        cwd=repo_root,
+        check=False,
+    )
+    if result.returncode != 0:
+        logger.warning(
+            "Could not remove pooled worktree %s: %s",
+            path,
+            result.stderr.strip(),
+        )
+
+
+def claim_worktree(
+    repo_root: Path, prefix: str, dest: Path, branch: str
+) -> bool:
+    """Turn a pooled worktree into ``dest`` on a new ``branch``.
+
+    The branch starts at the main checkout's HEAD, like ``git worktree
+    add -b``. Returns False when no entry could be claimed, so the
+    caller can create the worktree the usual way.
+    """
+    entries = pool_entries(pool_dir(repo_root, prefix))
+    if not entries:
+        return False
+    head = _head_commit(repo_root)
+    for entry in entries:
+        try:
+            os.rename(entry, dest)
+        except OSError:
+            continue  # claimed concurrently, or dest appeared
+        try:
+            _run_git(["worktree", "repair", str(dest)], cwd=repo_root)
+            _run_git(["worktree", "unlock", str(dest)], cwd=repo_root)
+            _run_git(["checkout", "-q", "-b", branch, head], cwd=dest)
+        except subprocess.CalledProcessError as e:
+            logger.warning(
+                "Pooled worktree %s unusable: %s", entry, e.stderr.strip()
+            )
+            _discard(repo_root, dest)
+            return False
+        return True
+    return False
+
+
+def refill_pool(repo_root: Path, prefix: str, size: int) -> int:
+    """Fast-forward idle entries and top the pool up to ``size``.
+
+    Returns the number of entries created. Does nothing if another
+    refill for the same pool is already running.
+    """
+    directory = pool_dir(repo_root, prefix)
+    directory.mkdir(parents=True, exist_ok=True)
+    with open(directory / ".lock", "a") as lock:
+        try:
+            fcntl.flock(lock.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except BlockingIOError:
+            return 0
+        head = _head_commit(repo_root)
+        entries = pool_entries(directory)
+
+        for entry in entries[size:]:
+            _discard(repo_root, entry)
+        for entry in entries[:size]:
+            _refresh_entry(repo_root, entry, head)
+
+        created = 0
+        names = {p.name for p in pool_entries(directory)}
+        index = 0
+        while len(names) < size:
+            index += 1
+            if str(index) in names:
+                continue
+            staging = directory / f"{_STAGING_PREFIX}{index}"
+            _run_git(
+                [
+                    "worktree", "add", "--detach",
+                    "--lock", "--reason", _LOCK_REASON,
+                    str(staging), head,
+                ],
+                cwd=repo_root,
+            )
+            _move(repo_root, staging, directory / str(index))
+            names.add(str(index))
+            created += 1
+        return created
+
+
+def _refresh_entry(repo_root: Path, entry: Path, head: str) -> None:
+    """Move an idle entry to ``head``, discarding it if that fails."""
+    current = _run_git(
+        ["rev-parse", "HEAD"], cwd=entry, check=False
+    ).stdout.strip()
+    if current == head:
+        return
+    staging = entry.with_name(f"{_STAGING_PREFIX}{entry.name}")
+    try:
+        _move(repo_root, entry, staging)
+    except (OSError, subprocess.CalledProcessError):
+        return  # claimed while we looked at it
+    try:
+        _run_git(["checkout", "-q", "--detach", head], cwd=staging)
+        _move(repo_root, staging, entry)
+    except (OSError, subprocess.CalledProcessError) as e:
+        logger.warning("Dropping stale pooled worktree %s: %s", entry, e)
+        _discard(repo_root, staging)
+
+
+def spawn_refill(repo_root: Path, prefix: str, size: int) -> None:
+    """Run ``refill_pool`` in a detached background process."""
+    subprocess.Popen(
+        [
+            sys.executable, "-m", "devops_ai.worktree_pool",
+            str(repo_root), prefix, str(size),
+        ],
+        stdin=subprocess.DEVNULL,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+        start_new_session=True,
+    )
+
+
+def main(argv: list[str] | None = None) -> None:
+    """Refill a pool: ``python -m devops_ai.worktree_pool ROOT PREFIX N``."""
+    parser = argparse.ArgumentParser(prog="devops_ai.worktree_pool")
+    parser.add_argument("repo_root", type=Path)
+    parser.add_argument("prefix")
+    parser.add_argument("size", type=int)
+    args = parser.parse_args(argv)
+    refill_pool(args.repo_root, args.prefix, args.size)
+
+
+if __name__ == "__main__":
+    main()
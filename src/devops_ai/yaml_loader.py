@@ -0,0 +1,81 @@
+"""Read-only YAML loading for detection and inspection code.
+
+Callers that only read compose files get plain dicts and lists from
+ruamel's safe loader. It runs on the libyaml-based C parser when
+ruamel.yaml.clib is installed and falls back to the pure-Python parser
+otherwise. Both apply YAML 1.2 scalar rules, so results never depend on
+which parser is present. The comment-preserving round-trip loader is not
+needed anywhere: ``rewrite_compose`` edits compose files line by line.
+
+Local tags such as Compose's ``!reset`` and ``!override`` are dropped:
+the tagged node loads as the plain value it would be untagged.
+"""
+
+from __future__ import annotations
+
+import logging
+from pathlib import Path
+from typing import Any
+
+from ruamel.yaml import YAML
+from ruamel.yaml import main as _ruamel_main
+from ruamel.yaml.constructor import SafeConstructor
+from ruamel.yaml.error import YAMLError
+from ruamel.yaml.nodes import Node, ScalarNode, SequenceNode
+
+logger = logging.getLogger(__name__)
+
+# True when ruamel.yaml.clib is importable and YAML(typ="safe") uses it
+HAS_C_LOADER: bool = getattr(_ruamel_main, "CParser", None) is not None
+
+_c_loader_broken = False
+
+
+class _LocalTagConstructor(SafeConstructor):
+    """Safe constructor that ignores ``!tag`` annotations."""
+
+
+def _untagged(
+    constructor: SafeConstructor, tag_suffix: str, node: Node
+) -> Any:
+    if isinstance(node, ScalarNode):
+        node.tag = constructor.loader.resolver.resolve(
+            ScalarNode, node.value, (True, False)
+        )
+    elif isinstance(node, SequenceNode):
+        node.tag = "tag:yaml.org,2002:seq"
+    else:
+        node.tag = "tag:yaml.org,2002:map"
+    return constructor.construct_non_recursive_object(node)
+
+
+_LocalTagConstructor.add_multi_constructor("!", _untagged)
+
+
+def _safe_yaml(pure: bool = False) -> YAML:
+    yaml = YAML(typ="safe", pure=pure)
+    yaml.Constructor = _LocalTagConstructor
+    return yaml
+
+
+def load_yaml(text: str) -> Any:
+    """Parse YAML text into plain Python data.
+
+    Raises ruamel.yaml.error.YAMLError on malformed input.
+    """
+    global _c_loader_broken
+    if HAS_C_LOADER and not _c_loader_broken:
+        try:
+            return _safe_yaml().load(text)
+        except YAMLError:
+            raise
+        except (AttributeError, ImportError, TypeError) as e:
+            # Mismatched clib build — use the pure parser from now on
+            logger.debug("C YAML loader unavailable, falling back: %s", e)
+            _c_loader_broken = True
+    return _safe_yaml(pure=True).load(text)
+
+
+def load_yaml_file(path: Path) -> Any:
+    """Read and parse a YAML file. Raises OSError or YAMLError."""
+    return load_yaml(path.read_text())
@@ -0,0 +1,232 @@
+"""Tests for admission control — headroom, quotas, and the FIFO wait queue."""
+
+from __future__ import annotations
+
+import json
+from pathlib import Path
+from unittest.mock import patch
+
+from devops_ai.admission import (
+    QueueEntry,
+    cgroup_memory_headroom,
+    check_admission,
+    check_queue,
+    dequeue,
+    enqueue,
+    load_queue,
+    memory_headroom,
+    queue_position,
+    read_mem_available,
+    wait_for_admission,
+)
+from devops_ai.cli.queue_cmd import queue_command
+from devops_ai.config import InfraConfig, ServiceResources, SlotResources
+from devops_ai.registry import Registry, SlotInfo
+
+MIB = 1024**2
+
+
+def _config(
+    max_slots: int | None = None,
+    mem_limit: str | None = None,
+    min_free_mem: str | None = None,
+) -> InfraConfig:
+    services = (
+        {"api": ServiceResources(mem_limit=mem_limit)} if mem_limit else {}
+    )
+    return InfraConfig(
+        project_name="proj",
+        prefix="proj",
+        has_sandbox=True,
+        max_slots=max_slots,
+        resources=SlotResources(min_free_mem=min_free_mem, services=services),
+    )
+
+
+def _slot(slot_id: int, project: str = "proj") -> SlotInfo:
+    return SlotInfo(
+        slot_id=slot_id,
+        project=project,
+        worktree_path=f"/wt{slot_id}",
+        slot_dir=f"/slot{slot_id}",
+        compose_file_copy="",
+        ports={},
+        claimed_at="2025-01-01T00:00:00",
+        status="running",
+    )
+
+
+class TestHeadroom:
+    def test_mem_available(self, tmp_path: Path) -> None:
+        meminfo = tmp_path / "meminfo"
+        meminfo.write_text("MemTotal: 4096 kB\nMemAvailable: 2048 kB\n")
+        assert read_mem_available(meminfo) == 2048 * 1024
+
+    def test_mem_available_missing(self, tmp_path: Path) -> None:
+        assert read_mem_available(tmp_path / "nope") is None
+
+    def test_cgroup_limit(self, tmp_path: Path) -> None:
+        (tmp_path / "memory.max").write_text(f"{1024 * MIB}\n")
+        (tmp_path / "memory.current").write_text(f"{256 * MIB}\n")
+        assert cgroup_memory_headroom(tmp_path) == 768 * MIB
+
+    def test_cgroup_unlimited(self, tmp_path: Path) -> None:
+        (tmp_path / "memory.max").write_text("max\n")
+        (tmp_path / "memory.current").write_text("1\n")
+        assert cgroup_memory_headroom(tmp_path) is None
+
+    def test_tighter_of_host_and_cgroup(self, tmp_path: Path) -> None:
+        meminfo = tmp_path / "meminfo"
+        meminfo.write_text(f"MemAvailable: {2048 * 1024} kB\n")
+        (tmp_path / "memory.max").write_text(f"{1024 * MIB}\n")
+        (tmp_path / "memory.current").write_text("0\n")
+        assert memory_headroom(meminfo, tmp_path) == 1024 * MIB
+
+
+class TestCheckAdmission:
+    def test_quota_reached(self) -> None:
+        reg = Registry(slots={1: _slot(1), 2: _slot(2), 3: _slot(3, "other")})
+        reason = check_admission(reg, _config(max_slots=2), headroom=None)
+        assert reason is not None
+        assert "quota" in reason
+
+    def test_quota_ignores_other_projects(self) -> None:
+        reg = Registry(slots={1: _slot(1, "other"), 2: _slot(2, "other")})
+        assert check_admission(reg, _config(max_slots=1)) is None
+
+    def test_insufficient_headroom(self) -> None:
+        reason = check_admission(
+            Registry(), _config(mem_limit="2g"), headroom=512 * MIB
+        )
+        assert reason is not None
+        assert "headroom" in reason
+
+    def test_min_free_mem_floor(self) -> None:
+        reason = check_admission(
+            Registry(), _config(min_free_mem="4g"), headroom=3 * 1024 * MIB
+        )
+        assert reason is not None
+
+    def test_admitted(self) -> None:
+        assert (
+            check_admission(
+                Registry(), _config(mem_limit="1g"), headroom=8 * 1024 * MIB
+            )
+            is None
+        )
+
+    def test_no_limits_skips_memory_check(self) -> None:
+        with patch("devops_ai.admission.memory_headroom") as mock_headroom:
+            assert check_admission(Registry(), _config()) is None
+        mock_headroom.assert_not_called()
+
+
+class TestQueue:
+    def test_fifo_positions(self, tmp_path: Path) -> None:
+        path = tmp_path / "queue.json"
+        a = enqueue("proj", "feat/M1", path)
+        b = enqueue("proj", "feat/M2", path)
+        assert queue_position(a.ticket, path) == 0
+        assert queue_position(b.ticket, path) == 1
+        dequeue(a.ticket, path)
+        assert queue_position(b.ticket, path) == 0
+        assert queue_position(a.ticket, path) is None
+
+    def test_dead_waiters_pruned(self, tmp_path: Path) -> None:
+        path = tmp_path / "queue.json"
+        dead = QueueEntry("dead", "proj", "feat/M1", 999_999_999, "t")
+        path.write_text(json.dumps([dead.__dict__]))
+        live = enqueue("proj", "feat/M2", path)
+        assert [e.ticket for e in load_queue(path)] == [live.ticket]
+
+    def test_load_queue_does_not_write(self, tmp_path: Path) -> None:
+        path = tmp_path / "queue.json"
+        dead = QueueEntry("dead", "proj", "feat/M1", 999_999_999, "t")
+        path.write_text(json.dumps([dead.__dict__]))
+        before = path.read_text()
+        assert load_queue(path) == []
+        assert path.read_text() == before
+        assert not path.with_suffix(".lock").exists()
+
+    def test_check_queue(self, tmp_path: Path) -> None:
+        path = tmp_path / "queue.json"
+        assert check_queue("proj", path) is None
+        enqueue("proj", "feat/M1", path)
+        assert (
+            check_queue("proj", path)
+            == "1 request(s) already queued for a slot"
+        )
+
+    def test_quota_blocked_head_lets_other_projects_pass(
+        self, tmp_path: Path
+    ) -> None:
+        path = tmp_path / "queue.json"
+        head = enqueue("a", "feat/M1", path)
+        data = json.loads(path.read_text())
+        data[0]["quota_blocked"] = True
+        path.write_text(json.dumps(data))
+
+        assert check_queue("b", path) is None
+        assert check_queue("a", path) is not None
+        other = enqueue("b", "feat/M1", path)
+        assert wait_for_admission(other, lambda: None, path, timeout=0)
+        assert queue_position(head.ticket, path) == 0
+
+    def test_head_marked_while_quota_blocked(self, tmp_path: Path) -> None:
+        path = tmp_path / "queue.json"
+        entry = enqueue("proj", "feat/M1", path)
+        quota = iter(["Project quota reached", None])
+        flags: list[bool] = []
+
+        def sleep(_: float) -> None:
+            flags.append(load_queue(path)[0].quota_blocked)
+
+        with patch("devops_ai.admission.time.sleep", side_effect=sleep):
+            assert wait_for_admission(
+                entry, lambda: None, path, quota=lambda: next(quota)
+            )
+        assert flags == [True]
+        assert load_queue(path)[0].quota_blocked is False
+
+    def test_only_head_is_admitted(self, tmp_path: Path) -> None:
+        path = tmp_path / "queue.json"
+        head = enqueue("proj", "feat/M1", path)
+        second = enqueue("proj", "feat/M2", path)
+        calls: list[str] = []
+
+        def admit() -> str | None:
+            calls.append("admit")
+            return None
+
+        with patch("devops_ai.admission.time.sleep"):
+            admitted = wait_for_admission(
+                second, admit, path, poll_interval=0, timeout=0
+            )
+        assert admitted is False
+        assert calls == []
+        assert queue_position(head.ticket, path) == 0
+
+    def test_head_admitted_when_capacity_frees(self, tmp_path: Path) -> None:
+        path = tmp_path / "queue.json"
+        entry = enqueue("proj", "feat/M1", path)
+        answers = iter(["busy", "busy", None])
+        with patch("devops_ai.admission.time.sleep") as mock_sleep:
+            assert wait_for_admission(
+                entry, lambda: next(answers), path, poll_interval=1
+            )
+        assert mock_sleep.call_count == 2
+
+
+class TestQueueCommand:
+    def test_empty(self, tmp_path: Path) -> None:
+        code, msg = queue_command(tmp_path / "queue.json")
+        assert code == 0
+        assert "No queued requests" in msg
+
+    def test_lists_positions(self, tmp_path: Path) -> None:
+        path = tmp_path / "queue.json"
+        enqueue("proj", "feat/M1", path)
+        enqueue("other", "x/M2", path)
+        code, msg = queue_command(path)
+        assert "1. proj feat/M1" in msg
+        assert "2. other x/M2" in msg
@@ -0,0 +1,201 @@
+"""Tests for build cache — context hashing and content-addressed image pins."""
+
+from __future__ import annotations
+
+from pathlib import Path
+
+from devops_ai.build_cache import (
+    BuildContext,
+    compute_image_pins,
+    hash_build_context,
+    image_tag,
+    load_build_contexts,
+)
+from devops_ai.config import InfraConfig
+
+COMPOSE = """\
+services:
+  api:
+    build: ./api
+  worker:
+    build:
+      context: .
+      dockerfile: docker/worker.Dockerfile
+  db:
+    image: postgres:16
+  tagged:
+    build: ./api
+    image: myorg/tagged:dev
+"""
+
+
+def _context(root: Path) -> Path:
+    ctx = root / "api"
+    (ctx / "src").mkdir(parents=True)
+    (ctx / "Dockerfile").write_text("FROM python:3.12\n")
+    (ctx / "src" / "main.py").write_text("print('hi')\n")
+    return ctx
+
+
+def _config(build_cache: bool = True) -> InfraConfig:
+    return InfraConfig(
+        project_name="MyProj",
+        prefix="myproj",
+        has_sandbox=True,
+        build_cache=build_cache,
+    )
+
+
+class TestLoadBuildContexts:
+    def test_short_and_long_forms(self, tmp_path: Path) -> None:
+        compose = tmp_path / "docker-compose.yml"
+        compose.write_text(COMPOSE)
+        contexts = load_build_contexts(compose)
+        assert set(contexts) == {"api", "worker"}
+        assert contexts["api"].context == (tmp_path / "api").resolve()
+        assert contexts["worker"].dockerfile == "docker/worker.Dockerfile"
+
+    def test_missing_file(self, tmp_path: Path) -> None:
+        assert load_build_contexts(tmp_path / "nope.yml") == {}
+
+    def test_args_and_target(self, tmp_path: Path) -> None:
+        compose = tmp_path / "docker-compose.yml"
+        compose.write_text(
+            "services:\n  api:\n    build:\n      context: ./api\n"
+            "      target: dev\n      args:\n        - PY=3.12\n"
+            "        - TOKEN\n"
+        )
+        build = load_build_contexts(compose)["api"]
+        assert build.args == {"PY": "3.12", "TOKEN": None}
+        assert build.target == "dev"
+
+    def test_override_and_included_builds(self, tmp_path: Path) -> None:
+        compose = tmp_path / "docker-compose.yml"
+        compose.write_text(
+            "include:\n  - infra/worker.yml\n"
+            "services:\n  api:\n    image: x\n"
+        )
+        (tmp_path / "infra").mkdir()
+        (tmp_path / "infra" / "worker.yml").write_text(
+            "services:\n  worker:\n    build: ./worker\n"
+        )
+        override = tmp_path / "docker-compose.dev.yml"
+        override.write_text(
+            "services:\n  web:\n    build:\n      context: ./web\n"
+        )
+        contexts = load_build_contexts(compose, [override])
+        assert contexts["worker"].context == (
+            tmp_path / "infra" / "worker"
+        ).resolve()
+        assert contexts["web"].context == (tmp_path / "web").resolve()
+
+
+class TestHashBuildContext:
+    def test_identical_contexts_match(self, tmp_path: Path) -> None:
+        a = _context(tmp_path / "a")
+        b = _context(tmp_path / "b")
+        assert hash_build_context(BuildContext(a)) == hash_build_context(
+            BuildContext(b)
+        )
+
+    def test_content_change_changes_hash(self, tmp_path: Path) -> None:
+        ctx = _context(tmp_path)
+        before = hash_build_context(BuildContext(ctx))
+        (ctx / "src" / "main.py").write_text("print('bye')\n")
+        assert hash_build_context(BuildContext(ctx)) != before
+
+    def test_dockerignored_files_excluded(self, tmp_path: Path) -> None:
+        ctx = _context(tmp_path)
+        (ctx / ".dockerignore").write_text("# junk\nnode_modules\n*.log\n")
+        before = hash_build_context(BuildContext(ctx))
+        (ctx / "node_modules").mkdir()
+        (ctx / "node_modules" / "x.js").write_text("x")
+        (ctx / "src" / "debug.log").write_text("noise")
+        assert hash_build_context(BuildContext(ctx)) == before
+
+    def test_negated_pattern_reincludes(self, tmp_path: Path) -> None:
+        ctx = _context(tmp_path)
+        (ctx / ".dockerignore").write_text("*.md\n!README.md\n")
+        before = hash_build_context(BuildContext(ctx))
+        (ctx / "NOTES.md").write_text("ignored")
+        assert hash_build_context(BuildContext(ctx)) == before
+        (ctx / "README.md").write_text("kept")
+        assert hash_build_context(BuildContext(ctx)) != before
+
+    def test_dockerfile_always_included(self, tmp_path: Path) -> None:
+        ctx = _context(tmp_path)
+        (ctx / ".dockerignore").write_text("Dockerfile\n")
+        before = hash_build_context(BuildContext(ctx))
+        (ctx / "Dockerfile").write_text("FROM python:3.13\n")
+        assert hash_build_context(BuildContext(ctx)) != before
+
+
+    def test_args_change_hash(self, tmp_path: Path) -> None:
+        ctx = _context(tmp_path)
+        a = BuildContext(ctx, args={"PY": "3.12"})
+        b = BuildContext(ctx, args={"PY": "3.13"})
+        assert hash_build_context(a) != hash_build_context(b)
+
+    def test_arg_order_irrelevant(self, tmp_path: Path) -> None:
+        ctx = _context(tmp_path)
+        a = BuildContext(ctx, args={"A": "1", "B": "2"})
+        b = BuildContext(ctx, args={"B": "2", "A": "1"})
+        assert hash_build_context(a) == hash_build_context(b)
+
+    def test_target_changes_hash(self, tmp_path: Path) -> None:
+        ctx = _context(tmp_path)
+        assert hash_build_context(
+            BuildContext(ctx, target="dev")
+        ) != hash_build_context(BuildContext(ctx, target="prod"))
+
+    def test_dockerfile_outside_context(self, tmp_path: Path) -> None:
+        ctx = _context(tmp_path)
+        outside = tmp_path / "docker" / "api.Dockerfile"
+        outside.parent.mkdir()
+        outside.write_text("FROM python:3.12\n")
+        build = BuildContext(ctx, dockerfile="../docker/api.Dockerfile")
+        before = hash_build_context(build)
+        outside.write_text("FROM python:3.13\n")
+        assert hash_build_context(build) != before
+
+
+class TestComputeImagePins:
+    def test_pins_build_services(self, tmp_path: Path) -> None:
+        _context(tmp_path)
+        (tmp_path / "docker-compose.yml").write_text(COMPOSE)
+        pins = compute_image_pins(_config(), tmp_path)
+        assert set(pins) == {"api", "worker"}
+        assert pins["api"].startswith("kinfra-myproj-api:")
+
+    def test_same_tag_across_worktrees(self, tmp_path: Path) -> None:
+        for wt in ("wt1", "wt2"):
+            _context(tmp_path / wt)
+            (tmp_path / wt / "docker-compose.yml").write_text(
+                "services:\n  api:\n    build: ./api\n"
+            )
+        assert compute_image_pins(
+            _config(), tmp_path / "wt1"
+        ) == compute_image_pins(_config(), tmp_path / "wt2")
+
+    def test_worktrees_differing_only_in_args(self, tmp_path: Path) -> None:
+        pins = []
+        for wt, py in (("wt1", "3.12"), ("wt2", "3.13")):
+            _context(tmp_path / wt)
+            (tmp_path / wt / "docker-compose.yml").write_text(
+                "services:\n  api:\n    build:\n      context: ./api\n"
+                f"      args:\n        PY: \"{py}\"\n"
+            )
+            pins.append(compute_image_pins(_config(), tmp_path / wt))
+        assert pins[0]["api"] != pins[1]["api"]
+
+    def test_disabled(self, tmp_path: Path) -> None:
+        _context(tmp_path)
+        (tmp_path / "docker-compose.yml").write_text(COMPOSE)
+        assert compute_image_pins(_config(build_cache=False), tmp_path) == {}
+
+
+class TestImageTag:
+    def test_lowercase_and_truncated(self) -> None:
+        assert image_tag("MyProj", "API", "a" * 64) == (
+            "kinfra-myproj-api:" + "a" * 16
+        )
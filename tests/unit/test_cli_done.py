@@ -128,3 +128,75 @@ class TestDoneAmbiguousMatch:
 
         # Cleanup
         remove_worktree(git_repo, wt2, force=True)
+
+
+class TestDoneMany:
+    def test_all_removes_every_managed_worktree(
+        self, git_repo: Path
+    ) -> None:
+        from devops_ai.cli.done import done_many_command
+
+        prefix = git_repo.name
+        wt1 = create_spec_worktree(git_repo, prefix, "feat-a")
+        wt2 = create_spec_worktree(git_repo, prefix, "feat-b")
+
+        exit_code, msg = done_many_command(
+            repo_root=git_repo, all_worktrees=True
+        )
+        assert exit_code == 0, msg
+        assert not wt1.exists()
+        assert not wt2.exists()
+        assert git_repo.exists()
+
+    def test_dirty_skipped_others_removed(self, git_repo: Path) -> None:
+        from devops_ai.cli.done import done_many_command
+
+        prefix = git_repo.name
+        clean = create_spec_worktree(git_repo, prefix, "feat-a")
+        dirty = create_spec_worktree(git_repo, prefix, "feat-b")
+        (dirty / "dirty.txt").write_text("dirty")
+
+        exit_code, msg = done_many_command(
+            ["feat-a", "feat-b"], repo_root=git_repo
+        )
+        assert exit_code == 1
+        assert not clean.exists()
+        assert dirty.exists()
+        assert "Skipped 'feat-b'" in msg
+
+        remove_worktree(git_repo, dirty, force=True)
+
+    def test_merged_selects_merged_branches(self, git_repo: Path) -> None:
+        from devops_ai.cli.done import done_many_command
+
+        prefix = git_repo.name
+        merged = create_spec_worktree(git_repo, prefix, "feat-a")
+        ahead = create_spec_worktree(git_repo, prefix, "feat-b")
+        (ahead / "new.txt").write_text("work")
+        subprocess.run(
+            ["git", "add", "."], cwd=ahead, check=True, capture_output=True
+        )
+        subprocess.run(
+            ["git", "commit", "-m", "work"],
+            cwd=ahead,
+            check=True,
+            capture_output=True,
+        )
+
+        exit_code, msg = done_many_command(
+            repo_root=git_repo, merged=True
+        )
+        assert exit_code == 0, msg
+        assert not merged.exists()
+        assert ahead.exists()
+
+        remove_worktree(git_repo, ahead, force=True)
+
+    def test_unknown_name_reported(self, git_repo: Path) -> None:
+        from devops_ai.cli.done import done_many_command
+
+        exit_code, msg = done_many_command(
+            ["nope", "missing"], repo_root=git_repo
+        )
+        assert exit_code == 1
+        assert "No worktree found matching 'nope'" in msg
@@ -5,8 +5,14 @@ from __future__ import annotations
 from pathlib import Path
 from unittest.mock import MagicMock, patch
 
-from devops_ai.cli.done import done_command
-from devops_ai.registry import Registry, SlotInfo
+from devops_ai.cli.done import done_command, done_many_command
+from devops_ai.registry import (
+    Registry,
+    SlotInfo,
+    load_registry,
+    release_slots,
+    save_registry,
+)
 from devops_ai.worktree import WorktreeInfo
 
 
@@ -74,7 +80,7 @@ class TestDoneWithSandbox:
             code, msg = done_command("feat-M1", repo_root=tmp_path)
 
         assert code == 0
-        mock_stop.assert_called_once_with(slot)
+        mock_stop.assert_called_once_with(slot, check=True)
 
     def test_removes_slot_dir(self, tmp_path: Path) -> None:
         """Slot dir deleted."""
@@ -138,8 +144,8 @@ class TestDoneWithSandbox:
         assert code == 0
         mock_rel.assert_called_once()
 
-    def test_ordering_stop_before_remove(self, tmp_path: Path) -> None:
-        """Stop containers before remove worktree."""
+    def test_ordering_stop_before_release(self, tmp_path: Path) -> None:
+        """Slot is released only after containers are stopped."""
         wt_path = tmp_path / "worktree"
         wt_path.mkdir()
         slot_dir = tmp_path / "slot"
@@ -153,8 +159,8 @@ class TestDoneWithSandbox:
         def track_stop(*a, **kw):  # noqa: ANN002, ANN003
             call_order.append("stop")
 
-        def track_remove(*a, **kw):  # noqa: ANN002, ANN003
-            call_order.append("remove_wt")
+        def track_release(*a, **kw):  # noqa: ANN002, ANN003
+            call_order.append("release")
 
         with (
             patch(
@@ -171,16 +177,97 @@ class TestDoneWithSandbox:
                 "devops_ai.cli.done.stop_sandbox", side_effect=track_stop
             ),
             patch("devops_ai.cli.done.remove_slot_dir"),
+            patch(
+                "devops_ai.cli.done.release_slot",
+                side_effect=track_release,
+            ),
+            patch("devops_ai.cli.done.remove_worktree"),
+        ):
+            mock_dirty.return_value = MagicMock(is_dirty=False)
+            done_command("feat-M1", repo_root=tmp_path)
+
+        assert call_order == ["stop", "release"]
+
+    def test_failed_stop_keeps_slot(self, tmp_path: Path) -> None:
+        """Neither the slot nor the still-mounted worktree is removed."""
+        wt_path = tmp_path / "worktree"
+        wt_path.mkdir()
+        slot_dir = tmp_path / "slot"
+        slot_dir.mkdir()
+        slot = _slot(
+            worktree_path=str(wt_path), slot_dir=str(slot_dir)
+        )
+        registry = _registry_with_slot(slot)
+
+        with (
+            patch(
+                "devops_ai.cli.done.list_worktrees",
+                return_value=_mock_worktrees(wt_path, "test"),
+            ),
+            patch("devops_ai.cli.done.check_dirty") as mock_dirty,
+            patch("devops_ai.cli.done.load_registry", return_value=registry),
+            patch(
+                "devops_ai.cli.done.get_slot_for_worktree",
+                return_value=slot,
+            ),
+            patch(
+                "devops_ai.cli.done.stop_sandbox",
+                side_effect=RuntimeError("daemon gone"),
+            ),
+            patch("devops_ai.cli.done.remove_slot_dir") as mock_rmsd,
+            patch("devops_ai.cli.done.release_slot") as mock_rel,
+            patch("devops_ai.cli.done.remove_worktree") as mock_rm,
+        ):
+            mock_dirty.return_value = MagicMock(is_dirty=False)
+            code, msg = done_command("feat-M1", repo_root=tmp_path)
+
+        assert code == 1
+        mock_rm.assert_not_called()
+        mock_rmsd.assert_not_called()
+        mock_rel.assert_not_called()
+        assert f"slot 1 and worktree {wt_path} kept" in msg
+        assert "release slot skipped" in msg
+        assert "worktree skipped" in msg
+
+    def test_worktree_removed_after_stop(self, tmp_path: Path) -> None:
+        """Containers bind-mount the worktree, so it goes after them."""
+        wt_path = tmp_path / "worktree"
+        wt_path.mkdir()
+        slot_dir = tmp_path / "slot"
+        slot_dir.mkdir()
+        slot = _slot(
+            worktree_path=str(wt_path), slot_dir=str(slot_dir)
+        )
+        registry = _registry_with_slot(slot)
+        call_order: list[str] = []
+
+        with (
+            patch(
+                "devops_ai.cli.done.list_worktrees",
+                return_value=_mock_worktrees(wt_path, "test"),
+            ),
+            patch("devops_ai.cli.done.check_dirty") as mock_dirty,
+            patch("devops_ai.cli.done.load_registry", return_value=registry),
+            patch(
+                "devops_ai.cli.done.get_slot_for_worktree",
+                return_value=slot,
+            ),
+            patch(
+                "devops_ai.cli.done.stop_sandbox",
+                side_effect=lambda *a, **kw: call_order.append("stop"),
+            ),
+            patch("devops_ai.cli.done.remove_slot_dir"),
             patch("devops_ai.cli.done.release_slot"),
             patch(
                 "devops_ai.cli.done.remove_worktree",
-                side_effect=track_remove,
+                side_effect=lambda *a, **kw: call_order.append("worktree"),
             ),
         ):
             mock_dirty.return_value = MagicMock(is_dirty=False)
-            done_command("feat-M1", repo_root=tmp_path)
+            code, _ = done_command("feat-M1", repo_root=tmp_path)
 
-        assert call_order == ["stop", "remove_wt"]
+        assert code == 0
+        assert call_order == ["stop", "worktree"]
 
     def test_missing_slot_dir_graceful(self, tmp_path: Path) -> None:
         """Slot dir missing → skip Docker stop, still clean registry."""
@@ -248,3 +335,171 @@ class TestDoneWithSandbox:
 
         assert code == 0
         assert "removed" in msg.lower()
+
+
+class TestDoneManyWithSandbox:
+    def test_releases_all_slots_in_one_write(self, tmp_path: Path) -> None:
+        worktrees = []
+        slots = {}
+        for slot_id in (1, 2):
+            wt_path = tmp_path / f"worktree-{slot_id}"
+            slot_dir = tmp_path / f"slot-{slot_id}"
+            slot_dir.mkdir()
+            worktrees.append(
+                WorktreeInfo(
+                    path=wt_path,
+                    branch=f"impl/feat{slot_id}-M1",
+                    wt_type="impl",
+                    feature=f"feat{slot_id}-M1",
+                )
+            )
+            slots[wt_path] = _slot(slot_id, str(wt_path), str(slot_dir))
+        registry = Registry(
+            version=1, slots={s.slot_id: s for s in slots.values()}
+        )
+
+        with (
+            patch(
+                "devops_ai.cli.done.list_worktrees", return_value=worktrees
+            ),
+            patch("devops_ai.cli.done.check_dirty") as mock_dirty,
+            patch("devops_ai.cli.done.load_registry", return_value=registry),
+            patch(
+                "devops_ai.cli.done.get_slot_for_worktree",
+                side_effect=lambda reg, path: slots.get(path),
+            ),
+            patch("devops_ai.cli.done.stop_sandbox") as mock_stop,
+            patch("devops_ai.cli.done.remove_slot_dir"),
+            patch("devops_ai.cli.done.release_slots") as mock_rel,
+            patch("devops_ai.cli.done.remove_worktree") as mock_rm,
+        ):
+            mock_dirty.return_value = MagicMock(is_dirty=False)
+            code, msg = done_many_command(
+                repo_root=tmp_path, all_worktrees=True
+            )
+
+        assert code == 0, msg
+        assert mock_stop.call_count == 2
+        assert mock_rm.call_count == 2
+        mock_rel.assert_called_once()
+        assert sorted(mock_rel.call_args.args[1]) == [1, 2]
+        assert "Released slot 2" in msg
+
+    def test_failed_teardown_keeps_slot_and_worktree(
+        self, tmp_path: Path
+    ) -> None:
+        worktrees = []
+        slots = {}
+        for slot_id in (1, 2):
+            wt_path = tmp_path / f"worktree-{slot_id}"
+            slot_dir = tmp_path / f"slot-{slot_id}"
+            slot_dir.mkdir()
+            worktrees.append(
+                WorktreeInfo(
+                    path=wt_path,
+                    branch=f"impl/feat{slot_id}-M1",
+                    wt_type="impl",
+                    feature=f"feat{slot_id}-M1",
+                )
+            )
+            slots[wt_path] = _slot(slot_id, str(wt_path), str(slot_dir))
+        registry = Registry(
+            version=1, slots={s.slot_id: s for s in slots.values()}
+        )
+
+        def stop(slot: SlotInfo, **kwargs: object) -> None:
+            if slot.slot_id == 1:
+                raise RuntimeError("compose down failed")
+
+        with (
+            patch(
+                "devops_ai.cli.done.list_worktrees", return_value=worktrees
+            ),
+            patch("devops_ai.cli.done.check_dirty") as mock_dirty,
+            patch(
+                "devops_ai.cli.done.agent_deck.is_available",
+                return_value=False,
+            ),
+            patch("devops_ai.cli.done.load_registry", return_value=registry),
+            patch(
+                "devops_ai.cli.done.get_slot_for_worktree",
+                side_effect=lambda reg, path: slots.get(path),
+            ),
+            patch("devops_ai.cli.done.stop_sandbox", side_effect=stop),
+            patch("devops_ai.cli.done.remove_slot_dir"),
+            patch("devops_ai.cli.done.release_slots") as mock_rel,
+            patch("devops_ai.cli.done.remove_worktree") as mock_rm,
+        ):
+            mock_dirty.return_value = MagicMock(is_dirty=False)
+            code, msg = done_many_command(
+                repo_root=tmp_path, all_worktrees=True
+            )
+
+        assert code == 1
+        assert mock_rel.call_args.args[1] == [2]
+        removed = [c.args[1] for c in mock_rm.call_args_list]
+        assert removed == [tmp_path / "worktree-2"]
+        assert "slot 1 and worktree kept" in msg
+        assert "Released slot 2" in msg
+
+    def _run_one(
+        self, tmp_path: Path, **patches: object
+    ) -> tuple[int, str, MagicMock]:
+        wt_path = tmp_path / "worktree"
+        slot_dir = tmp_path / "slot"
+        slot_dir.mkdir()
+        worktrees = _mock_worktrees(wt_path, "test")
+        path = tmp_path / "registry.json"
+        save_registry(
+            _registry_with_slot(_slot(1, str(wt_path), str(slot_dir))), path
+        )
+
+        with (
+            patch("devops_ai.registry.DEFAULT_REGISTRY_PATH", path),
+            patch(
+                "devops_ai.cli.done.list_worktrees", return_value=worktrees
+            ),
+            patch("devops_ai.cli.done.check_dirty") as mock_dirty,
+            patch(
+                "devops_ai.cli.done.agent_deck.is_available",
+                return_value=False,
+            ),
+            patch(
+                "devops_ai.cli.done.stop_sandbox",
+                patches.get("stop_sandbox", MagicMock()),
+            ),
+            patch("devops_ai.cli.done.remove_slot_dir"),
+            patch(
+                "devops_ai.cli.done.release_slots",
+                patches.get("release_slots", release_slots),
+            ),
+            patch("devops_ai.cli.done.remove_worktree") as mock_rm,
+        ):
+            mock_dirty.return_value = MagicMock(is_dirty=False)
+            code, msg = done_many_command(
+                repo_root=tmp_path, all_worktrees=True
+            )
+        return code, msg, mock_rm
+
+    def test_claim_during_teardown_survives(self, tmp_path: Path) -> None:
+        path = tmp_path / "registry.json"
+
+        def claim_meanwhile(slot: SlotInfo, **kwargs: object) -> None:
+            registry = load_registry(path)
+            registry.slots[3] = _slot(3, "/other", "/other-slot")
+            save_registry(registry, path)
+
+        code, msg, _ = self._run_one(tmp_path, stop_sandbox=claim_meanwhile)
+
+        assert code == 0, msg
+        assert sorted(load_registry(path).slots) == [3]
+
+    def test_release_failure_reported(self, tmp_path: Path) -> None:
+        code, msg, mock_rm = self._run_one(
+            tmp_path, release_slots=MagicMock(side_effect=OSError("ro fs"))
+        )
+
+        assert code == 1
+        assert "Could not release slots 1: ro fs" in msg
+        assert "Released slot" not in msg
+        mock_rm.assert_called_once()
@@ -0,0 +1,267 @@
+"""Tests for kinfra gc."""
+
+from __future__ import annotations
+
+import subprocess
+from pathlib import Path
+from unittest.mock import MagicMock, patch
+
+from devops_ai.cli.gc_cmd import (
+    GcReport,
+    Usage,
+    collect_report,
+    compose_backups,
+    format_report,
+    gc_command,
+    reclaim,
+)
+from devops_ai.config import InfraConfig
+from devops_ai.registry import (
+    Registry,
+    SlotInfo,
+    load_registry,
+    save_registry,
+)
+
+
+def _slot(slot_id: int, worktree: Path, slot_dir: Path) -> SlotInfo:
+    return SlotInfo(
+        slot_id=slot_id,
+        project="myapp",
+        worktree_path=str(worktree),
+        slot_dir=str(slot_dir),
+        compose_file_copy="",
+        ports={},
+        claimed_at="2026-01-01T00:00:00",
+        status="running",
+    )
+
+
+def _docker(containers: str = "", volumes: str = "") -> MagicMock:
+    def run(cmd: list[str], **kwargs: object) -> MagicMock:
+        out = volumes if cmd[1] == "volume" else containers
+        return MagicMock(returncode=0, stdout=out, stderr="")
+
+    return MagicMock(side_effect=run)
+
+
+class TestCollectReport:
+    def test_finds_orphans(self, tmp_path: Path) -> None:
+        base = tmp_path / "slots"
+        live_dir = base / "myapp-1"
+        live_dir.mkdir(parents=True)
+        (live_dir / "big").write_bytes(b"x" * 10000)
+        orphan_dir = base / "myapp-7"
+        orphan_dir.mkdir()
+        (orphan_dir / "junk").write_bytes(b"x" * 5000)
+        worktree = tmp_path / "wt"
+        worktree.mkdir()
+        registry = Registry(slots={1: _slot(1, worktree, live_dir)})
+
+        containers = (
+            f"myapp-slot-1-api-1\tmyapp-slot-1\t{live_dir}\n"
+            f"myapp-slot-7-api-1\tmyapp-slot-7\t{orphan_dir}\n"
+        )
+        volumes = (
+            "myapp-slot-1_data\tmyapp-slot-1\n"
+            "myapp-slot-7_data\tmyapp-slot-7\n"
+        )
+        with patch(
+            "devops_ai.cli.gc_cmd.subprocess.run",
+            _docker(containers, volumes),
+        ):
+            report = collect_report(
+                registry, [Usage("feat", worktree)], [], slots_base=base
+            )
+
+        orphans = {(o.kind, o.name) for o in report.orphans}
+        assert orphans == {
+            ("slot dir", str(orphan_dir)),
+            ("container", "myapp-slot-7-api-1"),
+            ("volume", "myapp-slot-7_data"),
+        }
+        assert report.slots[0].size is not None
+        assert report.slots[0].size >= 10000
+        assert report.reclaimable >= 5000
+        assert report.stale == []
+
+    def test_stale_entry_frees_its_resources(self, tmp_path: Path) -> None:
+        base = tmp_path / "slots"
+        slot_dir = base / "myapp-2"
+        slot_dir.mkdir(parents=True)
+        stale = _slot(2, tmp_path / "gone", slot_dir)
+        registry = Registry(slots={2: stale})
+
+        with patch(
+            "devops_ai.cli.gc_cmd.subprocess.run",
+            _docker(f"myapp-slot-2-api-1\tmyapp-slot-2\t{slot_dir}\n"),
+        ):
+            report = collect_report(registry, [], [], slots_base=base)
+
+        assert report.stale == [stale]
+        kinds = sorted(o.kind for o in report.orphans)
+        assert kinds == ["container", "slot dir"]
+
+    def test_docker_unavailable(self, tmp_path: Path) -> None:
+        with patch(
+            "devops_ai.cli.gc_cmd.subprocess.run",
+            side_effect=FileNotFoundError("docker"),
+        ):
+            report = collect_report(
+                Registry(), [], [], slots_base=tmp_path / "none"
+            )
+        assert report.orphans == []
+        assert any("Docker containers" in n for n in report.notes)
+
+    def test_unrelated_projects_left_alone(self, tmp_path: Path) -> None:
+        """Other users' and non-kinfra ``*-slot-N`` projects are kept."""
+        base = tmp_path / "slots"
+        base.mkdir()
+        other_base = tmp_path / "alice" / ".devops-ai" / "slots"
+        containers = (
+            # Not kinfra-labelled: no slot dir label
+            "foo-slot-1-web-1\tfoo-slot-1\t\n"
+            # Another user's kinfra sandbox
+            f"alice-app-slot-3-db-1\talice-app-slot-3\t"
+            f"{other_base / 'alice-app-3'}\n"
+        )
+        volumes = (
+            "foo-slot-1_data\tfoo-slot-1\n"
+            "alice-app-slot-3_pgdata\talice-app-slot-3\n"
+        )
+        with patch(
+            "devops_ai.cli.gc_cmd.subprocess.run",
+            _docker(containers, volumes),
+        ) as mock_run:
+            report = collect_report(Registry(), [], [], slots_base=base)
+
+        assert report.orphans == []
+        ps = mock_run.call_args_list[0].args[0]
+        assert "label=devops-ai.managed=true" in ps
+
+
+class TestReclaim:
+    def test_removes_orphans(self, tmp_path: Path) -> None:
+        base = tmp_path / "slots"
+        orphan_dir = base / "myapp-7"
+        orphan_dir.mkdir(parents=True)
+        backup = tmp_path / "docker-compose.yml.bak"
+        backup.write_text("services: {}\n")
+        slot_dir = base / "myapp-2"
+        slot_dir.mkdir()
+        registry_path = tmp_path / "registry.json"
+        registry = Registry(slots={2: _slot(2, tmp_path / "gone", slot_dir)})
+        save_registry(registry, registry_path)
+
+        with patch(
+            "devops_ai.cli.gc_cmd.subprocess.run",
+            _docker(f"myapp-slot-7-api-1\tmyapp-slot-7\t{orphan_dir}\n"),
+        ) as mock_run:
+            report = collect_report(
+                registry, [], [backup], slots_base=base
+            )
+            errors = reclaim(report, registry_path)
+
+        assert errors == []
+        assert not orphan_dir.exists()
+        assert not slot_dir.exists()
+        assert not backup.exists()
+        assert load_registry(registry_path).slots == {}
+        rm_calls = [c.args[0] for c in mock_run.call_args_list]
+        assert ["docker", "rm", "-f", "myapp-slot-7-api-1"] in rm_calls
+
+    def test_slot_claimed_meanwhile_survives(self, tmp_path: Path) -> None:
+        """A slot dir claimed after the report was made is not deleted."""
+        base = tmp_path / "slots"
+        new_dir = base / "myapp-4"
+        new_dir.mkdir(parents=True)
+        registry_path = tmp_path / "registry.json"
+        with patch(
+            "devops_ai.cli.gc_cmd.subprocess.run",
+            _docker(f"myapp-slot-4-api-1\tmyapp-slot-4\t{new_dir}\n"),
+        ) as mock_run:
+            report = collect_report(Registry(), [], [], slots_base=base)
+            assert {o.kind for o in report.orphans} == {
+                "slot dir",
+                "container",
+            }
+            # kinfra impl claims slot 4 before gc deletes anything
+            worktree = tmp_path / "wt"
+            worktree.mkdir()
+            save_registry(
+                Registry(slots={4: _slot(4, worktree, new_dir)}),
+                registry_path,
+            )
+            errors = reclaim(report, registry_path)
+
+        assert errors == []
+        assert new_dir.exists()
+        rm_calls = [c.args[0] for c in mock_run.call_args_list]
+        assert not any(c[:2] == ["docker", "rm"] for c in rm_calls)
+
+
+class TestFormatReport:
+    def test_dry_run_summary(self, tmp_path: Path) -> None:
+        base = tmp_path / "slots"
+        (base / "myapp-7").mkdir(parents=True)
+        with patch(
+            "devops_ai.cli.gc_cmd.subprocess.run",
+            side_effect=subprocess.TimeoutExpired("docker", 1),
+        ):
+            report = collect_report(Registry(), [], [], slots_base=base)
+        text = format_report(report, dry_run=True)
+        assert "slot dir:" in text
+        assert "Would reclaim" in text
+        assert text.endswith(
+            "1 × slot dir (dry run; rerun with --yes to reclaim)"
+        )
+
+    def test_nothing(self) -> None:
+        text = format_report(GcReport(), dry_run=True)
+        assert "Nothing to reclaim." in text
+
+
+class TestGcCommand:
+    def _run(self, tmp_path: Path, **kwargs: bool) -> MagicMock:
+        with (
+            patch(
+                "devops_ai.cli.gc_cmd._project_usage", return_value=([], [])
+            ),
+            patch(
+                "devops_ai.cli.gc_cmd.load_registry", return_value=Registry()
+            ),
+            patch(
+                "devops_ai.cli.gc_cmd.collect_report",
+                return_value=GcReport(),
+            ),
+            patch(
+                "devops_ai.cli.gc_cmd.reclaim", return_value=[]
+            ) as mock_reclaim,
+        ):
+            gc_command(repo_root=tmp_path, **kwargs)
+        return mock_reclaim
+
+    def test_reports_only_by_default(self, tmp_path: Path) -> None:
+        self._run(tmp_path).assert_not_called()
+
+    def test_yes_reclaims(self, tmp_path: Path) -> None:
+        self._run(tmp_path, yes=True).assert_called_once()
+
+
+class TestComposeBackups:
+    def test_finds_backups(self, tmp_path: Path) -> None:
+        (tmp_path / "docker-compose.yml").write_text("")
+        (tmp_path / "docker-compose.yml.bak").write_text("")
+        (tmp_path / "deploy").mkdir()
+        (tmp_path / "deploy" / "compose.yaml.bak").write_text("")
+        config = InfraConfig(
+            project_name="x",
+            prefix="x",
+            compose_file="docker-compose.yml",
+            compose_overrides=["deploy/compose.yaml"],
+        )
+        found = compose_backups([tmp_path], config)
+        assert found == [
+            tmp_path / "docker-compose.yml.bak",
+            tmp_path / "deploy" / "compose.yaml.bak",
+        ]
@@ -5,7 +5,15 @@ from __future__ import annotations
 from pathlib import Path
 from unittest.mock import MagicMock, patch
 
-from devops_ai.cli.impl import impl_command, parse_feature_milestone
+import pytest
+
+from devops_ai.cli.impl import (
+    _milestone_paths,
+    _sparse_paths,
+    impl_command,
+    parse_feature_milestone,
+)
+from devops_ai.config import InfraConfig, WorktreeSettings
 
 
 class TestParseFeatureMilestone:
@@ -23,6 +31,45 @@ class TestParseFeatureMilestone:
             assert "feature/milestone" in str(e).lower()
 
 
+class TestSparsePaths:
+    def test_front_matter_paths(self, tmp_path: Path) -> None:
+        ms_file = tmp_path / "M1_api.md"
+        ms_file.write_text(
+            "---\ndesign: DESIGN.md\npaths:\n  - services/api\n"
+            "  - /libs/common/\n---\n\n# M1\n"
+        )
+        assert _milestone_paths(ms_file) == ["services/api", "libs/common"]
+
+    def test_no_front_matter(self, tmp_path: Path) -> None:
+        ms_file = tmp_path / "M1_api.md"
+        ms_file.write_text("# M1\n")
+        assert _milestone_paths(ms_file) == []
+        assert _sparse_paths(None, "feat", ms_file) == []
+
+    def test_invalid_paths(self, tmp_path: Path) -> None:
+        ms_file = tmp_path / "M1_api.md"
+        ms_file.write_text("---\npaths: services\n---\n")
+        with pytest.raises(ValueError, match="list"):
+            _milestone_paths(ms_file)
+
+    def test_combines_config_and_required_dirs(self, tmp_path: Path) -> None:
+        ms_file = tmp_path / "M1_api.md"
+        ms_file.write_text("---\npaths: [services/api]\n---\n")
+        config = InfraConfig(
+            project_name="x",
+            prefix="x",
+            has_sandbox=True,
+            compose_file="deploy/docker-compose.yml",
+            worktree=WorktreeSettings(sparse=["libs"]),
+        )
+        assert _sparse_paths(config, "feat", ms_file) == [
+            "deploy",
+            "docs/designs/feat",
+            "libs",
+            "services/api",
+        ]
+
+
 class TestMilestoneNotFound:
     def test_error_message(self, tmp_path: Path) -> None:
         """Missing milestone file → informative error."""
@@ -115,6 +162,71 @@ class TestImplWithConfig:
         mock_claim.assert_called_once()
 
 
+class TestImplClaim:
+    def _run(
+        self, tmp_path: Path, registries: list[MagicMock]
+    ) -> tuple[int, MagicMock, MagicMock]:
+        _setup_git_repo(tmp_path)
+        _setup_milestone(tmp_path, "my-feature", "M1")
+        _setup_infra_toml(tmp_path)
+        with (tmp_path / ".devops-ai" / "infra.toml").open("a") as f:
+            f.write("\n[worktree]\ndeferred_checkout = true\n")
+        calls = MagicMock()
+
+        with (
+            patch("devops_ai.cli.impl.create_impl_worktree") as mock_wt,
+            patch("devops_ai.cli.impl.start_checkout"),
+            patch(
+                "devops_ai.cli.impl.finish_checkout", calls.finish_checkout
+            ),
+            patch("devops_ai.cli.impl.ObservabilityManager"),
+            patch("devops_ai.cli.impl.load_registry", side_effect=registries),
+            patch("devops_ai.cli.impl.check_queue", return_value=None),
+            patch("devops_ai.cli.impl.allocate_slot") as mock_alloc,
+            patch("devops_ai.cli.impl.clean_stale_entries"),
+            patch("devops_ai.cli.impl.claim_slot", calls.claim_slot),
+            patch("devops_ai.cli.impl.save_registry"),
+            patch("devops_ai.cli.impl.create_slot_dir") as mock_sd,
+            patch("devops_ai.cli.impl.copy_compose_to_slot"),
+            patch("devops_ai.cli.impl.generate_env_file"),
+            patch("devops_ai.cli.impl.generate_override"),
+            patch("devops_ai.cli.impl.compute_image_pins"),
+            patch("devops_ai.cli.impl.start_sandbox"),
+            patch("devops_ai.cli.impl.run_health_gate", return_value=True),
+            patch("devops_ai.cli.impl.agent_deck") as mock_ad,
+        ):
+            mock_wt.return_value = tmp_path / "wt"
+            mock_alloc.side_effect = [
+                (1, {"API_PORT": 8081}),
+                (2, {"API_PORT": 8082}),
+            ]
+            mock_sd.return_value = tmp_path / "slot"
+            mock_ad.is_available.return_value = False
+            code, _ = impl_command("my-feature/M1", repo_root=tmp_path)
+        return code, calls, mock_alloc
+
+    def test_checkout_awaited_after_claim(self, tmp_path: Path) -> None:
+        code, calls, _ = self._run(
+            tmp_path, [MagicMock(slots={}) for _ in range(3)]
+        )
+        assert code == 0
+        names = [c[0] for c in calls.mock_calls]
+        assert names == ["claim_slot", "finish_checkout"]
+
+    def test_slot_taken_meanwhile_is_reallocated(
+        self, tmp_path: Path
+    ) -> None:
+        taken = MagicMock(slots={1: MagicMock()})
+        code, calls, mock_alloc = self._run(
+            tmp_path, [MagicMock(slots={}), taken, MagicMock(slots={})]
+        )
+        assert code == 0
+        assert mock_alloc.call_args_list[1][0][0] is taken
+        claimed = calls.claim_slot.call_args[0]
+        assert claimed[0] is taken
+        assert claimed[1].slot_id == 2
+
+
 class TestImplDockerFailure:
     def test_releases_slot_keeps_worktree(self, tmp_path: Path) -> None:
         """Docker failure → slot released, worktree kept."""
@@ -158,6 +270,124 @@ class TestImplDockerFailure:
         assert "worktree preserved" in msg.lower()
 
 
+class TestImplAdmissionDenied:
+    def _run(
+        self,
+        tmp_path: Path,
+        wait: bool,
+        queued: str | None = None,
+        admitted: bool = True,
+        wait_timeout: float | None = None,
+    ) -> tuple[int, str, MagicMock]:
+        from devops_ai.admission import AdmissionDenied
+
+        _setup_git_repo(tmp_path)
+        _setup_milestone(tmp_path, "my-feature", "M1")
+        _setup_infra_toml(tmp_path)
+
+        with (
+            patch("devops_ai.cli.impl.create_impl_worktree") as mock_wt,
+            patch("devops_ai.cli.impl.ObservabilityManager"),
+            patch("devops_ai.cli.impl.load_registry") as mock_lr,
+            patch("devops_ai.cli.impl.clean_stale_entries"),
+            patch(
+                "devops_ai.cli.impl.allocate_slot",
+                side_effect=AdmissionDenied("Insufficient memory headroom"),
+            ),
+            patch("devops_ai.cli.impl.check_queue", return_value=queued),
+            patch("devops_ai.cli.impl.enqueue") as mock_enqueue,
+            patch(
+                "devops_ai.cli.impl.wait_for_admission",
+                return_value=admitted,
+            ),
+            patch("devops_ai.cli.impl.dequeue"),
+        ):
+            mock_wt.return_value = (
+                tmp_path.parent / f"{tmp_path.name}-impl-my-feature-M1"
+            )
+            mock_lr.return_value = MagicMock(slots={})
+            code, msg = impl_command(
+                "my-feature/M1",
+                repo_root=tmp_path,
+                wait=wait,
+                wait_timeout=wait_timeout,
+            )
+        return code, msg, mock_enqueue
+
+    def test_refused_without_wait(self, tmp_path: Path) -> None:
+        code, msg, mock_enqueue = self._run(tmp_path, wait=False)
+        assert code == 1
+        assert "refused" in msg.lower()
+        assert "--wait" in msg
+        mock_enqueue.assert_not_called()
+
+    def test_queued_with_wait(self, tmp_path: Path) -> None:
+        code, msg, mock_enqueue = self._run(tmp_path, wait=True)
+        mock_enqueue.assert_called_once_with("test", "my-feature/M1")
+        # Still saturated after admission → allocation failure reported
+        assert code == 1
+        assert "Slot allocation failed" in msg
+
+    def test_waiters_not_jumped_without_wait(self, tmp_path: Path) -> None:
+        code, msg, mock_enqueue = self._run(
+            tmp_path, wait=False, queued="1 request(s) already queued"
+        )
+        assert code == 1
+        assert "already queued" in msg
+        mock_enqueue.assert_not_called()
+
+    def test_wait_timeout_reported(self, tmp_path: Path) -> None:
+        code, msg, _ = self._run(
+            tmp_path, wait=True, admitted=False, wait_timeout=30
+        )
+        assert code == 1
+        assert "Timed out waiting for a slot after 30s" in msg
+
+
+class TestImplDeferredCheckoutReaped:
+    """A deferred checkout is awaited even when impl returns early."""
+
+    def _run(self, tmp_path: Path, network_error: bool) -> int:
+        from devops_ai.admission import AdmissionDenied
+
+        _setup_git_repo(tmp_path)
+        _setup_milestone(tmp_path, "my-feature", "M1")
+        _setup_infra_toml(tmp_path)
+        with (tmp_path / ".devops-ai" / "infra.toml").open("a") as f:
+            f.write("\n[worktree]\ndeferred_checkout = true\n")
+        proc = MagicMock(returncode=None)
+
+        with (
+            patch("devops_ai.cli.impl.create_impl_worktree") as mock_wt,
+            patch(
+                "devops_ai.cli.impl.start_checkout", return_value=proc
+            ),
+            patch("devops_ai.cli.impl.finish_checkout") as mock_finish,
+            patch("devops_ai.cli.impl.ObservabilityManager") as mock_obs,
+            patch("devops_ai.cli.impl.load_registry"),
+            patch("devops_ai.cli.impl.clean_stale_entries"),
+            patch("devops_ai.cli.impl.check_queue", return_value=None),
+            patch(
+                "devops_ai.cli.impl.allocate_slot",
+                side_effect=AdmissionDenied("Insufficient memory headroom"),
+            ),
+        ):
+            mock_wt.return_value = tmp_path / "wt"
+            if network_error:
+                mock_obs.return_value.ensure_network.side_effect = (
+                    RuntimeError("no docker")
+                )
+            code, _ = impl_command("my-feature/M1", repo_root=tmp_path)
+        mock_finish.assert_called_once_with(proc)
+        return code
+
+    def test_observability_network_failure(self, tmp_path: Path) -> None:
+        assert self._run(tmp_path, network_error=True) == 1
+
+    def test_admission_denied(self, tmp_path: Path) -> None:
+        assert self._run(tmp_path, network_error=False) == 1
+
+
 # --- Helpers ---
 
 
@@ -1,7 +1,10 @@
 """Tests for kinfra init — project inspection + config generation."""
 
+import subprocess
+from collections.abc import Callable
 from pathlib import Path
-from unittest.mock import patch
+from typing import Any
+from unittest.mock import MagicMock, patch
 
 from devops_ai.cli.init_cmd import (
     InitPlan,
@@ -12,6 +15,8 @@ from devops_ai.cli.init_cmd import (
     detect_services_from_compose,
     generate_infra_toml,
     identify_observability_services,
+    rewrite_compose_graph,
+    select_compose_files,
 )
 from devops_ai.config import load_config
 
@@ -296,6 +301,32 @@ class TestDetectProject:
         assert plan.obs_services == []
         assert plan.app_services == {}
 
+    def test_resolves_includes_and_override(self, tmp_path: Path) -> None:
+        """Services from included files and the sibling override count."""
+        (tmp_path / "docker-compose.yml").write_text(
+            "include:\n  - infra/api.yml\n" + COMPOSE_APP_ONLY
+        )
+        (tmp_path / "infra").mkdir()
+        (tmp_path / "infra" / "api.yml").write_text(
+            "services:\n  api:\n    image: api\n"
+            "    ports:\n      - \"9000:9000\"\n"
+        )
+        (tmp_path / "docker-compose.override.yml").write_text(
+            "services:\n  debug:\n    image: busybox\n"
+            "    profiles: [debug]\n"
+        )
+
+        plan = detect_project(tmp_path)
+
+        assert set(plan.services) == {"myapp", "api", "debug"}
+        assert plan.compose_overrides == ["docker-compose.override.yml"]
+        assert len(plan.compose_graph) == 3
+        assert plan.profiles == {"debug": ["debug"]}
+        assert (
+            'compose_file = ["docker-compose.yml", '
+            '"docker-compose.override.yml"]'
+        ) in plan.toml_content
+
     def test_existing_interactive_flow_unchanged(
         self, tmp_path: Path
     ) -> None:
@@ -637,20 +668,34 @@ class TestDetectEnvVars:
         assert len(app_secret_entries) == 1
 
 
+def _mock_check_ignore(ignored: set[str]) -> Callable[..., Any]:
+    """Emulate `git check-ignore --stdin -z --verbose --non-matching`."""
+    calls: list[list[str]] = []
+
+    def run(cmd, input, capture_output, text, timeout, cwd):
+        paths = [p for p in input.split("\0") if p]
+        calls.append(paths)
+        fields: list[str] = []
+        for path in paths:
+            if path in ignored:
+                fields += [".gitignore", "1", path, path]
+            else:
+                fields += ["", "", "", path]
+        result = MagicMock()
+        result.returncode = 0 if ignored & set(paths) else 1
+        result.stdout = "".join(f"{f}\0" for f in fields)
+        return result
+
+    run.calls = calls
+    return run
+
+
 class TestDetectGitignoredMounts:
     def test_identifies_gitignored_bind_mounts(
         self, tmp_path: Path
     ) -> None:
         # Mock git check-ignore: config.yaml is ignored, data/ is not
-        def mock_check_ignore(
-            cmd, capture_output, text, timeout, cwd,
-        ):
-            from unittest.mock import MagicMock
-
-            path = cmd[-1]
-            result = MagicMock()
-            result.returncode = 0 if path == "config.yaml" else 1
-            return result
+        mock_check_ignore = _mock_check_ignore({"config.yaml"})
 
         with patch("devops_ai.cli.init_cmd.subprocess.run", mock_check_ignore):
             candidates = detect_gitignored_mounts(
@@ -662,12 +707,7 @@ class TestDetectGitignoredMounts:
 
     def test_skips_named_volumes(self, tmp_path: Path) -> None:
         # All bind mounts non-ignored
-        def mock_check_ignore(cmd, capture_output, text, timeout, cwd):
-            from unittest.mock import MagicMock
-
-            result = MagicMock()
-            result.returncode = 1  # not ignored
-            return result
+        mock_check_ignore = _mock_check_ignore(set())
 
         with patch("devops_ai.cli.init_cmd.subprocess.run", mock_check_ignore):
             candidates = detect_gitignored_mounts(
@@ -685,14 +725,8 @@ class TestDetectGitignoredMounts:
         (tmp_path / "config.yaml").write_text("setting: value")
         (tmp_path / ".env.example").write_text("KEY=val")
 
-        def mock_check_ignore(cmd, capture_output, text, timeout, cwd):
-            from unittest.mock import MagicMock
-
-            path = cmd[-1]
-            result = MagicMock()
-            # config.yaml and .env are ignored
-            result.returncode = 0 if path in ("config.yaml", ".env") else 1
-            return result
+        # config.yaml and .env are ignored
+        mock_check_ignore = _mock_check_ignore({"config.yaml", ".env"})
 
         with patch("devops_ai.cli.init_cmd.subprocess.run", mock_check_ignore):
             candidates = detect_gitignored_mounts(
@@ -715,6 +749,45 @@ class TestDetectGitignoredMounts:
         candidates = detect_gitignored_mounts(compose, tmp_path)
         assert candidates == []
 
+    def test_single_git_call_for_all_mounts(self, tmp_path: Path) -> None:
+        mock_check_ignore = _mock_check_ignore({"config.yaml"})
+
+        with patch("devops_ai.cli.init_cmd.subprocess.run", mock_check_ignore):
+            detect_gitignored_mounts(COMPOSE_WITH_VOLUMES, tmp_path)
+
+        assert mock_check_ignore.calls == [
+            ["config.yaml", "data", ".env"]
+        ]
+
+    def test_paths_outside_repo_do_not_hide_ignored(
+        self, tmp_path: Path
+    ) -> None:
+        """An absolute or ../ mount source must not break the batch."""
+        subprocess.run(["git", "init", "-q"], cwd=tmp_path, check=True)
+        (tmp_path / ".gitignore").write_text(".env\n")
+        compose = (
+            "services:\n"
+            "  app:\n"
+            "    image: x\n"
+            "    volumes:\n"
+            "      - /var/run/docker.sock:/var/run/docker.sock\n"
+            "      - ../shared/data:/data\n"
+            "      - ./.env:/app/.env\n"
+            "      - ./src:/app/src\n"
+        )
+        candidates = detect_gitignored_mounts(compose, tmp_path)
+        assert [c.host_path for c in candidates] == [".env"]
+
+    def test_real_git_with_negation(self, tmp_path: Path) -> None:
+        subprocess.run(["git", "init", "-q"], cwd=tmp_path, check=True)
+        (tmp_path / ".gitignore").write_text("config.yaml\n.env*\n!.env\n")
+        (tmp_path / "config.yaml.sample").write_text("x: 1\n")
+
+        candidates = detect_gitignored_mounts(COMPOSE_WITH_VOLUMES, tmp_path)
+
+        assert [c.host_path for c in candidates] == ["config.yaml"]
+        assert candidates[0].example_path == "config.yaml.sample"
+
 
 class TestGenerateInfraTomlWithProvisioning:
     def test_appends_secrets_section(self) -> None:
@@ -1002,13 +1075,7 @@ class TestCheckModeExcludesExisting:
         compose.write_text(COMPOSE_WITH_VOLUMES)
 
         # Make config.yaml gitignored
-        def mock_check_ignore(cmd, capture_output, text, timeout, cwd):
-            from unittest.mock import MagicMock
-
-            path = cmd[-1]
-            result = MagicMock()
-            result.returncode = 0 if path == "config.yaml" else 1
-            return result
+        mock_check_ignore = _mock_check_ignore({"config.yaml"})
 
         config_dir = tmp_path / ".devops-ai"
         config_dir.mkdir()
@@ -1257,3 +1324,48 @@ class TestDetectProjectPopulatesNewFields:
         # Port vars should be excluded
         for c in plan.env_var_candidates:
             assert c.name not in plan.ports
+
+
+class TestSelectComposeFiles:
+    def test_prefers_canonical_name(self, tmp_path: Path) -> None:
+        (tmp_path / "docker-compose.dev.yml").write_text("services: {}\n")
+        (tmp_path / "docker-compose.yml").write_text("services: {}\n")
+        assert select_compose_files(tmp_path) == ("docker-compose.yml", [])
+
+    def test_override_never_primary(self, tmp_path: Path) -> None:
+        (tmp_path / "compose.yml").write_text("services: {}\n")
+        (tmp_path / "compose.override.yml").write_text("services: {}\n")
+        assert select_compose_files(tmp_path) == (
+            "compose.yml",
+            ["compose.override.yml"],
+        )
+
+    def test_none_found(self, tmp_path: Path) -> None:
+        assert select_compose_files(tmp_path) == ("docker-compose.yml", [])
+
+
+class TestRewriteComposeGraph:
+    def test_rewrites_included_ports_only_where_needed(
+        self, tmp_path: Path
+    ) -> None:
+        primary = tmp_path / "docker-compose.yml"
+        primary.write_text("services:\n  web:\n    image: nginx\n")
+        api = tmp_path / "api.yml"
+        api.write_text(
+            'services:\n  api:\n    ports:\n      - "9000:9000"\n'
+        )
+        other = tmp_path / "other.yml"
+        other.write_text("services:\n  db:\n    image: postgres\n")
+        outside = tmp_path.parent / f"{tmp_path.name}-shared.yml"
+        outside.write_text('services:\n  x:\n    ports: ["9000:9000"]\n')
+
+        rewritten = rewrite_compose_graph(
+            tmp_path, [primary, api, other, outside], {"API_PORT": 9000}, []
+        )
+
+        assert rewritten == ["docker-compose.yml", "api.yml"]
+        assert "${API_PORT:-9000}" in api.read_text()
+        assert "kinfra" not in other.read_text()
+        assert "kinfra-managed" in primary.read_text()
+        assert "kinfra-managed" not in api.read_text()
+        assert "${API_PORT" not in outside.read_text()
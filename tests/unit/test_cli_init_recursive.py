@@ -0,0 +1,112 @@
+"""Tests for kinfra init --recursive."""
+
+from __future__ import annotations
+
+from pathlib import Path
+
+from devops_ai.cli.init_recursive import (
+    discover_projects,
+    init_recursive_command,
+    inspect_project,
+)
+
+
+def _compose(path: Path, port: int) -> None:
+    path.mkdir(parents=True, exist_ok=True)
+    (path / "docker-compose.yml").write_text(
+        "services:\n  app:\n    build: .\n"
+        f"    ports:\n      - \"{port}:{port}\"\n"
+    )
+
+
+def _onboard(path: Path, name: str, port: int) -> None:
+    config_dir = path / ".devops-ai"
+    config_dir.mkdir(parents=True)
+    (config_dir / "infra.toml").write_text(
+        f'[project]\nname = "{name}"\n\n'
+        '[sandbox]\ncompose_file = "docker-compose.yml"\n\n'
+        f'[sandbox.ports]\n{name.upper()}_PORT = {port}\n'
+    )
+
+
+class TestDiscoverProjects:
+    def test_finds_nested_projects(self, tmp_path: Path) -> None:
+        _compose(tmp_path / "services" / "api", 8080)
+        _compose(tmp_path / "services" / "web", 3000)
+        (tmp_path / "services" / "lib").mkdir()
+        assert discover_projects(tmp_path) == [
+            tmp_path / "services" / "api",
+            tmp_path / "services" / "web",
+        ]
+
+    def test_prunes_hidden_and_vendor_dirs(self, tmp_path: Path) -> None:
+        _compose(tmp_path / "node_modules" / "pkg", 8080)
+        _compose(tmp_path / ".cache" / "x", 8080)
+        _compose(tmp_path / "app", 9000)
+        assert discover_projects(tmp_path) == [tmp_path / "app"]
+
+    def test_config_only_project(self, tmp_path: Path) -> None:
+        _onboard(tmp_path / "svc", "svc", 7000)
+        assert discover_projects(tmp_path) == [tmp_path / "svc"]
+
+
+class TestInspectProject:
+    def test_new_project_uses_detected_ports(self, tmp_path: Path) -> None:
+        _compose(tmp_path, 8080)
+        report = inspect_project(tmp_path)
+        assert not report.onboarded
+        assert list(report.ports.values()) == [8080]
+
+    def test_onboarded_uses_declared_ports(self, tmp_path: Path) -> None:
+        _compose(tmp_path, 8080)
+        _onboard(tmp_path, "api", 8500)
+        report = inspect_project(tmp_path)
+        assert report.onboarded
+        assert report.name == "api"
+        assert report.ports == {"API_PORT": 8500}
+
+    def test_error_captured(self, tmp_path: Path) -> None:
+        (tmp_path / "docker-compose.yml").write_text("services: [oops\n")
+        report = inspect_project(tmp_path)
+        assert report.plan is None
+        assert report.error
+
+
+class TestInitRecursiveCommand:
+    def test_combined_report(self, tmp_path: Path) -> None:
+        _compose(tmp_path / "api", 8080)
+        _onboard(tmp_path / "api", "api", 8080)
+        _compose(tmp_path / "web", 3000)
+        code, msg = init_recursive_command(tmp_path, jobs=1)
+        assert code == 0
+        assert "=== api ===" in msg
+        assert "=== web ===" in msg
+        assert "api (already onboarded)" in msg
+        assert "2 projects (1 onboarded, 1 new)" in msg
+
+    def test_port_band_clash_fails(self, tmp_path: Path) -> None:
+        _compose(tmp_path / "api", 8080)
+        _compose(tmp_path / "admin", 8090)
+        code, msg = init_recursive_command(tmp_path, jobs=1)
+        assert code == 1
+        assert "Port band clashes" in msg
+        assert "admin:" in msg and "api:" in msg
+
+    def test_duplicate_names_fail(self, tmp_path: Path) -> None:
+        _onboard(tmp_path / "a", "shared", 8000)
+        _onboard(tmp_path / "b", "shared", 9000)
+        code, msg = init_recursive_command(tmp_path, jobs=1)
+        assert code == 1
+        assert "shared: a, b" in msg
+
+    def test_process_pool(self, tmp_path: Path) -> None:
+        for i in range(3):
+            _compose(tmp_path / f"svc{i}", 8000 + i * 1000)
+        code, msg = init_recursive_command(tmp_path, jobs=2)
+        assert code == 0
+        assert msg.index("=== svc0 ===") < msg.index("=== svc2 ===")
+
+    def test_no_projects(self, tmp_path: Path) -> None:
+        code, msg = init_recursive_command(tmp_path, jobs=1)
+        assert code == 1
+        assert "No compose projects" in msg
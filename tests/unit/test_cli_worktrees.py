@@ -0,0 +1,138 @@
+"""Tests for kinfra worktrees."""
+
+from __future__ import annotations
+
+import os
+import time
+from pathlib import Path
+from unittest.mock import patch
+
+import pytest
+
+from devops_ai.cli.worktrees import collect_rows, worktrees_command
+from devops_ai.config import InfraConfig
+from devops_ai.registry import Registry, SlotInfo
+from devops_ai.worktree import DirtyState, WorktreeInfo
+
+
+def _wt(path: Path, feature: str) -> WorktreeInfo:
+    path.mkdir(exist_ok=True)
+    return WorktreeInfo(
+        path=path, branch=f"impl/{feature}-M1", wt_type="impl",
+        feature=feature,
+    )
+
+
+def _slot(wt_path: Path) -> SlotInfo:
+    return SlotInfo(
+        slot_id=2,
+        project="myapp",
+        worktree_path=str(wt_path),
+        slot_dir="/tmp/slot-2",
+        compose_file_copy="",
+        ports={"API_PORT": 8082},
+        claimed_at="",
+        status="running",
+    )
+
+
+CONFIG = InfraConfig(project_name="myapp", prefix="myapp", has_sandbox=True)
+
+
+class TestCollectRows:
+    def test_probes_fill_row(self, tmp_path: Path) -> None:
+        wt = _wt(tmp_path / "a", "a")
+        registry = Registry(slots={2: _slot(wt.path)})
+        with (
+            patch(
+                "devops_ai.cli.worktrees.load_registry",
+                return_value=registry,
+            ),
+            patch(
+                "devops_ai.cli.worktrees.check_dirty",
+                return_value=DirtyState(has_uncommitted=True, ahead=2),
+            ),
+            patch(
+                "devops_ai.cli.worktrees._docker_states",
+                return_value={"myapp-slot-2": ["running", "exited"]},
+            ),
+        ):
+            [row] = collect_rows([wt], CONFIG)
+
+        assert row.slot is not None and row.slot.slot_id == 2
+        assert row.dirty is not None and row.dirty.ahead == 2
+        assert row.containers == "1/2 up"
+        # No health endpoint configured
+        assert row.health == "-"
+        assert row.disk is not None
+
+    def test_slow_probe_times_out(self, tmp_path: Path) -> None:
+        wts = [_wt(tmp_path / f"w{i}", f"w{i}") for i in range(3)]
+
+        def slow_dirty(path: Path, timeout: float) -> DirtyState:
+            if path.name == "w1":
+                time.sleep(2)
+            return DirtyState()
+
+        start = time.monotonic()
+        with (
+            patch(
+                "devops_ai.cli.worktrees.load_registry",
+                return_value=Registry(),
+            ),
+            patch(
+                "devops_ai.cli.worktrees.check_dirty",
+                side_effect=slow_dirty,
+            ),
+        ):
+            rows = collect_rows(wts, None, timeout=0.3)
+        assert time.monotonic() - start < 1.5
+        assert [r.dirty is None for r in rows] == [False, True, False]
+        assert rows[0].containers == "-"
+
+    def test_probe_error_left_unknown(self, tmp_path: Path) -> None:
+        wt = _wt(tmp_path / "a", "a")
+        with (
+            patch(
+                "devops_ai.cli.worktrees.load_registry",
+                return_value=Registry(slots={2: _slot(wt.path)}),
+            ),
+            patch(
+                "devops_ai.cli.worktrees.check_dirty",
+                side_effect=OSError("git missing"),
+            ),
+            patch(
+                "devops_ai.cli.worktrees._docker_states",
+                side_effect=FileNotFoundError("docker"),
+            ),
+        ):
+            [row] = collect_rows([wt], CONFIG)
+        assert row.dirty is None
+        assert row.containers == "?"
+
+
+class TestWorktreesCommand:
+    def test_table_columns(
+        self, tmp_path: Path, capsys: pytest.CaptureFixture[str]
+    ) -> None:
+        wt = _wt(tmp_path / "a", "feat")
+        with (
+            patch.dict(os.environ, {"COLUMNS": "200"}),
+            patch(
+                "devops_ai.cli.worktrees.list_worktrees",
+                return_value=[wt],
+            ),
+            patch(
+                "devops_ai.cli.worktrees.load_registry",
+                return_value=Registry(),
+            ),
+            patch(
+                "devops_ai.cli.worktrees.check_dirty",
+                return_value=DirtyState(behind=1),
+            ),
+        ):
+            code = worktrees_command(repo_root=tmp_path)
+        out = capsys.readouterr().out
+        assert code == 0
+        assert "feat" in out
+        assert "clean ↓1" in out
@@ -1,15 +1,25 @@
 """Tests for compose file parameterization."""
 
+import os
+import time
 from pathlib import Path
+from unittest.mock import patch
 
+import pytest
+
+from devops_ai import compose
 from devops_ai.compose import (
     add_header_comment,
     comment_out_services,
     parameterize_ports,
     remove_depends_on,
     rewrite_compose,
+    rewrite_compose_text,
 )
 
+# Millisecond budget for rewriting a large file; checked only when set
+REWRITE_BUDGET_ENV = "KINFRA_COMPOSE_REWRITE_BUDGET_MS"
+
 SAMPLE_COMPOSE = """\
 services:
   myapp:
@@ -194,3 +204,106 @@ class TestRoundtripPreservesStructure:
         port_map = {"MYAPP_PORT": 8080}
         result = parameterize_ports(SAMPLE_COMPOSE, port_map)
         assert "COLLECTOR_OTLP_ENABLED=true" in result
+
+
+def _large_compose(n_services: int) -> str:
+    lines = ["services:\n"]
+    for i in range(n_services):
+        lines.append(f"  app{i}:\n")
+        lines.append(f"    image: example/app{i}:latest\n")
+        lines.append("    ports:\n")
+        lines.append(f'      - "{8080 + i % 3}:8080"\n')
+        lines.append("    environment:\n")
+        lines.extend(f"      - VAR_{j}=value\n" for j in range(32))
+        lines.append("    depends_on:\n")
+        lines.append("      - jaeger\n")
+        lines.append("      - db\n")
+        lines.append("\n")
+    lines.append(SAMPLE_COMPOSE.split("services:\n", 1)[1])
+    return "".join(lines)
+
+
+class TestRewriteComposeText:
+    def test_matches_step_by_step(self) -> None:
+        port_map = {"MYAPP_PORT": 8080, "API_PORT": 8081}
+        staged = add_header_comment(
+            comment_out_services(
+                parameterize_ports(
+                    remove_depends_on(SAMPLE_COMPOSE, ["jaeger"]), port_map
+                ),
+                ["jaeger"],
+            )
+        )
+        assert (
+            rewrite_compose_text(SAMPLE_COMPOSE, port_map, ["jaeger"])
+            == staged
+        )
+
+    def test_no_services_key_not_commented(self) -> None:
+        content = "x-common:\n  jaeger:\n    image: foo\n"
+        result = rewrite_compose_text(content, {}, ["jaeger"])
+        assert "# image: foo" not in result
+
+
+class TestRewriteComposeLargeFile:
+    def test_large_file_single_pass(self) -> None:
+        content = _large_compose(500)
+        assert content.count("\n") > 20_000
+        port_map = {"APP_PORT": 8080, "ALT_PORT": 8081, "OTHER_PORT": 8082}
+        kept = list(
+            compose._filter_depends_on(
+                content.splitlines(keepends=True), ["jaeger"]
+            )
+        )
+
+        with (
+            patch.object(
+                compose,
+                "_filter_depends_on",
+                wraps=compose._filter_depends_on,
+            ) as filter_calls,
+            patch.object(
+                compose, "_comment_blocks", wraps=compose._comment_blocks
+            ) as comment_calls,
+            patch.object(
+                compose._PortRewriter,
+                "__call__",
+                autospec=True,
+                side_effect=compose._PortRewriter.__call__,
+            ) as port_calls,
+        ):
+            result = rewrite_compose_text(content, port_map, ["jaeger"])
+
+        # One pass: each stage runs once, each kept line is rewritten once
+        filter_calls.assert_called_once()
+        comment_calls.assert_called_once()
+        assert port_calls.call_count == len(kept)
+
+        staged = add_header_comment(
+            comment_out_services(
+                parameterize_ports(
+                    remove_depends_on(content, ["jaeger"]), port_map
+                ),
+                ["jaeger"],
+            )
+        )
+        assert result == staged
+        assert "- jaeger" not in result
+        assert '"${ALT_PORT:-8081}:8080"' in result
+
+    @pytest.mark.skipif(
+        REWRITE_BUDGET_ENV not in os.environ,
+        reason=f"timing check is opt-in; set {REWRITE_BUDGET_ENV}",
+    )
+    def test_large_file_time(self) -> None:
+        budget = float(os.environ[REWRITE_BUDGET_ENV])
+        content = _large_compose(500)
+        port_map = {"APP_PORT": 8080, "ALT_PORT": 8081, "OTHER_PORT": 8082}
+
+        start = time.perf_counter()
+        rewrite_compose_text(content, port_map, ["jaeger"])
+        elapsed_ms = (time.perf_counter() - start) * 1000
+
+        assert elapsed_ms < budget, (
+            f"rewrite took {elapsed_ms:.0f}ms (budget {budget:.0f}ms)"
+        )
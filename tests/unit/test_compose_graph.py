@@ -0,0 +1,147 @@
+"""Tests for compose graph resolution."""
+
+from __future__ import annotations
+
+from pathlib import Path
+
+import pytest
+
+from devops_ai.compose_graph import (
+    default_override,
+    merge_compose,
+    resolve_compose_graph,
+)
+
+
+def _write(path: Path, text: str) -> Path:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(text)
+    return path
+
+
+class TestMergeCompose:
+    def test_maps_merge_lists_extend_scalars_replace(self) -> None:
+        base = {"image": "a", "ports": ["80:80"], "env": {"A": "1"}}
+        override = {"image": "b", "ports": ["81:81"], "env": {"B": "2"}}
+        assert merge_compose(base, override) == {
+            "image": "b",
+            "ports": ["80:80", "81:81"],
+            "env": {"A": "1", "B": "2"},
+        }
+
+    def test_command_replaced(self) -> None:
+        merged = merge_compose(
+            {"command": ["a", "b"]}, {"command": ["c"]}
+        )
+        assert merged == {"command": ["c"]}
+
+
+class TestResolveComposeGraph:
+    def test_include(self, tmp_path: Path) -> None:
+        primary = _write(
+            tmp_path / "docker-compose.yml",
+            "include:\n  - infra/db.yml\n"
+            "services:\n  api:\n    image: api\n",
+        )
+        db = _write(
+            tmp_path / "infra" / "db.yml",
+            "services:\n  db:\n    image: postgres\n"
+            "    volumes:\n      - ./init.sql:/init.sql\n",
+        )
+        graph = resolve_compose_graph(primary)
+        assert graph.files == [primary.resolve(), db.resolve()]
+        assert set(graph.services) == {"api", "db"}
+        # Relative mounts are rebased onto the project dir
+        assert graph.services["db"]["volumes"] == [
+            "./infra/init.sql:/init.sql"
+        ]
+
+    def test_include_long_form(self, tmp_path: Path) -> None:
+        primary = _write(
+            tmp_path / "compose.yml",
+            "include:\n  - path: [a.yml, b.yml]\n",
+        )
+        _write(tmp_path / "a.yml", "services:\n  a:\n    image: a\n")
+        _write(tmp_path / "b.yml", "services:\n  b:\n    image: b\n")
+        graph = resolve_compose_graph(primary)
+        assert set(graph.services) == {"a", "b"}
+        assert len(graph.files) == 3
+
+    def test_missing_include_skipped(self, tmp_path: Path) -> None:
+        primary = _write(
+            tmp_path / "compose.yml",
+            "include:\n  - nope.yml\nservices:\n  a:\n    image: a\n",
+        )
+        graph = resolve_compose_graph(primary)
+        assert list(graph.services) == ["a"]
+
+    def test_include_cycle(self, tmp_path: Path) -> None:
+        primary = _write(tmp_path / "a.yml", "include:\n  - b.yml\n")
+        _write(tmp_path / "b.yml", "include:\n  - a.yml\n")
+        with pytest.raises(ValueError, match="Circular"):
+            resolve_compose_graph(primary)
+
+    def test_extends_other_file(self, tmp_path: Path) -> None:
+        primary = _write(
+            tmp_path / "compose.yml",
+            "services:\n  api:\n    extends:\n"
+            "      file: common/base.yml\n      service: web\n"
+            "    ports:\n      - '8080:8080'\n",
+        )
+        base = _write(
+            tmp_path / "common" / "base.yml",
+            "services:\n  web:\n    image: web\n"
+            "    ports:\n      - '9000:9000'\n",
+        )
+        graph = resolve_compose_graph(primary)
+        assert base.resolve() in graph.files
+        api = graph.services["api"]
+        assert api["image"] == "web"
+        assert api["ports"] == ["9000:9000", "8080:8080"]
+        assert "extends" not in api
+
+    def test_extends_same_file(self, tmp_path: Path) -> None:
+        primary = _write(
+            tmp_path / "compose.yml",
+            "services:\n  base:\n    image: x\n"
+            "  worker:\n    extends: base\n    command: [run]\n",
+        )
+        graph = resolve_compose_graph(primary)
+        assert graph.services["worker"] == {"image": "x", "command": ["run"]}
+
+    def test_layered_override(self, tmp_path: Path) -> None:
+        primary = _write(
+            tmp_path / "docker-compose.yml",
+            "services:\n  api:\n    image: api\n",
+        )
+        override = _write(
+            tmp_path / "docker-compose.override.yml",
+            "services:\n  api:\n    ports:\n      - '8080:8080'\n",
+        )
+        graph = resolve_compose_graph(primary, [override])
+        assert graph.services["api"] == {
+            "image": "api",
+            "ports": ["8080:8080"],
+        }
+
+    def test_profiles(self, tmp_path: Path) -> None:
+        primary = _write(
+            tmp_path / "compose.yml",
+            "services:\n  api:\n    image: a\n"
+            "  debug:\n    image: d\n    profiles: [debug]\n",
+        )
+        graph = resolve_compose_graph(primary)
+        assert graph.profiles() == {"debug": ["debug"]}
+        assert graph.active_services() == ["api"]
+        assert graph.active_services(["debug"]) == ["api", "debug"]
+
+
+class TestDefaultOverride:
+    def test_found(self, tmp_path: Path) -> None:
+        primary = _write(tmp_path / "docker-compose.yml", "")
+        override = _write(tmp_path / "docker-compose.override.yml", "")
+        assert default_override(primary) == override
+
+    def test_absent(self, tmp_path: Path) -> None:
+        primary = _write(tmp_path / "compose.yaml", "")
+        assert default_override(primary) is None
@@ -0,0 +1,160 @@
+"""Tests for the parsed compose model and its on-disk cache."""
+
+from __future__ import annotations
+
+import json
+from pathlib import Path
+from unittest.mock import patch
+
+from devops_ai.compose_model import (
+    ComposeModel,
+    VolumeRef,
+    cache_file,
+    load_compose_model,
+)
+
+COMPOSE = """\
+services:
+  api:
+    image: myorg/api:dev
+    ports:
+      - "8080:8080"
+      - "${API_PORT:-9090}:9090"
+    environment:
+      - DB_URL=${DB_URL}
+      - TOKEN=${TOKEN:-dev}
+    volumes:
+      - ./config/app.yaml:/app/config.yaml
+      - data:/var/lib/data
+  worker:
+    image: myorg/worker:dev
+    environment:
+      DB_URL: ${DB_URL}
+volumes:
+  data:
+"""
+
+
+class TestComposeModelFromText:
+    def test_services_and_ports(self) -> None:
+        model = ComposeModel.from_text(COMPOSE)
+        assert model.services["api"] == {
+            "image": "myorg/api:dev",
+            "ports": [{"host": 8080, "container": 8080}],
+        }
+        assert model.services["worker"]["ports"] == []
+
+    def test_env_indexes(self) -> None:
+        model = ComposeModel.from_text(COMPOSE)
+        assert model.env_refs == {
+            "API_PORT": "9090",
+            "DB_URL": None,
+            "TOKEN": "dev",
+        }
+        assert model.env_services["DB_URL"] == ["api", "worker"]
+        assert model.env_services["TOKEN"] == ["api"]
+        assert "API_PORT" not in model.env_services
+
+    def test_volumes(self) -> None:
+        model = ComposeModel.from_text(COMPOSE)
+        assert model.named_volumes == ["data"]
+        assert model.volumes == [
+            VolumeRef("api", "./config/app.yaml", "/app/config.yaml"),
+            VolumeRef("api", "data", "/var/lib/data"),
+        ]
+
+    def test_no_services(self) -> None:
+        model = ComposeModel.from_text("version: '3'\n")
+        assert model.services == {}
+
+    def test_dict_roundtrip(self) -> None:
+        model = ComposeModel.from_text(COMPOSE)
+        assert ComposeModel.from_dict(model.to_dict()) == model
+
+
+class TestLoadComposeModel:
+    def test_missing_file(self, tmp_path: Path) -> None:
+        assert load_compose_model(tmp_path / "docker-compose.yml") is None
+
+    def test_writes_cache(self, tmp_path: Path) -> None:
+        (tmp_path / ".devops-ai").mkdir()
+        compose = tmp_path / "docker-compose.yml"
+        compose.write_text(COMPOSE)
+        cache_dir = tmp_path / ".devops-ai" / "cache"
+
+        model = load_compose_model(compose, cache_dir)
+
+        assert model is not None
+        inputs = [str(compose.resolve())]
+        data = json.loads((cache_dir / cache_file(inputs)).read_text())
+        assert data["model"]["digest"] == model.digest
+        assert (cache_dir / ".gitignore").read_text() == "*\n"
+
+    def test_cache_hit_skips_parse(self, tmp_path: Path) -> None:
+        (tmp_path / ".devops-ai").mkdir()
+        compose = tmp_path / "docker-compose.yml"
+        compose.write_text(COMPOSE)
+        cache_dir = tmp_path / ".devops-ai" / "cache"
+        first = load_compose_model(compose, cache_dir)
+
+        with patch.object(ComposeModel, "from_text") as mock_parse:
+            second = load_compose_model(compose, cache_dir)
+
+        mock_parse.assert_not_called()
+        assert second == first
+
+    def test_content_change_invalidates(self, tmp_path: Path) -> None:
+        (tmp_path / ".devops-ai").mkdir()
+        compose = tmp_path / "docker-compose.yml"
+        compose.write_text(COMPOSE)
+        cache_dir = tmp_path / ".devops-ai" / "cache"
+        load_compose_model(compose, cache_dir)
+
+        compose.write_text(COMPOSE.replace("8080:8080", "8081:8080"))
+        model = load_compose_model(compose, cache_dir)
+
+        assert model is not None
+        assert model.services["api"]["ports"][0]["host"] == 8081
+
+    def test_projects_sharing_cache_dir_keep_own_entry(
+        self, tmp_path: Path
+    ) -> None:
+        cache_dir = tmp_path / "cache"
+        composes = []
+        for name in ("a", "b"):
+            (tmp_path / name).mkdir()
+            compose = tmp_path / name / "docker-compose.yml"
+            compose.write_text(COMPOSE)
+            composes.append(compose)
+            load_compose_model(compose, cache_dir)
+
+        assert len(list(cache_dir.glob("compose-model-*.json"))) == 2
+        with patch.object(ComposeModel, "from_graph") as mock_build:
+            for compose in composes:
+                assert load_compose_model(compose, cache_dir) is not None
+        mock_build.assert_not_called()
+
+    def test_no_cache_without_devops_ai_dir(self, tmp_path: Path) -> None:
+        compose = tmp_path / "docker-compose.yml"
+        compose.write_text(COMPOSE)
+        cache_dir = tmp_path / ".devops-ai" / "cache"
+
+        assert load_compose_model(compose, cache_dir) is not None
+        assert not cache_dir.exists()
+
+    def test_included_file_change_invalidates(self, tmp_path: Path) -> None:
+        (tmp_path / ".devops-ai").mkdir()
+        compose = tmp_path / "docker-compose.yml"
+        compose.write_text("include:\n  - db.yml\n")
+        db = tmp_path / "db.yml"
+        db.write_text("services:\n  db:\n    image: postgres:15\n")
+        cache_dir = tmp_path / ".devops-ai" / "cache"
+        first = load_compose_model(compose, cache_dir)
+        assert first is not None
+        assert first.files == [str(compose.resolve()), str(db.resolve())]
+
+        db.write_text("services:\n  db:\n    image: postgres:16\n")
+        second = load_compose_model(compose, cache_dir)
+
+        assert second is not None
+        assert second.services["db"]["image"] == "postgres:16"
@@ -1,10 +1,20 @@
 """Tests for config loader — .devops-ai/infra.toml parsing."""
 
+import os
+import time
 from pathlib import Path
+from unittest.mock import patch
 
 import pytest
 
-from devops_ai.config import find_project_root, load_config, parse_mount
+from devops_ai import config as config_module
+from devops_ai.config import (
+    clear_config_cache,
+    find_project_root,
+    load_config,
+    parse_mem_limit,
+    parse_mount,
+)
 
 # --- Simple config (khealth-style, 12 lines) ---
 
@@ -338,3 +348,223 @@ class TestProvisioningSectionTypeValidation:
             ValueError, match="sandbox.secrets.*must be a table"
         ):
             load_config(root)
+
+
+# --- Resource limits ---
+
+RESOURCES_CONFIG = """\
+[project]
+name = "ktrdr"
+
+[sandbox]
+
+[sandbox.resources]
+slot_cpus = 4
+slot_mem_limit = "6g"
+
+[sandbox.resources.backend]
+cpus = 2
+mem_limit = "2g"
+pids_limit = 512
+
+[sandbox.resources.db]
+mem_limit = "1g"
+"""
+
+
+class TestParseResources:
+    def test_slot_totals(self, tmp_path: Path) -> None:
+        root = _write_config(tmp_path, RESOURCES_CONFIG)
+        config = load_config(root)
+        assert config is not None
+        assert config.resources.slot_cpus == 4.0
+        assert config.resources.slot_mem_limit == "6g"
+
+    def test_service_limits(self, tmp_path: Path) -> None:
+        root = _write_config(tmp_path, RESOURCES_CONFIG)
+        config = load_config(root)
+        assert config is not None
+        backend = config.resources.services["backend"]
+        assert backend.cpus == 2.0
+        assert backend.mem_limit == "2g"
+        assert backend.pids_limit == 512
+        db = config.resources.services["db"]
+        assert db.cpus is None
+        assert db.pids_limit is None
+
+    def test_defaults_to_empty(self, tmp_path: Path) -> None:
+        root = _write_config(tmp_path, SIMPLE_CONFIG)
+        config = load_config(root)
+        assert config is not None
+        assert config.resources.services == {}
+        assert config.resources.slot_cpus is None
+
+    def test_invalid_mem_limit_raises(self, tmp_path: Path) -> None:
+        root = _write_config(
+            tmp_path,
+            '[project]\nname = "x"\n[sandbox]\n'
+            '[sandbox.resources.app]\nmem_limit = "lots"\n',
+        )
+        with pytest.raises(ValueError, match="Invalid memory size"):
+            load_config(root)
+
+    def test_unknown_scalar_raises(self, tmp_path: Path) -> None:
+        root = _write_config(
+            tmp_path,
+            '[project]\nname = "x"\n[sandbox]\n'
+            "[sandbox.resources]\ncpus = 2\n",
+        )
+        with pytest.raises(ValueError, match="Unknown key"):
+            load_config(root)
+
+
+class TestParseMemLimit:
+    def test_units(self) -> None:
+        assert parse_mem_limit("1024") == 1024
+        assert parse_mem_limit("512m") == 512 * 1024**2
+        assert parse_mem_limit("2g") == 2 * 1024**3
+        assert parse_mem_limit("1.5G") == int(1.5 * 1024**3)
+        assert parse_mem_limit("64kb") == 64 * 1024
+
+    def test_invalid(self) -> None:
+        with pytest.raises(ValueError):
+            parse_mem_limit("2x")
+
+
+class TestParseMaxSlots:
+    def test_parsed(self, tmp_path: Path) -> None:
+        root = _write_config(
+            tmp_path, '[project]\nname = "x"\n[sandbox]\nmax_slots = 3\n'
+        )
+        config = load_config(root)
+        assert config is not None
+        assert config.max_slots == 3
+
+    def test_invalid(self, tmp_path: Path) -> None:
+        root = _write_config(
+            tmp_path, '[project]\nname = "x"\n[sandbox]\nmax_slots = 0\n'
+        )
+        with pytest.raises(ValueError, match="max_slots"):
+            load_config(root)
+
+
+class TestParseWorktreeSection:
+    def test_without_sandbox(self, tmp_path: Path) -> None:
+        root = _write_config(
+            tmp_path,
+            '[project]\nname = "x"\n[worktree]\n'
+            'sparse = ["services/api/", "libs"]\n'
+            "deferred_checkout = true\n",
+        )
+        config = load_config(root)
+        assert config is not None
+        assert config.worktree.sparse == ["services/api", "libs"]
+        assert config.worktree.deferred_checkout is True
+
+    def test_defaults(self, tmp_path: Path) -> None:
+        root = _write_config(tmp_path, '[project]\nname = "x"\n[sandbox]\n')
+        config = load_config(root)
+        assert config is not None
+        assert config.worktree.sparse == []
+        assert config.worktree.deferred_checkout is False
+
+    def test_pool_size(self, tmp_path: Path) -> None:
+        root = _write_config(
+            tmp_path, '[project]\nname = "x"\n[worktree]\npool_size = 2\n'
+        )
+        config = load_config(root)
+        assert config is not None
+        assert config.worktree.pool_size == 2
+
+    def test_negative_pool_size_rejected(self, tmp_path: Path) -> None:
+        root = _write_config(
+            tmp_path, '[project]\nname = "x"\n[worktree]\npool_size = -1\n'
+        )
+        with pytest.raises(ValueError, match="pool_size"):
+            load_config(root)
+
+    def test_wildcard_rejected(self, tmp_path: Path) -> None:
+        root = _write_config(
+            tmp_path,
+            '[project]\nname = "x"\n[worktree]\nsparse = ["src/*"]\n',
+        )
+        with pytest.raises(ValueError, match="plain directory"):
+            load_config(root)
+
+
+class TestParseComposeFileList:
+    def test_single_path(self, tmp_path: Path) -> None:
+        root = _write_config(
+            tmp_path,
+            '[project]\nname = "x"\n[sandbox]\ncompose_file = "c.yml"\n',
+        )
+        config = load_config(root)
+        assert config is not None
+        assert config.compose_file == "c.yml"
+        assert config.compose_overrides == []
+
+    def test_layered_list(self, tmp_path: Path) -> None:
+        root = _write_config(
+            tmp_path,
+            '[project]\nname = "x"\n[sandbox]\n'
+            'compose_file = ["c.yml", "c.override.yml"]\n',
+        )
+        config = load_config(root)
+        assert config is not None
+        assert config.compose_file == "c.yml"
+        assert config.compose_overrides == ["c.override.yml"]
+
+    def test_empty_list_invalid(self, tmp_path: Path) -> None:
+        root = _write_config(
+            tmp_path,
+            '[project]\nname = "x"\n[sandbox]\ncompose_file = []\n',
+        )
+        with pytest.raises(ValueError, match="compose_file"):
+            load_config(root)
+
+
+def _age(path: Path, seconds: int = 60) -> None:
+    """Backdate a file so it falls outside the racy-mtime window."""
+    old = time.time() - seconds
+    os.utime(path, (old, old))
+
+
+class TestConfigCache:
+    def setup_method(self) -> None:
+        clear_config_cache()
+
+    def test_unchanged_file_not_reparsed(self, tmp_path: Path) -> None:
+        root = _write_config(tmp_path, SIMPLE_CONFIG)
+        _age(root / ".devops-ai" / "infra.toml")
+        first = load_config(root)
+
+        with patch.object(config_module, "_parse_config") as mock_parse:
+            second = load_config(root)
+
+        mock_parse.assert_not_called()
+        assert second is first
+
+    def test_edit_invalidates(self, tmp_path: Path) -> None:
+        root = _write_config(tmp_path, SIMPLE_CONFIG)
+        path = root / ".devops-ai" / "infra.toml"
+        _age(path, 120)
+        load_config(root)
+
+        path.write_text(SIMPLE_CONFIG.replace("khealth", "kother"))
+        _age(path)
+        config = load_config(root)
+        assert config is not None
+        assert config.project_name == "kother"
+
+    def test_recently_modified_not_cached(self, tmp_path: Path) -> None:
+        root = _write_config(tmp_path, SIMPLE_CONFIG)
+        first = load_config(root)
+        assert load_config(root) is not first
+
+    def test_deleted_file(self, tmp_path: Path) -> None:
+        root = _write_config(tmp_path, SIMPLE_CONFIG)
+        path = root / ".devops-ai" / "infra.toml"
+        _age(path)
+        load_config(root)
+        path.unlink()
+        assert load_config(root) is None
@@ -0,0 +1,48 @@
+"""Tests for the per-invocation project context."""
+
+from __future__ import annotations
+
+import subprocess
+from pathlib import Path
+
+from devops_ai.context import ProjectContext
+
+
+def _git(cwd: Path, *args: str) -> None:
+    subprocess.run(
+        ["git", *args], cwd=cwd, check=True, capture_output=True
+    )
+
+
+class TestProjectContext:
+    def test_without_config(self, tmp_path: Path) -> None:
+        ctx = ProjectContext.resolve(tmp_path)
+        assert ctx.config is None
+        assert ctx.prefix == tmp_path.name
+        assert ctx.project_name == tmp_path.name
+
+    def test_with_config(self, tmp_path: Path) -> None:
+        (tmp_path / ".devops-ai").mkdir()
+        (tmp_path / ".devops-ai" / "infra.toml").write_text(
+            '[project]\nname = "myapp"\nprefix = "ma"\n'
+        )
+        ctx = ProjectContext.resolve(tmp_path)
+        assert ctx.project_name == "myapp"
+        assert ctx.prefix == "ma"
+
+    def test_main_repo_root_from_worktree(self, tmp_path: Path) -> None:
+        main = tmp_path / "main"
+        main.mkdir()
+        _git(main, "init", "-q")
+        _git(
+            main,
+            "-c", "user.email=t@t", "-c", "user.name=t",
+            "commit", "-q", "--allow-empty", "-m", "init",
+        )
+        _git(main, "worktree", "add", "-q", str(tmp_path / "wt"))
+
+        ctx = ProjectContext.resolve(tmp_path / "wt")
+        assert ctx.main_repo_root == main.resolve()
+
+    def test_main_repo_root_outside_git(self, tmp_path: Path) -> None:
+        assert ProjectContext.resolve(tmp_path).main_repo_root is None
@@ -0,0 +1,145 @@
+"""Tests for kinfrad and its client."""
+
+from __future__ import annotations
+
+import os
+import tempfile
+import threading
+from collections.abc import Iterator
+from contextlib import contextmanager
+from pathlib import Path
+from unittest.mock import patch
+
+import pytest
+
+from devops_ai.daemon import call_daemon
+from devops_ai.daemon_server import KinfraDaemon, create_server
+from devops_ai.registry import Registry, SlotInfo, save_registry
+
+
+@pytest.fixture
+def sock_path() -> Iterator[Path]:
+    # AF_UNIX paths are limited to ~104 bytes; pytest's tmp_path can exceed it
+    with tempfile.TemporaryDirectory(prefix="kd") as d:
+        yield Path(d) / "kinfra.sock"
+
+
+@contextmanager
+def _serve(sock_path: Path, daemon: KinfraDaemon) -> Iterator[None]:
+    server = create_server(sock_path, daemon)
+    thread = threading.Thread(
+        target=server.serve_forever, args=(0.01,), daemon=True
+    )
+    thread.start()
+    try:
+        yield
+    finally:
+        server.shutdown()
+        server.server_close()
+
+
+def _slot(worktree: Path) -> SlotInfo:
+    return SlotInfo(
+        slot_id=3,
+        project="myapp",
+        worktree_path=str(worktree),
+        slot_dir="/tmp/slot-3",
+        compose_file_copy="",
+        ports={"API_PORT": 8083},
+        claimed_at="2026-01-01T00:00:00",
+        status="running",
+    )
+
+
+class TestCallDaemon:
+    def test_no_daemon_returns_none(self, sock_path: Path) -> None:
+        assert call_daemon("ping", socket_path=sock_path) is None
+
+    def test_disabled_by_env(self, sock_path: Path) -> None:
+        daemon = KinfraDaemon(sock_path.parent / "registry.json")
+        with _serve(sock_path, daemon):
+            with patch.dict(os.environ, {"KINFRA_NO_DAEMON": "1"}):
+                assert call_daemon("ping", socket_path=sock_path) is None
+
+    def test_ping(self, sock_path: Path) -> None:
+        daemon = KinfraDaemon(sock_path.parent / "registry.json")
+        with _serve(sock_path, daemon):
+            reply = call_daemon("ping", socket_path=sock_path)
+        assert reply is not None
+        assert reply[0] == 0
+        assert str(os.getpid()) in reply[1]
+
+    def test_unknown_method_falls_back(self, sock_path: Path) -> None:
+        daemon = KinfraDaemon(sock_path.parent / "registry.json")
+        with _serve(sock_path, daemon):
+            assert call_daemon("nope", socket_path=sock_path) is None
+
+    def test_socket_is_owner_only(self, sock_path: Path) -> None:
+        daemon = KinfraDaemon(sock_path.parent / "registry.json")
+        with _serve(sock_path, daemon):
+            assert sock_path.stat().st_mode & 0o077 == 0
+
+
+class TestDaemonStatus:
+    def test_status_from_registry(
+        self, sock_path: Path, tmp_path: Path
+    ) -> None:
+        (tmp_path / ".devops-ai").mkdir()
+        registry_path = sock_path.parent / "registry.json"
+        save_registry(
+            Registry(slots={3: _slot(tmp_path.resolve())}), registry_path
+        )
+        daemon = KinfraDaemon(registry_path)
+        with _serve(sock_path, daemon):
+            reply = call_daemon(
+                "status", {"cwd": str(tmp_path)}, socket_path=sock_path
+            )
+        assert reply is not None
+        code, msg = reply
+        assert code == 0
+        assert "Slot:      3" in msg
+        assert "API_PORT: 8083" in msg
+
+
+class TestRegistryCache:
+    def test_reused_until_file_changes(self, tmp_path: Path) -> None:
+        registry_path = tmp_path / "registry.json"
+        save_registry(Registry(), registry_path)
+        daemon = KinfraDaemon(registry_path)
+
+        first = daemon.registry()
+        assert daemon.registry() is first
+
+        save_registry(Registry(slots={3: _slot(tmp_path)}), registry_path)
+        assert 3 in daemon.registry().slots
+
+    def test_missing_file(self, tmp_path: Path) -> None:
+        daemon = KinfraDaemon(tmp_path / "registry.json")
+        assert daemon.registry().slots == {}
+
+
+class TestDispatch:
+    def test_version_mismatch(self, tmp_path: Path) -> None:
+        daemon = KinfraDaemon(tmp_path / "registry.json")
+        reply = daemon.dispatch({"version": 99, "method": "ping"})
+        assert "protocol version" in reply["error"]
+
+    def test_handler_error_reported(self, tmp_path: Path) -> None:
+        daemon = KinfraDaemon(tmp_path / "registry.json")
+        daemon.methods["boom"] = lambda params: 1 / 0
+        reply = daemon.dispatch({"version": 1, "method": "boom"})
+        assert "ZeroDivisionError" in reply["error"]
+
+
+class TestCreateServer:
+    def test_refuses_second_daemon(self, sock_path: Path) -> None:
+        daemon = KinfraDaemon(sock_path.parent / "registry.json")
+        with _serve(sock_path, daemon):
+            with pytest.raises(RuntimeError, match="already listening"):
+                create_server(sock_path, daemon)
+
+    def test_replaces_stale_socket(self, sock_path: Path) -> None:
+        sock_path.touch()
+        daemon = KinfraDaemon(sock_path.parent / "registry.json")
+        with _serve(sock_path, daemon):
+            assert call_daemon("ping", socket_path=sock_path) is not None
@@ -0,0 +1,50 @@
+"""Tests for disk usage accounting."""
+
+from __future__ import annotations
+
+import os
+import time
+from pathlib import Path
+
+from devops_ai.disk import format_size, tree_size
+
+
+class TestTreeSize:
+    def test_counts_nested_files(self, tmp_path: Path) -> None:
+        (tmp_path / "a").mkdir()
+        (tmp_path / "a" / "f.bin").write_bytes(b"x" * 100_000)
+        (tmp_path / "g.bin").write_bytes(b"y" * 50_000)
+        size = tree_size(tmp_path)
+        assert size is not None
+        assert size >= 150_000
+
+    def test_hardlinks_counted_once(self, tmp_path: Path) -> None:
+        (tmp_path / "f.bin").write_bytes(b"x" * 100_000)
+        single = tree_size(tmp_path)
+        os.link(tmp_path / "f.bin", tmp_path / "g.bin")
+        assert tree_size(tmp_path) == single
+
+    def test_symlinks_not_followed(self, tmp_path: Path) -> None:
+        outside = tmp_path / "outside"
+        outside.mkdir()
+        (outside / "big.bin").write_bytes(b"x" * 200_000)
+        inside = tmp_path / "inside"
+        inside.mkdir()
+        (inside / "link").symlink_to(outside, target_is_directory=True)
+        size = tree_size(inside)
+        assert size is not None
+        assert size < 200_000
+
+    def test_deadline(self, tmp_path: Path) -> None:
+        (tmp_path / "f").write_text("x")
+        assert tree_size(tmp_path, deadline=time.monotonic() - 1) is None
+
+    def test_missing_dir(self, tmp_path: Path) -> None:
+        assert tree_size(tmp_path / "nope") == 0
+
+
+class TestFormatSize:
+    def test_units(self) -> None:
+        assert format_size(512) == "512B"
+        assert format_size(1536) == "1.5K"
+        assert format_size(3 * 1024**3) == "3.0G"
@@ -0,0 +1,142 @@
+"""Tests for image prefetch — collection, concurrent pulls, digest cache."""
+
+from __future__ import annotations
+
+import threading
+import time
+from pathlib import Path
+from unittest.mock import patch
+
+from devops_ai.cli.images_cmd import images_prefetch_command
+from devops_ai.images import (
+    collect_images,
+    load_digest_cache,
+    prefetch_images,
+    record_digests,
+    start_background_prefetch,
+)
+
+COMPOSE = """\
+services:
+  api:
+    build: .
+    image: myapp:dev
+  db:
+    image: postgres:16
+  cache:
+    image: redis:7
+  custom:
+    image: ${REGISTRY}/thing:latest
+  db2:
+    image: postgres:16
+"""
+
+
+class FakeRuntime:
+    """In-memory runtime that records concurrency."""
+
+    def __init__(self, fail: set[str] | None = None) -> None:
+        self.fail = fail or set()
+        self.pulled: list[str] = []
+        self.active = 0
+        self.peak = 0
+        self._lock = threading.Lock()
+
+    def pull(self, image: str) -> None:
+        with self._lock:
+            self.active += 1
+            self.peak = max(self.peak, self.active)
+        time.sleep(0.02)
+        with self._lock:
+            self.active -= 1
+            self.pulled.append(image)
+        if image in self.fail:
+            raise RuntimeError("manifest unknown")
+
+    def digest(self, image: str) -> str | None:
+        return f"{image.split(':')[0]}@sha256:{len(image):064d}"
+
+
+class TestCollectImages:
+    def test_pullable_only(self, tmp_path: Path) -> None:
+        compose = tmp_path / "docker-compose.yml"
+        compose.write_text(COMPOSE)
+        assert collect_images(compose) == ["postgres:16", "redis:7"]
+
+    def test_missing_file(self, tmp_path: Path) -> None:
+        assert collect_images(tmp_path / "nope.yml") == []
+
+
+class TestPrefetchImages:
+    def test_bounded_concurrency(self) -> None:
+        runtime = FakeRuntime()
+        images = [f"img{i}:1" for i in range(8)]
+        result = prefetch_images(images, runtime, max_workers=3)
+        assert sorted(runtime.pulled) == sorted(images)
+        assert 1 < runtime.peak <= 3
+        assert set(result.digests) == set(images)
+
+    def test_failures_collected(self) -> None:
+        runtime = FakeRuntime(fail={"bad:1"})
+        result = prefetch_images(["good:1", "bad:1"], runtime)
+        assert "good:1" in result.digests
+        assert result.errors == {"bad:1": "manifest unknown"}
+
+
+class TestDigestCache:
+    def test_record_and_load(self, tmp_path: Path) -> None:
+        record_digests("proj", {"redis:7": "redis@sha256:abc"}, tmp_path)
+        record_digests("proj", {"postgres:16": None}, tmp_path)
+        cache = load_digest_cache("proj", tmp_path)
+        assert cache["redis:7"]["digest"] == "redis@sha256:abc"
+        assert "postgres:16" in cache
+
+    def test_missing_cache(self, tmp_path: Path) -> None:
+        assert load_digest_cache("nope", tmp_path) == {}
+
+
+class TestPrefetchCommand:
+    def test_pulls_and_records(self, tmp_path: Path) -> None:
+        (tmp_path / "docker-compose.yml").write_text(COMPOSE)
+        cache_dir = tmp_path / "cache"
+        code, msg = images_prefetch_command(
+            tmp_path, runtime=FakeRuntime(), cache_dir=cache_dir
+        )
+        assert code == 0
+        assert "2/2" in msg
+        assert set(load_digest_cache(tmp_path.name, cache_dir)) == {
+            "postgres:16",
+            "redis:7",
+        }
+
+    def test_failure_exit_code(self, tmp_path: Path) -> None:
+        (tmp_path / "docker-compose.yml").write_text(COMPOSE)
+        code, msg = images_prefetch_command(
+            tmp_path,
+            runtime=FakeRuntime(fail={"redis:7"}),
+            cache_dir=tmp_path / "cache",
+        )
+        assert code == 1
+        assert "redis:7: manifest unknown" in msg
+
+    def test_no_images(self, tmp_path: Path) -> None:
+        code, msg = images_prefetch_command(tmp_path, runtime=FakeRuntime())
+        assert code == 0
+        assert "No images" in msg
+
+
+class TestBackgroundPrefetch:
+    def test_spawns_detached(self, tmp_path: Path) -> None:
+        with patch("devops_ai.images.subprocess.Popen") as mock_popen:
+            assert start_background_prefetch(tmp_path, "proj", tmp_path)
+        args, kwargs = mock_popen.call_args
+        assert args[0][-2:] == ["images", "prefetch"]
+        assert kwargs["cwd"] == tmp_path
+        assert kwargs["start_new_session"] is True
+        assert (tmp_path / "proj.log").exists()
+
+    def test_spawn_failure_non_fatal(self, tmp_path: Path) -> None:
+        with patch(
+            "devops_ai.images.subprocess.Popen", side_effect=OSError("nope")
+        ):
+            assert not start_background_prefetch(tmp_path, "proj", tmp_path)
@@ -0,0 +1,102 @@
+"""Import budget for kinfra subcommands.
+
+Each case imports the CLI entry point plus the command module a
+subcommand loads lazily, in a fresh interpreter run with
+``python -X importtime``, and checks that no heavy module it does not
+need got loaded. That module set is the guard.
+
+Wall-clock import time depends too much on machine load to assert on by
+default. Set KINFRA_IMPORT_BUDGET_MS to also check the time each import
+adds over a bare interpreter (``python -c pass``).
+"""
+
+from __future__ import annotations
+
+import os
+import subprocess
+import sys
+
+import pytest
+
+IMPORT_BUDGET_ENV = "KINFRA_IMPORT_BUDGET_MS"
+
+# Modules only commands that parse YAML, render tables or talk HTTP need
+HEAVY_MODULES = (
+    "ruamel.yaml",
+    "rich",
+    "urllib.request",
+    "devops_ai.cli.init_cmd",
+    "devops_ai.sandbox",
+    # Server half of kinfrad; the client must not pull it in
+    "devops_ai.daemon_server",
+    "socketserver",
+)
+
+# subcommand -> (modules its wrapper imports, heavy modules it may load)
+SUBCOMMANDS: dict[str, tuple[str | None, tuple[str, ...]]] = {
+    "--help": (None, ()),
+    "status": ("devops_ai.daemon, devops_ai.cli.status", ()),
+    "queue": ("devops_ai.daemon, devops_ai.cli.queue_cmd", ()),
+    "worktrees": ("devops_ai.cli.worktrees", ("rich",)),
+}
+
+
+def _import_profile(modules: str | None) -> tuple[set[str], float]:
+    """Import main (and modules) in a fresh interpreter.
+
+    With ``modules`` set to "", imports nothing (interpreter baseline).
+    Returns (loaded module names, total cumulative import time in ms).
+    """
+    if modules == "":
+        code = "pass"
+    else:
+        extra = f", {modules}" if modules else ""
+        code = f"import devops_ai.cli.main{extra}"
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code],
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    loaded: set[str] = set()
+    total_us = 0
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line.split("|")
+        loaded.add(name.strip())
+        # Top-level entries (no indent) partition the whole import
+        if not name[1:].startswith(" "):
+            total_us += int(cumulative)
+    return loaded, total_us / 1000
+
+
+@pytest.mark.parametrize("command", sorted(SUBCOMMANDS))
+def test_subcommand_imports(command: str) -> None:
+    modules, allowed = SUBCOMMANDS[command]
+    loaded, _ = _import_profile(modules)
+
+    unexpected = [
+        heavy
+        for heavy in HEAVY_MODULES
+        if heavy not in allowed and heavy in loaded
+    ]
+    assert unexpected == [], f"kinfra {command} imports {unexpected}"
+
+
+@pytest.mark.skipif(
+    IMPORT_BUDGET_ENV not in os.environ,
+    reason=f"timing check is opt-in; set {IMPORT_BUDGET_ENV}",
+)
+@pytest.mark.parametrize("command", sorted(SUBCOMMANDS))
+def test_subcommand_import_time(command: str) -> None:
+    budget = float(os.environ[IMPORT_BUDGET_ENV])
+    modules, _ = SUBCOMMANDS[command]
+    # Best of three on both sides to shed scheduling noise
+    baseline = min(_import_profile("")[1] for _ in range(3))
+    total = min(_import_profile(modules)[1] for _ in range(3))
+    added = total - baseline
+    assert added < budget, (
+        f"kinfra {command} imports add {added:.0f}ms over a bare "
+        f"interpreter (budget {budget:.0f}ms)"
+    )
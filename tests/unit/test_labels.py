@@ -0,0 +1,240 @@
+"""Tests for slot labels and registry rebuild from Docker."""
+
+from __future__ import annotations
+
+import fcntl
+import subprocess
+from collections.abc import Iterator
+from pathlib import Path
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from devops_ai.labels import (
+    MANAGED,
+    PROJECT,
+    SLOT,
+    LabelledContainer,
+    list_slot_containers,
+    rebuild_registry,
+    slot_from_labels,
+    slot_labels,
+)
+from devops_ai.registry import Registry, SlotInfo
+
+
+def _slot(slot_id: int = 2, worktree: str = "/w/feat") -> SlotInfo:
+    return SlotInfo(
+        slot_id=slot_id,
+        project="myproj",
+        worktree_path=worktree,
+        slot_dir=f"/s/myproj-{slot_id}",
+        compose_file_copy=f"/s/myproj-{slot_id}/docker-compose.yml",
+        ports={"API_PORT": 8082, "DB_PORT": 5434},
+        claimed_at="2025-01-01T00:00:00",
+        status="running",
+        cpus=2.0,
+        mem_bytes=1 << 30,
+    )
+
+
+def _container(
+    name: str, slot: SlotInfo, state: str = "running"
+) -> LabelledContainer:
+    return LabelledContainer(name, state, slot_labels(slot))
+
+
+class TestSlotLabels:
+    def test_round_trip(self) -> None:
+        slot = _slot()
+        rebuilt = slot_from_labels(slot_labels(slot))
+        assert rebuilt is not None
+        # Status comes from container state, not labels
+        rebuilt.status = slot.status
+        assert rebuilt == slot
+
+    def test_missing_required_label(self) -> None:
+        labels = slot_labels(_slot())
+        del labels[SLOT]
+        assert slot_from_labels(labels) is None
+
+    def test_malformed_ports(self) -> None:
+        labels = slot_labels(_slot())
+        labels["devops-ai.ports"] = "API_PORT=abc"
+        assert slot_from_labels(labels) is None
+
+
+class TestListSlotContainers:
+    def test_parses_tab_separated_labels(self) -> None:
+        labels = slot_labels(_slot())
+        values = [labels[k] for k in labels]
+        stdout = "\t".join(["myproj-slot-2-api-1", "running", *values])
+        result = MagicMock(stdout=stdout + "\n")
+        with patch(
+            "devops_ai.labels.subprocess.run", return_value=result
+        ) as run:
+            containers = list_slot_containers()
+
+        cmd = run.call_args[0][0]
+        assert f"label={MANAGED}=true" in cmd
+        assert len(containers) == 1
+        assert containers[0].name == "myproj-slot-2-api-1"
+        assert containers[0].labels == labels
+
+    def test_skips_short_lines(self) -> None:
+        result = MagicMock(stdout="garbage\n")
+        with patch("devops_ai.labels.subprocess.run", return_value=result):
+            assert list_slot_containers() == []
+
+    def test_docker_failure_raises(self) -> None:
+        with patch(
+            "devops_ai.labels.subprocess.run",
+            side_effect=subprocess.CalledProcessError(1, "docker"),
+        ):
+            with pytest.raises(subprocess.SubprocessError):
+                list_slot_containers()
+
+
+class TestRebuildRegistry:
+    def test_adds_missing_slots(self) -> None:
+        reg = Registry()
+        slot = _slot()
+        added, conflicts = rebuild_registry(
+            reg,
+            [
+                _container("api", slot, "exited"),
+                _container("db", slot, "running"),
+            ],
+        )
+        assert [s.slot_id for s in added] == [2]
+        assert conflicts == []
+        assert reg.slots[2].status == "running"
+
+    def test_all_exited_is_stopped(self) -> None:
+        reg = Registry()
+        rebuild_registry(reg, [_container("api", _slot(), "exited")])
+        assert reg.slots[2].status == "stopped"
+
+    def test_keeps_existing_entry(self) -> None:
+        existing = _slot()
+        reg = Registry(slots={2: existing})
+        added, conflicts = rebuild_registry(
+            reg, [_container("api", _slot())]
+        )
+        assert added == []
+        assert conflicts == []
+        assert reg.slots[2] is existing
+
+    def test_registry_conflict_reported(self) -> None:
+        reg = Registry(slots={2: _slot(worktree="/w/other")})
+        added, conflicts = rebuild_registry(
+            reg, [_container("api", _slot())]
+        )
+        assert added == []
+        assert len(conflicts) == 1
+        assert reg.slots[2].worktree_path == "/w/other"
+
+    def test_containers_disagree(self) -> None:
+        reg = Registry()
+        added, conflicts = rebuild_registry(
+            reg,
+            [
+                _container("a", _slot(worktree="/w/one")),
+                _container("b", _slot(worktree="/w/two")),
+            ],
+        )
+        assert reg.slots[2].worktree_path == "/w/one"
+        assert len(conflicts) == 1
+        assert "b: slot 2" in conflicts[0]
+
+    def test_incomplete_labels(self) -> None:
+        reg = Registry()
+        container = LabelledContainer(
+            "stray", "running", {MANAGED: "true", PROJECT: "x"}
+        )
+        added, conflicts = rebuild_registry(reg, [container])
+        assert added == []
+        assert conflicts == ["stray: incomplete labels"]
+
+
+class TestRebuildCommand:
+    @pytest.fixture(autouse=True)
+    def _registry_path(self, tmp_path: Path) -> Iterator[Path]:
+        path = tmp_path / "registry.json"
+        with patch("devops_ai.registry.DEFAULT_REGISTRY_PATH", path):
+            yield path
+
+    def test_saves_added_slots(self) -> None:
+        from devops_ai.cli.registry_cmd import rebuild_command
+
+        with (
+            patch(
+                "devops_ai.cli.registry_cmd.list_slot_containers",
+                return_value=[_container("api", _slot())],
+            ),
+            patch(
+                "devops_ai.cli.registry_cmd.load_registry",
+                return_value=Registry(),
+            ),
+            patch("devops_ai.cli.registry_cmd.save_registry") as save,
+        ):
+            code, msg = rebuild_command()
+        assert code == 0
+        assert "Added slot 2" in msg
+        save.assert_called_once()
+
+    def test_saves_under_registry_lock(self, _registry_path: Path) -> None:
+        from devops_ai.cli.registry_cmd import rebuild_command
+
+        def _save(_registry: Registry) -> None:
+            lock_path = _registry_path.with_name("registry.json.lock")
+            with open(lock_path, "a") as lock:
+                with pytest.raises(BlockingIOError):
+                    fcntl.flock(lock.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+
+        with (
+            patch(
+                "devops_ai.cli.registry_cmd.list_slot_containers",
+                return_value=[_container("api", _slot())],
+            ),
+            patch(
+                "devops_ai.cli.registry_cmd.load_registry",
+                return_value=Registry(),
+            ),
+            patch(
+                "devops_ai.cli.registry_cmd.save_registry", side_effect=_save
+            ) as save,
+        ):
+            code, _ = rebuild_command()
+        assert code == 0
+        save.assert_called_once()
+
+    def test_dry_run_does_not_save(self) -> None:
+        from devops_ai.cli.registry_cmd import rebuild_command
+
+        with (
+            patch(
+                "devops_ai.cli.registry_cmd.list_slot_containers",
+                return_value=[_container("api", _slot())],
+            ),
+            patch(
+                "devops_ai.cli.registry_cmd.load_registry",
+                return_value=Registry(),
+            ),
+            patch("devops_ai.cli.registry_cmd.save_registry") as save,
+        ):
+            code, msg = rebuild_command(dry_run=True)
+        assert code == 0
+        assert "Would add slot 2" in msg
+        save.assert_not_called()
+
+    def test_docker_unavailable(self) -> None:
+        from devops_ai.cli.registry_cmd import rebuild_command
+
+        with patch(
+            "devops_ai.cli.registry_cmd.list_slot_containers",
+            side_effect=FileNotFoundError("docker"),
+        ):
+            code, msg = rebuild_command()
+        assert code == 1
+        assert "Could not list Docker containers" in msg
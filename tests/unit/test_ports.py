@@ -9,6 +9,7 @@ from devops_ai.ports import (
     check_base_port_safety,
     check_ports_available,
     compute_ports,
+    find_port_band_clashes,
 )
 
 
@@ -88,3 +89,29 @@ class TestBasePortSafety:
         ]
         warnings = check_base_port_safety(config, other_entries)
         assert warnings == []
+
+
+class TestFindPortBandClashes:
+    def test_overlapping_bands(self) -> None:
+        clashes = find_port_band_clashes(
+            {
+                "api": {"API_PORT": 8080},
+                "web": {"WEB_PORT": 8120, "ADMIN_PORT": 9000},
+            }
+        )
+        assert len(clashes) == 1
+        assert clashes[0].project == "api"
+        assert clashes[0].other_project == "web"
+        assert "40 apart" in str(clashes[0])
+
+    def test_same_project_ignored(self) -> None:
+        clashes = find_port_band_clashes(
+            {"api": {"API_PORT": 8080, "GRPC_PORT": 8081}}
+        )
+        assert clashes == []
+
+    def test_band_edge_is_safe(self) -> None:
+        clashes = find_port_band_clashes(
+            {"a": {"A_PORT": 8000}, "b": {"B_PORT": 8100}}
+        )
+        assert clashes == []
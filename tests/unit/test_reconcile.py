@@ -0,0 +1,329 @@
+"""Tests for the slot status reconciler."""
+
+from __future__ import annotations
+
+import io
+import json
+import shutil
+import threading
+from datetime import datetime, timezone
+from pathlib import Path
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from devops_ai.labels import LabelledContainer, slot_labels
+from devops_ai.reconcile import Reconciler, StatusChange, reconcile_once
+from devops_ai.registry import (
+    Registry,
+    SlotInfo,
+    load_registry,
+    registry_lock,
+    save_registry,
+)
+
+
+def _setup(
+    tmp_path: Path,
+    slot_id: int = 1,
+    status: str = "running",
+    claimed_at: str = "2025-01-01T00:00:00",
+) -> tuple[Path, SlotInfo]:
+    wt = tmp_path / "wts" / f"feat-{slot_id}"
+    slot_dir = tmp_path / "slots" / f"proj-{slot_id}"
+    wt.mkdir(parents=True)
+    slot_dir.mkdir(parents=True)
+    slot = SlotInfo(
+        slot_id=slot_id,
+        project="proj",
+        worktree_path=str(wt),
+        slot_dir=str(slot_dir),
+        compose_file_copy="",
+        ports={"API_PORT": 8080 + slot_id},
+        claimed_at=claimed_at,
+        status=status,
+    )
+    path = tmp_path / "registry.json"
+    registry = load_registry(path)
+    registry.slots[slot_id] = slot
+    save_registry(registry, path)
+    return path, slot
+
+
+def _event(slot: SlotInfo, action: str, name: str = "api") -> dict:
+    attrs = {**slot_labels(slot), "name": name}
+    return {
+        "Type": "container",
+        "Action": action,
+        "Actor": {"ID": "abc", "Attributes": attrs},
+    }
+
+
+def _status(path: Path, slot_id: int = 1) -> str:
+    return load_registry(path).slots[slot_id].status
+
+
+class TestSync:
+    def test_no_running_container_is_stopped(self, tmp_path: Path) -> None:
+        path, slot = _setup(tmp_path)
+        rec = Reconciler(path)
+        rec.sync([LabelledContainer("api", "exited", slot_labels(slot))])
+        changes = rec.flush()
+        assert changes == [StatusChange(1, "proj", "running", "stopped")]
+        assert _status(path) == "stopped"
+
+    def test_flush_writes_under_registry_lock(self, tmp_path: Path) -> None:
+        path, slot = _setup(tmp_path)
+        rec = Reconciler(path)
+        rec.sync([LabelledContainer("api", "exited", slot_labels(slot))])
+        with patch(
+            "devops_ai.reconcile.registry_lock", wraps=registry_lock
+        ) as lock:
+            rec.flush()
+        lock.assert_called_once_with(path)
+        assert _status(path) == "stopped"
+
+    def test_running_container_unchanged(self, tmp_path: Path) -> None:
+        path, slot = _setup(tmp_path)
+        rec = Reconciler(path)
+        rec.sync([LabelledContainer("api", "running", slot_labels(slot))])
+        assert rec.flush() == []
+
+    def test_deleted_worktree_is_missing(self, tmp_path: Path) -> None:
+        path, slot = _setup(tmp_path)
+        shutil.rmtree(slot.worktree_path)
+        rec = Reconciler(path)
+        rec.sync([])
+        rec.flush()
+        assert _status(path) == "missing"
+
+    def test_provisioning_left_alone(self, tmp_path: Path) -> None:
+        now = datetime.now(timezone.utc).isoformat(timespec="seconds")
+        path, _ = _setup(tmp_path, status="provisioning", claimed_at=now)
+        rec = Reconciler(path)
+        rec.sync([])
+        assert rec.flush() == []
+        assert _status(path) == "provisioning"
+
+    def test_abandoned_provisioning_reconciled(self, tmp_path: Path) -> None:
+        """A slot a crashed ``kinfra impl`` left behind is not stuck."""
+        path, _ = _setup(tmp_path, status="provisioning")
+        rec = Reconciler(path)
+        rec.sync([])
+        assert rec.flush() == [
+            StatusChange(1, "proj", "provisioning", "stopped")
+        ]
+
+    def test_provisioning_with_paths_gone_is_missing(
+        self, tmp_path: Path
+    ) -> None:
+        now = datetime.now(timezone.utc).isoformat(timespec="seconds")
+        path, slot = _setup(tmp_path, status="provisioning", claimed_at=now)
+        shutil.rmtree(slot.slot_dir)
+        rec = Reconciler(path)
+        rec.sync([])
+        rec.flush()
+        assert _status(path) == "missing"
+
+    def test_containers_of_previous_owner_ignored(
+        self, tmp_path: Path
+    ) -> None:
+        """A reused slot id does not inherit the old worktree's containers."""
+        path, slot = _setup(tmp_path)
+        old = SlotInfo(**{**slot.__dict__, "worktree_path": "/gone"})
+        rec = Reconciler(path)
+        rec.sync([LabelledContainer("api", "running", slot_labels(old))])
+        rec.flush()
+        assert _status(path) == "stopped"
+
+
+class TestEvents:
+    def test_die_then_start(self, tmp_path: Path) -> None:
+        path, slot = _setup(tmp_path)
+        rec = Reconciler(path)
+        rec.sync([LabelledContainer("api", "running", slot_labels(slot))])
+        rec.flush()
+
+        rec.apply_event(_event(slot, "die"))
+        rec.flush()
+        assert _status(path) == "stopped"
+
+        rec.apply_event(_event(slot, "start"))
+        rec.flush()
+        assert _status(path) == "running"
+
+    def test_one_of_two_containers_dies(self, tmp_path: Path) -> None:
+        path, slot = _setup(tmp_path)
+        rec = Reconciler(path)
+        rec.sync([
+            LabelledContainer("api", "running", slot_labels(slot)),
+            LabelledContainer("db", "running", slot_labels(slot)),
+        ])
+        rec.apply_event(_event(slot, "die", name="db"))
+        assert rec.flush() == []
+        assert _status(path) == "running"
+
+    def test_irrelevant_actions_ignored(self, tmp_path: Path) -> None:
+        path, slot = _setup(tmp_path)
+        rec = Reconciler(path)
+        rec.sync([LabelledContainer("api", "running", slot_labels(slot))])
+        rec.flush()
+        rec.apply_event(_event(slot, "exec_start: sh"))
+        rec.apply_event({"Action": "die", "Actor": {"Attributes": {}}})
+        assert rec.flush() == []
+
+    def test_event_only_evaluates_its_slot(self, tmp_path: Path) -> None:
+        path, slot = _setup(tmp_path, slot_id=1)
+        _, other = _setup(tmp_path, slot_id=2)
+        rec = Reconciler(path)
+        rec.sync([])
+        rec.flush()
+        with patch.object(
+            rec, "status_of", wraps=rec.status_of
+        ) as status_of:
+            rec.apply_event(_event(other, "start"))
+            rec.flush()
+        assert [c.args[0].slot_id for c in status_of.call_args_list] == [2]
+
+
+class TestPoll:
+    def test_parent_change_marks_slot(self, tmp_path: Path) -> None:
+        path, slot = _setup(tmp_path)
+        rec = Reconciler(path)
+        rec.sync([LabelledContainer("api", "running", slot_labels(slot))])
+        rec.flush()
+
+        shutil.rmtree(slot.worktree_path)
+        rec.poll()
+        changes = rec.flush()
+        assert [c.new for c in changes] == ["missing"]
+
+    def test_provisioning_timeout_noticed(self, tmp_path: Path) -> None:
+        path, _ = _setup(tmp_path, status="provisioning")
+        rec = Reconciler(path, provisioning_timeout=1e9)
+        rec.sync([])
+        assert rec.flush() == []
+
+        rec.provisioning_timeout = 0
+        rec.poll()
+        assert [c.new for c in rec.flush()] == ["stopped"]
+
+    def test_status_written_meanwhile_is_rechecked(
+        self, tmp_path: Path
+    ) -> None:
+        path, slot = _setup(tmp_path, status="provisioning")
+        rec = Reconciler(path)
+        rec.sync([LabelledContainer("api", "exited", slot_labels(slot))])
+        registry = load_registry(path)
+        registry.slots[1].status = "running"  # impl finished meanwhile
+        save_registry(registry, path)
+
+        assert rec.flush() == []
+        assert _status(path) == "running"
+        assert [c.new for c in rec.flush()] == ["stopped"]
+
+    def test_idle_poll_checks_nothing(self, tmp_path: Path) -> None:
+        path, slot = _setup(tmp_path)
+        rec = Reconciler(path)
+        rec.sync([LabelledContainer("api", "running", slot_labels(slot))])
+        rec.flush()
+        with patch.object(rec, "status_of") as status_of:
+            rec.poll()
+            rec.flush()
+        status_of.assert_not_called()
+
+    def test_new_registry_entry_picked_up(self, tmp_path: Path) -> None:
+        path, _ = _setup(tmp_path, slot_id=1)
+        rec = Reconciler(path)
+        rec.sync([])
+        rec.flush()
+        _setup(tmp_path, slot_id=2)
+        rec.poll()
+        changes = rec.flush()
+        assert [c.slot_id for c in changes] == [2]
+        assert _status(path, 2) == "stopped"
+
+    def test_released_meanwhile_not_resurrected(
+        self, tmp_path: Path
+    ) -> None:
+        path, slot = _setup(tmp_path)
+        rec = Reconciler(path)
+        rec.sync([LabelledContainer("api", "running", slot_labels(slot))])
+        rec.flush()
+        save_registry(Registry(), path)  # kinfra done ran meanwhile
+        rec.apply_event(_event(slot, "die"))
+        assert rec.flush() == []
+        assert load_registry(path).slots == {}
+
+
+class TestWatch:
+    def test_follows_event_stream(self, tmp_path: Path) -> None:
+        path, slot = _setup(tmp_path)
+        lines = json.dumps(_event(slot, "die")) + "\nnot json\n"
+        proc = MagicMock(stdout=io.StringIO(lines))
+        stop = threading.Event()
+        seen: list[StatusChange] = []
+
+        def report(changes: list[StatusChange]) -> None:
+            seen.extend(changes)
+            stop.set()
+
+        containers = [LabelledContainer("api", "running", slot_labels(slot))]
+        with (
+            patch(
+                "devops_ai.reconcile.subprocess.Popen", return_value=proc
+            ) as popen,
+            patch(
+                "devops_ai.reconcile.list_slot_containers",
+                return_value=containers,
+            ),
+        ):
+            Reconciler(path).watch(stop, interval=0.01, report=report)
+
+        assert "events" in popen.call_args[0][0]
+        assert seen == [StatusChange(1, "proj", "running", "stopped")]
+        proc.terminate.assert_called()
+
+    def test_docker_missing_raises(self, tmp_path: Path) -> None:
+        path, _ = _setup(tmp_path)
+        with patch(
+            "devops_ai.reconcile.subprocess.Popen",
+            side_effect=FileNotFoundError("docker"),
+        ):
+            with pytest.raises(FileNotFoundError):
+                Reconciler(path).watch(threading.Event(), interval=0.01)
+
+
+class TestReconcileOnce:
+    def test_single_listing(self, tmp_path: Path) -> None:
+        path, _ = _setup(tmp_path)
+        with patch(
+            "devops_ai.reconcile.list_slot_containers", return_value=[]
+        ) as listing:
+            changes = reconcile_once(path)
+        listing.assert_called_once()
+        assert [c.new for c in changes] == ["stopped"]
+
+
+class TestReconcileCommand:
+    def test_reports_changes(self) -> None:
+        from devops_ai.cli.reconcile_cmd import reconcile_command
+
+        change = StatusChange(3, "proj", "running", "stopped")
+        with patch(
+            "devops_ai.cli.reconcile_cmd.reconcile_once",
+            return_value=[change],
+        ):
+            code, msg = reconcile_command()
+        assert code == 0
+        assert msg == "slot 3 (proj): running → stopped"
+
+    def test_docker_unavailable(self) -> None:
+        from devops_ai.cli.reconcile_cmd import reconcile_command
+
+        with patch(
+            "devops_ai.cli.reconcile_cmd.reconcile_once",
+            side_effect=FileNotFoundError("docker"),
+        ):
+            code, msg = reconcile_command()
+        assert code == 1
@@ -15,7 +15,9 @@ from devops_ai.registry import (
     clean_stale_entries,
     get_slot_for_worktree,
     load_registry,
+    paths_exist,
     release_slot,
+    release_slots,
     save_registry,
 )
 
@@ -110,6 +112,24 @@ class TestAtomicWrite:
         reg = load_registry(path)
         assert reg.slots == {}
 
+    def test_corrupt_file_is_backed_up(self, tmp_path: Path) -> None:
+        """A corrupt registry is moved aside, not overwritten later."""
+        path = tmp_path / "registry.json"
+        path.write_text('{"version": 1, "slots": {')
+        load_registry(path)
+        assert not path.exists()
+        backups = list(tmp_path.glob("registry.json.corrupt-*"))
+        assert len(backups) == 1
+        assert backups[0].read_text() == '{"version": 1, "slots": {'
+
+    def test_malformed_entry_recovers(self, tmp_path: Path) -> None:
+        """Valid JSON with a broken slot entry → empty registry."""
+        path = tmp_path / "registry.json"
+        path.write_text('{"version": 1, "slots": {"1": {"project": "x"}}}')
+        reg = load_registry(path)
+        assert reg.slots == {}
+        assert list(tmp_path.glob("registry.json.corrupt-*"))
+
 
 class TestClaimAndRelease:
     def test_claim_adds_release_removes(self, tmp_path: Path) -> None:
@@ -131,6 +151,30 @@ class TestClaimAndRelease:
         release_slot(reg, 5, path)
         assert 5 not in reg.slots
 
+    def test_release_many_single_write(self, tmp_path: Path) -> None:
+        path = tmp_path / "registry.json"
+        reg = Registry(version=1, slots={})
+        for slot_id in (1, 2, 3):
+            reg.slots[slot_id] = SlotInfo(
+                slot_id=slot_id,
+                project="proj",
+                worktree_path=f"/wt{slot_id}",
+                slot_dir=f"/slot{slot_id}",
+                compose_file_copy="",
+                ports={},
+                claimed_at="2025-01-01T00:00:00",
+                status="running",
+            )
+
+        with patch(
+            "devops_ai.registry.save_registry",
+            wraps=save_registry,
+        ) as mock_save:
+            release_slots(reg, [1, 3, 99], path)
+
+        mock_save.assert_called_once()
+        assert set(load_registry(path).slots) == {2}
+
 
 class TestAllocateSlot:
     def test_skips_claimed(self) -> None:
@@ -280,3 +324,72 @@ class TestCleanStale:
         removed = clean_stale_entries(reg)
         assert 1 in reg.slots
         assert len(removed) == 0
+
+    def test_teardown_called_for_stale_only(self, tmp_path: Path) -> None:
+        """Stale slots are torn down; live ones are left alone."""
+        wt = tmp_path / "worktree"
+        wt.mkdir()
+        slot_dir = tmp_path / "slot"
+        slot_dir.mkdir()
+        reg = Registry(version=1, slots={})
+        for slot_id, worktree in ((1, str(wt)), (2, "/nonexistent/wt")):
+            reg.slots[slot_id] = SlotInfo(
+                slot_id=slot_id,
+                project="proj",
+                worktree_path=worktree,
+                slot_dir=str(slot_dir),
+                compose_file_copy="",
+                ports={},
+                claimed_at="2025-01-01T00:00:00",
+                status="running",
+            )
+        torn_down: list[int] = []
+        removed = clean_stale_entries(
+            reg, teardown=lambda s: torn_down.append(s.slot_id)
+        )
+        assert removed == [2]
+        assert torn_down == [2]
+        assert list(reg.slots) == [1]
+
+    def test_teardown_failure_still_removes(self, tmp_path: Path) -> None:
+        reg = Registry(version=1, slots={})
+        reg.slots[1] = SlotInfo(
+            slot_id=1,
+            project="proj",
+            worktree_path="/nonexistent/worktree",
+            slot_dir="/nonexistent/slot",
+            compose_file_copy="",
+            ports={},
+            claimed_at="2025-01-01T00:00:00",
+            status="running",
+        )
+
+        def fail(slot: SlotInfo) -> None:
+            raise OSError("docker gone")
+
+        assert clean_stale_entries(reg, teardown=fail) == [1]
+        assert reg.slots == {}
+
+
+class TestPathsExist:
+    def test_checks_each_path(self, tmp_path: Path) -> None:
+        present = tmp_path / "present"
+        present.mkdir()
+        result = paths_exist([str(present), str(tmp_path / "gone")])
+        assert result == {
+            str(present): True,
+            str(tmp_path / "gone"): False,
+        }
+
+    def test_removed_path_seen_at_once(self, tmp_path: Path) -> None:
+        present = tmp_path / "present"
+        present.mkdir()
+        assert paths_exist([str(present)]) == {str(present): True}
+        present.rmdir()
+        assert paths_exist([str(present)]) == {str(present): False}
+
+    def test_duplicates_checked_once(self, tmp_path: Path) -> None:
+        with patch("devops_ai.registry._exists", return_value=True) as exists:
+            result = paths_exist([str(tmp_path), str(tmp_path)])
+        assert result == {str(tmp_path): True}
+        exists.assert_called_once_with(str(tmp_path))
@@ -0,0 +1,124 @@
+"""Tests for host resource budget — slot demand, capacity, budget check."""
+
+from __future__ import annotations
+
+from pathlib import Path
+from unittest.mock import patch
+
+import pytest
+
+from devops_ai.config import InfraConfig, ServiceResources, SlotResources
+from devops_ai.registry import Registry, SlotInfo, allocate_slot
+from devops_ai.resources import (
+    HostCapacity,
+    SlotDemand,
+    check_host_budget,
+    host_capacity,
+    slot_demand,
+)
+
+GIB = 1024**3
+
+
+def _config(resources: SlotResources | None = None) -> InfraConfig:
+    return InfraConfig(
+        project_name="proj",
+        prefix="proj",
+        has_sandbox=True,
+        resources=resources or SlotResources(),
+    )
+
+
+def _claimed(slot_id: int, cpus: float, mem_bytes: int) -> SlotInfo:
+    return SlotInfo(
+        slot_id=slot_id,
+        project="other",
+        worktree_path=f"/wt{slot_id}",
+        slot_dir=f"/slot{slot_id}",
+        compose_file_copy="",
+        ports={},
+        claimed_at="2025-01-01T00:00:00",
+        status="running",
+        cpus=cpus,
+        mem_bytes=mem_bytes,
+    )
+
+
+class TestSlotDemand:
+    def test_sums_service_limits(self) -> None:
+        config = _config(
+            SlotResources(
+                services={
+                    "api": ServiceResources(cpus=1, mem_limit="1g"),
+                    "db": ServiceResources(cpus=0.5, mem_limit="512m"),
+                }
+            )
+        )
+        demand = slot_demand(config)
+        assert demand.cpus == 1.5
+        assert demand.mem_bytes == GIB + GIB // 2
+
+    def test_slot_totals_win(self) -> None:
+        config = _config(
+            SlotResources(
+                slot_cpus=4,
+                slot_mem_limit="8g",
+                services={"api": ServiceResources(cpus=1, mem_limit="1g")},
+            )
+        )
+        demand = slot_demand(config)
+        assert demand.cpus == 4
+        assert demand.mem_bytes == 8 * GIB
+
+    def test_no_resources_is_empty(self) -> None:
+        assert slot_demand(_config()).is_empty
+
+
+class TestHostCapacity:
+    def test_reads_meminfo(self, tmp_path: Path) -> None:
+        meminfo = tmp_path / "meminfo"
+        meminfo.write_text("MemTotal:       16384 kB\nMemFree: 1 kB\n")
+        cap = host_capacity(meminfo)
+        assert cap.mem_bytes == 16384 * 1024
+        assert cap.cpus >= 1
+
+
+class TestCheckHostBudget:
+    def test_fits(self) -> None:
+        cap = HostCapacity(cpus=8, mem_bytes=16 * GIB)
+        claimed = [_claimed(1, 2, 4 * GIB)]
+        assert check_host_budget(SlotDemand(2, 4 * GIB), claimed, cap) is None
+
+    def test_cpu_exceeded(self) -> None:
+        cap = HostCapacity(cpus=4, mem_bytes=16 * GIB)
+        claimed = [_claimed(1, 3, GIB)]
+        reason = check_host_budget(SlotDemand(2, GIB), claimed, cap)
+        assert reason is not None
+        assert "CPU budget" in reason
+
+    def test_memory_exceeded(self) -> None:
+        cap = HostCapacity(cpus=8, mem_bytes=8 * GIB)
+        claimed = [_claimed(1, 1, 6 * GIB)]
+        reason = check_host_budget(SlotDemand(1, 4 * GIB), claimed, cap)
+        assert reason is not None
+        assert "Memory budget" in reason
+
+    def test_empty_demand_always_fits(self) -> None:
+        cap = HostCapacity(cpus=1, mem_bytes=GIB)
+        claimed = [_claimed(1, 10, 10 * GIB)]
+        assert check_host_budget(SlotDemand(), claimed, cap) is None
+
+
+class TestAllocateSlotBudget:
+    def test_refuses_when_over_budget(self) -> None:
+        config = _config(SlotResources(slot_cpus=4))
+        reg = Registry(slots={1: _claimed(1, 6, 0)})
+        with (
+            patch(
+                "devops_ai.resources.host_capacity",
+                return_value=HostCapacity(cpus=8, mem_bytes=0),
+            ),
+            patch("devops_ai.registry.check_ports_available", return_value=[]),
+            pytest.raises(RuntimeError, match="CPU budget"),
+        ):
+            allocate_slot(reg, config)
@@ -3,8 +3,17 @@
 from __future__ import annotations
 
 from pathlib import Path
+from unittest.mock import MagicMock, patch
 
-from devops_ai.config import InfraConfig, MountEntry, ServicePort
+import pytest
+
+from devops_ai.config import (
+    InfraConfig,
+    MountEntry,
+    ServicePort,
+    ServiceResources,
+    SlotResources,
+)
 from devops_ai.registry import SlotInfo
 from devops_ai.sandbox import (
     _compose_cmd,
@@ -14,6 +23,8 @@ from devops_ai.sandbox import (
     generate_env_file,
     generate_override,
     remove_slot_dir,
+    stop_sandbox,
+    teardown_stale_slot,
 )
 
 
@@ -71,6 +82,58 @@ class TestRemoveSlotDir:
         assert not slot_dir.exists()
 
 
+class TestStopSandboxCheck:
+    def test_failure_ignored_by_default(self) -> None:
+        failed = MagicMock(returncode=1, stderr="boom")
+        with patch("devops_ai.sandbox.subprocess.run", return_value=failed):
+            stop_sandbox(_slot())
+
+    def test_failure_raises_with_check(self) -> None:
+        failed = MagicMock(returncode=1, stderr="boom")
+        with (
+            patch("devops_ai.sandbox.subprocess.run", return_value=failed),
+            pytest.raises(RuntimeError, match="boom"),
+        ):
+            stop_sandbox(_slot(), check=True)
+
+    def test_docker_missing_raises_with_check(self) -> None:
+        with (
+            patch(
+                "devops_ai.sandbox.subprocess.run",
+                side_effect=FileNotFoundError("docker"),
+            ),
+            pytest.raises(RuntimeError, match="Docker not found"),
+        ):
+            stop_sandbox(_slot(), check=True)
+
+
+class TestTeardownStaleSlot:
+    def test_slot_dir_present_uses_compose_copy(
+        self, tmp_path: Path
+    ) -> None:
+        slot_dir = tmp_path / "slot"
+        slot_dir.mkdir()
+        slot = _slot()
+        slot.slot_dir = str(slot_dir)
+        with patch(
+            "devops_ai.sandbox.subprocess.run", return_value=MagicMock()
+        ) as mock_run:
+            teardown_stale_slot(slot)
+        assert "-f" in mock_run.call_args[0][0]
+        assert not slot_dir.exists()
+
+    def test_slot_dir_gone_uses_project_name(self, tmp_path: Path) -> None:
+        slot = _slot(slot_id=7)
+        slot.slot_dir = str(tmp_path / "gone")
+        with patch(
+            "devops_ai.sandbox.subprocess.run", return_value=MagicMock()
+        ) as mock_run:
+            teardown_stale_slot(slot)
+        cmd = mock_run.call_args[0][0]
+        assert cmd[:4] == ["docker", "compose", "-p", "myproj-slot-7"]
+        assert "down" in cmd
+
+
 class TestCopyCompose:
     def test_copies_to_slot_dir(self, tmp_path: Path) -> None:
         compose = tmp_path / "docker-compose.yml"
@@ -82,6 +145,79 @@ class TestCopyCompose:
         assert result.read_text() == compose.read_text()
 
 
+class TestCopyComposeGraph:
+    def test_snapshots_includes_and_overrides(self, tmp_path: Path) -> None:
+        project = tmp_path / "project"
+        (project / "infra").mkdir(parents=True)
+        compose = project / "docker-compose.yml"
+        compose.write_text(
+            "include:\n  - infra/db.yml\n"
+            "services:\n  app:\n    image: python\n"
+        )
+        (project / "infra" / "db.yml").write_text(
+            "services:\n  db:\n    image: postgres\n"
+        )
+        override = project / "docker-compose.override.yml"
+        override.write_text("services:\n  app:\n    ports: ['80:80']\n")
+        slot_dir = tmp_path / "slot"
+        slot_dir.mkdir()
+
+        result = copy_compose_to_slot(compose, slot_dir, [override])
+
+        snapshot = slot_dir / "compose"
+        assert result == snapshot / "docker-compose.yml"
+        assert (snapshot / "infra" / "db.yml").exists()
+        assert (snapshot / "docker-compose.override.yml").exists()
+        manifest = (snapshot / ".kinfra-files").read_text().split()
+        assert manifest == [
+            "docker-compose.yml",
+            "docker-compose.override.yml",
+        ]
+
+    def test_model_cache_kept_out_of_checkout(self, tmp_path: Path) -> None:
+        project = tmp_path / "project"
+        (project / ".devops-ai").mkdir(parents=True)
+        compose = project / "compose.yml"
+        compose.write_text("services:\n  app:\n    image: python\n")
+        slot_dir = tmp_path / "slot"
+        slot_dir.mkdir()
+        cache_dir = tmp_path / "home" / "cache"
+        cache_dir.parent.mkdir()
+
+        with patch("devops_ai.sandbox.DEFAULT_CACHE_DIR", cache_dir):
+            copy_compose_to_slot(compose, slot_dir)
+
+        assert not (project / ".devops-ai" / "cache").exists()
+        assert list(cache_dir.glob("compose-model-*.json"))
+
+    def test_stop_uses_snapshot_files(self, tmp_path: Path) -> None:
+        project = tmp_path / "project"
+        project.mkdir()
+        compose = project / "compose.yml"
+        compose.write_text("services:\n  app:\n    image: python\n")
+        override = project / "compose.override.yml"
+        override.write_text("services: {}\n")
+        slot_dir = tmp_path / "slot"
+        slot_dir.mkdir()
+        copy = copy_compose_to_slot(compose, slot_dir, [override])
+        slot = _slot()
+        slot.slot_dir = str(slot_dir)
+        slot.compose_file_copy = str(copy)
+
+        with patch(
+            "devops_ai.sandbox.subprocess.run", return_value=MagicMock()
+        ) as mock_run:
+            stop_sandbox(slot)
+
+        cmd = mock_run.call_args[0][0]
+        f_args = [cmd[i + 1] for i, a in enumerate(cmd) if a == "-f"]
+        assert f_args == [
+            str(slot_dir / "compose" / "compose.yml"),
+            str(slot_dir / "compose" / "compose.override.yml"),
+            str(slot_dir / "docker-compose.override.yml"),
+        ]
+
+
 class TestGenerateEnvFile:
     def test_content(self, tmp_path: Path) -> None:
         slot = _slot(slot_id=2, ports={"API_PORT": 8082, "DB_PORT": 5434})
@@ -295,6 +431,155 @@ class TestGenerateOverride:
         assert "- devops-ai-observability" in content
 
 
+class TestGenerateDeterministic:
+    def test_override_stable_across_runs(self, tmp_path: Path) -> None:
+        """No timestamp — regenerating leaves the file untouched."""
+        config = _config(
+            code_mounts=[MountEntry("src/", "/app/src")],
+            code_mount_targets=["app"],
+        )
+        slot_dir = tmp_path / "slot"
+        slot_dir.mkdir()
+        args = (config, _slot(), tmp_path / "wt", tmp_path / "main", slot_dir)
+        first = generate_override(*args)
+        content = first.read_text()
+        mtime = first.stat().st_mtime_ns
+        second = generate_override(*args)
+        assert second.read_text() == content
+        assert second.stat().st_mtime_ns == mtime
+        assert "Generated at" not in content
+
+    def test_env_file_rewritten_only_on_change(self, tmp_path: Path) -> None:
+        slot_dir = tmp_path / "slot"
+        slot_dir.mkdir()
+        env = generate_env_file(_config(), _slot(ports={"A": 1}), slot_dir)
+        mtime = env.stat().st_mtime_ns
+        generate_env_file(_config(), _slot(ports={"A": 1}), slot_dir)
+        assert env.stat().st_mtime_ns == mtime
+        generate_env_file(_config(), _slot(ports={"A": 2}), slot_dir)
+        assert "A=2" in env.read_text()
+
+
+class TestGenerateOverrideResources:
+    def _generate(self, tmp_path: Path, config: InfraConfig) -> dict:
+        from ruamel.yaml import YAML
+
+        slot_dir = tmp_path / "slot"
+        slot_dir.mkdir()
+        result = generate_override(
+            config, _slot(), tmp_path / "wt", tmp_path / "main", slot_dir
+        )
+        return YAML(typ="safe").load(result.read_text())
+
+    def test_limits_rendered_on_target(self, tmp_path: Path) -> None:
+        config = _config(
+            code_mounts=[MountEntry("src/", "/app/src")],
+            code_mount_targets=["app"],
+        )
+        config.resources = SlotResources(
+            services={
+                "app": ServiceResources(
+                    cpus=1.5, mem_limit="512m", pids_limit=256
+                )
+            }
+        )
+        data = self._generate(tmp_path, config)
+        app = data["services"]["app"]
+        assert app["cpus"] == 1.5
+        assert app["mem_limit"] == "512m"
+        assert app["pids_limit"] == 256
+        assert "volumes" in app
+
+    def test_limited_service_without_mounts(self, tmp_path: Path) -> None:
+        """Limits apply to services that are not mount targets too."""
+        config = _config()
+        config.resources = SlotResources(
+            services={"db": ServiceResources(mem_limit="1g")}
+        )
+        data = self._generate(tmp_path, config)
+        db = data["services"]["db"]
+        assert db["mem_limit"] == "1g"
+        # Only limits and slot labels; no mounts or networks
+        assert set(db) == {"mem_limit", "labels"}
+
+    def test_image_pins(self, tmp_path: Path) -> None:
+        slot_dir = tmp_path / "slot"
+        slot_dir.mkdir()
+        result = generate_override(
+            _config(),
+            _slot(),
+            tmp_path / "wt",
+            tmp_path / "main",
+            slot_dir,
+            image_pins={"api": "kinfra-myproj-api:abc123"},
+        )
+        assert "    image: kinfra-myproj-api:abc123" in result.read_text()
+
+    def test_no_resources_no_limits(self, tmp_path: Path) -> None:
+        config = _config(
+            code_mounts=[MountEntry("src/", "/app/src")],
+            code_mount_targets=["app"],
+        )
+        data = self._generate(tmp_path, config)
+        assert "mem_limit" not in data["services"]["app"]
+
+
+class TestGenerateOverrideLabels:
+    def test_every_compose_service_labelled(self, tmp_path: Path) -> None:
+        """Services without mounts or limits still carry slot labels."""
+        from ruamel.yaml import YAML
+
+        from devops_ai.labels import slot_from_labels
+
+        wt = tmp_path / "wt"
+        wt.mkdir()
+        (wt / "docker-compose.yml").write_text(
+            "services:\n  api:\n    image: x\n  db:\n    image: y\n"
+        )
+        slot_dir = tmp_path / "slot"
+        slot_dir.mkdir()
+        slot = _slot(slot_id=4, ports={"API_PORT": 8084, "DB_PORT": 5436})
+        result = generate_override(
+            _config(), slot, wt, tmp_path / "main", slot_dir
+        )
+        services = YAML(typ="safe").load(result.read_text())["services"]
+        assert set(services) == {"api", "db"}
+        for service in services.values():
+            rebuilt = slot_from_labels(service["labels"])
+            assert rebuilt is not None
+            assert rebuilt.slot_id == 4
+            assert rebuilt.worktree_path == slot.worktree_path
+            assert rebuilt.ports == slot.ports
+
+
+    def test_services_follow_worktree_compose(self, tmp_path: Path) -> None:
+        """A worktree that renamed a service gets stanzas for its own."""
+        from ruamel.yaml import YAML
+
+        main_repo = tmp_path / "main"
+        main_repo.mkdir()
+        (main_repo / "docker-compose.yml").write_text(
+            "services:\n  api:\n    image: x\n  db:\n    image: y\n"
+        )
+        wt = tmp_path / "wt"
+        wt.mkdir()
+        (wt / "docker-compose.yml").write_text(
+            "services:\n  api:\n    image: x\n"
+            "  postgres:\n    image: y\n"
+        )
+        slot_dir = tmp_path / "slot"
+        slot_dir.mkdir()
+        config = _config(
+            code_mounts=[MountEntry("src/", "/app/src")],
+            code_mount_targets=["db"],
+        )
+
+        result = generate_override(config, _slot(), wt, main_repo, slot_dir)
+
+        services = YAML(typ="safe").load(result.read_text())["services"]
+        assert set(services) == {"api", "postgres"}
+
+
 class TestComposeCmdMultipleEnvFiles:
     def test_single_env_file(self) -> None:
         cmd = _compose_cmd(
@@ -325,6 +610,21 @@ class TestComposeCmdMultipleEnvFiles:
         ]
 
 
+class TestComposeCmdLayeredFiles:
+    def test_extra_files_before_override(self) -> None:
+        cmd = _compose_cmd(
+            "compose.yml", "override.yml", [], ["down"],
+            ["compose.dev.yml"],
+        )
+        assert cmd == [
+            "docker", "compose",
+            "-f", "compose.yml",
+            "-f", "compose.dev.yml",
+            "-f", "override.yml",
+            "down",
+        ]
+
+
 class TestEnvFilesForSlot:
     def test_only_sandbox_when_no_secrets(self, tmp_path: Path) -> None:
         (tmp_path / ".env.sandbox").write_text("COMPOSE_PROJECT_NAME=test\n")
@@ -127,6 +127,60 @@ class TestStartSandbox:
         assert "down" in down_cmd
 
 
+class TestStartSandboxIdempotent:
+    def _setup(self, tmp_path: Path) -> tuple[Path, Path, SlotInfo]:
+        wt = tmp_path / "worktree"
+        wt.mkdir()
+        slot_dir = tmp_path / "slot"
+        slot_dir.mkdir()
+        (wt / "docker-compose.yml").write_text("services: {}")
+        (slot_dir / "docker-compose.override.yml").write_text("services: {}")
+        (slot_dir / ".env.sandbox").write_text("X=1\n")
+        return wt, slot_dir, _slot(slot_dir=str(slot_dir))
+
+    def _start(self, wt: Path, slot: SlotInfo) -> list[str]:
+        ok = MagicMock(returncode=0)
+        with patch(
+            "devops_ai.sandbox.subprocess.run", return_value=ok
+        ) as mock_run:
+            start_sandbox(_config(), slot, wt)
+        return mock_run.call_args_list[0][0][0]
+
+    def test_first_start_recreates(self, tmp_path: Path) -> None:
+        wt, slot_dir, slot = self._setup(tmp_path)
+        cmd = self._start(wt, slot)
+        assert "--no-recreate" not in cmd
+        assert (slot_dir / ".kinfra-hash").exists()
+
+    def test_unchanged_restart_skips_recreate(self, tmp_path: Path) -> None:
+        wt, _, slot = self._setup(tmp_path)
+        self._start(wt, slot)
+        cmd = self._start(wt, slot)
+        assert cmd[-3:] == ["up", "-d", "--no-recreate"]
+
+    def test_changed_env_recreates(self, tmp_path: Path) -> None:
+        wt, slot_dir, slot = self._setup(tmp_path)
+        self._start(wt, slot)
+        (slot_dir / ".env.sandbox").write_text("X=2\n")
+        cmd = self._start(wt, slot)
+        assert "--no-recreate" not in cmd
+
+    def test_failure_clears_hash(self, tmp_path: Path) -> None:
+        wt, slot_dir, slot = self._setup(tmp_path)
+        self._start(wt, slot)
+        fail = MagicMock(returncode=1, stderr="boom")
+        with patch(
+            "devops_ai.sandbox.subprocess.run",
+            side_effect=[fail, MagicMock(returncode=0)],
+        ):
+            try:
+                start_sandbox(_config(), slot, wt)
+                raise AssertionError("Should have raised")
+            except RuntimeError:
+                pass
+        assert not (slot_dir / ".kinfra-hash").exists()
+
+
 class TestStopSandbox:
     def test_uses_slot_compose(self, tmp_path: Path) -> None:
         """Verify stop uses slot dir's compose copy, not worktree's."""
@@ -0,0 +1,81 @@
+"""Tests for the teardown step graph."""
+
+from __future__ import annotations
+
+import threading
+
+import pytest
+
+from devops_ai.teardown import Step, format_durations, run_steps
+
+
+class TestRunSteps:
+    def test_dependencies_run_in_order(self) -> None:
+        order: list[str] = []
+        steps = [
+            Step("c", lambda: order.append("c"), after=("b",)),
+            Step("b", lambda: order.append("b"), after=("a",)),
+            Step("a", lambda: order.append("a")),
+        ]
+        results = run_steps(steps)
+        assert order == ["a", "b", "c"]
+        assert list(results) == ["c", "b", "a"]
+        assert all(r.ok for r in results.values())
+
+    def test_independent_steps_overlap(self) -> None:
+        # Each step waits for the other to start; serial execution would
+        # time out at the barrier
+        barrier = threading.Barrier(2, timeout=5)
+        results = run_steps(
+            [Step("x", barrier.wait), Step("y", barrier.wait)]
+        )
+        assert results["x"].ok
+        assert results["y"].ok
+
+    def test_failure_skips_dependents(self) -> None:
+        ran: list[str] = []
+
+        def boom() -> None:
+            raise RuntimeError("boom")
+
+        results = run_steps(
+            [
+                Step("stop", boom),
+                Step("rm", lambda: ran.append("rm"), after=("stop",)),
+                Step("release", lambda: ran.append("r"), after=("rm",)),
+                Step("other", lambda: ran.append("other")),
+            ]
+        )
+        assert ran == ["other"]
+        assert str(results["stop"].error) == "boom"
+        assert results["rm"].duration is None
+        assert results["release"].duration is None
+        assert results["other"].ok
+
+    def test_cycle_rejected(self) -> None:
+        with pytest.raises(ValueError, match="cycle"):
+            run_steps(
+                [
+                    Step("a", lambda: None, after=("b",)),
+                    Step("b", lambda: None, after=("a",)),
+                ]
+            )
+
+    def test_unknown_dependency_rejected(self) -> None:
+        with pytest.raises(ValueError, match="unknown"):
+            run_steps([Step("a", lambda: None, after=("nope",))])
+
+
+class TestFormatDurations:
+    def test_formats_each_outcome(self) -> None:
+        def boom() -> None:
+            raise RuntimeError("boom")
+
+        results = run_steps(
+            [Step("ok", lambda: None), Step("bad", boom),
+             Step("later", lambda: None, after=("bad",))]
+        )
+        text = format_durations(results)
+        assert text.startswith("ok 0.")
+        assert "bad failed after" in text
+        assert text.endswith("later skipped")
@@ -1,21 +1,33 @@
 """Tests for worktree manager — git worktree lifecycle operations."""
 
+import os
+import subprocess
+import time
 from pathlib import Path
+from unittest.mock import patch
 
 import pytest
 
 from devops_ai.worktree import (
     check_dirty,
+    create_impl_worktree,
     create_spec_worktree,
+    finish_checkout,
     impl_branch_name,
     impl_worktree_path,
     list_worktrees,
+    parse_status_v2,
     remove_worktree,
     spec_branch_name,
     spec_worktree_path,
+    start_checkout,
     validate_feature_name,
 )
 
+# Minimum speedup of the list_worktrees fast path over git; the
+# wall-clock benchmark only runs when this is set
+SPEEDUP_ENV = "KINFRA_WORKTREE_SPEEDUP"
+
 # --- Pure function tests (no git needed) ---
 
 
@@ -137,6 +149,45 @@ class TestCreateAndRemoveSpecWorktree:
         assert not wt_path.exists()
 
 
+class TestSparseAndDeferredCheckout:
+    @pytest.fixture()
+    def layered_repo(self, git_repo: Path) -> Path:
+        for rel in ("services/api/app.py", "services/web/app.js"):
+            (git_repo / rel).parent.mkdir(parents=True, exist_ok=True)
+            (git_repo / rel).write_text("x\n")
+        subprocess.run(
+            ["git", "add", "."], cwd=git_repo, check=True, capture_output=True
+        )
+        subprocess.run(
+            ["git", "commit", "-m", "layout"],
+            cwd=git_repo,
+            check=True,
+            capture_output=True,
+        )
+        return git_repo
+
+    def test_sparse_checks_out_only_cone(self, layered_repo: Path) -> None:
+        wt = create_impl_worktree(
+            layered_repo, "test", "alpha", "M1", sparse=["services/api"]
+        )
+        assert (wt / "services" / "api" / "app.py").is_file()
+        assert (wt / "README.md").is_file()
+        assert not (wt / "services" / "web").exists()
+        assert not check_dirty(wt).has_uncommitted
+        # The main checkout is unaffected
+        assert (layered_repo / "services" / "web" / "app.js").is_file()
+
+    def test_deferred_checkout(self, layered_repo: Path) -> None:
+        wt = create_impl_worktree(
+            layered_repo, "test", "alpha", "M1", checkout=False
+        )
+        assert not (wt / "README.md").exists()
+
+        finish_checkout(start_checkout(wt))
+        assert (wt / "services" / "web" / "app.js").is_file()
+        assert not check_dirty(wt).has_uncommitted
+
+
 class TestDirtyCheck:
     def test_uncommitted(self, git_repo: Path) -> None:
         (git_repo / "dirty.txt").write_text("dirty")
@@ -153,6 +204,52 @@ class TestDirtyCheck:
         # Without a remote, has_unpushed should be False (no upstream)
         state = check_dirty(git_repo)
         assert state.has_unpushed is False
+        assert state.upstream is None
+
+    def test_ahead_of_upstream(self, git_repo: Path, tmp_path: Path) -> None:
+        remote = tmp_path / "remote.git"
+        subprocess.run(
+            ["git", "init", "-q", "--bare", str(remote)], check=True
+        )
+        for args in (
+            ["remote", "add", "origin", str(remote)],
+            ["push", "-q", "-u", "origin", "HEAD"],
+            ["commit", "-q", "--allow-empty", "-m", "local"],
+        ):
+            subprocess.run(
+                ["git", *args], cwd=git_repo, check=True, capture_output=True
+            )
+        state = check_dirty(git_repo)
+        assert state.upstream is not None
+        assert state.has_unpushed is True
+        assert (state.ahead, state.behind) == (1, 0)
+        assert state.has_uncommitted is False
+
+
+class TestParseStatusV2:
+    def test_branch_headers_and_changes(self) -> None:
+        state = parse_status_v2(
+            "# branch.oid 1234abcd\n"
+            "# branch.head impl/feat-M1\n"
+            "# branch.upstream origin/impl/feat-M1\n"
+            "# branch.ab +2 -3\n"
+            "1 .M N... 100644 100644 100644 aaa bbb src/app.py\n"
+            "? notes.txt\n"
+        )
+        assert state.upstream == "origin/impl/feat-M1"
+        assert (state.ahead, state.behind) == (2, 3)
+        assert state.has_unpushed is True
+        assert state.has_uncommitted is True
+
+    def test_gone_upstream(self) -> None:
+        state = parse_status_v2(
+            "# branch.oid 1234abcd\n"
+            "# branch.head main\n"
+            "# branch.upstream origin/main\n"
+        )
+        assert state.upstream == "origin/main"
+        assert state.has_unpushed is False
+        assert state.is_dirty is False
 
 
 class TestListWorktrees:
@@ -166,3 +263,97 @@ class TestListWorktrees:
 
         # Cleanup
         remove_worktree(git_repo, spec_wts[0].path)
+
+
+class TestListWorktreesFastPath:
+    @pytest.fixture
+    def repo_with_worktrees(self, git_repo: Path) -> Path:
+        create_spec_worktree(git_repo, "test", "zeta")
+        create_impl_worktree(git_repo, "test", "alpha", "M1")
+        subprocess.run(
+            ["git", "worktree", "add", "-q", "--detach",
+             str(git_repo.parent / "test-spec-detached")],
+            cwd=git_repo, check=True, capture_output=True,
+        )
+        return git_repo
+
+    def test_matches_git(self, repo_with_worktrees: Path) -> None:
+        fast = list_worktrees(repo_with_worktrees, "test")
+        slow = list_worktrees(repo_with_worktrees, "test", fast=False)
+        assert fast == slow
+        assert len(fast) == 4
+        detached = [w for w in fast if w.feature == "detached"]
+        assert detached[0].branch == ""
+
+    def test_matches_git_from_linked_worktree(
+        self, repo_with_worktrees: Path
+    ) -> None:
+        linked = repo_with_worktrees.parent / "test-spec-zeta"
+        assert list_worktrees(linked, "test") == list_worktrees(
+            linked, "test", fast=False
+        )
+
+    def test_matches_git_from_subdirectory(
+        self, repo_with_worktrees: Path
+    ) -> None:
+        sub = repo_with_worktrees / "services" / "api"
+        sub.mkdir(parents=True)
+        assert list_worktrees(sub, "test") == list_worktrees(
+            sub, "test", fast=False
+        )
+
+    def test_git_dir_env_falls_back(self, repo_with_worktrees: Path) -> None:
+        with (
+            patch.dict(
+                os.environ, {"GIT_DIR": str(repo_with_worktrees / ".git")}
+            ),
+            patch(
+                "devops_ai.worktree._git_worktree_list", return_value=[]
+            ) as mock_git,
+        ):
+            assert list_worktrees(repo_with_worktrees, "test") == []
+        mock_git.assert_called_once()
+
+    def test_unexpected_head_falls_back(
+        self, repo_with_worktrees: Path
+    ) -> None:
+        meta = repo_with_worktrees / ".git" / "worktrees"
+        head = next(meta.iterdir()) / "HEAD"
+        head.write_text("garbage\n")
+        with patch(
+            "devops_ai.worktree._git_worktree_list", return_value=[]
+        ) as mock_git:
+            list_worktrees(repo_with_worktrees, "test")
+        mock_git.assert_called_once()
+
+    def test_fast_path_spawns_no_git(
+        self, repo_with_worktrees: Path
+    ) -> None:
+        """The speedup comes from not running git; check that, not timing."""
+        with patch("devops_ai.worktree._git_worktree_list") as mock_git:
+            assert len(list_worktrees(repo_with_worktrees, "test")) == 4
+        mock_git.assert_not_called()
+
+    @pytest.mark.skipif(
+        SPEEDUP_ENV not in os.environ,
+        reason=f"benchmark is opt-in; set {SPEEDUP_ENV}",
+    )
+    def test_benchmark_fast_path(self, repo_with_worktrees: Path) -> None:
+        """Micro-benchmark: reading metadata beats spawning git."""
+        speedup = float(os.environ[SPEEDUP_ENV])
+        rounds = 20
+
+        def timed(fast: bool) -> float:
+            # Best round of each to shed scheduling noise
+            best = float("inf")
+            for _ in range(rounds):
+                start = time.perf_counter()
+                list_worktrees(repo_with_worktrees, "test", fast=fast)
+                best = min(best, time.perf_counter() - start)
+            return best
+
+        fast_s, git_s = timed(True), timed(False)
+        assert fast_s * speedup < git_s, (
+            f"list_worktrees: fast {fast_s * 1e6:.0f}us, "
+            f"git {git_s * 1e6:.0f}us per call (want {speedup:g}x)"
+        )
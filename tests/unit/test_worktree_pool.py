@@ -0,0 +1,125 @@
+"""Tests for the pre-created worktree pool."""
+
+from __future__ import annotations
+
+import subprocess
+from pathlib import Path
+from unittest.mock import patch
+
+import pytest
+
+from devops_ai.worktree import create_spec_worktree, list_worktrees
+from devops_ai.worktree_pool import (
+    claim_worktree,
+    pool_dir,
+    pool_entries,
+    refill_pool,
+)
+
+
+def _git(cwd: Path, *args: str) -> str:
+    return subprocess.run(
+        ["git", *args], cwd=cwd, check=True, capture_output=True, text=True
+    ).stdout.strip()
+
+
+@pytest.fixture()
+def git_repo(tmp_path: Path) -> Path:
+    repo = tmp_path / "main-repo"
+    repo.mkdir()
+    _git(repo, "init")
+    _git(repo, "config", "user.email", "test@test.com")
+    _git(repo, "config", "user.name", "Test")
+    (repo / "README.md").write_text("# test\n")
+    _git(repo, "add", ".")
+    _git(repo, "commit", "-m", "init")
+    return repo
+
+
+class TestRefillPool:
+    def test_creates_detached_entries(self, git_repo: Path) -> None:
+        assert refill_pool(git_repo, "test", 2) == 2
+
+        entries = pool_entries(pool_dir(git_repo, "test"))
+        assert [p.name for p in entries] == ["1", "2"]
+        head = _git(git_repo, "rev-parse", "HEAD")
+        for entry in entries:
+            assert (entry / "README.md").is_file()
+            assert _git(entry, "rev-parse", "HEAD") == head
+        # Pool entries are not spec/impl worktrees
+        kinds = {w.wt_type for w in list_worktrees(git_repo, "test")}
+        assert kinds == {"other"}
+
+    def test_idempotent(self, git_repo: Path) -> None:
+        refill_pool(git_repo, "test", 2)
+        assert refill_pool(git_repo, "test", 2) == 0
+
+    def test_fast_forwards_idle_entries(self, git_repo: Path) -> None:
+        refill_pool(git_repo, "test", 1)
+        (git_repo / "new.txt").write_text("new\n")
+        _git(git_repo, "add", ".")
+        _git(git_repo, "commit", "-m", "second")
+
+        refill_pool(git_repo, "test", 1)
+        (entry,) = pool_entries(pool_dir(git_repo, "test"))
+        assert _git(entry, "rev-parse", "HEAD") == _git(
+            git_repo, "rev-parse", "HEAD"
+        )
+        assert (entry / "new.txt").is_file()
+
+    def test_shrinks_to_size(self, git_repo: Path) -> None:
+        refill_pool(git_repo, "test", 3)
+        refill_pool(git_repo, "test", 1)
+        assert len(pool_entries(pool_dir(git_repo, "test"))) == 1
+
+
+class TestClaimWorktree:
+    def test_empty_pool(self, git_repo: Path, tmp_path: Path) -> None:
+        dest = tmp_path / "wt"
+        assert not claim_worktree(git_repo, "test", dest, "spec/x")
+        assert not dest.exists()
+
+    def test_claim_creates_branch(
+        self, git_repo: Path, tmp_path: Path
+    ) -> None:
+        refill_pool(git_repo, "test", 2)
+        dest = tmp_path / "test-spec-x"
+
+        assert claim_worktree(git_repo, "test", dest, "spec/x")
+        assert len(pool_entries(pool_dir(git_repo, "test"))) == 1
+        assert _git(dest, "branch", "--show-current") == "spec/x"
+        listed = {w.path: w for w in list_worktrees(git_repo, "test")}
+        assert listed[dest.resolve()].wt_type == "spec"
+        # Claimed worktrees are no longer locked
+        porcelain = _git(git_repo, "worktree", "list", "--porcelain")
+        block = porcelain.split(f"worktree {dest.resolve()}\n")[1]
+        assert "locked" not in block.split("\n\n")[0]
+
+    def test_stale_entry_moves_to_head(
+        self, git_repo: Path, tmp_path: Path
+    ) -> None:
+        refill_pool(git_repo, "test", 1)
+        (git_repo / "new.txt").write_text("new\n")
+        _git(git_repo, "add", ".")
+        _git(git_repo, "commit", "-m", "second")
+        dest = tmp_path / "wt"
+
+        assert claim_worktree(git_repo, "test", dest, "spec/x")
+        assert (dest / "new.txt").is_file()
+
+
+class TestCreateFromPool:
+    def test_spec_worktree_claims_from_pool(self, git_repo: Path) -> None:
+        refill_pool(git_repo, "test", 1)
+        with patch("devops_ai.worktree_pool.spawn_refill") as mock_spawn:
+            wt = create_spec_worktree(git_repo, "test", "feat", pool_size=1)
+
+        mock_spawn.assert_called_once_with(git_repo, "test", 1)
+        assert pool_entries(pool_dir(git_repo, "test")) == []
+        assert (wt / "docs" / "designs" / "feat").is_dir()
+        assert _git(wt, "branch", "--show-current") == "spec/feat"
+
+    def test_falls_back_when_empty(self, git_repo: Path) -> None:
+        with patch("devops_ai.worktree_pool.spawn_refill"):
+            wt = create_spec_worktree(git_repo, "test", "feat", pool_size=1)
+        assert _git(wt, "branch", "--show-current") == "spec/feat"
@@ -0,0 +1,75 @@
+"""Tests for the read-only YAML loader."""
+
+from __future__ import annotations
+
+from pathlib import Path
+from unittest.mock import patch
+
+import pytest
+from ruamel.yaml.error import YAMLError
+
+from devops_ai import yaml_loader
+from devops_ai.yaml_loader import load_yaml, load_yaml_file
+
+
+class TestLoadYaml:
+    def test_plain_data(self) -> None:
+        data = load_yaml("services:\n  api:\n    image: foo\n")
+        assert data == {"services": {"api": {"image": "foo"}}}
+        assert type(data) is dict
+
+    def test_yaml_12_scalars(self) -> None:
+        # YAML 1.1 would read 22:22 as sexagesimal and "yes" as a bool
+        data = load_yaml("ports:\n  - 22:22\nflag: yes\n")
+        assert data == {"ports": ["22:22"], "flag": "yes"}
+
+    def test_malformed_raises(self) -> None:
+        with pytest.raises(YAMLError):
+            load_yaml("services: [unclosed\n")
+
+    def test_compose_local_tags(self) -> None:
+        """Compose's !reset / !override load as the untagged value."""
+        data = load_yaml(
+            "services:\n"
+            "  api:\n"
+            "    environment: !reset []\n"
+            "    ports: !override\n"
+            "      - 8080:80\n"
+            "    labels: !reset null\n"
+            "    deploy: !override {replicas: 2}\n"
+        )
+        assert data["services"]["api"] == {
+            "environment": [],
+            "ports": ["8080:80"],
+            "labels": None,
+            "deploy": {"replicas": 2},
+        }
+
+    def test_compose_local_tags_pure_parser(self) -> None:
+        with patch.object(yaml_loader, "HAS_C_LOADER", False):
+            assert load_yaml("a: !reset [1]\n") == {"a": [1]}
+
+    def test_file(self, tmp_path: Path) -> None:
+        path = tmp_path / "c.yml"
+        path.write_text("a: 1\n")
+        assert load_yaml_file(path) == {"a": 1}
+
+    def test_pure_parser_without_clib(self) -> None:
+        with patch.object(yaml_loader, "HAS_C_LOADER", False):
+            assert load_yaml("a: [1, 2]\n") == {"a": [1, 2]}
+
+    def test_falls_back_when_c_loader_breaks(self) -> None:
+        real_yaml = yaml_loader.YAML
+
+        def fake_yaml(*args: object, **kwargs: object) -> object:
+            if not kwargs.get("pure"):
+                raise AttributeError("CParser")
+            return real_yaml(*args, **kwargs)
+
+        with (
+            patch.object(yaml_loader, "HAS_C_LOADER", True),
+            patch.object(yaml_loader, "_c_loader_broken", False),
+            patch.object(yaml_loader, "YAML", side_effect=fake_yaml),
+        ):
+            assert load_yaml("a: 1\n") == {"a": 1}
+            assert yaml_loader._c_loader_broken is True